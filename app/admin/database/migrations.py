@@ -0,0 +1,414 @@
+import argparse
+import logging
+import mysql.connector
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+# Migrações versionadas do schema. Cada versão é aplicada uma única vez e
+# registrada em schema_migrations; os passos são idempotentes para que uma
+# migração interrompida (DDL no MySQL faz commit implícito) possa ser refeita.
+MIGRATIONS = [
+    {
+        'version': 1,
+        'description': 'Tabela journal_applied do journal offline dos clientes',
+        'statements': [
+            """
+            CREATE TABLE IF NOT EXISTS journal_applied (
+                idempotency_key CHAR(36) PRIMARY KEY,
+                result_id INT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        ]
+    },
+    {
+        'version': 2,
+        'description': 'Índices compostos das consultas mais frequentes',
+        'indexes': [
+            # TimeManager._pause_after_hours / ActivityTopFrame.check_company_hours_notice
+            ('atividades', 'idx_atividades_user_status', ('user_id', 'ativo', 'concluido', 'pausado')),
+            # ActivityTableLogic.get_activities / relatórios por usuário
+            ('atividades', 'idx_atividades_user_start', ('user_id', 'start_time')),
+            ('atividades', 'idx_atividades_user_updated', ('user_id', 'updated_at')),
+            # DashboardQuery (faixas de datas sem filtro de usuário)
+            ('atividades', 'idx_atividades_updated', ('updated_at',)),
+            ('atividades', 'idx_atividades_start', ('start_time',)),
+            # LockStateObserver (índice de cobertura)
+            ('user_lock_unlock', 'idx_lock_user', ('user_id', 'lock_status', 'unlock_control'))
+        ]
+    },
+    {
+        'version': 3,
+        'description': 'Índices de created_at para os filtros de período em intervalo',
+        'indexes': [
+            # QueryActivities.get_activities_report_data
+            ('atividades', 'idx_atividades_user_created', ('user_id', 'created_at')),
+            # SearchDialog (filtros de mês/ano sem usuário)
+            ('atividades', 'idx_atividades_created', ('created_at',))
+        ]
+    },
+    {
+        'version': 4,
+        'description': 'Calendário de trabalho: horários por equipe, feriados e recessos',
+        'statements': [
+            """
+            CREATE TABLE IF NOT EXISTS horarios_equipe (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                equipe_id INT NULL UNIQUE,
+                inicio_expediente TIME NOT NULL,
+                inicio_intervalo TIME NOT NULL,
+                fim_intervalo TIME NOT NULL,
+                fim_expediente TIME NOT NULL,
+                dias_semana VARCHAR(13) NOT NULL DEFAULT '0,1,2,3,4,5,6',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS feriados (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                data DATE NOT NULL,
+                descricao VARCHAR(255),
+                equipe_id INT NULL,
+                UNIQUE KEY uk_feriados_data_equipe (data, equipe_id),
+                FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS recessos (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                data_inicio DATE NOT NULL,
+                data_fim DATE NOT NULL,
+                descricao VARCHAR(255),
+                equipe_id INT NULL,
+                FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+            )
+            """
+        ]
+    },
+    {
+        'version': 5,
+        'description': 'Log de eventos das atividades e resumo mantido a cada evento',
+        'statements': [
+            """
+            CREATE TABLE IF NOT EXISTS activity_events (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                atividade_id INT NULL,
+                user_id INT NULL,
+                event_type VARCHAR(16) NOT NULL,
+                occurred_at DATETIME NOT NULL,
+                total_seconds INT NULL,
+                limit_seconds INT NULL,
+                idle_seconds INT NULL,
+                INDEX idx_activity_events_atividade (atividade_id, id),
+                INDEX idx_activity_events_user (user_id, occurred_at)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS activity_summary (
+                atividade_id INT PRIMARY KEY,
+                user_id INT NULL,
+                state VARCHAR(16) NULL,
+                total_seconds INT NOT NULL DEFAULT 0,
+                running_since DATETIME NULL,
+                limit_seconds INT NOT NULL DEFAULT 0,
+                exceeded_at DATETIME NULL,
+                idle_seconds INT NOT NULL DEFAULT 0,
+                last_event VARCHAR(16) NULL,
+                event_count INT NOT NULL DEFAULT 0,
+                updated_at DATETIME NULL,
+                INDEX idx_activity_summary_user (user_id, state)
+            )
+            """
+        ]
+    },
+    {
+        'version': 6,
+        'description': 'Coluna de versão das atividades (concorrência otimista nas transições de status)',
+        'columns': [
+            ('atividades', 'version', 'INT NOT NULL DEFAULT 0')
+        ]
+    },
+    {
+        'version': 7,
+        'description': 'Períodos ociosos, acúmulo por dia e total em segundos',
+        'columns': [
+            ('usuarios', 'ociosidade_seconds', 'INT NOT NULL DEFAULT 0')
+        ],
+        'statements': [
+            # Total anterior, gravado no campo TIME
+            """
+            UPDATE usuarios
+            SET ociosidade_seconds = TIME_TO_SEC(ociosidade)
+            WHERE ociosidade IS NOT NULL AND ociosidade_seconds = 0
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS idle_periods (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                atividade_id INT NULL,
+                started_at DATETIME NOT NULL,
+                ended_at DATETIME NOT NULL,
+                idle_seconds INT NOT NULL,
+                INDEX idx_idle_periods_user (user_id, started_at),
+                INDEX idx_idle_periods_atividade (atividade_id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS idle_daily (
+                user_id INT NOT NULL,
+                day DATE NOT NULL,
+                idle_seconds INT NOT NULL DEFAULT 0,
+                periods INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            )
+            """
+        ]
+    },
+    {
+        'version': 8,
+        'description': 'Índices FULLTEXT da pesquisa de atividades',
+        'fulltext': [
+            # ActivitySearch (SearchFrame e aba de atividades do admin)
+            ('atividades', 'ft_atividades_texto', ('description', 'atividade')),
+            ('usuarios', 'ft_usuarios_nome', ('nome',))
+        ]
+    }
+]
+
+# Consultas representativas verificadas com EXPLAIN: (descrição, query, params, tabela, índice esperado)
+INDEX_CHECKS = [
+    (
+        'Atividade em andamento do usuário',
+        "SELECT id FROM atividades WHERE user_id = %s AND ativo = TRUE AND concluido = FALSE AND pausado = FALSE",
+        (1,), 'atividades', 'idx_atividades_user_status'
+    ),
+    (
+        'Atividades do usuário por período',
+        "SELECT id FROM atividades WHERE user_id = %s AND start_time >= %s AND start_time < %s",
+        (1, '2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_user_start'
+    ),
+    (
+        'Atividades do usuário alteradas no período',
+        "SELECT id FROM atividades WHERE user_id = %s AND updated_at >= %s AND updated_at < %s",
+        (1, '2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_user_updated'
+    ),
+    (
+        'Relatório mensal do usuário',
+        "SELECT id FROM atividades WHERE user_id = %s AND created_at >= %s AND created_at < %s",
+        (1, '2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_user_created'
+    ),
+    (
+        'Atrasos por período (dashboard)',
+        "SELECT id FROM atividades WHERE updated_at >= %s AND updated_at < %s",
+        ('2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_updated'
+    ),
+    (
+        'Atividades iniciadas no período (dashboard)',
+        "SELECT id FROM atividades WHERE start_time >= %s AND start_time < %s",
+        ('2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_start'
+    ),
+    (
+        'Filtro de mês/ano sem usuário (pesquisa)',
+        "SELECT id FROM atividades WHERE created_at >= %s AND created_at < %s",
+        ('2024-01-01', '2024-02-01'), 'atividades', 'idx_atividades_created'
+    ),
+    (
+        'Períodos ociosos do usuário por intervalo',
+        "SELECT id FROM idle_periods WHERE user_id = %s AND started_at >= %s AND started_at < %s",
+        (1, '2024-01-01', '2024-02-01'), 'idle_periods', 'idx_idle_periods_user'
+    ),
+    (
+        'Pesquisa de atividades por texto',
+        "SELECT id FROM atividades WHERE MATCH(description, atividade) AGAINST (%s IN BOOLEAN MODE)",
+        ('+projeto*',), 'atividades', 'ft_atividades_texto'
+    ),
+    (
+        'Pesquisa de atividades por nome do usuário',
+        "SELECT id FROM usuarios WHERE MATCH(nome) AGAINST (%s IN BOOLEAN MODE)",
+        ('+ana*',), 'usuarios', 'ft_usuarios_nome'
+    ),
+    (
+        'Estado de bloqueio do usuário',
+        "SELECT unlock_control FROM user_lock_unlock WHERE user_id = %s",
+        (1,), 'user_lock_unlock', 'idx_lock_user'
+    )
+]
+
+class MigrationRunner:
+    """Aplica as migrações pendentes e verifica os índices com EXPLAIN"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def _connect(self):
+        return mysql.connector.connect(**self.config)
+
+    def _ensure_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def applied_versions(self):
+        """Retorna as versões já aplicadas"""
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            self._ensure_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            connection.close()
+
+    def pending(self):
+        """Retorna as migrações ainda não aplicadas, em ordem de versão"""
+        applied = self.applied_versions()
+        return [m for m in sorted(MIGRATIONS, key=lambda m: m['version'])
+                if m['version'] not in applied]
+
+    def migrate(self):
+        """Aplica as migrações pendentes e retorna as versões aplicadas"""
+        applied = []
+        connection = self._connect()
+        try:
+            cursor = connection.cursor()
+            self._ensure_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cursor.fetchall()}
+
+            for migration in sorted(MIGRATIONS, key=lambda m: m['version']):
+                if migration['version'] in done:
+                    continue
+
+                logger.info(f"[MIGRATION] Aplicando versão {migration['version']}: {migration['description']}")
+                # Colunas antes dos comandos, que podem preenchê-las
+                for table, column, definition in migration.get('columns', []):
+                    self._add_column(cursor, table, column, definition)
+                for statement in migration.get('statements', []):
+                    cursor.execute(statement)
+                for table, name, columns in migration.get('indexes', []):
+                    self._create_index(cursor, table, name, columns)
+                for table, name, columns in migration.get('fulltext', []):
+                    self._create_index(cursor, table, name, columns, fulltext=True)
+
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (migration['version'], migration['description'])
+                )
+                connection.commit()
+                applied.append(migration['version'])
+            return applied
+        finally:
+            connection.close()
+
+    def _add_column(self, cursor, table, column, definition):
+        """Adiciona a coluna se ainda não existir (MySQL não tem ADD COLUMN IF NOT EXISTS)"""
+        cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+            LIMIT 1
+        """, (table, column))
+        if cursor.fetchone():
+            logger.info(f"[MIGRATION] Coluna {table}.{column} já existe")
+            return
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"[MIGRATION] Coluna {column} adicionada em {table}")
+
+    def _create_index(self, cursor, table, name, columns, fulltext=False):
+        """Cria o índice se ainda não existir (MySQL não tem CREATE INDEX IF NOT EXISTS)"""
+        cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, (table, name))
+        if cursor.fetchone():
+            logger.info(f"[MIGRATION] Índice {name} já existe")
+            return
+        kind = "FULLTEXT INDEX" if fulltext else "INDEX"
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+        logger.info(f"[MIGRATION] Índice {name} criado em {table}")
+
+    def verify(self):
+        """
+        Executa EXPLAIN nas consultas representativas.
+        Uma verificação passa se o índice esperado for candidato (possible_keys);
+        'key' informa o índice escolhido pelo otimizador com os dados atuais.
+        """
+        results = []
+        connection = self._connect()
+        try:
+            cursor = connection.cursor(dictionary=True)
+            for description, query, params, table, index in INDEX_CHECKS:
+                cursor.execute(f"EXPLAIN {query}", params)
+                rows = [row for row in cursor.fetchall() if row.get('table') == table]
+                plan = rows[0] if rows else {}
+                possible = (plan.get('possible_keys') or '').split(',')
+                results.append({
+                    'check': description,
+                    'index': index,
+                    'ok': index in possible,
+                    'key': plan.get('key'),
+                    'type': plan.get('type')
+                })
+            return results
+        finally:
+            connection.close()
+
+def format_report(applied, checks):
+    """Texto de resumo usado pela CLI e pelo app administrativo"""
+    lines = [
+        f"Migrações aplicadas: {', '.join(map(str, applied))}" if applied
+        else "Nenhuma migração pendente"
+    ]
+    for check in checks:
+        status = "OK" if check['ok'] else "FALHOU"
+        lines.append(
+            f"[{status}] {check['check']}: {check['index']} (usado: {check['key'] or '-'}, tipo: {check['type'] or '-'})"
+        )
+    return "\n".join(lines)
+
+def _load_config():
+    """Configuração do MySQL a partir do arquivo criptografado do app administrativo"""
+    from app.admin.config.crypto import EnvCrypto
+    config = EnvCrypto().load_encrypted()
+    return {
+        'host': config.get('MYSQL_HOST', 'localhost'),
+        'port': config.get('MYSQL_PORT', '3306'),
+        'user': config.get('MYSQL_USER', 'root'),
+        'password': config.get('MYSQL_PASSWORD', ''),
+        'database': config.get('MYSQL_DATABASE', '')
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrações do banco de dados do Sistema Chronos")
+    parser.add_argument('--status', action='store_true', help="lista as migrações pendentes sem aplicar")
+    parser.add_argument('--verify', action='store_true', help="apenas verifica os índices com EXPLAIN")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    runner = MigrationRunner(_load_config())
+
+    try:
+        if args.status:
+            pending = runner.pending()
+            if not pending:
+                print("Nenhuma migração pendente")
+            for migration in pending:
+                print(f"Pendente: {migration['version']} - {migration['description']}")
+            return 0
+
+        applied = [] if args.verify else runner.migrate()
+        checks = runner.verify()
+        print(format_report(applied, checks))
+        return 0 if all(check['ok'] for check in checks) else 1
+    except Error as e:
+        logger.error(f"[MIGRATION] Erro MySQL: {e}")
+        return 2
+
+if __name__ == "__main__":
+    raise SystemExit(main())
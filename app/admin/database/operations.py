@@ -3,6 +3,7 @@ from mysql.connector import Error
 import logging
 import os
 import sys
+from .migrations import MigrationRunner, format_report
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +100,10 @@ class DatabaseOperations:
                         raise
                 
             connection.commit()
+            
+            # Aplica as migrações versionadas (índices etc.) no banco recém-criado
+            db_config['database'] = db_name
+            MigrationRunner(db_config).migrate()
             return True, None
             
         except FileNotFoundError as e:
@@ -113,6 +118,18 @@ class DatabaseOperations:
             if 'connection' in locals():
                 connection.close()
     
+    @staticmethod
+    def run_migrations(config):
+        """Aplica as migrações pendentes e verifica os índices com EXPLAIN"""
+        try:
+            runner = MigrationRunner(config)
+            applied = runner.migrate()
+            checks = runner.verify()
+            return all(check['ok'] for check in checks), format_report(applied, checks)
+        except Error as e:
+            logger.error(f"Erro ao aplicar migrações: {e}")
+            return False, str(e)
+    
     @staticmethod
     def change_mysql_password(config, current_password, new_password):
         """Altera a senha do usuário MySQL"""
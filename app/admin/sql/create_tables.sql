@@ -18,10 +18,12 @@ CREATE TABLE IF NOT EXISTS usuarios (
     data_entrada DATE,
     base_value DECIMAL(10,2),
     ociosidade TIME,
+    ociosidade_seconds INT NOT NULL DEFAULT 0,
     is_logged_in BOOLEAN DEFAULT FALSE,
     status BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FULLTEXT INDEX ft_usuarios_nome (nome),
     FOREIGN KEY (equipe_id) REFERENCES equipes(id)
 );
 
@@ -41,8 +43,10 @@ CREATE TABLE IF NOT EXISTS atividades (
     pausado BOOLEAN DEFAULT FALSE,
     concluido BOOLEAN DEFAULT FALSE,
     current_mode VARCHAR(20), 
+    version INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FULLTEXT INDEX ft_atividades_texto (description, atividade),
     FOREIGN KEY (user_id) REFERENCES usuarios(id)
 );
 
@@ -57,6 +61,93 @@ CREATE TABLE IF NOT EXISTS user_lock_unlock (
     FOREIGN KEY (user_id) REFERENCES usuarios(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+-- Idempotency keys of mutations replayed from the desktop clients' local journal
+CREATE TABLE IF NOT EXISTS journal_applied (
+    idempotency_key CHAR(36) PRIMARY KEY,
+    result_id INT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Work calendar: schedule per team (equipe_id NULL = company default), holidays and recesses
+CREATE TABLE IF NOT EXISTS horarios_equipe (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    equipe_id INT NULL UNIQUE,
+    inicio_expediente TIME NOT NULL,
+    inicio_intervalo TIME NOT NULL,
+    fim_intervalo TIME NOT NULL,
+    fim_expediente TIME NOT NULL,
+    dias_semana VARCHAR(13) NOT NULL DEFAULT '0,1,2,3,4,5,6',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS feriados (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    data DATE NOT NULL,
+    descricao VARCHAR(255),
+    equipe_id INT NULL,
+    UNIQUE KEY uk_feriados_data_equipe (data, equipe_id),
+    FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS recessos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    descricao VARCHAR(255),
+    equipe_id INT NULL,
+    FOREIGN KEY (equipe_id) REFERENCES equipes(id) ON DELETE CASCADE
+);
+
+-- Insert-only activity event log and the summary row maintained on every event
+CREATE TABLE IF NOT EXISTS activity_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    atividade_id INT NULL,
+    user_id INT NULL,
+    event_type VARCHAR(16) NOT NULL,
+    occurred_at DATETIME NOT NULL,
+    total_seconds INT NULL,
+    limit_seconds INT NULL,
+    idle_seconds INT NULL,
+    INDEX idx_activity_events_atividade (atividade_id, id),
+    INDEX idx_activity_events_user (user_id, occurred_at)
+);
+
+CREATE TABLE IF NOT EXISTS activity_summary (
+    atividade_id INT PRIMARY KEY,
+    user_id INT NULL,
+    state VARCHAR(16) NULL,
+    total_seconds INT NOT NULL DEFAULT 0,
+    running_since DATETIME NULL,
+    limit_seconds INT NOT NULL DEFAULT 0,
+    exceeded_at DATETIME NULL,
+    idle_seconds INT NOT NULL DEFAULT 0,
+    last_event VARCHAR(16) NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NULL,
+    INDEX idx_activity_summary_user (user_id, state)
+);
+
+-- Idle periods recorded by the desktop clients, with a per-day rollup
+CREATE TABLE IF NOT EXISTS idle_periods (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    atividade_id INT NULL,
+    started_at DATETIME NOT NULL,
+    ended_at DATETIME NOT NULL,
+    idle_seconds INT NOT NULL,
+    INDEX idx_idle_periods_user (user_id, started_at),
+    INDEX idx_idle_periods_atividade (atividade_id)
+);
+
+CREATE TABLE IF NOT EXISTS idle_daily (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    idle_seconds INT NOT NULL DEFAULT 0,
+    periods INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
 -- System Logs Table
 CREATE TABLE IF NOT EXISTS logs_sistema (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -139,7 +230,7 @@ BEGIN
     SET is_logged_in = FALSE,
         updated_at = CURRENT_TIMESTAMP 
     WHERE is_logged_in = TRUE 
-    AND DATE(updated_at) < CURRENT_DATE;
+    AND updated_at < CURRENT_DATE;
 END //
 
 DELIMITER ;
@@ -159,6 +159,18 @@ class DatabaseConfigDialog(ctk.CTkToplevel):
             font=("Roboto", 14)
         )
         self.create_db_btn.pack(side="right", padx=5)
+        
+        # Apply schema migrations button
+        self.migrate_btn = ctk.CTkButton(
+            self,
+            text="Aplicar Migrações",
+            fg_color="#FF5722",
+            hover_color="#CE461B",
+            command=self.run_migrations,
+            width=120,
+            font=("Roboto", 14)
+        )
+        self.migrate_btn.pack(padx=25, pady=(0, 10), anchor="e")
 
     def show_change_password_dialog(self):
         """Show dialog to change MySQL password"""
@@ -243,4 +255,19 @@ class DatabaseConfigDialog(ctk.CTkToplevel):
                             f"Banco de dados '{db_name}' criado com sucesso!")
             self.create_crypto_files(config)
         else:
-            messagebox.showerror("Erro", f"Erro ao criar banco: {error}")
\ No newline at end of file
+            messagebox.showerror("Erro", f"Erro ao criar banco: {error}")
+    
+    def run_migrations(self):
+        """Apply pending schema migrations and verify indexes"""
+        config = {key: entry.get().strip() 
+                for key, entry in self.entries.items()}
+        
+        if not config.get('database'):
+            messagebox.showerror("Erro", "Informe o nome do banco de dados!")
+            return
+            
+        success, report = DatabaseOperations.run_migrations(config)
+        if success:
+            messagebox.showinfo("Sucesso", report)
+        else:
+            messagebox.showerror("Erro", f"Erro nas migrações:\n{report}")
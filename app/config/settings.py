@@ -138,7 +138,9 @@ def load_settings():
                 normalized_config[db_key] = value
 
         # Verifica configurações obrigatórias
-        required_configs = ['DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME']
+        # Com o backend SQLite (testes e benchmarks locais) o MySQL não é necessário
+        db_backend = env_config.get('DB_BACKEND', 'mysql').lower()
+        required_configs = ['DB_HOST', 'DB_USER', 'DB_PASSWORD', 'DB_NAME'] if db_backend == 'mysql' else []
         missing_configs = [config for config in required_configs if config not in normalized_config]
         
         if missing_configs:
@@ -159,12 +161,51 @@ def load_settings():
         
         return {
             'DB_CONFIG': {
-                'host': normalized_config['DB_HOST'],
-                'user': normalized_config['DB_USER'],
-                'password': normalized_config['DB_PASSWORD'],
-                'database': normalized_config['DB_NAME'],
+                'host': normalized_config.get('DB_HOST'),
+                'user': normalized_config.get('DB_USER'),
+                'password': normalized_config.get('DB_PASSWORD'),
+                'database': normalized_config.get('DB_NAME'),
                 'port': int(normalized_config.get('DB_PORT', 3306))
             },
+            'DB_BACKEND_CONFIG': {
+                'engine': db_backend,
+                'sqlite_path': env_config.get('SQLITE_PATH', ':memory:')
+            },
+            'DB_POOL_CONFIG': {
+                'size': int(env_config.get('DB_POOL_SIZE', 6)),
+                'idle_timeout': int(env_config.get('DB_POOL_IDLE_TIMEOUT', 300)),
+                'acquire_timeout': int(env_config.get('DB_POOL_ACQUIRE_TIMEOUT', 10)),
+                'ping_after': int(env_config.get('DB_PING_AFTER', 60)),
+                'keepalive_interval': int(env_config.get('DB_KEEPALIVE_INTERVAL', 0)),
+                'retry_backoff': int(env_config.get('DB_RETRY_BACKOFF', 15))
+            },
+            'JOURNAL_CONFIG': {
+                'enabled': env_config.get('JOURNAL_ENABLED', 'True').lower() == 'true',
+                'path': env_config.get('JOURNAL_PATH', os.path.join('data', 'chronos_journal.db')),
+                'wait_timeout': float(env_config.get('JOURNAL_WAIT_TIMEOUT', 2)),
+                'retry_interval': int(env_config.get('JOURNAL_RETRY_INTERVAL', 15))
+            },
+            'CHECKPOINT_CONFIG': {
+                'enabled': env_config.get('CHECKPOINT_ENABLED', 'True').lower() == 'true',
+                'dir': env_config.get('CHECKPOINT_DIR', 'data'),
+                'sync_interval': float(env_config.get('CHECKPOINT_SYNC_INTERVAL', 5))
+            },
+            'IDLE_CONFIG': {
+                'backend': env_config.get('IDLE_BACKEND', 'auto'),
+                'threshold': int(env_config.get('IDLE_THRESHOLD', 10)),
+                'poll_interval': float(env_config.get('IDLE_POLL_INTERVAL', 1)),
+                'batch_size': int(env_config.get('IDLE_BATCH_SIZE', 20)),
+                'flush_interval': float(env_config.get('IDLE_FLUSH_INTERVAL', 30))
+            },
+            'ACTIVITY_STATE_CONFIG': {
+                'refresh_interval': float(env_config.get('STATE_REFRESH_INTERVAL', 30))
+            },
+            'QUERY_STATS_CONFIG': {
+                'enabled': env_config.get('QUERY_STATS_ENABLED', 'True').lower() == 'true',
+                'slow_query_ms': float(env_config.get('SLOW_QUERY_MS', 500)),
+                'summary_interval': int(env_config.get('QUERY_STATS_INTERVAL', 900)),
+                'log_dir': 'logs'
+            },
             'APP_CONFIG': {
                 'title': 'Sistema Chronos',
                 'version': '0.0.9',
@@ -220,5 +261,12 @@ settings = load_settings()
 
 # Exporta as configurações
 DB_CONFIG = settings['DB_CONFIG']
+DB_POOL_CONFIG = settings['DB_POOL_CONFIG']
+DB_BACKEND_CONFIG = settings['DB_BACKEND_CONFIG']
+JOURNAL_CONFIG = settings['JOURNAL_CONFIG']
+CHECKPOINT_CONFIG = settings['CHECKPOINT_CONFIG']
+IDLE_CONFIG = settings['IDLE_CONFIG']
+ACTIVITY_STATE_CONFIG = settings['ACTIVITY_STATE_CONFIG']
+QUERY_STATS_CONFIG = settings['QUERY_STATS_CONFIG']
 APP_CONFIG = settings['APP_CONFIG']
 LOG_CONFIG = settings['LOG_CONFIG']
\ No newline at end of file
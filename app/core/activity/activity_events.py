@@ -0,0 +1,240 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import logging
+
+from ...database.connection import DatabaseConnection
+from ...database.local_journal import write_through, resolve_ref
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento do ciclo de vida de uma atividade
+EVENT_START = "start"
+EVENT_PAUSE = "pause"
+EVENT_RESUME = "resume"
+EVENT_STOP = "stop"
+EVENT_EXCEEDED = "exceeded"
+EVENT_IDLE = "idle"
+EVENT_TYPES = (EVENT_START, EVENT_PAUSE, EVENT_RESUME, EVENT_STOP, EVENT_EXCEEDED, EVENT_IDLE)
+
+# Estado da atividade no resumo
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_STOPPED = "stopped"
+
+_INSERT_EVENT = """
+    INSERT INTO activity_events
+        (atividade_id, user_id, event_type, occurred_at, total_seconds, limit_seconds, idle_seconds)
+    VALUES (%(atividade_id)s, %(user_id)s, %(event_type)s, %(occurred_at)s,
+            %(total_seconds)s, %(limit_seconds)s, %(idle_seconds)s)
+"""
+
+_ENSURE_SUMMARY = """
+    INSERT IGNORE INTO activity_summary (atividade_id, user_id) VALUES (%(atividade_id)s, %(user_id)s)
+"""
+
+# Campos do resumo alterados por cada tipo de evento (além de last_event/event_count/updated_at)
+_SUMMARY_UPDATES = {
+    EVENT_START: "state = 'running', running_since = %(occurred_at)s, "
+                 "total_seconds = %(total_seconds)s, limit_seconds = %(limit_seconds)s, "
+                 "exceeded_at = NULL, idle_seconds = 0",
+    EVENT_RESUME: "state = 'running', running_since = %(occurred_at)s, "
+                  "total_seconds = %(total_seconds)s, limit_seconds = %(limit_seconds)s",
+    EVENT_PAUSE: "state = 'paused', running_since = NULL, total_seconds = %(total_seconds)s",
+    EVENT_STOP: "state = 'stopped', running_since = NULL, total_seconds = %(total_seconds)s",
+    EVENT_EXCEEDED: "exceeded_at = COALESCE(exceeded_at, %(occurred_at)s)",
+    EVENT_IDLE: "idle_seconds = idle_seconds + %(idle_seconds)s",
+}
+
+_SUMMARY_COLUMNS = """
+    atividade_id, user_id, state, total_seconds, running_since, limit_seconds,
+    exceeded_at, idle_seconds, last_event, event_count, updated_at
+"""
+
+class ActivitySummary(NamedTuple):
+    """
+    Resumo derivado dos eventos de uma atividade (uma linha de activity_summary).
+    total_seconds é o tempo total no último evento; enquanto a atividade roda,
+    o tempo atual soma o trecho desde running_since. limit_seconds é o tempo
+    total em que o regressivo zera: abaixo dele o modo é regressivo.
+    """
+    atividade_id: int
+    user_id: Optional[int]
+    state: Optional[str]
+    total_seconds: int
+    running_since: Optional[datetime]
+    limit_seconds: int
+    exceeded_at: Optional[datetime]
+    idle_seconds: int
+    last_event: Optional[str]
+    event_count: int
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, row: Dict) -> "ActivitySummary":
+        return cls(
+            row['atividade_id'], row['user_id'], row['state'], int(row['total_seconds'] or 0),
+            row['running_since'], int(row['limit_seconds'] or 0), row['exceeded_at'],
+            int(row['idle_seconds'] or 0), row['last_event'], int(row['event_count'] or 0),
+            row['updated_at']
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.state == STATE_RUNNING and self.running_since is not None
+
+    def total_at(self, now: Optional[datetime] = None) -> int:
+        """Tempo total em segundos em now (agora, se omitido)"""
+        if not self.running:
+            return self.total_seconds
+        now = now or datetime.now()
+        return self.total_seconds + max(0, int((now - self.running_since).total_seconds()))
+
+    def mode_at(self, now: Optional[datetime] = None) -> str:
+        return 'regressivo' if self.total_at(now) < self.limit_seconds else 'progressivo'
+
+    def regress_seconds_at(self, now: Optional[datetime] = None) -> int:
+        return max(0, self.limit_seconds - self.total_at(now))
+
+    def exceeded_seconds_at(self, now: Optional[datetime] = None) -> int:
+        return max(0, self.total_at(now) - self.limit_seconds)
+
+def fold(events: Iterable[Dict], summary: Optional[ActivitySummary] = None) -> Optional[ActivitySummary]:
+    """
+    Aplica eventos (linhas de activity_events, em ordem) a um resumo.
+    É a mesma regra que os UPDATEs de _SUMMARY_UPDATES aplicam no banco a
+    cada evento; serve para reconstruir o resumo a partir do log.
+    """
+    for event in events:
+        kind = event['event_type']
+        if summary is None:
+            summary = ActivitySummary(event['atividade_id'], event.get('user_id'), None, 0, None, 0,
+                                      None, 0, None, 0, None)
+        changes = {}
+        if kind in (EVENT_START, EVENT_RESUME):
+            changes = {'state': STATE_RUNNING, 'running_since': event['occurred_at'],
+                       'total_seconds': event['total_seconds'], 'limit_seconds': event['limit_seconds']}
+            if kind == EVENT_START:
+                changes.update(exceeded_at=None, idle_seconds=0)
+        elif kind in (EVENT_PAUSE, EVENT_STOP):
+            changes = {'state': STATE_PAUSED if kind == EVENT_PAUSE else STATE_STOPPED,
+                       'running_since': None, 'total_seconds': event['total_seconds']}
+        elif kind == EVENT_EXCEEDED:
+            changes = {'exceeded_at': summary.exceeded_at or event['occurred_at']}
+        elif kind == EVENT_IDLE:
+            changes = {'idle_seconds': summary.idle_seconds + int(event['idle_seconds'] or 0)}
+        summary = summary._replace(last_event=kind, event_count=summary.event_count + 1,
+                                   updated_at=event['occurred_at'], **changes)
+    return summary
+
+class ActivityEventLog:
+    """
+    Log de eventos das atividades (start/pause/resume/stop/exceeded/idle).
+
+    Os eventos são só inseridos, nunca alterados. Na mesma transação de cada
+    inserção o resumo da atividade (activity_summary) é atualizado de forma
+    incremental, então restaurar o estado, relatórios e painéis leem uma
+    linha por atividade em vez de recalcular os tempos com várias consultas.
+    Com o MySQL inacessível, evento e resumo vão juntos para o journal local.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, db=None):
+        if not self.initialized:
+            self.db = db or DatabaseConnection()
+            self.initialized = True
+
+    # ----------------------------------------------------------- escrita
+
+    def record(self, atividade_id, user_id, event_type: str, occurred_at: Optional[datetime] = None,
+               total_seconds: Optional[int] = None, limit_seconds: Optional[int] = None,
+               idle_seconds: Optional[int] = None) -> bool:
+        """
+        Registra um evento e atualiza o resumo da atividade.
+        total_seconds: tempo total da atividade no instante do evento (start/pause/resume/stop)
+        limit_seconds: tempo total em que o regressivo zera (start/resume)
+        idle_seconds: duração da ociosidade (idle; sem atividade, só o evento é gravado)
+        """
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Tipo de evento inválido: {event_type}")
+        atividade_id = resolve_ref(atividade_id, self.db)
+
+        params = {
+            'atividade_id': atividade_id,
+            'user_id': user_id,
+            'event_type': event_type,
+            'occurred_at': (occurred_at or datetime.now()).replace(microsecond=0),
+            'total_seconds': total_seconds,
+            'limit_seconds': limit_seconds,
+            'idle_seconds': idle_seconds,
+        }
+        statements = [(_INSERT_EVENT, params)]
+        if atividade_id is not None:
+            statements += [
+                (_ENSURE_SUMMARY, params),
+                (f"""
+                    UPDATE activity_summary
+                    SET {_SUMMARY_UPDATES[event_type]},
+                        last_event = %(event_type)s,
+                        event_count = event_count + 1,
+                        updated_at = %(occurred_at)s
+                    WHERE atividade_id = %(atividade_id)s
+                """, params),
+            ]
+
+        def direct():
+            if not self.db.execute_transaction(statements):
+                raise ConnectionError("Sem conexão com o banco de dados")
+            return True
+
+        def queued(journal):
+            journal.record_transaction(statements, activity_ref=atividade_id)
+            return True
+
+        try:
+            return write_through(self.db, direct, queued, atividade_id)
+        except ConnectionError:
+            return False
+
+    # ------------------------------------------------------------ leitura
+
+    def get_summary(self, atividade_id) -> Optional[ActivitySummary]:
+        """Resumo de uma atividade, ou None se ela ainda não tem eventos"""
+        if atividade_id is None:
+            return None
+        rows = self.db.execute_query(
+            f"SELECT {_SUMMARY_COLUMNS} FROM activity_summary WHERE atividade_id = %s",
+            (resolve_ref(atividade_id, self.db),)
+        )
+        return ActivitySummary.from_row(rows[0]) if rows else None
+
+    def get_summaries(self, atividade_ids: Iterable[int]) -> Dict[int, ActivitySummary]:
+        """Resumos de várias atividades em uma única consulta"""
+        ids = [atividade_id for atividade_id in atividade_ids if atividade_id is not None]
+        if not ids:
+            return {}
+        rows = self.db.execute_query(
+            f"SELECT {_SUMMARY_COLUMNS} FROM activity_summary "
+            f"WHERE atividade_id IN ({', '.join(['%s'] * len(ids))})",
+            tuple(ids)
+        )
+        return {row['atividade_id']: ActivitySummary.from_row(row) for row in rows or []}
+
+    def get_events(self, atividade_id) -> List[Dict]:
+        """Eventos de uma atividade em ordem de gravação"""
+        return self.db.execute_query("""
+            SELECT id, atividade_id, user_id, event_type, occurred_at,
+                   total_seconds, limit_seconds, idle_seconds
+            FROM activity_events
+            WHERE atividade_id = %s
+            ORDER BY id
+        """, (atividade_id,)) or []
+
+    def rebuild_summary(self, atividade_id) -> Optional[ActivitySummary]:
+        """Recalcula o resumo de uma atividade a partir do log (diagnóstico/correção)"""
+        return fold(self.get_events(atividade_id))
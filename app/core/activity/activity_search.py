@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional, Sequence
+import logging
+import re
+
+from ...database.connection import DatabaseConnection
+from ...database.sqlite_backend import SQLiteConnection
+
+logger = logging.getLogger(__name__)
+
+# Máximo de resultados por pesquisa (os mais relevantes)
+SEARCH_LIMIT = 200
+
+# Termos menores que innodb_ft_min_token_size (padrão 3) não entram no índice FULLTEXT
+MIN_TOKEN_LENGTH = 3
+
+# Colaborador e equipe de cada atividade: as colunas e filtros usam os aliases a, u e e
+_JOINS = """
+    JOIN usuarios u ON a.user_id = u.id
+    LEFT JOIN equipes e ON u.equipe_id = e.id
+"""
+
+# Atividades cujo texto ou nome do colaborador corresponde aos termos, com a
+# relevância somada das duas buscas (quem corresponde às duas vem primeiro)
+_MATCHES = {
+    'fulltext': ("""
+        SELECT id, SUM(relevance) AS relevance FROM (
+            SELECT id, MATCH(description, atividade) AGAINST (%s IN BOOLEAN MODE) AS relevance
+            FROM atividades
+            WHERE MATCH(description, atividade) AGAINST (%s IN BOOLEAN MODE)
+            UNION ALL
+            SELECT a.id, MATCH(u.nome) AGAINST (%s IN BOOLEAN MODE) AS relevance
+            FROM usuarios u JOIN atividades a ON a.user_id = u.id
+            WHERE MATCH(u.nome) AGAINST (%s IN BOOLEAN MODE)
+        ) matches
+        GROUP BY id
+    """, 4),
+    # bm25() é negativo: quanto menor, mais relevante
+    'fts5': ("""
+        SELECT id, SUM(relevance) AS relevance FROM (
+            SELECT rowid AS id, -bm25(atividades_fts) AS relevance
+            FROM atividades_fts
+            WHERE atividades_fts MATCH %s
+            UNION ALL
+            SELECT a.id, -bm25(usuarios_fts) AS relevance
+            FROM usuarios_fts JOIN atividades a ON a.user_id = usuarios_fts.rowid
+            WHERE usuarios_fts MATCH %s
+        ) matches
+        GROUP BY id
+    """, 2)
+}
+
+def search_tokens(term: str) -> List[str]:
+    """Palavras do termo que o índice de texto consegue encontrar"""
+    return [token for token in re.findall(r"\w+", term.lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+def ready_to_search(term: str) -> bool:
+    """Pesquisa enquanto digita: só com o campo vazio ou com ao menos uma palavra indexável"""
+    return not term.strip() or bool(search_tokens(term))
+
+def match_expression(tokens: Sequence[str], dialect: str) -> str:
+    """Expressão de busca por prefixo de qualquer um dos termos (a relevância ordena)"""
+    if dialect == 'fts5':
+        return " OR ".join(f'"{token}"*' for token in tokens)
+    return " ".join(f"{token}*" for token in tokens)
+
+class ActivitySearch:
+    """
+    Pesquisa de atividades por texto (descrição, atividade e nome do
+    colaborador) usando o índice FULLTEXT do MySQL ou as tabelas FTS5 do
+    backend SQLite, ordenada por relevância e limitada aos melhores resultados.
+    Termos sem palavras indexáveis (ex.: duas letras) usam LIKE, também limitado.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+        if isinstance(self.db, SQLiteConnection):
+            self.dialect = 'fts5' if self.db.full_text else 'like'
+        else:
+            self.dialect = 'fulltext'
+
+    def search(self, term: str, columns: str, where: Optional[str] = None, params: Sequence = (),
+               limit: int = SEARCH_LIMIT, order_by: str = "a.id DESC") -> List[Dict]:
+        """
+        Atividades correspondentes a term, filtradas por where (aliases a, u, e).
+        Sem termo, lista as atividades filtradas em order_by.
+        """
+        conditions = [f"({where})"] if where else []
+        params = list(params)
+        tokens = search_tokens(term)
+
+        if tokens and self.dialect != 'like':
+            matches, copies = _MATCHES[self.dialect]
+            query = f"SELECT {columns} FROM ({matches}) m JOIN atividades a ON a.id = m.id {_JOINS}"
+            params = [match_expression(tokens, self.dialect)] * copies + params
+            order_by = f"m.relevance DESC, {order_by}"
+        else:
+            query = f"SELECT {columns} FROM atividades a {_JOINS}"
+            if term.strip():
+                conditions.insert(0, "(u.nome LIKE %s OR a.description LIKE %s OR a.atividade LIKE %s)")
+                params = [f"%{term.strip()}%"] * 3 + params
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order_by} LIMIT {int(limit)}"
+        return list(self.db.execute_query(query, tuple(params)) or [])
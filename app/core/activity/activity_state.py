@@ -0,0 +1,253 @@
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+import threading
+
+from ..time.scheduler import DeadlineScheduler
+from ...database.connection import DatabaseConnection
+from ...config.settings import ACTIVITY_STATE_CONFIG
+from ...utils.ui_tasks import UITaskRunner
+
+logger = logging.getLogger(__name__)
+
+# Atividades em aberto do usuário (ativas e pausadas); os tempos gravados não
+# são mantidos aqui: quem precisa deles lê do timer ou do banco
+_STATE_COLUMNS = """
+    id, user_id, description, atividade, start_time, end_time,
+    ativo, pausado, concluido, version
+"""
+
+_OPEN = "user_id = %s AND ativo = TRUE AND concluido = FALSE"
+
+# Impressão digital do conjunto em aberto: muda quando uma atividade entra ou
+# sai do conjunto (COUNT, MAX(id)), passa por uma transição (SUM(version)) ou
+# é pausada sem transição, como na pausa do fim do expediente (SUM(pausado))
+_FINGERPRINT_QUERY = f"""
+    SELECT COUNT(*) as total, COALESCE(SUM(version), 0) as versions,
+           COALESCE(SUM(pausado), 0) as paused, COALESCE(MAX(id), 0) as last_id
+    FROM atividades
+    WHERE {_OPEN}
+"""
+
+def _is_open(row: Dict) -> bool:
+    return bool(row.get('ativo')) and not row.get('concluido')
+
+def _is_running(row: Dict) -> bool:
+    return _is_open(row) and not row.get('pausado')
+
+class ActivityStateStore:
+    """
+    Estado em memória das atividades em aberto do usuário logado: responde
+    "há atividade em andamento?" sem consultar o banco.
+
+    Carregado uma vez no login (load), atualizado pelos caminhos que alteram
+    as atividades (ActivityTransitions, criação, pausa do fim do expediente)
+    e reconciliado com o banco por uma verificação periódica barata (uma
+    agregação sobre o índice de status do usuário) que só recarrega as linhas
+    quando outra sessão ou o administrador alterou o conjunto.
+
+    Os inscritos (subscribe) são chamados na thread que alterou o estado; no
+    app, a thread da interface.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, db=None):
+        if not self.initialized:
+            self.db = db or DatabaseConnection()
+            self.refresh_interval = ACTIVITY_STATE_CONFIG['refresh_interval']
+            self._lock = threading.RLock()
+            self._activities = {}
+            self._fingerprint = None
+            self._subscribers = []
+            self._widget = None
+            self.user_id = None
+            self.initialized = True
+
+    # ------------------------------------------------------------- carga
+
+    def load(self, user_id: int) -> None:
+        """
+        Carrega as atividades em aberto do usuário (no login, fora da thread da
+        interface). Se a leitura falhar, o usuário fica sem impressão digital e
+        a próxima verificação de versão recarrega o estado.
+        """
+        if self.user_id != user_id:
+            self._replace(user_id, [], None)
+        rows, fingerprint = self._fetch(user_id)
+        self._replace(user_id, rows, fingerprint)
+        logger.info(f"[STATE] {len(rows)} atividade(s) em aberto carregada(s) para o usuário {user_id}")
+
+    def clear(self) -> None:
+        """Descarta o estado (logout) e para a verificação periódica"""
+        self.stop()
+        with self._lock:
+            self.user_id = None
+            self._activities = {}
+            self._fingerprint = None
+        self._notify()
+
+    def covers(self, user_id: int) -> bool:
+        """Se o estado carregado é o deste usuário"""
+        return user_id is not None and self.user_id == user_id
+
+    def _fetch(self, user_id):
+        rows = self.db.execute_query(
+            f"SELECT {_STATE_COLUMNS} FROM atividades WHERE {_OPEN} ORDER BY start_time DESC", (user_id,)
+        ) or []
+        return list(rows), self._read_fingerprint(user_id)
+
+    def _read_fingerprint(self, user_id):
+        result = self.db.execute_query(_FINGERPRINT_QUERY, (user_id,))
+        row = result[0] if result else {}
+        return tuple(int(row.get(key) or 0) for key in ('total', 'versions', 'paused', 'last_id'))
+
+    def _replace(self, user_id, rows, fingerprint):
+        with self._lock:
+            self.user_id = user_id
+            self._activities = {row['id']: dict(row) for row in rows}
+            self._fingerprint = fingerprint
+        self._notify()
+
+    # ------------------------------------------------------------- leitura
+
+    def activities(self) -> List[Dict]:
+        """Atividades em aberto, das mais recentes às mais antigas"""
+        with self._lock:
+            rows = [dict(row) for row in self._activities.values()]
+        return sorted(rows, key=lambda row: (row.get('start_time') is not None, row.get('start_time'), row['id']),
+                      reverse=True)
+
+    def running_activities(self) -> List[Dict]:
+        return [row for row in self.activities() if _is_running(row)]
+
+    def paused_activities(self) -> List[Dict]:
+        return [row for row in self.activities() if row.get('pausado')]
+
+    def running_activity(self) -> Optional[Dict]:
+        """Atividade em andamento (ativa e não pausada), ou None"""
+        running = self.running_activities()
+        return running[0] if running else None
+
+    def open_activity(self) -> Optional[Dict]:
+        """Atividade em aberto mais recente (em andamento ou pausada), ou None"""
+        activities = self.activities()
+        return activities[0] if activities else None
+
+    def has_running(self) -> bool:
+        return self.running_activity() is not None
+
+    # ------------------------------------------------------------- mutações
+
+    def apply(self, row: Dict) -> None:
+        """
+        Incorpora uma linha alterada por este cliente (criação ou transição);
+        campos ausentes são mantidos da versão em memória.
+        """
+        self.apply_all([row])
+
+    def apply_all(self, rows: Iterable[Dict]) -> None:
+        changed = False
+        with self._lock:
+            for row in rows:
+                known = row['id'] in self._activities
+                if self.user_id is None or row.get('user_id', self.user_id if known else None) != self.user_id:
+                    # Outro usuário, ou linha parcial de atividade fora do estado carregado
+                    continue
+                merged = {**self._activities.get(row['id'], {}), **row}
+                if _is_open(merged):
+                    self._activities[row['id']] = merged
+                else:
+                    self._activities.pop(row['id'], None)
+                changed = True
+        if changed:
+            self._notify()
+
+    def apply_flags(self, activity_id, flags: Dict[str, bool]) -> None:
+        """
+        Aplica ativo/pausado/concluido gravados sem a linha resultante (journal
+        local). A impressão digital é descartada: a próxima verificação recarrega
+        o que o banco tiver depois da sincronização, mesmo que a repetição não
+        altere a linha.
+        """
+        self._invalidate()
+        self.apply({'id': activity_id, **flags})
+
+    def apply_flags_to_running(self, flags: Dict[str, bool]) -> None:
+        """Aplica os flags a todas as atividades em andamento (pausar todas), como apply_flags"""
+        self._invalidate()
+        self.apply_all([{'id': row['id'], **flags} for row in self.running_activities()])
+
+    def _invalidate(self):
+        with self._lock:
+            self._fingerprint = None
+
+    # --------------------------------------------------------- verificação
+
+    def refresh(self) -> bool:
+        """
+        Compara a impressão digital do banco com a carregada e recarrega as
+        linhas se ela mudou. Retorna True se o estado foi recarregado.
+        """
+        result = self._check_version()
+        self._apply_refresh(result)
+        return result is not None
+
+    def start(self, widget) -> None:
+        """Agenda a verificação periódica; o banco é lido fora da thread da interface"""
+        self._widget = widget
+        DeadlineScheduler().schedule_in(self.refresh_interval, self._on_refresh_due, name='activity_state')
+
+    def stop(self) -> None:
+        if self._widget is not None:
+            DeadlineScheduler().cancel('activity_state')
+            self._widget = None
+
+    def _on_refresh_due(self):
+        # Callback do DeadlineScheduler: roda sempre na thread da interface (after() do
+        # Tk), onde UITaskRunner.submit() pode ser chamado com segurança
+        widget = self._widget
+        if widget is None:
+            return
+        UITaskRunner().submit(
+            widget,
+            self._check_version,
+            on_success=self._apply_refresh,
+            on_error=lambda e: logger.warning(f"[STATE] Verificação de versão falhou: {e}"),
+            key=('activity_state', 'refresh')
+        )
+        self.start(widget)
+
+    def _check_version(self):
+        """Thread de trabalho: retorna (usuário, linhas, impressão digital) se o conjunto mudou"""
+        user_id = self.user_id
+        if user_id is None or self._read_fingerprint(user_id) == self._fingerprint:
+            return None
+        return (user_id,) + self._fetch(user_id)
+
+    def _apply_refresh(self, result):
+        if result is not None and self.user_id == result[0]:
+            self._replace(*result)
+            logger.debug(f"[STATE] Estado do usuário {result[0]} recarregado (alterado no banco)")
+
+    # ------------------------------------------------------------ inscritos
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """callback() é chamado a cada mudança do estado"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self):
+        for callback in list(self._subscribers):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"[STATE] Erro ao notificar inscrito: {e}")
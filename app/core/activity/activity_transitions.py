@@ -0,0 +1,177 @@
+from typing import Dict, List, NamedTuple, Optional
+import logging
+
+from ...database.connection import DatabaseConnection
+from ...database.local_journal import write_through, resolve_ref
+from .activity_state import ActivityStateStore
+
+logger = logging.getLogger(__name__)
+
+# Status de destino aceitos pelas transições
+STATUS_ACTIVE = "ativo"
+STATUS_PAUSED = "pausado"
+STATUS_DONE = "concluido"
+
+# Tempo total atual calculado no servidor a partir do resumo do log de eventos (s = activity_summary)
+_TOTAL = (
+    "(s.total_seconds + CASE WHEN s.state = 'running' AND s.running_since < NOW() "
+    "THEN TIME_TO_SEC(TIMEDIFF(NOW(), s.running_since)) ELSE 0 END)"
+)
+
+def _from_summary(column: str, seconds: str) -> str:
+    # Atividades sem eventos mantêm os últimos tempos gravados na própria linha
+    return (f"{column} = COALESCE((SELECT SEC_TO_TIME({seconds}) FROM activity_summary s "
+            f"WHERE s.atividade_id = atividades.id), {column})")
+
+_FREEZE_TIMES = ", ".join([
+    _from_summary("total_time", _TOTAL),
+    _from_summary("time_regress", f"CASE WHEN s.limit_seconds > {_TOTAL} THEN s.limit_seconds - {_TOTAL} ELSE 0 END"),
+    _from_summary("time_exceeded", f"CASE WHEN {_TOTAL} > s.limit_seconds THEN {_TOTAL} - s.limit_seconds ELSE 0 END"),
+])
+
+class _Transition(NamedTuple):
+    flags: Dict[str, bool]   # ativo/pausado/concluido gravados
+    expected: str            # estado exigido na condição do UPDATE
+    freeze_times: bool       # grava os tempos do instante da transição
+
+_TRANSITIONS = {
+    STATUS_PAUSED: _Transition({'ativo': True, 'pausado': True, 'concluido': False},
+                               "ativo = TRUE AND pausado = FALSE AND concluido = FALSE", True),
+    STATUS_ACTIVE: _Transition({'ativo': True, 'pausado': False, 'concluido': False},
+                               "pausado = TRUE AND concluido = FALSE", False),
+    STATUS_DONE: _Transition({'ativo': False, 'pausado': False, 'concluido': True},
+                             "concluido = FALSE", True),
+}
+
+_ROW_COLUMNS = """
+    id, user_id, atividade, ativo, pausado, concluido,
+    total_time, time_regress, time_exceeded, version
+"""
+
+class TransitionResult(NamedTuple):
+    ok: bool
+    message: str
+    row: Optional[Dict] = None  # linha após a transição (None se gravada no journal local)
+
+class ActivityTransitions:
+    """
+    Transições de status das atividades (pausar, retomar, concluir).
+
+    Cada transição é um único UPDATE condicional: os tempos do instante da
+    transição são calculados no servidor a partir de activity_summary, e o
+    WHERE exige o estado de origem (e a versão lida, se informada). A coluna
+    version é incrementada a cada transição; nenhuma linha alterada significa
+    que outra sessão mudou a atividade antes. A linha resultante é lida na
+    mesma transação e conexão e incorporada ao ActivityStateStore.
+
+    Com o MySQL inacessível a transição vai para o journal local e é
+    aplicada na sincronização; os flags são aplicados ao estado em memória
+    sem a linha resultante, e a verificação de versão do ActivityStateStore
+    corrige o estado se a repetição não alterar a linha.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseConnection()
+
+    @staticmethod
+    def _rule(status: str) -> _Transition:
+        rule = _TRANSITIONS.get(status)
+        if rule is None:
+            raise ValueError(f"Status inválido: {status}")
+        return rule
+
+    @staticmethod
+    def _update_sql(rule: _Transition, where: str) -> str:
+        assignments = [f"{field} = {'TRUE' if value else 'FALSE'}" for field, value in rule.flags.items()]
+        if rule.freeze_times:
+            assignments.append(_FREEZE_TIMES)
+        assignments.append("version = version + 1")
+        return f"UPDATE atividades SET {', '.join(assignments)} WHERE {where} AND {rule.expected}"
+
+    # ------------------------------------------------------------ uma atividade
+
+    def transition(self, activity_id, status: str, expected_version: Optional[int] = None) -> TransitionResult:
+        """
+        Move a atividade para status se ela estiver no estado de origem.
+        expected_version: versão lida pelo chamador; se outra sessão alterou a
+        atividade depois dessa leitura, a transição não é aplicada.
+        """
+        rule = self._rule(status)
+        activity_id = resolve_ref(activity_id, self.db)
+        where = "id = %(atividade_id)s"
+        params = {'atividade_id': activity_id}
+        if expected_version is not None:
+            where += " AND version = %(version)s"
+            params['version'] = expected_version
+        query = self._update_sql(rule, where)
+
+        def queued(journal):
+            # Aplicada na sincronização; a referência local é trocada pelo id do MySQL
+            journal.record_transaction([(query, params)], activity_ref=activity_id, wait=True)
+            ActivityStateStore(self.db).apply_flags(activity_id, rule.flags)
+            return TransitionResult(True, f"Atividade {status} com sucesso!")
+
+        return write_through(
+            self.db,
+            lambda: self._apply(activity_id, status, rule, query, params, expected_version),
+            queued,
+            activity_id
+        )
+
+    def _apply(self, activity_id, status, rule, query, params, expected_version) -> TransitionResult:
+        with self.db.transaction() as cursor:
+            cursor.execute(query, params)
+            changed = cursor.rowcount
+            cursor.execute(f"SELECT {_ROW_COLUMNS} FROM atividades WHERE id = %s", (activity_id,))
+            row = cursor.fetchone()
+
+        if row is not None:
+            # A linha lida é o estado atual, mesmo quando outra sessão a alterou antes
+            ActivityStateStore(self.db).apply(row)
+        if changed:
+            logger.debug(f"[DB] Atividade {activity_id} -> {status} (versão {row['version']})")
+            return TransitionResult(True, f"Atividade {status} com sucesso!", row)
+        if row is None:
+            return TransitionResult(False, "Atividade não encontrada")
+        if all(bool(row[field]) == value for field, value in rule.flags.items()):
+            # Repetição da mesma transição (ex.: clique duplo): nada a fazer
+            return TransitionResult(True, f"Atividade já está {status}", row)
+        if expected_version is not None and row['version'] != expected_version:
+            logger.warning(f"[DB] Atividade {activity_id} alterada por outra sessão (versão {row['version']})")
+            return TransitionResult(False, "A atividade foi alterada em outra sessão. Atualize a lista.", row)
+        return TransitionResult(False, f"A atividade não pode ser {status} no estado atual", row)
+
+    # -------------------------------------------------------------- em lote
+
+    def transition_all(self, user_id: int, status: str) -> List[Dict]:
+        """
+        Move para status todas as atividades do usuário no estado de origem
+        (ex.: pausar todas as ativas) e retorna as linhas alteradas.
+        Com o MySQL inacessível a alteração vai para o journal local e nenhuma linha é retornada.
+        """
+        rule = self._rule(status)
+
+        def queued(journal):
+            journal.record_statement(self._update_sql(rule, "user_id = %s"), (user_id,), wait=True)
+            store = ActivityStateStore(self.db)
+            if status == STATUS_PAUSED and store.covers(user_id):
+                store.apply_flags_to_running(rule.flags)
+            return []
+
+        return write_through(self.db, lambda: self._apply_all(user_id, status, rule), queued)
+
+    def _apply_all(self, user_id, status, rule) -> List[Dict]:
+        with self.db.transaction() as cursor:
+            cursor.execute(f"SELECT id, version FROM atividades WHERE user_id = %s AND {rule.expected}", (user_id,))
+            versions = {row['id']: row['version'] for row in cursor.fetchall()}
+            if not versions:
+                return []
+            ids = ', '.join(['%s'] * len(versions))
+            cursor.execute(self._update_sql(rule, f"id IN ({ids})"), tuple(versions))
+            cursor.execute(f"SELECT {_ROW_COLUMNS} FROM atividades WHERE id IN ({ids})", tuple(versions))
+            # Só as linhas que esta transição alterou (versão lida + 1)
+            rows = [row for row in cursor.fetchall() if row['version'] == versions[row['id']] + 1]
+        ActivityStateStore(self.db).apply_all(rows)
+
+        logger.debug(f"[DB] {len(rows)} atividade(s) do usuário {user_id} -> {status}")
+        return rows
@@ -2,7 +2,8 @@ from datetime import datetime, time
 from typing import Dict, Tuple, Optional
 import re
 import logging
-from ..time.time_manager import TimeManager
+from ..time.work_calendar import WorkCalendar
+from .activity_state import ActivityStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,31 +19,27 @@ class ActivityValidator:
     @classmethod
     def _get_company_hours(cls) -> Dict[str, time]:
         """
-        Obtém horários da empresa do TimeManager como objetos time
+        Obtém horários da equipe do calendário de trabalho como objetos time
         """
+        schedule = WorkCalendar().day_schedule()
         return {
-            'start': TimeManager.get_time_object(TimeManager.COMPANY_START_TIME),
-            'break_start': TimeManager.get_time_object(TimeManager.BREAK_START_TIME),
-            'break_end': TimeManager.get_time_object(TimeManager.BREAK_END_TIME),
-            'end': TimeManager.get_time_object(TimeManager.COMPANY_END_TIME)
+            'start': schedule.company_start,
+            'break_start': schedule.break_start,
+            'break_end': schedule.break_end,
+            'end': schedule.company_end
         }
 
     @classmethod
     def _get_company_hours_tuple(cls) -> Dict[str, Tuple[int, int]]:
         """
-        Obtém horários da empresa do TimeManager como tuplas (hora, minuto)
+        Obtém horários da equipe do calendário de trabalho como tuplas (hora, minuto)
         """
-        return {
-            'start': TimeManager.get_time_tuple(TimeManager.COMPANY_START_TIME),
-            'break_start': TimeManager.get_time_tuple(TimeManager.BREAK_START_TIME),
-            'break_end': TimeManager.get_time_tuple(TimeManager.BREAK_END_TIME),
-            'end': TimeManager.get_time_tuple(TimeManager.COMPANY_END_TIME)
-        }
+        return {key: (value.hour, value.minute) for key, value in cls._get_company_hours().items()}
 
     @classmethod
     def _get_time_messages(cls) -> Dict[str, Tuple[str, str]]:
         """
-        Gera mensagens usando os horários atuais do TimeManager
+        Gera mensagens usando os horários atuais do calendário de trabalho
         """
         hours = cls._get_company_hours_tuple()
         start_h, start_m = hours['start']
@@ -121,7 +118,8 @@ class ActivityValidator:
     @classmethod
     def validate_concurrent_activities(cls, user_id: int, db_connection) -> Tuple[bool, Optional[Dict]]:
         """
-        Verifica se o usuário tem atividades concorrentes.
+        Verifica se o usuário tem atividades concorrentes. Para o usuário
+        logado, a resposta vem do ActivityStateStore, sem consulta.
         
         Args:
             user_id (int): ID do usuário
@@ -131,6 +129,11 @@ class ActivityValidator:
             Tuple[bool, Optional[Dict]]: (tem_atividade_ativa, dados_atividade)
         """
         try:
+            store = ActivityStateStore()
+            if store.covers(user_id):
+                activity = store.open_activity()
+                return activity is not None, activity
+            
             query = """
                 SELECT * FROM atividades
                 WHERE user_id = %s 
@@ -228,9 +231,6 @@ class ActivityValidator:
         if date_val.weekday() in [5, 6]:  # 5 = Sábado, 6 = Domingo
             return False
             
-        # Aqui você poderia adicionar mais verificações:
-        # - Feriados
-        # - Recesso da empresa
-        # - Outros dias não úteis
-            
-        return True
\ No newline at end of file
+        # Feriados, recessos e dias fora da escala da equipe
+        day = date_val.date() if isinstance(date_val, datetime) else date_val
+        return WorkCalendar().is_workday(day)
\ No newline at end of file
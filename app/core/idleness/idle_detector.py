@@ -1,26 +1,49 @@
-import time, threading, win32api, logging
-from pynput import keyboard
+import threading, time, logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from ...config.settings import IDLE_CONFIG
 from ..time.time_observer import TimeObserver
-from datetime import timedelta, datetime
+from ..time.scheduler import MAX_SLEEP_SECONDS
+from ..time.work_calendar import WorkCalendar, BREAK_TIME
+from .input_sources import InputSource, INPUT_MOUSE, INPUT_KEYBOARD, create_sources
 
 logger = logging.getLogger(__name__)
 
 class IdleDetector:
-    def __init__(self, mouse_idle_time=10, keyboard_idle_time=10):
-        self.mouse_idle_time = mouse_idle_time
-        self.keyboard_idle_time = keyboard_idle_time
-        self.last_mouse_activity = time.time()
-        self.last_keyboard_activity = time.time()
-        self.last_mouse_position = win32api.GetCursorPos()
+    """
+    Detector de ociosidade orientado a eventos.
+
+    As fontes de entrada (input_sources) apenas registram o instante da
+    última entrada; uma única thread dorme até o prazo de ociosidade (última
+    entrada + limite) e, ao acordar, reavalia o prazo, que pode ter avançado
+    com novas entradas. Não há verificação em intervalo fixo: enquanto o
+    usuário está ativo a thread acorda uma vez por limite, e durante a
+    ociosidade só acorda com uma entrada, no início do intervalo ou, para
+    fontes de consulta ao sistema, a cada poll_interval.
+    """
+
+    def __init__(self, mouse_idle_time=None, keyboard_idle_time=None,
+                 sources: Optional[List[InputSource]] = None, calendar=None, clock=time.monotonic):
+        threshold = IDLE_CONFIG['threshold']
+        self.mouse_idle_time = threshold if mouse_idle_time is None else mouse_idle_time
+        self.keyboard_idle_time = threshold if keyboard_idle_time is None else keyboard_idle_time
+        self.poll_interval = IDLE_CONFIG['poll_interval']
+        self.clock = clock
+        self.sources = create_sources(IDLE_CONFIG['backend'], clock) if sources is None else sources
+        self.calendar = calendar or WorkCalendar()
+        self.last_mouse_activity = clock()
+        self.last_keyboard_activity = self.last_mouse_activity
         self.observers = []
         self.is_idle = False
         self.running = False
         self.idle_start_time = None
         self.accumulated_idle_time = timedelta()
-        self.BREAK_START_TIME = "12:15:00"
-        self.BREAK_END_TIME = "13:15:00"
+        self._periods = []  # (início, fim) dos períodos encerrados, em datetime
         self.is_login_window = True  # Inicializa assumindo que está na tela de login
-        logger.info("IdleDetector inicializado")
+        self._cond = threading.Condition()
+        self._wake_pending = False
+        self._thread = None
+        logger.info(f"IdleDetector inicializado ({', '.join(s.name for s in self.sources) or 'sem fontes'})")
 
     def add_observer(self, observer: TimeObserver):
         self.observers.append(observer)
@@ -28,122 +51,151 @@ class IdleDetector:
 
     def start(self):
         self.running = True
-        self.last_mouse_activity = time.time()
-        self.last_keyboard_activity = time.time()
-        self.last_mouse_position = win32api.GetCursorPos()
-        
-        try:
-            # Iniciar apenas o listener do teclado
-            self.keyboard_listener = keyboard.Listener(
-                on_press=self._safe_keyboard_callback,
-                suppress=False
-            )
-            self.keyboard_listener.start()
-            
-            # Iniciar threads de monitoramento
-            self.idle_thread = threading.Thread(target=self.monitor_idle_status, daemon=True)
-            self.mouse_thread = threading.Thread(target=self.monitor_mouse_movement, daemon=True)
-            
-            self.idle_thread.start()
-            self.mouse_thread.start()
-            
-            logger.info("IdleDetector iniciado com sucesso")
-        except Exception as e:
-            logger.error(f"Erro ao iniciar IdleDetector: {e}")
-            raise
-
-    def monitor_mouse_movement(self):
-        """Thread dedicada para monitorar movimentos do mouse usando win32api"""
-        while self.running:
+        self.last_mouse_activity = self.last_keyboard_activity = self.clock()
+        for source in self.sources:
             try:
-                current_position = win32api.GetCursorPos()
-                if current_position != self.last_mouse_position:
-                    self.last_mouse_position = current_position
-                    self.last_mouse_activity = time.time()
-                    self.check_activity()
-                time.sleep(0.1)  # Pequeno delay para não sobrecarregar a CPU
+                source.start(self.on_input)
             except Exception as e:
-                logger.error(f"Erro ao monitorar mouse: {e}")
-                time.sleep(1)
-
-    def _safe_keyboard_callback(self, *args):
-        try:
-            if self.is_idle:
-                logger.info("Atividade do teclado detectada após período ocioso")
-            self.last_keyboard_activity = time.time()
-            self.check_activity()
-        except Exception as e:
-            logger.error(f"Erro no callback do teclado: {e}")
-
-    def on_mouse_activity(self, *args):
-        if self.is_idle:
-            logger.info("Atividade detectada após período ocioso")
-        self.last_mouse_activity = time.time()
-        self.check_activity()
+                logger.error(f"[IDLE] Erro ao iniciar fonte {source.name}: {e}")
 
-    def on_keyboard_activity(self, *args):
-        if self.is_idle:
-            logger.info("Atividade detectada após período ocioso")
-        self.last_keyboard_activity = time.time()
-        self.check_activity()
+        self._thread = threading.Thread(target=self._run, name="IdleDetector", daemon=True)
+        self._thread.start()
+        logger.info("IdleDetector iniciado com sucesso")
 
-    def check_activity(self):
+    def stop(self):
+        self.running = False
+        self._wake()
+        for source in self.sources:
+            try:
+                source.stop()
+            except Exception as e:
+                logger.error(f"[IDLE] Erro ao parar fonte {source.name}: {e}")
+        logger.info("IdleDetector parado")
+
+    # ------------------------------------------------------------ entradas
+
+    def on_input(self, kind: str, when: Optional[float] = None):
+        """Callback das fontes: registra a entrada e só acorda a thread se estiver ocioso"""
+        when = self.clock() if when is None else when
+        if kind == INPUT_KEYBOARD:
+            self.last_keyboard_activity = when
+        else:
+            self.last_mouse_activity = when
         if self.is_idle:
-            self.is_idle = False
-            if self.idle_start_time:
-                idle_duration = time.time() - self.idle_start_time
-                self.accumulated_idle_time += timedelta(seconds=idle_duration)
-                logger.info(f"Tempo ocioso acumulado: {self.accumulated_idle_time}")
-                self.notify_observers('active')
-                self.idle_start_time = None
+            self._wake()
+
+    def on_mouse_activity(self, when: Optional[float] = None):
+        self.on_input(INPUT_MOUSE, when)
+
+    def on_keyboard_activity(self, when: Optional[float] = None):
+        self.on_input(INPUT_KEYBOARD, when)
 
     def set_login_status(self, is_login: bool):
         """Define se o usuário está na tela de login"""
         self.is_login_window = is_login
+        self._wake()
         logger.debug(f"Status de login atualizado: {'na tela de login' if is_login else 'logado'}")
 
-    def monitor_idle_status(self):
+    # ----------------------------------------------------------- avaliação
+
+    def _wake(self):
+        with self._cond:
+            self._wake_pending = True
+            self._cond.notify()
+
+    def _run(self):
         while self.running:
             try:
-                # Se estiver na tela de login, não monitora ociosidade
-                if self.is_login_window:
-                    if self.is_idle:
-                        self.is_idle = False
-                        self.notify_observers('active')
-                    time.sleep(1)
-                    continue
-
-                # Verificar se está no horário de intervalo
-                current_time = datetime.now().time()
-                break_start = datetime.strptime(self.BREAK_START_TIME, "%H:%M:%S").time()
-                break_end = datetime.strptime(self.BREAK_END_TIME, "%H:%M:%S").time()
-                
-                # Se estiver no horário de intervalo, não registra ociosidade
-                if break_start <= current_time <= break_end:
-                    if self.is_idle:
-                        self.is_idle = False
-                        self.notify_observers('active')
-                    time.sleep(1)
-                    continue
-
-                # Resto do código original de monitoramento
-                current_time = time.time()
-                mouse_idle_time = current_time - self.last_mouse_activity
-                keyboard_idle_time = current_time - self.last_keyboard_activity
-                
-                is_idle = (mouse_idle_time > self.mouse_idle_time and 
-                          keyboard_idle_time > self.keyboard_idle_time)
-                
-                if is_idle and not self.is_idle:
-                    self.is_idle = True
-                    self.idle_start_time = current_time
-                    logger.info(f"Iniciando período ocioso após {self.mouse_idle_time} segundos")
-                    self.notify_observers('idle')
-                
-                time.sleep(1)  # Verificar a cada segundo
-                
+                delay = self.check()
             except Exception as e:
                 logger.error(f"Erro no monitoramento de ociosidade: {e}")
+                delay = self.poll_interval
+            with self._cond:
+                if not self._wake_pending and self.running:
+                    # Também limita a espera a ajustes do relógio e suspensão da máquina
+                    self._cond.wait(MAX_SLEEP_SECONDS if delay is None else min(delay, MAX_SLEEP_SECONDS))
+                self._wake_pending = False
+
+    def _deadline(self) -> float:
+        """Instante (monotônico) em que mouse e teclado terão passado do limite"""
+        return max(self.last_mouse_activity + self.mouse_idle_time,
+                   self.last_keyboard_activity + self.keyboard_idle_time)
+
+    def _poll_sources(self, now: float) -> bool:
+        """Atualiza a última entrada com as fontes de consulta; retorna se há alguma"""
+        polled = False
+        for source in self.sources:
+            if source.event_driven:
+                continue
+            polled = True
+            idle = source.idle_seconds()
+            if idle is not None:
+                last = now - idle
+                self.last_mouse_activity = max(self.last_mouse_activity, last)
+                self.last_keyboard_activity = max(self.last_keyboard_activity, last)
+        return polled
+
+    def _seconds_until(self, status: Optional[str] = None) -> Optional[float]:
+        """Segundos até a próxima transição do calendário (para status, se informado)"""
+        now = datetime.now()
+        found = self.calendar.next_transition(now, status)
+        return max(0.0, (found[0] - now).total_seconds()) if found else None
+
+    def _idle_delay(self, polled: bool) -> Optional[float]:
+        """Espera durante a ociosidade: até o intervalo (que a encerra) ou a próxima consulta"""
+        delay = self._seconds_until(BREAK_TIME)
+        if polled:
+            delay = self.poll_interval if delay is None else min(delay, self.poll_interval)
+        return delay
+
+    def _end_idle(self, end: float):
+        self.is_idle = False
+        if self.idle_start_time is not None:
+            duration = timedelta(seconds=max(0.0, end - self.idle_start_time))
+            self.accumulated_idle_time += duration
+            # Instantes de parede a partir do relógio monotônico
+            ended_at = (datetime.now() - timedelta(seconds=max(0.0, self.clock() - end))).replace(microsecond=0)
+            self._periods.append(((ended_at - duration).replace(microsecond=0), ended_at))
+            logger.info(f"Tempo ocioso acumulado: {self.accumulated_idle_time}")
+        self.idle_start_time = None
+
+    def check(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Reavalia a ociosidade em now (relógio monotônico).
+        Retorna em quantos segundos reavaliar; None espera apenas por entradas.
+        """
+        now = self.clock() if now is None else now
+        status = None
+        with self._cond:
+            polled = self._poll_sources(now)
+            last_input = max(self.last_mouse_activity, self.last_keyboard_activity)
+
+            if self.is_login_window or self.calendar.status_at() == BREAK_TIME:
+                # Na tela de login ou no intervalo não registra ociosidade
+                if self.is_idle:
+                    self._end_idle(now)
+                    status = 'active'
+                delay = None if self.is_login_window else self._seconds_until()
+            elif self.is_idle:
+                if last_input > self.idle_start_time:
+                    logger.info("Atividade detectada após período ocioso")
+                    self._end_idle(min(now, last_input))
+                    status = 'active'
+                    delay = self._deadline() - now
+                else:
+                    delay = self._idle_delay(polled)
+            elif now >= self._deadline():
+                self.is_idle = True
+                self.idle_start_time = now
+                logger.info(f"Iniciando período ocioso após {self.mouse_idle_time} segundos")
+                status = 'idle'
+                delay = self._idle_delay(polled)
+            else:
+                delay = self._deadline() - now
+
+        if status:
+            self.notify_observers(status)
+        return delay
 
     def notify_observers(self, status):
         for observer in self.observers:
@@ -153,18 +205,20 @@ class IdleDetector:
                 logger.error(f"Erro ao notificar observer {observer.__class__.__name__}: {e}")
 
     def get_accumulated_idle_time(self):
-        if self.is_idle and self.idle_start_time:
-            current_duration = timedelta(seconds=time.time() - self.idle_start_time)
-            return self.accumulated_idle_time + current_duration
-        return self.accumulated_idle_time
+        with self._cond:
+            if self.is_idle and self.idle_start_time is not None:
+                current_duration = timedelta(seconds=self.clock() - self.idle_start_time)
+                return self.accumulated_idle_time + current_duration
+            return self.accumulated_idle_time
+
+    def take_periods(self):
+        """Retorna e esvazia os períodos ociosos encerrados: lista de (início, fim)"""
+        with self._cond:
+            periods, self._periods = self._periods, []
+            return periods
 
     def reset_accumulated_idle_time(self):
-        previous_time = self.accumulated_idle_time
-        self.accumulated_idle_time = timedelta()
+        with self._cond:
+            previous_time = self.accumulated_idle_time
+            self.accumulated_idle_time = timedelta()
         logger.info(f"Tempo ocioso resetado. Anterior: {previous_time}")
-
-    def stop(self):
-        self.running = False
-        if hasattr(self, 'keyboard_listener'):
-            self.keyboard_listener.stop()
-        logger.info("IdleDetector parado") 
\ No newline at end of file
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import logging
+import threading
+
+from ...config.settings import IDLE_CONFIG
+from ...database.connection import DatabaseConnection
+from ...database.local_journal import write_through, resolve_ref, LocalJournal
+from ...utils.date_ranges import range_clause, start_of_day
+
+logger = logging.getLogger(__name__)
+
+_ENSURE_DAY = """
+    INSERT IGNORE INTO idle_daily (user_id, day) VALUES (%(user_id)s, %(day)s)
+"""
+
+_ADD_DAY = """
+    UPDATE idle_daily
+    SET idle_seconds = idle_seconds + %(idle_seconds)s,
+        periods = periods + %(periods)s
+    WHERE user_id = %(user_id)s AND day = %(day)s
+"""
+
+# Incremento no servidor: sem leitura prévia e sem o limite do tipo TIME
+_ADD_TOTAL = """
+    UPDATE usuarios
+    SET ociosidade_seconds = ociosidade_seconds + %(idle_seconds)s
+    WHERE id = %(user_id)s
+"""
+
+class IdlePeriod(NamedTuple):
+    """Um período ocioso do usuário (uma linha de idle_periods)"""
+    user_id: int
+    atividade_id: Optional[int]
+    started_at: datetime
+    ended_at: datetime
+
+    @property
+    def seconds(self) -> int:
+        return max(0, int((self.ended_at - self.started_at).total_seconds()))
+
+def split_by_day(started_at: datetime, ended_at: datetime) -> List[Tuple[date, int]]:
+    """Segundos de um período em cada dia; a soma é igual à duração inteira do período"""
+    parts = []
+    day_start, elapsed = started_at, 0
+    while day_start < ended_at:
+        day_end = min(start_of_day(day_start) + timedelta(days=1), ended_at)
+        until = int((day_end - started_at).total_seconds())
+        parts.append((day_start.date(), until - elapsed))
+        day_start, elapsed = day_end, until
+    return parts
+
+def build_statements(periods: List[IdlePeriod]) -> List[Tuple[str, Dict]]:
+    """
+    Comandos de um lote: as linhas de idle_periods em um único INSERT, o
+    acúmulo por dia em idle_daily e o total de cada usuário
+    """
+    rows, params = [], {}
+    daily = defaultdict(lambda: [0, 0])  # (user_id, dia) -> [segundos, períodos]
+    totals = defaultdict(int)
+    for index, period in enumerate(periods):
+        rows.append(f"(%(user_id_{index})s, %(atividade_id_{index})s, %(started_at_{index})s, "
+                    f"%(ended_at_{index})s, %(idle_seconds_{index})s)")
+        params.update({
+            f'user_id_{index}': period.user_id,
+            f'atividade_id_{index}': period.atividade_id,
+            f'started_at_{index}': period.started_at,
+            f'ended_at_{index}': period.ended_at,
+            f'idle_seconds_{index}': period.seconds,
+        })
+        for part, (day, seconds) in enumerate(split_by_day(period.started_at, period.ended_at)):
+            entry = daily[(period.user_id, day)]
+            entry[0] += seconds
+            entry[1] += 1 if part == 0 else 0  # o período conta no dia em que começou
+        totals[period.user_id] += period.seconds
+
+    statements = [(f"""
+        INSERT INTO idle_periods (user_id, atividade_id, started_at, ended_at, idle_seconds)
+        VALUES {', '.join(rows)}
+    """, params)]
+    for (user_id, day), (seconds, count) in daily.items():
+        values = {'user_id': user_id, 'day': day, 'idle_seconds': seconds, 'periods': count}
+        statements += [(_ENSURE_DAY, values), (_ADD_DAY, values)]
+    for user_id, seconds in totals.items():
+        statements.append((_ADD_TOTAL, {'user_id': user_id, 'idle_seconds': seconds}))
+    return statements
+
+class IdleSessionLog:
+    """
+    Registro dos períodos ociosos dos usuários.
+
+    Cada período vira uma linha de idle_periods (usuário, atividade, início e
+    fim), com o acúmulo por dia em idle_daily e o total em
+    usuarios.ociosidade_seconds, ambos incrementados no próprio UPDATE. Os
+    períodos ficam em memória e são gravados em lote, em uma transação, a
+    cada batch_size períodos ou flush_interval segundos.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, db=None, batch_size=None, flush_interval=None):
+        if not self.initialized:
+            self.db = db or DatabaseConnection()
+            self.batch_size = batch_size or IDLE_CONFIG['batch_size']
+            self.flush_interval = flush_interval or IDLE_CONFIG['flush_interval']
+            self._pending: List[IdlePeriod] = []
+            self._cond = threading.Condition()
+            self._flush_requested = False
+            self._running = True
+            self._worker = threading.Thread(target=self._run, daemon=True, name="idle-sessions")
+            self._worker.start()
+            self.initialized = True
+
+    # ----------------------------------------------------------- escrita
+
+    def record(self, user_id: int, atividade_id, started_at: datetime, ended_at: datetime) -> None:
+        """Agenda a gravação de um período ocioso"""
+        if not user_id or ended_at <= started_at:
+            return
+        with self._cond:
+            self._pending.append(IdlePeriod(user_id, atividade_id, started_at, ended_at))
+            if len(self._pending) >= self.batch_size:
+                self._flush_requested = True
+                self._cond.notify_all()
+
+    def flush(self) -> bool:
+        """Grava os períodos pendentes na thread atual; retorna False se o lote falhar"""
+        with self._cond:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return True
+        try:
+            self._write(batch)
+            logger.debug(f"[IDLE] {len(batch)} período(s) ocioso(s) gravado(s)")
+            return True
+        except Exception as e:
+            logger.error(f"[IDLE] Erro ao gravar períodos ociosos, nova tentativa no próximo ciclo: {e}")
+            with self._cond:
+                self._pending[:0] = batch
+            return False
+
+    def stop(self) -> None:
+        """Grava o que estiver pendente e encerra a thread de gravação"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._flush_requested and self._running:
+                    self._cond.wait(self.flush_interval)
+                if not self._running:
+                    return
+                self._flush_requested = False
+            self.flush()
+
+    def _write(self, batch: List[IdlePeriod]) -> None:
+        # Atividades criadas offline só entram com o id do MySQL, se já sincronizadas
+        batch = [period._replace(atividade_id=self._activity_id(period.atividade_id)) for period in batch]
+        statements = build_statements(batch)
+
+        def direct():
+            if not self.db.execute_transaction(statements):
+                raise ConnectionError("Sem conexão com o banco de dados")
+
+        write_through(self.db, direct, lambda journal: journal.record_transaction(statements))
+
+    def _activity_id(self, atividade_id):
+        atividade_id = resolve_ref(atividade_id, self.db)
+        return None if LocalJournal.is_local_ref(atividade_id) else atividade_id
+
+    # ------------------------------------------------------------ leitura
+
+    def get_total_seconds(self, user_id: int) -> int:
+        """Tempo ocioso total do usuário, em segundos"""
+        rows = self.db.execute_query("SELECT ociosidade_seconds FROM usuarios WHERE id = %s", (user_id,))
+        return int(rows[0]['ociosidade_seconds'] or 0) if rows else 0
+
+    def get_daily(self, user_id: int, start: datetime, end: datetime) -> List[Dict]:
+        """Tempo ocioso por dia no intervalo [start, end): day, idle_seconds, periods"""
+        return self.db.execute_query(f"""
+            SELECT day, idle_seconds, periods
+            FROM idle_daily
+            WHERE user_id = %s AND {range_clause('day')}
+            ORDER BY day
+        """, (user_id, start.date() if isinstance(start, datetime) else start,
+              end.date() if isinstance(end, datetime) else end)) or []
+
+    def get_periods(self, user_id: int, start: datetime, end: datetime) -> List[Dict]:
+        """Períodos ociosos iniciados no intervalo [start, end)"""
+        return self.db.execute_query(f"""
+            SELECT id, user_id, atividade_id, started_at, ended_at, idle_seconds
+            FROM idle_periods
+            WHERE user_id = %s AND {range_clause('started_at')}
+            ORDER BY started_at
+        """, (user_id, start, end)) or []
@@ -0,0 +1,182 @@
+import ctypes
+import ctypes.util
+import logging
+import sys
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tipos de entrada informados pelas fontes
+INPUT_MOUSE = "mouse"
+INPUT_KEYBOARD = "keyboard"
+
+class InputSource:
+    """
+    Fonte de entrada do usuário para o IdleDetector.
+
+    Fontes orientadas a eventos (event_driven) chamam on_input(tipo, instante)
+    a cada entrada, com o instante no relógio monotônico. Fontes de consulta
+    respondem idle_seconds() e só são consultadas quando o prazo de
+    ociosidade vence (e, durante a ociosidade, a cada poll_interval).
+    """
+    name = "base"
+    event_driven = True
+
+    def start(self, on_input: Callable) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def idle_seconds(self) -> Optional[float]:
+        """Segundos desde a última entrada segundo o sistema (None se não suportado)"""
+        return None
+
+class PynputInputSource(InputSource):
+    """Listeners de mouse e teclado do pynput (hooks do sistema, sem polling)"""
+    name = "pynput"
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._listeners = []
+
+    def start(self, on_input: Callable) -> None:
+        from pynput import keyboard, mouse
+
+        clock = self.clock
+
+        # Chamados na thread do hook: apenas registram o instante
+        def on_mouse(*args):
+            on_input(INPUT_MOUSE, clock())
+
+        def on_keyboard(*args):
+            on_input(INPUT_KEYBOARD, clock())
+
+        self._listeners = [
+            mouse.Listener(on_move=on_mouse, on_click=on_mouse, on_scroll=on_mouse),
+            keyboard.Listener(on_press=on_keyboard, suppress=False),
+        ]
+        for listener in self._listeners:
+            listener.start()
+
+    def stop(self) -> None:
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+
+def _windows_idle_query() -> Optional[Callable[[], Optional[float]]]:
+    """GetLastInputInfo: milissegundos desde a última entrada da sessão"""
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetTickCount.restype = ctypes.c_uint
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+
+    def query():
+        if not user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        # GetTickCount volta a zero a cada ~49 dias
+        return ((kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+    return query
+
+def _x11_idle_query() -> Optional[Callable[[], Optional[float]]]:
+    """XScreenSaverQueryInfo (libXss): milissegundos sem entrada no display"""
+    xlib_path, xss_path = ctypes.util.find_library('X11'), ctypes.util.find_library('Xss')
+    if not xlib_path or not xss_path:
+        return None
+
+    class XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [('window', ctypes.c_ulong), ('state', ctypes.c_int), ('kind', ctypes.c_int),
+                    ('til_or_since', ctypes.c_ulong), ('idle', ctypes.c_ulong),
+                    ('eventMask', ctypes.c_ulong)]
+
+    xlib = ctypes.cdll.LoadLibrary(xlib_path)
+    xss = ctypes.cdll.LoadLibrary(xss_path)
+    xlib.XOpenDisplay.restype = ctypes.c_void_p
+    xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+    xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+
+    display = xlib.XOpenDisplay(None)
+    if not display:
+        return None
+    root = xlib.XDefaultRootWindow(display)
+    info = xss.XScreenSaverAllocInfo()
+
+    def query():
+        if not xss.XScreenSaverQueryInfo(display, root, info):
+            return None
+        return info.contents.idle / 1000.0
+    return query
+
+class SystemIdleSource(InputSource):
+    """Tempo ocioso informado pelo sistema (GetLastInputInfo ou XScreenSaver)"""
+    name = "os"
+    event_driven = False
+
+    def __init__(self):
+        query = _windows_idle_query() if sys.platform == 'win32' else _x11_idle_query()
+        if query is None:
+            raise OSError("Consulta de tempo ocioso do sistema indisponível")
+        self._query = query
+
+    def idle_seconds(self) -> Optional[float]:
+        try:
+            return self._query()
+        except Exception as e:
+            logger.error(f"[IDLE] Erro ao consultar tempo ocioso do sistema: {e}")
+            return None
+
+class SyntheticInputSource(InputSource):
+    """
+    Fonte controlada pelo chamador (testes e automação): emit() simula uma
+    entrada; com event_driven=False, idle é devolvido por idle_seconds().
+    """
+    name = "synthetic"
+
+    def __init__(self, event_driven: bool = True):
+        self.event_driven = event_driven
+        self.idle = 0.0
+        self.on_input = None
+
+    def start(self, on_input: Callable) -> None:
+        self.on_input = on_input
+
+    def stop(self) -> None:
+        self.on_input = None
+
+    def emit(self, kind: str = INPUT_MOUSE, when: Optional[float] = None) -> None:
+        if self.on_input:
+            self.on_input(kind, when)
+
+    def idle_seconds(self) -> Optional[float]:
+        return None if self.event_driven else self.idle
+
+def create_sources(backend: str = "auto", clock=time.monotonic) -> List[InputSource]:
+    """
+    Fontes de entrada do backend configurado:
+    'pynput' (eventos), 'os' (consulta ao sistema) ou 'auto' (pynput, senão o sistema).
+    """
+    if backend in ("auto", "pynput"):
+        try:
+            import pynput  # noqa: F401 - só verifica se a dependência está instalada
+            return [PynputInputSource(clock)]
+        except Exception as e:
+            if backend == "pynput":
+                raise
+            logger.warning(f"[IDLE] pynput indisponível ({e}), usando o tempo ocioso do sistema")
+    if backend in ("auto", "os"):
+        try:
+            return [SystemIdleSource()]
+        except Exception as e:
+            if backend == "os":
+                raise
+            logger.warning(f"[IDLE] Nenhuma fonte de entrada disponível, ociosidade não será detectada: {e}")
+            return []
+    raise ValueError(f"Backend de ociosidade inválido: {backend}")
@@ -1,6 +1,7 @@
 import logging
 from datetime import datetime
 from ..time.time_manager import TimeManager
+from ..time.work_calendar import BLOCKED_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,8 @@ class LockManager:
                 
             # Verificar horário comercial
             current_status = self.time_manager.check_company_hours()
-            # Bloqueia se for depois do expediente OU horário de almoço
-            return current_status in ["after_hours", "lunch_break"]
+            # Bloqueia depois do expediente, no intervalo e em dias sem expediente
+            return current_status in BLOCKED_STATUSES
             
         except Exception as e:
             logger.error(f"Erro na verificação de bloqueio: {e}")
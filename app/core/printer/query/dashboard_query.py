@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 import logging
+from ....utils.date_ranges import custom_range, range_clause
+from ....utils.duration import to_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -151,36 +153,14 @@ class DashboardQuery:
             
             atrasos_por_periodo = {}
             
-            def converter_tempo_para_segundos(tempo_str):
-                """Converte uma string de tempo (incluindo dias) para segundos"""
-                try:
-                    # Se contém dias
-                    if 'day' in tempo_str:
-                        # Separar dias da parte de tempo
-                        dias_parte, tempo_parte = tempo_str.split(', ')
-                        dias = int(dias_parte.split()[0])  # Extrai o número de dias
-                        # Converter dias para segundos e adicionar ao tempo
-                        segundos_dias = dias * 24 * 3600
-                        
-                        # Converter a parte do tempo (HH:MM:SS)
-                        horas, minutos, segundos = map(int, tempo_parte.split(':'))
-                        return segundos_dias + horas * 3600 + minutos * 60 + segundos
-                    else:
-                        # Formato normal HH:MM:SS
-                        horas, minutos, segundos = map(int, tempo_str.split(':'))
-                        return horas * 3600 + minutos * 60 + segundos
-                except Exception as e:
-                    logger.error(f"Erro ao converter tempo '{tempo_str}': {e}")
-                    return 0
-
             # Para cada período, buscar os dados
             for periodo_nome, datas in periodos.items():
                 where_clauses = [
                     "a.time_exceeded > '00:00:00'",  # Apenas atividades com atraso
                     "a.reason IS NOT NULL AND a.reason != ''",  # Apenas atividades com motivo preenchido
-                    "DATE(a.updated_at) BETWEEN DATE(%s) AND DATE(%s)"  # Filtro por período
+                    range_clause("a.updated_at")  # Filtro por período (dias inteiros)
                 ]
-                params = [datas['start'], datas['end']]
+                params = list(custom_range(datas['start'], datas['end']))
                 
                 if user_id:
                     where_clauses.append("a.user_id = %s")
@@ -193,7 +173,7 @@ class DashboardQuery:
                     SELECT 
                         a.reason,
                         COUNT(DISTINCT a.id) as quantidade,
-                        SEC_TO_TIME(SUM(TIME_TO_SEC(a.time_exceeded))) as tempo_total,
+                        SUM(TIME_TO_SEC(a.time_exceeded)) as tempo_total_segundos,
                         CASE 
                             WHEN SUM(TIME_TO_SEC(a.time_exceeded)) > 14400 THEN 'Alto'
                             WHEN SUM(TIME_TO_SEC(a.time_exceeded)) > 7200 THEN 'Médio'
@@ -214,8 +194,8 @@ class DashboardQuery:
                 
                 atrasos = {}
                 for row in result:
-                    # Usar a nova função para converter o tempo
-                    tempo_total_seconds = converter_tempo_para_segundos(str(row['tempo_total']))
+                    # Soma lida já em segundos (sem passar por TIME/texto, que quebrava acima de 24h)
+                    tempo_total_seconds = to_seconds(row['tempo_total_segundos'])
                     dias_atraso = tempo_total_seconds / (24 * 3600)
                     
                     atrasos[row['reason']] = {
@@ -1,6 +1,7 @@
 from typing import List, Dict
 from datetime import datetime
 import logging
+from ....utils.date_ranges import month_range
 
 logger = logging.getLogger(__name__)
 
@@ -53,28 +54,29 @@ class QueryActivities:
                     a.created_at
                 FROM atividades a
                 WHERE a.user_id = %(user_id)s
-                AND MONTH(a.created_at) = %(month)s
-                AND YEAR(a.created_at) = %(year)s
+                AND a.created_at >= %(start)s
+                AND a.created_at < %(end)s
                 ORDER BY a.created_at DESC
             """
             
+            start, end = month_range(year, month)
             query_params = {
                 'user_id': user_id,
-                'month': month,
-                'year': year
+                'start': start,
+                'end': end
             }
             
             logger.debug("[REPORT] Executando query de atividades")
-            activities_result = self.db.execute_query(activities_query, query_params)
-            
             activities = []
-            if activities_result:
-                for row in activities_result:
+            with self.db.stream(activities_query, query_params) as rows:
+                for row in rows:
                     activities.append({
                         'description': row['description'],
                         'activity': row['activity'],
                         'total_time': row['total_time']
                     })
+            
+            if activities:
                 logger.info(f"[REPORT] {len(activities)} atividades encontradas para o usuário {user_info['user_name']}")
             else:
                 logger.info(f"[REPORT] Nenhuma atividade encontrada para o usuário {user_info['user_name']}")
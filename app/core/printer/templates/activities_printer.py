@@ -1,5 +1,6 @@
 import logging
 from ..printer import Printer
+from ....utils.duration import format_hms, to_seconds
 from reportlab.lib import colors
 from reportlab.lib.units import inch, mm, cm
 from reportlab.platypus import Table, TableStyle, Image, Spacer, Paragraph
@@ -259,25 +260,13 @@ class ActivitiesPrinter(Printer):
         
         total_activities = len(activities)
         
-        def get_hours_from_timedelta(td):
-            if td is None:
+        def get_seconds(value):
+            if value is None:
                 logger.warning("[REPORT] total_time é None")
                 return 0
-                
-            if isinstance(td, str):
-                try:
-                    # Converte string HH:MM:SS para segundos
-                    h, m, s = map(int, td.split(':'))
-                    total_seconds = h * 3600 + m * 60 + s
-                    return total_seconds / 3600
-                except Exception as e:
-                    logger.error(f"[REPORT] Erro ao converter string de tempo: {str(e)}")
-                    return 0
-                    
             try:
-                total_seconds = td.total_seconds()
-                return total_seconds / 3600
-            except Exception as e:
+                return to_seconds(value)
+            except (TypeError, ValueError) as e:
                 logger.error(f"[REPORT] Erro ao converter tempo: {str(e)}")
                 return 0
         
@@ -285,14 +274,9 @@ class ActivitiesPrinter(Printer):
             """Formata valor monetário no padrão brasileiro"""
             return f"R$ {value:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
         
-        # Soma total de horas com tratamento de erro
-        total_hours = 0
-        for activity in activities:
-            try:
-                total_hours += get_hours_from_timedelta(activity.get('total_time'))
-            except Exception as e:
-                logger.error(f"[REPORT] Erro ao processar atividade: {str(e)}")
-                continue
+        # Soma em segundos inteiros (sem perda de precisão por atividade)
+        total_seconds = sum(get_seconds(activity.get('total_time')) for activity in activities)
+        total_hours = total_seconds / 3600
         
         # Cálculo do valor total usando a fórmula correta
         WORKDAYS = 21  # Dias úteis no mês
@@ -303,11 +287,7 @@ class ActivitiesPrinter(Printer):
         else:
             total_value = (50 * total_hours) / (WORKDAYS * WORKHOURS)  # Usa 50 como fallback
         
-        # Formato HH:MM:SS
-        hours = int(total_hours)
-        minutes = int((total_hours * 60) % 60)
-        seconds = int((total_hours * 3600) % 60)
-        total_time_formatted = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        total_time_formatted = format_hms(total_seconds)
         
         available_width = A4[0] - (5 * cm)
         col_widths = [
@@ -0,0 +1,130 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALL_DAYS = (0, 1, 2, 3, 4, 5, 6)  # segunda = 0, como date.weekday()
+_EPOCH = date(1970, 1, 5)         # segunda-feira de referência para contar semanas
+_EPOCH_NP = '1970-01-05'
+
+def _seconds(value) -> int:
+    """Segundos desde a meia-noite de um "HH:MM:SS" ou time"""
+    if isinstance(value, str):
+        h, m, s = map(int, value.split(':'))
+        return h * 3600 + m * 60 + s
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+class BusinessCalendar:
+    """
+    Calendário de horário comercial com intervalos diários pré-calculados.
+
+    O tempo útil acumulado desde uma data de referência é uma função
+    monotônica F(t) = dias úteis antes de t * horas por dia + parte útil do
+    dia de t. A duração útil de um período é F(fim) - F(início), calculada
+    sem percorrer os dias do período: os dias úteis saem da contagem de
+    semanas e os feriados de uma busca binária.
+    """
+
+    def __init__(self, intervals, workdays=ALL_DAYS, holidays=()):
+        """
+        intervals: períodos de trabalho do dia como pares (início, fim) em
+        "HH:MM:SS" ou time, em ordem e sem sobreposição
+        workdays: dias da semana trabalhados (segunda = 0)
+        holidays: datas sem expediente
+        """
+        self.workdays = tuple(sorted(set(workdays)))
+        self.holidays = sorted({d for d in holidays if d.weekday() in self.workdays})
+
+        # Pontos da função acumulada do dia: (segundo do dia, segundos úteis até ele)
+        self._knots = [0]
+        self._cumulative = [0]
+        for start, end in intervals:
+            start, end = _seconds(start), _seconds(end)
+            if start < self._knots[-1] or end < start:
+                raise ValueError("Intervalos do dia devem estar em ordem e sem sobreposição")
+            self._knots += [start, end]
+            self._cumulative += [self._cumulative[-1], self._cumulative[-1] + end - start]
+        self.day_seconds = self._cumulative[-1]
+
+        # Dias úteis acumulados dentro de uma semana a partir de segunda
+        self._week_prefix = [0]
+        for weekday in range(7):
+            self._week_prefix.append(self._week_prefix[-1] + (weekday in self.workdays))
+
+    @classmethod
+    def from_hours(cls, company_start, break_start, break_end, company_end, **kwargs):
+        """Calendário de um expediente com um intervalo (constantes COMPANY_*/BREAK_* do TimeManager)"""
+        return cls([(company_start, break_start), (break_end, company_end)], **kwargs)
+
+    # ------------------------------------------------------------- escalar
+
+    def is_workday(self, day: date) -> bool:
+        if day.weekday() not in self.workdays:
+            return False
+        index = bisect_left(self.holidays, day)
+        return index == len(self.holidays) or self.holidays[index] != day
+
+    def workdays_before(self, day: date) -> int:
+        """Dias úteis desde a data de referência até day (exclusive)"""
+        weeks, rest = divmod((day - _EPOCH).days, 7)
+        return weeks * len(self.workdays) + self._week_prefix[rest] - bisect_left(self.holidays, day)
+
+    def _within_day(self, seconds: float) -> float:
+        """Segundos úteis entre a meia-noite e seconds"""
+        index = bisect_right(self._knots, seconds) - 1
+        if index >= len(self._knots) - 1:
+            return self.day_seconds
+        # Índices ímpares começam um período de trabalho; pares, uma pausa
+        if index % 2 == 1:
+            return self._cumulative[index] + seconds - self._knots[index]
+        return self._cumulative[index]
+
+    def business_seconds(self, moment: datetime) -> float:
+        """F(moment): segundos úteis desde a data de referência"""
+        day = moment.date()
+        total = self.workdays_before(day) * self.day_seconds
+        if self.is_workday(day):
+            total += self._within_day(
+                moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+            )
+        return total
+
+    def duration(self, start: datetime, end: datetime) -> timedelta:
+        """Tempo útil entre start e end"""
+        if start >= end:
+            return timedelta()
+        return timedelta(seconds=self.business_seconds(end) - self.business_seconds(start))
+
+    # ------------------------------------------------------------ em lote
+
+    def durations(self, starts, ends):
+        """
+        Tempo útil (segundos, array float) de vários períodos de uma vez, com NumPy.
+        starts/ends: sequências de datetime, arrays datetime64 ou colunas do pandas.
+        Períodos com fim ausente (None/NaT) resultam em NaN.
+        """
+        import numpy as np
+
+        starts = np.asarray(starts, dtype='datetime64[us]')
+        ends = np.asarray(ends, dtype='datetime64[us]')
+        result = self._business_seconds_array(ends) - self._business_seconds_array(starts)
+        return np.where(np.isnat(starts) | np.isnat(ends), np.nan, np.maximum(result, 0.0))
+
+    def _business_seconds_array(self, moments):
+        import numpy as np
+
+        days = moments.astype('datetime64[D]')
+        valid = ~np.isnat(days)
+        safe_days = np.where(valid, days, np.datetime64(_EPOCH_NP, 'D'))
+        weekmask = [int(weekday in self.workdays) for weekday in range(7)]
+        holidays = np.array(self.holidays, dtype='datetime64[D]')
+
+        # np.busday_count conta [início, fim); datas anteriores à referência ficam negativas
+        before = np.busday_count(np.datetime64(_EPOCH_NP, 'D'), safe_days,
+                                 weekmask=weekmask, holidays=holidays)
+        workday = np.is_busday(safe_days, weekmask=weekmask, holidays=holidays)
+
+        seconds_of_day = (moments - days).astype('timedelta64[us]').astype(np.float64) / 1e6
+        within = np.interp(seconds_of_day, self._knots, self._cumulative)
+        return before * float(self.day_seconds) + np.where(workday, within, 0.0)
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from ...config.settings import CHECKPOINT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Estado do timer gravado no checkpoint
+CHECKPOINT_RUNNING = 1
+CHECKPOINT_PAUSED = 2
+CHECKPOINT_STOPPED = 3
+
+_MAGIC = b"CHKP"
+_VERSION = 2
+_HEADER = struct.Struct("<4sHxx")
+# Cabe uma referência local do journal ("local:" + uuid4, 42 bytes)
+_REF_SIZE = 48
+# seq, atividade, user_id, estado, total, timer, limite, gravado em (epoch)
+_RECORD = struct.Struct(f"<Q{_REF_SIZE}sqBxxxxxxxqqqd")
+_CRC = struct.Struct("<I")
+_SLOT_SIZE = _RECORD.size + _CRC.size
+FILE_SIZE = _HEADER.size + 2 * _SLOT_SIZE
+
+class CheckpointRecord(NamedTuple):
+    """Tempos do timer no último tick (segundos inteiros, como no TimerSnapshot)"""
+    activity_ref: object    # id da atividade (ou referência local do journal)
+    user_id: int
+    state: int              # CHECKPOINT_RUNNING, CHECKPOINT_PAUSED ou CHECKPOINT_STOPPED
+    total_seconds: int
+    timer_seconds: int      # restante (regressivo) ou excedido (progressivo)
+    limit_seconds: int      # tempo total em que o regressivo zera
+    saved_at: datetime
+
+    @property
+    def mode(self) -> str:
+        return 'regressivo' if self.total_seconds < self.limit_seconds else 'progressivo'
+
+class TimerCheckpoint:
+    """
+    Checkpoint local do timer em um arquivo mapeado em memória (um por usuário).
+
+    O registro tem tamanho fixo e é reescrito a cada tick com uma cópia de
+    memória, sem chamadas ao sistema: a página mapeada sobrevive ao fim do
+    processo e o sistema operacional a grava no disco. Para quedas de energia,
+    o arquivo é sincronizado (msync) nas mudanças de estado e a cada
+    sync_interval segundos.
+
+    Há dois slots gravados alternadamente, cada um com número de sequência e
+    CRC32; a leitura usa o slot válido mais recente, então uma gravação
+    interrompida no meio nunca corrompe o último checkpoint bom.
+    """
+
+    def __init__(self, path: str, sync_interval: Optional[float] = None):
+        self.path = path
+        self.sync_interval = CHECKPOINT_CONFIG['sync_interval'] if sync_interval is None else sync_interval
+        self._seq = 0
+        self._last_sync = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        if os.fstat(self._file.fileno()).st_size != FILE_SIZE:
+            self._file.truncate(FILE_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), FILE_SIZE)
+
+        magic, version = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map[:] = bytes(FILE_SIZE)
+            _HEADER.pack_into(self._map, 0, _MAGIC, _VERSION)
+            self._map.flush()
+        else:
+            self._seq = max(self._read_slot(0)[0], self._read_slot(1)[0])
+
+    @classmethod
+    def for_user(cls, user_id: int) -> Optional["TimerCheckpoint"]:
+        """Checkpoint do usuário no diretório configurado, ou None se desabilitado"""
+        if not CHECKPOINT_CONFIG['enabled']:
+            return None
+        return cls(os.path.join(CHECKPOINT_CONFIG['dir'], f"timer_{user_id}.chk"))
+
+    # ----------------------------------------------------------- escrita
+
+    def write(self, record: CheckpointRecord, sync: bool = False) -> None:
+        """Grava o registro no slot mais antigo; sync força a gravação no disco"""
+        ref = str(record.activity_ref).encode()
+        if len(ref) > _REF_SIZE:
+            # Truncada, a referência não voltaria a identificar a atividade
+            raise ValueError(f"Referência da atividade longa demais para o checkpoint: {record.activity_ref}")
+        self._seq += 1
+        payload = _RECORD.pack(
+            self._seq, ref, record.user_id or 0, record.state,
+            record.total_seconds, record.timer_seconds, record.limit_seconds,
+            record.saved_at.timestamp()
+        )
+        offset = _HEADER.size + (self._seq % 2) * _SLOT_SIZE
+        self._map[offset:offset + _SLOT_SIZE] = payload + _CRC.pack(zlib.crc32(payload))
+
+        now = time.monotonic()
+        if sync or now - self._last_sync >= self.sync_interval:
+            self._map.flush()
+            self._last_sync = now
+
+    def flush(self) -> None:
+        self._map.flush()
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+
+    # ------------------------------------------------------------ leitura
+
+    def _read_slot(self, index: int):
+        offset = _HEADER.size + index * _SLOT_SIZE
+        payload = self._map[offset:offset + _RECORD.size]
+        (crc,) = _CRC.unpack_from(self._map, offset + _RECORD.size)
+        if crc != zlib.crc32(payload):
+            return 0, None
+        values = _RECORD.unpack(payload)
+        return values[0], values
+
+    def read(self) -> Optional[CheckpointRecord]:
+        """Último registro válido, ou None se o arquivo ainda não tem checkpoint"""
+        seq, values = max((self._read_slot(0), self._read_slot(1)), key=lambda slot: slot[0])
+        if not seq:
+            return None
+        _, ref, user_id, state, total, timer, limit, saved_at = values
+        ref = ref.rstrip(b"\0").decode()
+        return CheckpointRecord(
+            int(ref) if ref.isdigit() else ref, user_id, state, total, timer, limit,
+            datetime.fromtimestamp(saved_at)
+        )
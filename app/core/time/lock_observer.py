@@ -2,6 +2,7 @@ from datetime import datetime, time
 import logging
 from typing import Optional
 from ...database.connection import DatabaseConnection
+from .scheduler import DeadlineScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +20,19 @@ class LockStateObserver:
             self.db = DatabaseConnection()
             self._initialized = True
             self._observers = []
-            self._check_timer_id = None
-            self._start_monitoring()
+            self.scheduler = DeadlineScheduler()
 
     def add_observer(self, observer):
         if observer not in self._observers:
             self._observers.append(observer)
+            self._start_monitoring()
 
     def remove_observer(self, observer):
         if observer in self._observers:
             self._observers.remove(observer)
+        if not self._observers:
+            # Sem observadores, nenhuma consulta periódica ao banco
+            self.scheduler.unsubscribe_tick(self._check_changes)
 
     def check_lock_state(self, user_id: int) -> bool:
         """
@@ -63,34 +67,37 @@ class LockStateObserver:
                 logger.error(f"Erro ao notificar observer sobre bloqueio: {e}")
 
     def _start_monitoring(self):
-        """Inicia monitoramento periódico do estado de bloqueio"""
+        """Inscreve a verificação de bloqueio (a cada 2 segundos) no tick do agendador"""
         try:
-            def check_changes():
-                for observer in self._observers:
-                    if hasattr(observer, 'user_data'):
-                        current_state = self.check_lock_state(observer.user_data['id'])
-                        
-                        # Se o estado mudou para bloqueado
-                        if hasattr(observer, 'is_unlocked') and observer.is_unlocked != current_state:
-                            if not current_state:  # Se vai bloquear
-                                # Pausar atividades ativas antes do bloqueio
-                                if hasattr(observer, '_pause_active_activities'):
-                                    observer._pause_active_activities()
-                            
-                            logger.debug(f"[LOCK] Estado mudou de {observer.is_unlocked} para {current_state}")
-                            observer.is_unlocked = current_state  # Atualiza o estado
-                            observer.on_lock_state_changed(current_state)  # Notifica mudança
-                        
-                        # Força atualização da UI independente de mudança
-                        if hasattr(observer, 'update_button_states'):
-                            observer.update_button_states()
-                        
-                        # Agendar próxima verificação
-                        if hasattr(observer, 'after'):
-                            observer.after(2000, check_changes)
-                            break
-
-            check_changes()
+            for observer in self._observers:
+                if hasattr(observer, 'after'):
+                    self.scheduler.attach(observer)
+                    break
+            self.scheduler.subscribe_tick(self._check_changes, every=2)
         except Exception as e:
             logger.error(f"Erro ao monitorar mudanças de bloqueio: {e}")
- 
\ No newline at end of file
+
+    def _check_changes(self, now=None):
+        """O bloqueio é alterado pelo administrador em outro processo, por isso é consultado no banco"""
+        for observer in self._observers:
+            if hasattr(observer, 'user_data'):
+                current_state = self.check_lock_state(observer.user_data['id'])
+                
+                # Se o estado mudou para bloqueado
+                if hasattr(observer, 'is_unlocked') and observer.is_unlocked != current_state:
+                    if not current_state:  # Se vai bloquear
+                        # Pausar atividades ativas antes do bloqueio
+                        if hasattr(observer, '_pause_active_activities'):
+                            observer._pause_active_activities()
+                    
+                    logger.debug(f"[LOCK] Estado mudou de {observer.is_unlocked} para {current_state}")
+                    observer.is_unlocked = current_state  # Atualiza o estado
+                    observer.on_lock_state_changed(current_state)  # Notifica mudança
+                
+                # Força atualização da UI independente de mudança
+                if hasattr(observer, 'update_button_states'):
+                    observer.update_button_states()
+                
+                # Apenas o primeiro observador com janela é verificado
+                if hasattr(observer, 'after'):
+                    break
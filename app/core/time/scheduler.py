@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Maior intervalo entre dois despertares do loop do Tkinter, mesmo sem eventos
+# próximos: protege contra ajustes do relógio do sistema e suspensão da máquina
+MAX_SLEEP_SECONDS = 60
+
+class ScheduledEvent:
+    """Evento agendado; cancel() remove o evento sem precisar reorganizar o heap"""
+    __slots__ = ('when', 'callback', 'name', 'daily', 'cancelled')
+
+    def __init__(self, when, callback, name=None, daily=None):
+        self.when = when
+        self.callback = callback
+        self.name = name
+        self.daily = daily  # "HH:MM:SS" para eventos que se repetem todo dia
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class DeadlineScheduler:
+    """
+    Agendador único dos eventos de horário da aplicação.
+
+    Mantém um heap com os prazos (início/fim do expediente, intervalo, fim do
+    tempo regressivo da atividade) e dispara cada callback exatamente no seu
+    horário, em vez de vários loops verificando o relógio a cada segundo.
+    Consumidores de interface recebem um único tick coalescido por segundo,
+    alinhado à virada do segundo, que só existe enquanto há inscritos.
+
+    Os callbacks rodam na thread do Tkinter, através de um único after()
+    reprogramado para o próximo prazo ou tick. Sem janela associada (attach),
+    os eventos aguardam no heap; run_pending() permite executá-los diretamente.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, clock=time.time):
+        if not self.initialized:
+            self.clock = clock
+            self._lock = threading.RLock()
+            self._heap = []
+            self._sequence = itertools.count()
+            self._named = {}
+            self._tick_subscribers = {}
+            self._tick_count = 0
+            self._next_tick = None
+            self._root = None
+            self._after_id = None
+            self._ui_thread = None
+            self.initialized = True
+
+    # ------------------------------------------------------------------ agenda
+
+    def schedule_at(self, when, callback, name=None):
+        """
+        Agenda callback para o instante when (datetime ou timestamp).
+        Um evento com o mesmo name substitui o anterior.
+        """
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        return self._push(ScheduledEvent(when, callback, name))
+
+    def schedule_in(self, delay, callback, name=None):
+        """Agenda callback para daqui a delay (segundos ou timedelta)"""
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        return self._push(ScheduledEvent(self.clock() + max(0.0, delay), callback, name))
+
+    def schedule_daily(self, time_str, callback, name=None, catch_up=False):
+        """
+        Agenda callback todos os dias no horário time_str ("HH:MM:SS").
+        Com catch_up=True, se o horário de hoje já passou o callback também
+        roda logo na primeira oportunidade.
+        """
+        now = datetime.fromtimestamp(self.clock())
+        when = self._next_occurrence(now, time_str)
+        event = self._push(ScheduledEvent(when.timestamp(), callback, name, daily=time_str))
+        if catch_up and self._at_time(now, time_str) <= now:
+            self.schedule_in(0, callback)
+        return event
+
+    def cancel(self, name):
+        """Cancela o evento nomeado, se existir"""
+        with self._lock:
+            event = self._named.pop(name, None)
+            if event:
+                event.cancel()
+
+    def next_deadline(self):
+        """Timestamp do próximo evento pendente ou None"""
+        with self._lock:
+            self._discard_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    # -------------------------------------------------------------- tick de UI
+
+    def subscribe_tick(self, callback, every=1):
+        """
+        Inscreve callback(now: datetime) no tick coalescido de 1 segundo.
+        every=N chama o callback apenas a cada N ticks.
+        """
+        with self._lock:
+            self._tick_subscribers[callback] = max(1, int(every))
+            if self._next_tick is None:
+                self._next_tick = math.floor(self.clock()) + 1
+        self._rearm()
+
+    def unsubscribe_tick(self, callback):
+        with self._lock:
+            self._tick_subscribers.pop(callback, None)
+            if not self._tick_subscribers:
+                self._next_tick = None
+
+    # ------------------------------------------------------------------ motor
+
+    def attach(self, widget):
+        """Associa o agendador ao loop de eventos do Tkinter da janela de widget"""
+        try:
+            root = widget.winfo_toplevel()
+            if self._root is not None and self._root is root and self._alive(root):
+                return
+            self._cancel_after()
+            self._root = root
+            self._ui_thread = threading.get_ident()
+            logger.debug("[SCHEDULER] Associado ao loop de eventos da interface")
+            self._rearm()
+        except Exception as e:
+            logger.error(f"[SCHEDULER] Erro ao associar à interface: {e}")
+
+    def run_pending(self, now=None):
+        """
+        Executa os eventos vencidos e o tick, se devido.
+        Retorna o timestamp do próximo despertar (ou None se não houver nada agendado).
+        """
+        now = self.clock() if now is None else now
+        due = []
+        tick_callbacks = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, event = heapq.heappop(self._heap)
+                if event.cancelled:
+                    continue
+                if event.name and self._named.get(event.name) is event:
+                    del self._named[event.name]
+                due.append(event)
+                if event.daily:
+                    # Reagendar antes de executar, a partir de agora: depois de dias
+                    # suspenso o evento roda uma vez, não uma por dia perdido
+                    following = self._next_occurrence(datetime.fromtimestamp(now), event.daily)
+                    self._push_locked(ScheduledEvent(following.timestamp(), event.callback, event.name, event.daily))
+
+            if self._next_tick is not None and now >= self._next_tick:
+                self._tick_count += 1
+                tick_callbacks = [callback for callback, every in self._tick_subscribers.items()
+                                  if self._tick_count % every == 0]
+                self._next_tick = math.floor(now) + 1
+
+        for event in due:
+            self._run(event.callback, event.name or 'evento')
+        if tick_callbacks:
+            current = datetime.fromtimestamp(now)
+            for callback in tick_callbacks:
+                self._run(lambda cb=callback: cb(current), 'tick')
+
+        return self._next_wakeup()
+
+    def _next_wakeup(self):
+        with self._lock:
+            self._discard_cancelled()
+            candidates = [t for t in (self._heap[0][0] if self._heap else None, self._next_tick) if t is not None]
+            return min(candidates) if candidates else None
+
+    def _drive(self):
+        self._after_id = None
+        try:
+            self.run_pending()
+        finally:
+            self._rearm()
+
+    def _rearm(self):
+        """Reprograma o único after() do agendador para o próximo despertar"""
+        root = self._root
+        if root is None or threading.get_ident() != self._ui_thread:
+            # Fora da thread da interface: o próximo despertar (no máximo
+            # MAX_SLEEP_SECONDS) já considera o heap atualizado
+            return
+        wakeup = self._next_wakeup()
+        self._cancel_after()
+        if wakeup is None:
+            return
+        delay = min(max(0.0, wakeup - self.clock()), MAX_SLEEP_SECONDS)
+        try:
+            self._after_id = root.after(max(1, int(math.ceil(delay * 1000))), self._drive)
+        except Exception as e:
+            logger.debug(f"[SCHEDULER] Janela indisponível, aguardando nova associação: {e}")
+            self._root = None
+
+    def _cancel_after(self):
+        if self._after_id is not None and self._root is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+
+    # ------------------------------------------------------------- auxiliares
+
+    def _push(self, event):
+        with self._lock:
+            self._push_locked(event)
+        self._rearm()
+        return event
+
+    def _push_locked(self, event):
+        if event.name:
+            previous = self._named.get(event.name)
+            if previous:
+                previous.cancel()
+            self._named[event.name] = event
+        heapq.heappush(self._heap, (event.when, next(self._sequence), event))
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+
+    @staticmethod
+    def _at_time(reference, time_str):
+        hours, minutes, seconds = map(int, time_str.split(':'))
+        return reference.replace(hour=hours, minute=minutes, second=seconds, microsecond=0)
+
+    @classmethod
+    def _next_occurrence(cls, reference, time_str):
+        """Próximo horário time_str estritamente depois de reference"""
+        today = cls._at_time(reference, time_str)
+        return today if today > reference else today + timedelta(days=1)
+
+    @staticmethod
+    def _alive(root):
+        try:
+            return bool(root.winfo_exists())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _run(callback, name):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"[SCHEDULER] Erro ao executar {name}: {e}")
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 import logging
 
+from ...utils.duration import to_hms, to_seconds
+
 logger = logging.getLogger(__name__)
 
 class TimeController:
@@ -22,8 +24,7 @@ class TimeController:
             # Se houver tempo total registrado, usar como tempo acumulado
             if 'total_time' in activity_info and activity_info['total_time']:
                 try:
-                    h, m, s = map(int, activity_info['total_time'].split(':'))
-                    self.accumulated_time = timedelta(hours=h, minutes=m, seconds=s)
+                    self.accumulated_time = timedelta(seconds=to_seconds(activity_info['total_time']))
                     self.total_elapsed_time = self.accumulated_time  # Inicializa tempo total
                 except:
                     self.accumulated_time = timedelta()
@@ -114,11 +115,7 @@ class TimeController:
 
     def format_total_time(self):
         """Formata o tempo total decorrido para exibição"""
-        total_seconds = int(self.total_elapsed_time.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return to_hms(self.total_elapsed_time)
 
     def get_current_duration(self):
         """Retorna a duração atual total"""
@@ -135,8 +132,7 @@ class TimeController:
     def set_accumulated_time(self, time_str):
         """Define o tempo acumulado a partir de uma string HH:MM:SS"""
         try:
-            h, m, s = map(int, time_str.split(':'))
-            self.accumulated_time = timedelta(hours=h, minutes=m, seconds=s)
+            self.accumulated_time = timedelta(seconds=to_seconds(time_str))
             self.total_elapsed_time = self.accumulated_time
             logger.debug(f"Tempo acumulado definido: {self.accumulated_time}")
         except Exception as e:
@@ -1,27 +1,41 @@
 from datetime import datetime, timedelta, time
 import logging
-import json
 from typing import Optional, Dict
 from plyer import notification
 import os
 from .time_state import TimeState
 from .time_observer import TimeObservable, TimeObserver
 from ...database.connection import DatabaseConnection
+from ...database.write_behind import WriteBehindQueue, SqlExpression
+from ...database.local_journal import write_through, resolve_ref
 from ...config.settings import APP_CONFIG
+from ...utils.duration import to_seconds, to_hms
 from .lock_observer import LockStateObserver
+from .scheduler import DeadlineScheduler
+from .timer_engine import TimerEngine, NS_PER_SECOND
+from .checkpoint import (
+    TimerCheckpoint, CheckpointRecord, CHECKPOINT_RUNNING, CHECKPOINT_PAUSED, CHECKPOINT_STOPPED
+)
+from .work_calendar import WorkCalendar, DEFAULT_SCHEDULE, AFTER_HOURS
+from ..activity.activity_state import ActivityStateStore
+from ..activity.activity_events import (
+    ActivityEventLog, EVENT_START, EVENT_PAUSE, EVENT_RESUME, EVENT_STOP, EVENT_EXCEEDED, EVENT_IDLE
+)
 from ..idleness.idle_detector import IdleDetector
+from ..idleness.idle_sessions import IdleSessionLog
 from ...ui.dialogs.reason_exceeded_dialog import ReasonExceededDialog
 from .time_exceeded_observer import TimeExceededObserver
 
 logger = logging.getLogger(__name__)
 
 class TimeManager(TimeObservable):
-    # Constantes de horário comercial
-    COMPANY_START_TIME = "08:00:00"
-    BREAK_START_TIME = "12:15:00"
-    BREAK_END_TIME = "13:15:00"
-    COMPANY_END_TIME = "18:30:00"
+    # Constantes de horário comercial (expediente padrão; horários por equipe ficam no WorkCalendar)
+    COMPANY_START_TIME = DEFAULT_SCHEDULE.company_start.isoformat()
+    BREAK_START_TIME = DEFAULT_SCHEDULE.break_start.isoformat()
+    BREAK_END_TIME = DEFAULT_SCHEDULE.break_end.isoformat()
+    COMPANY_END_TIME = DEFAULT_SCHEDULE.company_end.isoformat()
     APP_ICON = APP_CONFIG['icons']['app']
+    SAVE_INTERVAL_NS = 60 * NS_PER_SECOND  # gravação periódica dos tempos
     _instance = None  # Singleton instance
     
     
@@ -36,9 +50,16 @@ class TimeManager(TimeObservable):
             super().__init__()  # Importante: chamar o init da classe pai
             self.state = TimeState()
             self.db = DatabaseConnection()
+            self.writer = WriteBehindQueue(self.db)
             self._timer_id = None
-            self._check_lock_timer_id = None
+            self.scheduler = DeadlineScheduler()
+            self.calendar = WorkCalendar()
+            self.engine = TimerEngine()
+            self.events = ActivityEventLog(self.db)
+            self.checkpoint = None  # aberto em set_user
+            self._last_save_ns = 0
             self._start_lock_check()
+            self.idle_sessions = IdleSessionLog(self.db)
             self.idle_detector = IdleDetector()
             self.idle_detector.add_observer(self)
             self.idle_detector.start()
@@ -73,24 +94,31 @@ class TimeManager(TimeObservable):
             # Notificar observadores do reset
             self.notify_observers_timer(timedelta(), timedelta())
 
-            query = """
-                SELECT time_regress, time_exceeded
-                FROM atividades 
-                WHERE id = %s
-            """
-            result = self.db.execute_query(query, (activity_info['id'],))
+            # Atividade recém-criada já traz o tempo regressivo; evita a consulta
+            # (e permite iniciar o timer de atividades criadas offline)
+            if activity_info.get('time_regress') is not None:
+                result = [{'time_regress': activity_info['time_regress']}]
+            else:
+                query = """
+                    SELECT time_regress, time_exceeded
+                    FROM atividades 
+                    WHERE id = %s
+                """
+                result = self.db.execute_query(query, (activity_info['id'],))
             
             if result and result[0]:
-                time_val = result[0]['time_regress']
-                if time_val and time_val != '00:00:00':
+                regress_seconds = to_seconds(result[0]['time_regress'])
+                if regress_seconds:
                     # Modo regressivo
-                    if isinstance(time_val, timedelta):
-                        self.state.initial_timer_value = time_val
-                    else:
-                        h, m, s = map(int, str(time_val).split(':'))
-                        self.state.initial_timer_value = timedelta(hours=h, minutes=m, seconds=s)
+                    self.state.initial_timer_value = timedelta(seconds=regress_seconds)
                     logger.debug(f"[TIMER_DEBUG] Configurado timer regressivo: {self.state.initial_timer_value}")
 
+            self.engine.start(
+                regress=self.state.initial_timer_value,
+                accumulated=timedelta(seconds=self.state.accumulated_time)
+            )
+            self._record_event(EVENT_START)
+            self._write_checkpoint(CHECKPOINT_RUNNING, sync=True)
             self._start_timer_update()
 
             logger.debug(f"[TIMER_DEBUG] Estado final do timer")
@@ -104,29 +132,18 @@ class TimeManager(TimeObservable):
         """Pausa a atividade atual"""
         try:
             if self.state.is_running:
-                # Cancelar timer existente
-                if self._timer_id:
-                    for observer in self._observers:
-                        if hasattr(observer, 'after_cancel'):
-                            observer.after_cancel(self._timer_id)
-                            break
-
-                self._timer_id = None
+                # Cancelar timer existente e fixar os valores no instante da pausa
+                self._stop_timer_update()
+                self.engine.pause()
+                self._apply_snapshot(self.engine.snapshot())
+                self._record_event(EVENT_PAUSE)
+                self._write_checkpoint(CHECKPOINT_PAUSED, sync=True)
                 current_time = datetime.now()
                 self.state.pause_start_time = current_time
                 self.state.is_running = False
 
                 # Salvar apenas os tempos necessários no banco
                 if self.state.activity_info:
-                    query = """
-                        UPDATE atividades 
-                        SET total_time = %s,
-                            time_regress = %s,
-                            time_exceeded = %s,
-                            current_mode = %s
-                        WHERE id = %s
-                    """
-                    
                     total_time = self.format_total_time(self.state.total_elapsed_time)
                     
                     # Determinar valores baseado no modo atual
@@ -137,75 +154,139 @@ class TimeManager(TimeObservable):
                         time_regress = '00:00:00'
                         time_exceeded = self.format_total_time(abs(self.state.timer_value))
                     
-                    params = (
-                        total_time,
-                        time_regress, 
-                        time_exceeded,
-                        self.state.current_mode,
-                        self.state.activity_info['id']
-                    )
-                    self.db.execute_query(query, params)
+                    self.writer.enqueue(self.state.activity_info['id'], {
+                        'total_time': total_time,
+                        'time_regress': time_regress,
+                        'time_exceeded': time_exceeded,
+                        'current_mode': self.state.current_mode
+                    })
+                    # Garantir que a pausa esteja gravada antes de quem ler o banco em seguida
+                    self.writer.flush()
                     
         except Exception as e:
             logger.error(f"Erro ao pausar atividade: {e}")
 
-    def _save_exact_state(self):
-        """Salva o estado com precisão total"""
-        state_data = {
-            'mode': self.state.current_mode,
-            'timer_value': self.format_total_time(self.state.timer_value),
-            'total_time': self.format_total_time(self.state.total_elapsed_time),
-            'start_time': self.state.start_time.isoformat() if self.state.start_time else None,
-            'accumulated_time': self.format_total_time(self.state.accumulated_time)
-        }
-        
-        self._save_to_db(state_data)
+    def _record_event(self, event_type: str) -> None:
+        """Registra no log de eventos os tempos do motor no instante atual"""
+        if not self.state.activity_info:
+            return
+        try:
+            snapshot = self.engine.snapshot()
+            self._defer_event(
+                self.state.activity_info['id'], getattr(self.state, 'user_id', None), event_type,
+                total_seconds=snapshot.total_seconds,
+                limit_seconds=self.engine.limit_ns // NS_PER_SECOND
+            )
+        except Exception as e:
+            logger.error(f"[EVENTS] Erro ao registrar evento {event_type}: {e}")
+
+    def _defer_event(self, activity_ref, user_id, event_type: str, occurred_at: Optional[datetime] = None,
+                     **times) -> None:
+        """
+        Agenda a gravação de um evento na thread do write-behind, fora da thread
+        da interface. O instante é fixado agora; os eventos são gravados em ordem.
+        """
+        occurred_at = occurred_at or datetime.now()
 
-    def _save_to_db(self):
-        """Salva o estado atual no banco de dados"""
+        def write():
+            if not self.events.record(activity_ref, user_id, event_type, occurred_at, **times):
+                raise ConnectionError(f"Evento {event_type} não gravado")
+
+        self.writer.defer(write)
+
+    def _load_saved_times(self, activity_id) -> Optional[Dict]:
+        """
+        Tempos de uma atividade parada: uma linha do resumo do log de eventos
+        ou, para atividades sem eventos, as colunas de tempo de atividades
+        """
+        # Atividade criada offline: só é encontrada pelo id do MySQL, depois de sincronizada
+        activity_id = resolve_ref(activity_id, self.db)
         try:
-            if not self.state.activity_info:
-                return
+            summary = self.events.get_summary(activity_id)
+            # Resumo ainda "rodando" indica sessão interrompida: as colunas têm a gravação mais recente
+            if summary and not summary.running:
+                return {
+                    'current_mode': summary.mode_at(),
+                    'total_time': timedelta(seconds=summary.total_seconds),
+                    'time_regress': timedelta(seconds=summary.regress_seconds_at()),
+                    'time_exceeded': timedelta(seconds=summary.exceeded_seconds_at())
+                }
+        except Exception as e:
+            logger.warning(f"[EVENTS] Resumo indisponível para atividade {activity_id}: {e}")
 
-            current_time = datetime.now()
-            total_time = self.format_total_time(self.state.total_elapsed_time)
+        query = """
+            SELECT time_regress, time_exceeded, total_time, current_mode
+            FROM atividades 
+            WHERE id = %s
+        """
+        result = self.db.execute_query(query, (activity_id,))
+        return result[0] if result else None
             
-            # Determinar valores baseado no modo atual
-            if self.state.current_mode == 'regressivo':
-                time_regress = self.format_total_time(self.state.timer_value)
-                time_exceeded = '00:00:00'
-            else:
-                time_regress = '00:00:00'
-                time_exceeded = self.format_total_time(abs(self.state.timer_value))
+    def _write_checkpoint(self, state: int, snapshot=None, sync: bool = False) -> None:
+        """Grava os tempos do motor no checkpoint local do usuário"""
+        if not self.checkpoint or not self.state.activity_info:
+            return
+        try:
+            snapshot = snapshot or self.engine.snapshot()
+            self.checkpoint.write(CheckpointRecord(
+                self.state.activity_info['id'], getattr(self.state, 'user_id', None), state,
+                snapshot.total_seconds, snapshot.timer_seconds,
+                self.engine.limit_ns // NS_PER_SECOND, datetime.now()
+            ), sync=sync)
+        except Exception as e:
+            logger.error(f"[CHECKPOINT] Erro ao gravar checkpoint: {e}")
+
+    def _checkpoint_times(self, activity_id) -> Optional[Dict]:
+        """Tempos da atividade no checkpoint local, se ele for dessa atividade"""
+        record = self.checkpoint.read() if self.checkpoint else None
+        if not record or record.activity_ref != activity_id:
+            return None
+        logger.debug(f"[CHECKPOINT] Tempos restaurados do checkpoint de {record.saved_at}")
+        return {
+            'current_mode': record.mode,
+            'total_time': timedelta(seconds=record.total_seconds),
+            'time_regress': timedelta(seconds=max(0, record.limit_seconds - record.total_seconds)),
+            'time_exceeded': timedelta(seconds=max(0, record.total_seconds - record.limit_seconds))
+        }
 
-            query = """
-                UPDATE atividades 
-                SET total_time = %s,
-                    time_regress = %s,
-                    time_exceeded = %s
-                WHERE id = %s
-            """
-            
-            params = (total_time, time_regress, time_exceeded, self.state.activity_info['id'])
-            self.db.execute_query(query, params)
-            
+    def _recover_checkpoint(self) -> None:
+        """
+        Recupera uma sessão encerrada com o timer rodando (queda do aplicativo).
+        Os tempos do último tick vão para o banco e a atividade fica pausada;
+        o tempo em que o aplicativo esteve fechado não é contado.
+        """
+        try:
+            record = self.checkpoint.read() if self.checkpoint else None
+            if not record or record.state != CHECKPOINT_RUNNING:
+                return
+            logger.warning(f"[CHECKPOINT] Timer da atividade {record.activity_ref} interrompido; "
+                           f"recuperando tempos de {record.saved_at}")
+
+            regress = max(0, record.limit_seconds - record.total_seconds)
+            self.writer.enqueue(record.activity_ref, {
+                'total_time': self.format_total_time(record.total_seconds),
+                'time_regress': self.format_total_time(regress),
+                'time_exceeded': self.format_total_time(max(0, record.total_seconds - record.limit_seconds)),
+                'current_mode': record.mode,
+                'pausado': True,
+                'ativo': True,
+                'concluido': False
+            })
+            self._defer_event(record.activity_ref, record.user_id, EVENT_PAUSE, record.saved_at,
+                              total_seconds=record.total_seconds)
+            self.checkpoint.write(record._replace(state=CHECKPOINT_PAUSED), sync=True)
         except Exception as e:
-            logger.error(f"Erro ao salvar estado no banco: {e}")
-            
+            logger.error(f"[CHECKPOINT] Erro ao recuperar checkpoint: {e}")
+
     def resume_activity(self, activity_info: Dict) -> None:
         """Retoma uma atividade pausada"""
         try:
             if not self.state.is_running:
                 self.state.activity_info = activity_info
-                query = """
-                    SELECT time_regress, time_exceeded, total_time, current_mode
-                    FROM atividades 
-                    WHERE id = %s
-                """
-                result = self.db.execute_query(query, (activity_info['id'],))
+                # Checkpoint local primeiro: tem os tempos do último segundo, sem ir ao banco
+                saved_data = self._checkpoint_times(activity_info['id']) or self._load_saved_times(activity_info['id'])
                 
-                if result:
-                    saved_data = result[0]
+                if saved_data:
                     logger.debug(f"[TIMER_RESUME] Dados recuperados do banco: {saved_data}")
                     
                     # Restaurar modo
@@ -213,28 +294,16 @@ class TimeManager(TimeObservable):
                     
                     # Restaurar tempo total
                     if saved_data['total_time']:
-                        # Verificar se já é timedelta
-                        if isinstance(saved_data['total_time'], timedelta):
-                            self.state.total_elapsed_time = saved_data['total_time']
-                        else:
-                            self.state.total_elapsed_time = self.parse_time(saved_data['total_time'])
+                        self.state.total_elapsed_time = self.parse_time(saved_data['total_time'])
                         self.state.accumulated_time = int(self.state.total_elapsed_time.total_seconds())
                     
                     # Configurar timer baseado no modo
                     if self.state.current_mode == 'regressivo':
-                        # Verificar se já é timedelta
-                        if isinstance(saved_data['time_regress'], timedelta):
-                            self.state.timer_value = saved_data['time_regress']
-                        else:
-                            self.state.timer_value = self.parse_time(saved_data['time_regress'])
+                        self.state.timer_value = self.parse_time(saved_data['time_regress'])
                         self.state.initial_timer_value = self.state.timer_value
                         self.state.chronometer_start = None
                     else:  # modo progressivo
-                        # Verificar se já é timedelta
-                        if isinstance(saved_data['time_exceeded'], timedelta):
-                            exceeded_time = saved_data['time_exceeded']
-                        else:
-                            exceeded_time = self.parse_time(saved_data['time_exceeded'])
+                        exceeded_time = self.parse_time(saved_data['time_exceeded'])
                         # Configure o chronometer_start para manter o tempo excedido
                         self.state.chronometer_start = datetime.now() - exceeded_time
                     
@@ -245,6 +314,14 @@ class TimeManager(TimeObservable):
                     
                     self.state.start_time = datetime.now()
                     self.state.is_running = True
+                    if self.state.current_mode == 'regressivo':
+                        self.engine.start(regress=self.state.timer_value,
+                                          accumulated=self.state.total_elapsed_time)
+                    else:
+                        self.engine.start(accumulated=self.state.total_elapsed_time,
+                                          exceeded=exceeded_time)
+                    self._record_event(EVENT_RESUME)
+                    self._write_checkpoint(CHECKPOINT_RUNNING, sync=True)
                     self._start_timer_update()
                 
                 else:
@@ -261,18 +338,15 @@ class TimeManager(TimeObservable):
                     return False
                 
             if self._timer_id:
+                self._stop_timer_update()
+                self.engine.pause()
+                self._apply_snapshot(self.engine.snapshot())
+                self._record_event(EVENT_STOP)
+                self._write_checkpoint(CHECKPOINT_STOPPED, sync=True)
                 self.state.is_running = False
                 
                 # Atualizar todos os tempos no banco
                 if self.state.activity_info:
-                    query = """
-                        UPDATE atividades 
-                        SET total_time = %s,
-                            time_regress = %s,
-                            time_exceeded = %s
-                        WHERE id = %s
-                    """
-                    
                     # Formatar tempos para salvar
                     total_time = self.format_total_time(self.state.total_elapsed_time)
                     
@@ -284,8 +358,12 @@ class TimeManager(TimeObservable):
                         time_regress = '00:00:00'
                         time_exceeded = self.format_total_time(abs(self.state.timer_value))
                     
-                    params = (total_time, time_regress, time_exceeded, self.state.activity_info['id'])
-                    self.db.execute_query(query, params)
+                    self.writer.enqueue(self.state.activity_info['id'], {
+                        'total_time': total_time,
+                        'time_regress': time_regress,
+                        'time_exceeded': time_exceeded
+                    })
+                    self.writer.flush()
                 
                 self.state.reset()
                 logger.info("Atividade parada")
@@ -298,76 +376,93 @@ class TimeManager(TimeObservable):
             return False
             
     def _start_timer_update(self) -> None:
-        """Inicia o loop de atualização do timer"""
+        """Agenda os ticks do timer e o fim do tempo regressivo no agendador"""
         try:
             if not self.state.is_running:
                 return
 
+            self._last_save_ns = 0
             self._update_timer()
-            
-            # Agenda próxima atualização usando o loop de eventos do Tkinter
-            for observer in self._observers:
-                if hasattr(observer, 'after'):
-                    self._timer_id = observer.after(1000, self._start_timer_update)
-                    break
+            self._timer_id = 'timer_tick'
+            self._schedule_next_tick()
+            self._schedule_regress_deadline()
+
+            # Atividade iniciada após o expediente é pausada, como no fim do horário
+            if self.check_company_hours() == "after_hours":
+                self.scheduler.schedule_in(0, self._pause_after_hours, name='company_end_late')
                     
         except Exception as e:
             logger.error(f"Erro no loop de atualização: {e}")
+
+    def _schedule_next_tick(self) -> None:
+        """
+        Agenda o próximo tick na virada de segundo do tempo da atividade.
+        O atraso é recalculado a partir das âncoras do motor, então não acumula deriva.
+        """
+        self.scheduler.schedule_in(self.engine.next_tick_delay(), self._on_timer_tick, name='timer_tick')
+
+    def _on_timer_tick(self) -> None:
+        if not self.state.is_running:
+            self._stop_timer_update()
+            return
+        self._update_timer()
+        self._schedule_next_tick()
+
+    def _stop_timer_update(self) -> None:
+        """Cancela os ticks do timer e o prazo da atividade"""
+        self.scheduler.cancel('timer_tick')
+        self.scheduler.cancel('activity_deadline')
+        self._timer_id = None
+
+    def _schedule_regress_deadline(self) -> None:
+        """Agenda a passagem para o modo progressivo no instante exato em que o tempo regressivo zera"""
+        remaining = self.engine.seconds_until_transition()
+        if remaining is not None:
+            self.scheduler.schedule_in(remaining, self._update_timer, name='activity_deadline')
+        else:
+            self.scheduler.cancel('activity_deadline')
+
+    def _apply_snapshot(self, snapshot) -> None:
+        """Copia a leitura do motor para o estado usado pelas gravações e observadores"""
+        self.state.current_mode = snapshot.mode
+        self.state.timer_value = timedelta(seconds=snapshot.timer_seconds)
+        self.state.total_elapsed_time = timedelta(seconds=snapshot.total_seconds)
             
     def _update_timer(self) -> None:
         try:
             if not self.state.is_running:
                 return
-                    
-            current_time = datetime.now()
-            elapsed = current_time - self.state.start_time - self.state.total_paused_time
 
-            # Verificar se passou 1 minuto desde o último salvamento
-            if not hasattr(self.state, 'last_save'):
-                self.state.last_save = current_time
+            snapshot = self.engine.snapshot()
+            previous_mode = self.state.current_mode
+            self._apply_snapshot(snapshot)
+            # Checkpoint local a cada tick: cópia de memória, sem acesso ao banco
+            self._write_checkpoint(CHECKPOINT_RUNNING, snapshot)
 
-            if (current_time - self.state.last_save).total_seconds() >= 60:
-                query = """
-                    UPDATE atividades 
-                    SET total_time = %s,
-                        time_exceeded = %s
-                    WHERE id = %s
-                """
-                
-                total_time = self.format_total_time(self.state.total_elapsed_time)
+            # Gravação periódica no banco a cada minuto de tempo rodando (visibilidade para os demais)
+            if snapshot.elapsed_ns - self._last_save_ns >= self.SAVE_INTERVAL_NS:
                 time_exceeded = '00:00:00'
+                if snapshot.mode == 'progressivo':
+                    time_exceeded = self.format_total_time(snapshot.timer_seconds)
                 
-                if self.state.current_mode == 'progressivo':
-                    time_exceeded = self.format_total_time(abs(self.state.timer_value))
+                # Gravação assíncrona: não bloqueia o tick de 1 segundo
+                self.writer.enqueue(self.state.activity_info['id'], {
+                    'total_time': self.format_total_time(snapshot.total_seconds),
+                    'time_exceeded': time_exceeded
+                })
+                self._last_save_ns = snapshot.elapsed_ns
+
+            # Transição calculada pelo motor: acontece uma única vez por sessão
+            if previous_mode == 'regressivo' and snapshot.mode == 'progressivo':
+                self.state.chronometer_start = datetime.now()
                 
-                self.db.execute_query(
-                    query,
-                    (total_time, time_exceeded, self.state.activity_info['id'])
-                )
+                # Atualizar banco e enviar notificação
+                self._update_mode_in_db('progressivo')
+                self._record_event(EVENT_EXCEEDED)
+                self._send_time_exceeded_notification()
                 
-                self.state.last_save = current_time
-
-            if self.state.current_mode == 'regressivo':
-                self.state.timer_value = self.state.initial_timer_value - elapsed
-                
-                if self.state.timer_value.total_seconds() <= 0:
-                    self.state.current_mode = 'progressivo'
-                    self.state.chronometer_start = current_time
-                    self.state.timer_value = timedelta(seconds=1)
-                    
-                    # Atualizar banco e enviar notificação
-                    self._update_mode_in_db('progressivo')
-                    self._send_time_exceeded_notification()
-                    
-                    # Notificar observers sem mensagem
-                    self.notify_time_exceeded(self.state.activity_info)
-                    
-            else:
-                if self.state.chronometer_start is None:
-                    self.state.chronometer_start = current_time
-                self.state.timer_value = current_time - self.state.chronometer_start
-            
-            self.state.total_elapsed_time = self._get_current_duration()
+                # Notificar observers sem mensagem
+                self.notify_time_exceeded(self.state.activity_info)
 
             # Notificar observadores sobre as mudanças
             self.notify_observers_timer(self.state.timer_value, self.state.total_elapsed_time)
@@ -409,133 +504,11 @@ class TimeManager(TimeObservable):
     def _update_mode_in_db(self, mode: str):
         """Atualiza modo no banco"""
         logger.debug(f"[DB_UPDATE] ---- Atualizando modo para: {mode} ----")
-        query = """
-            UPDATE atividades
-            SET time_regress = %s
-            WHERE id = %s
-        """
         time_regress = '00:00:00' if mode == 'progressivo' else '00:00:01'
         logger.debug(f"[DB_UPDATE] Valores a serem salvos: regress={time_regress}")
         
-        self.db.execute_query(query, (time_regress, self.state.activity_info['id']))
-        logger.debug("[DB_UPDATE] ---- Atualização concluída ----")
-
-    def _save_current_state_to_db(self):
-        """Salva estado atual no banco de forma consistente"""
-        try:
-            # Salva o estado completo como JSON para restauração precisa
-            state_data = {
-                'mode': self.state.current_mode,
-                'timer_value': self.format_total_time(self.state.timer_value),
-                'total_time': self.format_total_time(self.state.total_elapsed_time),
-                'start_time': self.state.start_time.isoformat() if self.state.start_time else None,
-                'accumulated_time': self.format_total_time(self.state.accumulated_time)
-            }
-
-            # Calcula valores para salvar baseado no modo atual
-            total_time = self.format_total_time(self.state.total_elapsed_time)
-            
-            if self.state.current_mode == 'regressivo':
-                time_regress = self.format_total_time(self.state.timer_value)
-                time_exceeded = '00:00:00'
-            else:
-                time_regress = '00:00:00' 
-                time_exceeded = self.format_total_time(abs(self.state.timer_value))
-
-            query = """
-                UPDATE atividades 
-                SET total_time = %s,
-                    time_regress = %s,
-                    time_exceeded = %s,
-                    current_mode = %s,
-                    last_state = %s
-                WHERE id = %s
-            """
-
-            # Salva o estado completo como JSON para restauração precisa
-            state_data = {
-                'mode': self.state.current_mode,
-                'timer_value': self.format_total_time(self.state.timer_value),
-                'total_time': self.format_total_time(self.state.total_elapsed_time),
-                'start_time': self.state.start_time.isoformat() if self.state.start_time else None,
-                'accumulated_time': self.format_total_time(self.state.accumulated_time)
-            }
-
-            logger.debug("[DB_SAVE] Valores calculados para salvar:")
-            logger.debug(f"  - total_time: {total_time}")
-            logger.debug(f"  - time_regress: {time_regress}")
-            logger.debug(f"  - time_exceeded: {time_exceeded}")
-            logger.debug(f"  - state_data: {state_data}")
-
-            self.db.execute_query(query, (
-                total_time,
-                time_regress, 
-                time_exceeded,
-                self.state.current_mode,
-                json.dumps(state_data),
-                self.state.activity_info['id']
-            ))
-
-            logger.debug("[DB_SAVE] ---- Estado salvo com sucesso ----")
-
-        except Exception as e:
-            logger.error(f"[DB_SAVE] Erro ao salvar estado: {e}")
-            raise
-
-    def _restore_state(self, saved_state: dict) -> None:
-        with self.state._state_lock:  # Usar lock para thread safety
-            self.state.current_mode = saved_state['mode']
-            self.state.timer_value = self.parse_time(saved_state['timer_value'])
-            self.state.total_elapsed_time = self.parse_time(saved_state['total_time'])
-            
-            if saved_state['start_time']:
-                self.state.start_time = datetime.fromisoformat(saved_state['start_time'])
-                
-            # Manter acumuladores precisos
-            self.state.accumulated_time = self.parse_time(saved_state['accumulated_time'])
-            
-            logger.debug(f"Estado restaurado com sucesso: {self.state.timer_value}")
-
-    def _load_state_from_db(self):
-        """Carrega estado do banco"""
-        logger.debug("[DB_LOAD] ---- Iniciando carregamento do banco ----")
-        query = """
-            SELECT time_regress, time_exceeded, total_time, current_mode
-            FROM atividades 
-            WHERE id = %s
-        """
-        result = self.db.execute_query(query, (self.state.activity_info['id'],))
-        logger.debug(f"[DB_LOAD] Dados recuperados: {result[0] if result else None}")
-        logger.debug("[DB_LOAD] ---- Fim do carregamento ----")
-        return result[0] if result else None
-    
-    def _restore_state(self, saved_state):
-        """Restaura estado salvo"""
-        logger.debug("[STATE_RESTORE] ---- Iniciando restauração ----")
-        logger.debug("[STATE_RESTORE] Estado recuperado do banco:")
-        logger.debug(f"  - Modo: {saved_state['current_mode']}")
-        logger.debug(f"  - Time Regress: {saved_state['time_regress']}")
-        logger.debug(f"  - Time Exceeded: {saved_state['time_exceeded']}")
-        logger.debug(f"  - Total Time: {saved_state['total_time']}")
-
-        self.state.current_mode = saved_state['current_mode']
-        
-        if saved_state['time_regress'] != '00:00:00':
-            h, m, s = map(int, saved_state['time_regress'].split(':'))
-            self.state.initial_timer_value = timedelta(hours=h, minutes=m, seconds=s)
-            self.state.chronometer_start = None
-            logger.debug(f"[STATE_RESTORE] Timer regressivo restaurado: {self.state.initial_timer_value}")
-        else:
-            h, m, s = map(int, saved_state['time_exceeded'].split(':'))
-            self.state.chronometer_start = datetime.now() - timedelta(hours=h, minutes=m, seconds=s)
-            logger.debug(f"[STATE_RESTORE] Timer progressivo restaurado: {self.state.chronometer_start}")
-
-        if saved_state['total_time']:
-            h, m, s = map(int, saved_state['total_time'].split(':'))
-            self.state.accumulated_time = timedelta(hours=h, minutes=m, seconds=s)
-            logger.debug(f"[STATE_RESTORE] Tempo acumulado restaurado: {self.state.accumulated_time}")
-
-        logger.debug("[STATE_RESTORE] ---- Restauração finalizada ----")
+        self.writer.enqueue(self.state.activity_info['id'], {'time_regress': time_regress})
+        logger.debug("[DB_UPDATE] ---- Atualização enfileirada ----")
 
     def _handle_time_exceeded(self) -> None:
         """Manipula o evento de tempo excedido"""
@@ -546,17 +519,13 @@ class TimeManager(TimeObservable):
             # Atualizar modo do timer
             self.state.current_mode = 'progressivo'
             
-            # Atualizar status no banco
-            query = """
-                UPDATE atividades 
-                SET time_regress = '00:00:00',
-                    time_exceeded = CASE
-                        WHEN NOW() > end_time THEN TIMEDIFF(NOW(), end_time)
-                        ELSE '00:00:00'
-                    END
-                WHERE id = %s
-            """
-            self.db.execute_query(query, (self.state.activity_info['id'],))
+            # Atualizar status no banco (gravação assíncrona)
+            self.writer.enqueue(self.state.activity_info['id'], {
+                'time_regress': '00:00:00',
+                'time_exceeded': SqlExpression(
+                    "CASE WHEN NOW() > end_time THEN TIMEDIFF(NOW(), end_time) ELSE '00:00:00' END"
+                )
+            })
             
             try:
                 notification.notify(
@@ -630,20 +599,8 @@ class TimeManager(TimeObservable):
 
     @staticmethod
     def check_company_hours():
-        """Verifica o horário atual em relação aos horários da empresa"""
-        now = datetime.now().time()
-        start_time = datetime.strptime(TimeManager.COMPANY_START_TIME, "%H:%M:%S").time()
-        break_start = datetime.strptime(TimeManager.BREAK_START_TIME, "%H:%M:%S").time()
-        break_end = datetime.strptime(TimeManager.BREAK_END_TIME, "%H:%M:%S").time()
-        end_time = datetime.strptime(TimeManager.COMPANY_END_TIME, "%H:%M:%S").time()
-        
-        if now < start_time:
-            return "before_hours"
-        elif break_start <= now <= break_end:
-            return "break_time"
-        elif now > end_time:
-            return "after_hours"
-        return "working_hours"
+        """Verifica o horário atual em relação aos horários da empresa (calendário da equipe)"""
+        return WorkCalendar().status_at()
     
     @staticmethod
     def should_compute_time(current_status):
@@ -654,6 +611,8 @@ class TimeManager(TimeObservable):
             return False, "Horário de intervalo"
         elif current_status == "after_hours":
             return False, "Horário posterior ao encerramento das atividades"
+        elif current_status == "day_off":
+            return False, "Dia sem expediente (feriado ou recesso)"
         return True, None
 
     @staticmethod
@@ -682,85 +641,6 @@ class TimeManager(TimeObservable):
                 
         return total
 
-    @staticmethod
-    def calculate_business_hours_duration(start: datetime, end: datetime) -> timedelta:
-        """
-        Calcula a duração dentro do horário comercial, descontando o intervalo de almoço.
-        Um dia completo de trabalho tem 9 horas (das 8:00 às 18:00, menos 1 hora de almoço).
-        """
-        if start >= end:
-            return timedelta()
-
-        # Ajustar para horário comercial
-        day_start = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))  # 08:00
-        if start < day_start:
-            start = day_start
-
-        day_end = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))    # 18:00
-        if end > day_end:
-            end = day_end
-
-        # Horários de almoço
-        break_start = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.BREAK_START_TIME))    # 12:15
-        break_end = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.BREAK_END_TIME))      # 13:15
-
-        # Calcular duração da manhã (08:00-12:15 = 4h15m máximo)
-        morning_duration = timedelta()
-        if start < break_start:
-            morning_end = min(end, break_start)
-            morning_duration = morning_end - start
-
-        # Calcular duração da tarde (13:15-18:00 = 4h45m máximo)
-        afternoon_duration = timedelta()
-        if end > break_end:
-            afternoon_start = max(start, break_end)
-            afternoon_duration = end - afternoon_start
-
-        # Retornar soma dos períodos
-        return morning_duration + afternoon_duration
-
-    @staticmethod
-    def format_duration(start_time: datetime, end_time: Optional[datetime] = None) -> str:
-        """
-        Calcula e formata a duração entre dois horários considerando horário comercial.
-        Cada dia útil tem 9 horas de trabalho (8:00-18:00 menos 1h de almoço).
-        """
-        if end_time is None:
-            end_time = datetime.now()
-
-        total_duration = timedelta()
-
-        # Se os horários são do mesmo dia
-        if start_time.date() == end_time.date():
-            total_duration = TimeManager.calculate_business_hours_duration(start_time, end_time)
-        else:
-            # Calcular tempo do primeiro dia
-            first_day_end = datetime.combine(start_time.date(), 
-                TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))
-            total_duration += TimeManager.calculate_business_hours_duration(start_time, first_day_end)
-
-            # Calcular dias completos entre início e fim (cada dia = 9 horas)
-            current_date = start_time.date() + timedelta(days=1)
-            while current_date < end_time.date():
-                day_start = datetime.combine(current_date, 
-                    TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))
-                day_end = datetime.combine(current_date, 
-                    TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))
-                total_duration += TimeManager.calculate_business_hours_duration(day_start, day_end)
-                current_date += timedelta(days=1)
-
-            # Calcular tempo do último dia se necessário
-            if current_date == end_time.date():
-                last_day_start = datetime.combine(end_time.date(), 
-                    TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))
-                total_duration += TimeManager.calculate_business_hours_duration(last_day_start, end_time)
-
-        return TimeManager.format_total_time(total_duration)
-
     @staticmethod
     def get_time_tuple(time_str):
         """Converte string de tempo em tupla (hora, minuto)"""
@@ -782,177 +662,117 @@ class TimeManager(TimeObservable):
             return time()
 
     @staticmethod
-    def parse_time(time_str: str) -> timedelta:
-        """Converte string HH:MM:SS para timedelta"""
+    def parse_time(time_str) -> timedelta:
+        """Converte HH:MM:SS (ou TIME/segundos/Duration) para timedelta"""
         try:
-            h, m, s = map(int, time_str.split(':'))
-            return timedelta(hours=h, minutes=m, seconds=s)
-        except Exception as e:
+            return timedelta(seconds=to_seconds(time_str))
+        except (TypeError, ValueError) as e:
             logger.error(f"Erro ao converter tempo: {e}")
             return timedelta()
 
     @staticmethod
     def format_total_time(time_val) -> str:
-        """Converte tempo para string HH:MM:SS"""
-        if isinstance(time_val, timedelta):
-            total_seconds = int(time_val.total_seconds())
-        elif isinstance(time_val, int):
-            total_seconds = time_val
-        else:
+        """Converte tempo (timedelta, segundos, Duration ou TIME) para string HH:MM:SS"""
+        try:
+            return to_hms(time_val)
+        except (TypeError, ValueError):
             logger.error(f"Tipo de tempo não suportado: {type(time_val)}")
             return "00:00:00"
-            
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
     @staticmethod
     def calculate_business_hours_duration(start: datetime, end: datetime) -> timedelta:
         """Calcula a duração dentro do horário comercial, descontando o intervalo de almoço"""
-        if start >= end:
-            return timedelta()
-
-        # Ajustar para horário comercial se necessário
-        day_start = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))
-        if start < day_start:
-            start = day_start
-
-        day_end = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))
-        if end > day_end:
-            end = day_end
-            
-        # Se o período é inválido após ajustes
-        if start >= end:
-            return timedelta()
-            
-        # Converter horários de almoço para o dia atual
-        break_start = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.BREAK_START_TIME))
-        break_end = datetime.combine(start.date(), 
-            TimeManager.get_time_object(TimeManager.BREAK_END_TIME))
-        
-        total_duration = timedelta()
-        
-        # Se o período inclui o horário de almoço
-        if start < break_start and end > break_end:
-            # Adicionar tempo antes do almoço
-            total_duration += break_start - start
-            # Adicionar tempo depois do almoço
-            total_duration += end - break_end
-        elif start < break_start and end > break_start:
-            # Período termina durante o almoço
-            total_duration += break_start - start
-        elif start < break_end and end > break_end:
-            # Período começa durante o almoço
-            total_duration += end - break_end
-        else:
-            # Período está totalmente fora do horário de almoço
-            if start >= break_end or end <= break_start:
-                total_duration += end - start
-                
-        return total_duration
+        return WorkCalendar().business_calendar().duration(start, end)
 
     @staticmethod
     def format_duration(start_time: datetime, end_time: Optional[datetime] = None) -> str:
         """Calcula e formata a duração entre dois horários considerando horário comercial"""
         if end_time is None:
             end_time = datetime.now()
-            
-        total_duration = timedelta()
-        
-        # Se os horários são do mesmo dia
-        if start_time.date() == end_time.date():
-            total_duration = TimeManager.calculate_business_hours_duration(start_time, end_time)
-        else:
-            # Calcular tempo do primeiro dia
-            first_day_end = datetime.combine(start_time.date(), 
-                TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))
-            total_duration += TimeManager.calculate_business_hours_duration(start_time, first_day_end)
-            
-            # Calcular dias completos entre início e fim
-            current_date = start_time.date() + timedelta(days=1)
-            while current_date < end_time.date():
-                day_start = datetime.combine(current_date, 
-                    TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))
-                day_end = datetime.combine(current_date, 
-                    TimeManager.get_time_object(TimeManager.COMPANY_END_TIME))
-                total_duration += TimeManager.calculate_business_hours_duration(day_start, day_end)
-                current_date += timedelta(days=1)
-            
-            # Calcular tempo do último dia se necessário
-            if current_date == end_time.date():
-                last_day_start = datetime.combine(end_time.date(), 
-                    TimeManager.get_time_object(TimeManager.COMPANY_START_TIME))
-                total_duration += TimeManager.calculate_business_hours_duration(last_day_start, end_time)
-            
-        return TimeManager.format_total_time(total_duration)
+        return TimeManager.format_total_time(WorkCalendar().business_calendar().duration(start_time, end_time))
 
     def _start_lock_check(self):
-        """Inicia verificação periódica do estado de bloqueio"""
+        """Agenda a pausa das atividades no próximo fim de expediente do calendário"""
+        try:
+            # Se o aplicativo abrir depois do fim, pausa na primeira oportunidade
+            if self.check_company_hours() == AFTER_HOURS:
+                self.scheduler.schedule_in(0, self._pause_after_hours, name='company_end_late')
+            self._schedule_company_end()
+        except Exception as e:
+            logger.error(f"Erro ao iniciar verificação de bloqueio: {e}")
+
+    def _schedule_company_end(self):
+        transition = self.calendar.next_transition(status=AFTER_HOURS)
+        if transition:
+            self.scheduler.schedule_at(transition[0], self._on_company_end, name='company_end')
+
+    def _on_company_end(self):
+        self._pause_after_hours()
+        self._schedule_company_end()
+
+    def _pause_after_hours(self):
+        """Pausa as atividades em andamento do usuário ao fim do expediente"""
         try:
-            def check_loop():
-                current_time = datetime.now().time()
-                company_end = datetime.strptime(self.COMPANY_END_TIME, "%H:%M:%S").time()
+            # Verificar se há usuário configurado
+            if not getattr(self.state, 'user_id', None):
+                return
+
+            logger.debug("[LOCK] Horário de fim atingido, pausando atividades...")
+            store = ActivityStateStore()
+            if store.covers(self.state.user_id):
+                # Uma verificação de versão inclui as iniciadas em outra sessão
+                store.refresh()
+                active_activities = store.running_activities()
+            else:
+                query = """
+                    SELECT id, atividade 
+                    FROM atividades 
+                    WHERE user_id = %s
+                    AND ativo = TRUE 
+                    AND concluido = FALSE
+                    AND pausado = FALSE
+                """
+                active_activities = self.db.execute_query(query, (self.state.user_id,))
+
+            now = datetime.now()
+            running_id = self.state.activity_info['id'] if self.state.is_running and self.state.activity_info else None
+            summaries = {}
+            try:
+                summaries = self.events.get_summaries(
+                    activity['id'] for activity in active_activities if activity['id'] != running_id
+                )
+            except Exception as e:
+                logger.warning(f"[EVENTS] Resumos indisponíveis: {e}")
+            
+            for activity in active_activities:
+                logger.debug(f"[LOCK] Pausando atividade {activity['id']}: {activity['atividade']}")
                 
-                # Verificar se acabou de atingir o horário de fim
-                if current_time >= company_end:
-                    logger.debug("[LOCK] Horário de fim atingido, pausando atividades...")
-                    
-                    # Verificar se há usuário configurado
-                    if hasattr(self.state, 'user_id') and self.state.user_id:
-                        query = """
-                            SELECT id, atividade 
-                            FROM atividades 
-                            WHERE user_id = %s
-                            AND ativo = TRUE 
-                            AND concluido = FALSE
-                            AND pausado = FALSE
-                        """
-                        active_activities = self.db.execute_query(query, (self.state.user_id,))
-                        
-                        for activity in active_activities:
-                            logger.debug(f"[LOCK] Pausando atividade {activity['id']}: {activity['atividade']}")
-                            
-                            # Primeiro atualizar no banco
-                            update_query = """
-                                UPDATE atividades 
-                                SET pausado = TRUE,
-                                    ativo = TRUE,
-                                    concluido = FALSE,
-                                    total_time = COALESCE(
-                                        (SELECT SEC_TO_TIME(
-                                            TIME_TO_SEC(TIMEDIFF(NOW(), start_time))
-                                        )
-                                    ), '00:00:00')
-                                WHERE id = %s
-                            """
-                            self.db.execute_query(update_query, (activity['id'],))
-                            
-                            # Depois pausar o timer
-                            self.pause_activity()
-                            
-                            # Notificar observadores para atualizar interface
-                            self.notify_observers_activity(None)
-                            
-                        # Notificar mudança de estado de bloqueio
-                        self._notify_lock_state()
-                        
-                        logger.info("[LOCK] Todas as atividades foram pausadas pelo horário de fim")
+                fields = {'pausado': True, 'ativo': True, 'concluido': False}
+                if activity['id'] == running_id:
+                    # Tempos exatos do motor do timer (pause_activity grava o evento e os tempos)
+                    self.pause_activity()
+                else:
+                    # Em andamento em outra sessão: tempo total derivado do resumo de eventos
+                    summary = summaries.get(activity['id'])
+                    if summary and summary.running:
+                        total_seconds = summary.total_at(now)
+                        fields['total_time'] = self.format_total_time(total_seconds)
+                        self._defer_event(activity['id'], self.state.user_id, EVENT_PAUSE, now,
+                                          total_seconds=total_seconds)
+                self.writer.enqueue(activity['id'], fields)
+                store.apply_flags(activity['id'], {'ativo': True, 'pausado': True, 'concluido': False})
                 
-                # Agendar próxima verificação
-                for observer in self._observers:
-                    if hasattr(observer, 'after'):
-                        observer.after(1000, check_loop)  # Verificar a cada segundo, como no update_clock
-                        break
-
-            # Iniciar o loop
-            check_loop()
+                # Notificar observadores para atualizar interface
+                self.notify_observers_activity(None)
+            self.writer.flush()
+                
+            # Notificar mudança de estado de bloqueio
+            self._notify_lock_state()
+            
+            logger.info("[LOCK] Todas as atividades foram pausadas pelo horário de fim")
             
         except Exception as e:
-            logger.error(f"Erro ao iniciar verificação de bloqueio: {e}")
+            logger.error(f"Erro ao pausar atividades no fim do expediente: {e}")
 
     def _notify_lock_state(self):
         """Notifica observadores sobre estado de bloqueio"""
@@ -969,6 +789,10 @@ class TimeManager(TimeObservable):
         """Adiciona um novo observador e verifica estado inicial de bloqueio"""
         super().add_observer(observer)
         
+        # Os eventos do agendador rodam no loop de eventos da janela do observador
+        if hasattr(observer, 'after'):
+            self.scheduler.attach(observer)
+        
         # Verificar estado inicial de bloqueio
         try:
             if hasattr(observer, 'user_data'):
@@ -1003,18 +827,29 @@ class TimeManager(TimeObservable):
                     logger.debug(f"[TIME_MANAGER] Justificativa fornecida: {reason}")
                     
                     if reason:
+                        logger.debug(f"[TIME_MANAGER] Parâmetros: reason={reason}, id={activity_info['id']}")
+                        fields = {
+                            'reason': reason,
+                            'concluido': True,
+                            'ativo': False,
+                            'pausado': False
+                        }
+                        
+                        activity_id = resolve_ref(activity_info['id'], self.db)
                         update_query = """
                             UPDATE atividades 
                             SET reason = %s,
-                                concluido = TRUE,
-                                ativo = FALSE,
-                                pausado = FALSE
+                                concluido = %s,
+                                ativo = %s,
+                                pausado = %s
                             WHERE id = %s
                         """
-                        logger.debug(f"[TIME_MANAGER] Executando query de atualização: {update_query}")
-                        logger.debug(f"[TIME_MANAGER] Parâmetros: reason={reason}, id={activity_info['id']}")
-                        
-                        self.db.execute_query(update_query, (reason, activity_info['id']))
+                        write_through(
+                            self.db,
+                            lambda: self.db.execute_query(update_query, (*fields.values(), activity_id)),
+                            lambda journal: journal.record_update(activity_id, fields, wait=True),
+                            activity_id
+                        )
                         logger.info(f"[TIME_MANAGER] Justificativa salva com sucesso")
                         return True
                         
@@ -1046,54 +881,55 @@ class TimeManager(TimeObservable):
             logger.info(f"Atividade atual: {self.state.activity_info['atividade']}")
 
     def handle_activity_resume(self):
-        """Quando a atividade é retomada, salva o tempo ocioso acumulado"""
+        """Quando a atividade é retomada, registra os períodos ociosos encerrados"""
         try:
-            idle_time = self.idle_detector.get_accumulated_idle_time()
-            if idle_time.total_seconds() > 0:
-                logger.info(f"Salvando tempo ocioso: {idle_time}")
-                self.save_idle_time_to_db(idle_time)
-                self.idle_detector.reset_accumulated_idle_time()
+            periods = self.idle_detector.take_periods()
+            self.idle_detector.reset_accumulated_idle_time()
+            if periods:
+                self.save_idle_periods(periods)
         except Exception as e:
             logger.error(f"Erro ao processar retomada de atividade: {e}")
 
-    def save_idle_time_to_db(self, idle_time: timedelta):
-        """Salva o tempo ocioso no banco de dados"""
+    def save_idle_periods(self, periods):
+        """
+        Registra períodos ociosos (início, fim): as linhas, o acúmulo diário e o
+        total do usuário são gravados em lote pelo IdleSessionLog
+        """
         try:
             if not self.state.user_id:
                 logger.warning("Tentativa de salvar tempo ocioso sem user_id")
                 return
 
-            # Buscar tempo ocioso atual
-            query = "SELECT ociosidade FROM usuarios WHERE id = %s"
-            result = self.db.execute_query(query, (self.state.user_id,))
-            
-            current_idle_time = timedelta()
-            if result and result[0]['ociosidade']:
-                h, m, s = map(int, str(result[0]['ociosidade']).split(':'))
-                current_idle_time = timedelta(hours=h, minutes=m, seconds=s)
-
-            # Somar tempos
-            total_idle_time = current_idle_time + idle_time
-            formatted_time = self.format_total_time(total_idle_time)
+            activity_id = self.state.activity_info['id'] if self.state.activity_info else None
+            for started_at, ended_at in periods:
+                self.idle_sessions.record(self.state.user_id, activity_id, started_at, ended_at)
 
-            # Atualizar banco
-            update_query = """
-                UPDATE usuarios 
-                SET ociosidade = %s
-                WHERE id = %s
-            """
-            self.db.execute_query(update_query, (formatted_time, self.state.user_id))
-            logger.info(f"Tempo ocioso atualizado no banco: {formatted_time}")
+            idle_seconds = sum(int((ended_at - started_at).total_seconds()) for started_at, ended_at in periods)
+            self._defer_event(activity_id, self.state.user_id, EVENT_IDLE, idle_seconds=idle_seconds)
+            logger.info(f"Tempo ocioso registrado: {self.format_total_time(idle_seconds)}")
 
         except Exception as e:
             logger.error(f"Erro ao salvar tempo ocioso: {e}")
 
     def cleanup(self):
+        self.writer.flush()
+        self.idle_sessions.flush()
+        if self.checkpoint:
+            self.checkpoint.close()
         self.idle_detector.stop()
         # ... outras limpezas ...
 
     def set_user(self, user_data):
-        """Define o usuário atual"""
+        """Define o usuário atual e o calendário da sua equipe"""
         if user_data and 'id' in user_data:
+            if self.checkpoint is None or getattr(self.state, 'user_id', None) != user_data['id']:
+                if self.checkpoint:
+                    self.checkpoint.close()
+                self.checkpoint = TimerCheckpoint.for_user(user_data['id'])
+                # Antes de qualquer leitura do banco para este usuário
+                self._recover_checkpoint()
             self.state.set_user_id(user_data['id'])
+            self.calendar.set_team(user_data.get('equipe_id'))
+            self.idle_detector.set_login_status(False)
+            self._schedule_company_end()
             logger.info(f"User ID configurado: {user_data['id']}")
\ No newline at end of file
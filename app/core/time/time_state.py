@@ -3,6 +3,8 @@ from typing import Optional, Dict
 import logging
 import threading
 
+from ...utils.duration import to_seconds
+
 logger = logging.getLogger(__name__)
 
 class TimeState:
@@ -68,8 +70,7 @@ class TimeState:
                 # Processar tempo total já acumulado
                 if 'total_time' in activity_info and activity_info['total_time']:
                     try:
-                        h, m, s = map(int, activity_info['total_time'].split(':'))
-                        self.accumulated_time = h * 3600 + m * 60 + s
+                        self.accumulated_time = to_seconds(activity_info['total_time'])
                         self.total_elapsed_time = timedelta(seconds=self.accumulated_time)
                     except Exception as e:
                         logger.error(f"Erro ao processar tempo total: {e}")
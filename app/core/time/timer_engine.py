@@ -0,0 +1,110 @@
+from datetime import timedelta
+from typing import NamedTuple, Optional
+import time
+
+NS_PER_SECOND = 1_000_000_000
+
+def _to_ns(value) -> int:
+    """Converte timedelta ou segundos para nanossegundos inteiros"""
+    if value is None:
+        return 0
+    if isinstance(value, timedelta):
+        return (value.days * 86400 + value.seconds) * NS_PER_SECOND + value.microseconds * 1000
+    return int(value * NS_PER_SECOND)
+
+class TimerSnapshot(NamedTuple):
+    """Leitura do timer em segundos inteiros, pronta para exibição"""
+    running: bool
+    mode: str            # 'regressivo' ou 'progressivo'
+    timer_seconds: int   # tempo restante (regressivo) ou excedido (progressivo)
+    total_seconds: int   # tempo total acumulado da atividade
+    elapsed_ns: int      # tempo rodando desde start(), sem as pausas
+
+class TimerEngine:
+    """
+    Motor do timer de atividades baseado em relógio monotônico.
+
+    Guarda apenas âncoras em nanossegundos inteiros: o instante em que o
+    segmento atual começou a rodar, o tempo dos segmentos já encerrados por
+    pausas e o orçamento regressivo. Os valores exibidos são calculados a
+    partir dessas âncoras a cada leitura, então não acumulam atraso do loop
+    de eventos nem saltam com ajustes do relógio do sistema. A passagem do
+    modo regressivo para o progressivo é o instante em que o tempo rodando
+    alcança o orçamento regressivo.
+    """
+
+    def __init__(self, clock=time.monotonic_ns):
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self._running = False
+        self._anchor_ns = 0       # início do segmento em execução
+        self._banked_ns = 0       # soma dos segmentos encerrados por pausas
+        self._budget_ns = 0       # tempo regressivo disponível no start()
+        self._accumulated_ns = 0  # tempo total já registrado antes do start()
+        self._exceeded_ns = 0     # tempo excedido já registrado antes do start()
+
+    def start(self, regress: Optional[timedelta] = None, accumulated: Optional[timedelta] = None,
+              exceeded: Optional[timedelta] = None) -> None:
+        """
+        Inicia uma nova sessão do timer.
+        regress: tempo regressivo restante (zero ou None inicia já no modo progressivo)
+        accumulated: tempo total já registrado da atividade
+        exceeded: tempo excedido já registrado (retomada no modo progressivo)
+        """
+        self.reset()
+        self._budget_ns = max(0, _to_ns(regress))
+        self._accumulated_ns = _to_ns(accumulated)
+        self._exceeded_ns = _to_ns(exceeded)
+        self._anchor_ns = self.clock()
+        self._running = True
+
+    def pause(self) -> None:
+        if self._running:
+            self._banked_ns += self.clock() - self._anchor_ns
+            self._running = False
+
+    def resume(self) -> None:
+        if not self._running:
+            self._anchor_ns = self.clock()
+            self._running = True
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def limit_ns(self) -> int:
+        """Tempo total da atividade em que o regressivo zera (menor que o acumulado se já excedido)"""
+        return self._accumulated_ns + self._budget_ns - self._exceeded_ns
+
+    def elapsed_ns(self, now_ns: Optional[int] = None) -> int:
+        """Tempo rodando desde start(), descontadas as pausas"""
+        if not self._running:
+            return self._banked_ns
+        return self._banked_ns + (self.clock() if now_ns is None else now_ns) - self._anchor_ns
+
+    def snapshot(self, now_ns: Optional[int] = None) -> TimerSnapshot:
+        elapsed = self.elapsed_ns(now_ns)
+        over = elapsed - self._budget_ns
+        if over < 0:
+            # Arredonda para cima: o regressivo mostra 00:00:01 até zerar
+            mode, timer_seconds = 'regressivo', -(over // NS_PER_SECOND)
+        else:
+            mode, timer_seconds = 'progressivo', (self._exceeded_ns + over) // NS_PER_SECOND
+        return TimerSnapshot(
+            self._running, mode, timer_seconds,
+            (self._accumulated_ns + elapsed) // NS_PER_SECOND, elapsed
+        )
+
+    def seconds_until_transition(self, now_ns: Optional[int] = None) -> Optional[float]:
+        """Segundos até o fim do tempo regressivo; None se parado ou já progressivo"""
+        if not self._running:
+            return None
+        remaining = self._budget_ns - self.elapsed_ns(now_ns)
+        return remaining / NS_PER_SECOND if remaining > 0 else None
+
+    def next_tick_delay(self, now_ns: Optional[int] = None) -> float:
+        """Segundos até a próxima virada de segundo do tempo rodando"""
+        return (NS_PER_SECOND - self.elapsed_ns(now_ns) % NS_PER_SECOND) / NS_PER_SECOND
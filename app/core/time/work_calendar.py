@@ -0,0 +1,295 @@
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+import logging
+import threading
+import time as clock
+
+from ...database.connection import DatabaseConnection
+from ...utils.ui_tasks import UITaskRunner
+from .business_calendar import BusinessCalendar, ALL_DAYS
+from .scheduler import DeadlineScheduler
+
+logger = logging.getLogger(__name__)
+
+# Status de um instante no calendário de trabalho
+BEFORE_HOURS = "before_hours"
+WORKING_HOURS = "working_hours"
+BREAK_TIME = "break_time"
+AFTER_HOURS = "after_hours"
+DAY_OFF = "day_off"  # fim de semana fora da escala, feriado ou recesso
+
+# Status em que as ações de atividade ficam bloqueadas
+BLOCKED_STATUSES = (BREAK_TIME, AFTER_HOURS, DAY_OFF)
+
+class DaySchedule(NamedTuple):
+    """Horário de um dia de trabalho"""
+    company_start: time
+    break_start: time
+    break_end: time
+    company_end: time
+
+def _to_time(value) -> time:
+    """Converte "HH:MM:SS", timedelta (coluna TIME do MySQL) ou time para time"""
+    if isinstance(value, time):
+        return value
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return time(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+    h, m, s = map(int, str(value).split(':'))
+    return time(h, m, s)
+
+# Expediente padrão da empresa, usado quando não há horário cadastrado no banco
+DEFAULT_SCHEDULE = DaySchedule(
+    _to_time("08:00:00"), _to_time("12:15:00"), _to_time("13:15:00"), _to_time("18:30:00")
+)
+
+class CompiledCalendar:
+    """
+    Transições de status de um intervalo de datas em listas ordenadas.
+    bounds[i] é o instante a partir do qual vale statuses[i]; as consultas
+    são buscas binárias, sem converter horários a cada chamada.
+    """
+
+    def __init__(self, schedule: DaySchedule, workdays, days_off: Set[date], first_day: date, last_day: date):
+        self.first_day = first_day
+        self.last_day = last_day  # exclusive
+        self.schedule = schedule
+        self.bounds = []
+        self.statuses = []
+
+        day = first_day
+        while day < last_day:
+            midnight = datetime.combine(day, time())
+            if day.weekday() not in workdays or day in days_off:
+                self._add(midnight, DAY_OFF)
+            else:
+                self._add(midnight, BEFORE_HOURS)
+                self._add(datetime.combine(day, schedule.company_start), WORKING_HOURS)
+                self._add(datetime.combine(day, schedule.break_start), BREAK_TIME)
+                self._add(datetime.combine(day, schedule.break_end), WORKING_HOURS)
+                self._add(datetime.combine(day, schedule.company_end), AFTER_HOURS)
+            day += timedelta(days=1)
+
+    def _add(self, moment, status):
+        # Horários coincidentes (ex.: sem intervalo) mantêm apenas o último status
+        if self.bounds and self.bounds[-1] == moment:
+            self.statuses[-1] = status
+        else:
+            self.bounds.append(moment)
+            self.statuses.append(status)
+
+    def covers(self, moment: datetime) -> bool:
+        return self.bounds[0] <= moment < datetime.combine(self.last_day, time())
+
+    def status_at(self, moment: datetime) -> str:
+        return self.statuses[bisect_right(self.bounds, moment) - 1]
+
+    def next_transition(self, moment: datetime, status: Optional[str] = None) -> Optional[Tuple[datetime, str]]:
+        """Próxima transição estritamente após moment (opcionalmente para um status)"""
+        for index in range(bisect_right(self.bounds, moment), len(self.bounds)):
+            if status is None or self.statuses[index] == status:
+                return self.bounds[index], self.statuses[index]
+        return None
+
+class WorkCalendar:
+    """
+    Calendário de trabalho compartilhado pelo processo.
+
+    Os horários por equipe (horarios_equipe), feriados e recessos são lidos
+    do banco uma vez por RELOAD_INTERVAL e compilados em listas ordenadas de
+    transições para uma janela de dias; consultas de status e da próxima
+    transição são O(log n). Sem horário cadastrado vale DEFAULT_SCHEDULE,
+    com todos os dias da semana trabalhados.
+
+    Com a interface aberta (start), a releitura periódica roda fora da thread
+    da interface e, enquanto ela não termina (ou com o banco fora), as
+    consultas continuam usando o último calendário compilado.
+    """
+    _instance = None
+    RELOAD_INTERVAL = 3600  # segundos
+    WINDOW_DAYS = 35
+    SEARCH_LIMIT_DAYS = 366
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, db=None):
+        if not self.initialized:
+            self._db = db
+            self._lock = threading.RLock()
+            self._schedules: Dict[Optional[int], Tuple[DaySchedule, tuple]] = {}
+            self._days_off: Dict[Optional[int], Set[date]] = {}
+            self._compiled: Dict[Optional[int], CompiledCalendar] = {}
+            self._business: Dict[Optional[int], BusinessCalendar] = {}
+            self._loaded_at = None
+            self._widget = None
+            self.team_id = None
+            self.initialized = True
+
+    # ------------------------------------------------------------ carga
+
+    def set_team(self, team_id: Optional[int]) -> None:
+        """Define a equipe usada quando as consultas não informam uma"""
+        self.team_id = team_id
+
+    def reload(self) -> None:
+        """Relê horários, feriados e recessos do banco e descarta as compilações"""
+        try:
+            rules = self._read()
+        except Exception as e:
+            logger.warning(f"[CALENDAR] Calendário do banco indisponível, usando horário padrão: {e}")
+            rules = ({}, {})
+        self._install(rules)
+
+    def start(self, widget) -> None:
+        """Agenda a releitura periódica; o banco é lido fora da thread da interface"""
+        self._widget = widget
+        DeadlineScheduler().schedule_in(self.RELOAD_INTERVAL, self._on_reload_due, name='work_calendar')
+
+    def stop(self) -> None:
+        if self._widget is not None:
+            DeadlineScheduler().cancel('work_calendar')
+            self._widget = None
+
+    def _on_reload_due(self):
+        # Callback do DeadlineScheduler: roda na thread da interface, como exige o submit()
+        widget = self._widget
+        if widget is None:
+            return
+        UITaskRunner().submit(
+            widget,
+            self._read,
+            on_success=self._install,
+            on_error=lambda e: logger.warning(f"[CALENDAR] Releitura falhou, mantendo o calendário atual: {e}"),
+            key=('work_calendar', 'reload')
+        )
+        self.start(widget)
+
+    def _read(self):
+        """Lê as regras do banco: (horários por equipe, dias sem expediente por equipe)"""
+        schedules = {}
+        days_off = {}
+        db = self._db or DatabaseConnection()
+        for row in db.execute_query("""
+            SELECT equipe_id, inicio_expediente, inicio_intervalo,
+                   fim_intervalo, fim_expediente, dias_semana
+            FROM horarios_equipe
+        """) or []:
+            schedule = DaySchedule(
+                _to_time(row['inicio_expediente']), _to_time(row['inicio_intervalo']),
+                _to_time(row['fim_intervalo']), _to_time(row['fim_expediente'])
+            )
+            workdays = tuple(int(d) for d in str(row['dias_semana'] or '').split(',') if d.strip())
+            schedules[row['equipe_id']] = (schedule, workdays or ALL_DAYS)
+
+        for row in db.execute_query("SELECT data, equipe_id FROM feriados") or []:
+            days_off.setdefault(row['equipe_id'], set()).add(self._to_date(row['data']))
+
+        for row in db.execute_query("SELECT data_inicio, data_fim, equipe_id FROM recessos") or []:
+            day, last = self._to_date(row['data_inicio']), self._to_date(row['data_fim'])
+            target = days_off.setdefault(row['equipe_id'], set())
+            while day <= last:
+                target.add(day)
+                day += timedelta(days=1)
+        return schedules, days_off
+
+    def _install(self, rules):
+        schedules, days_off = rules
+        with self._lock:
+            self._schedules = schedules
+            self._days_off = days_off
+            self._compiled = {}
+            self._business = {}
+            self._loaded_at = clock.monotonic()
+        logger.debug(f"[CALENDAR] {len(schedules)} horário(s) e {sum(map(len, days_off.values()))} dia(s) sem expediente carregados")
+
+    @staticmethod
+    def _to_date(value) -> date:
+        return value.date() if isinstance(value, datetime) else value
+
+    def _ensure_loaded(self):
+        # Com a interface aberta a releitura é periódica (start); aqui só a primeira carga
+        if self._loaded_at is None:
+            self.reload()
+        elif self._widget is None and clock.monotonic() - self._loaded_at > self.RELOAD_INTERVAL:
+            self.reload()
+
+    def _team_rules(self, team_id):
+        """Horário, dias da semana e dias sem expediente da equipe (horário da empresa como padrão)"""
+        schedule, workdays = self._schedules.get(team_id) or self._schedules.get(None) or (DEFAULT_SCHEDULE, ALL_DAYS)
+        days_off = self._days_off.get(None, set()) | self._days_off.get(team_id, set())
+        return schedule, workdays, days_off
+
+    def _compiled_for(self, moment: datetime, team_id) -> CompiledCalendar:
+        self._ensure_loaded()
+        compiled = self._compiled.get(team_id)
+        if compiled is None or not compiled.covers(moment):
+            with self._lock:
+                schedule, workdays, days_off = self._team_rules(team_id)
+                first_day = moment.date() - timedelta(days=1)
+                compiled = CompiledCalendar(schedule, workdays, days_off, first_day,
+                                            first_day + timedelta(days=self.WINDOW_DAYS))
+                self._compiled[team_id] = compiled
+        return compiled
+
+    def _team(self, team_id):
+        return self.team_id if team_id is None else team_id
+
+    # --------------------------------------------------------- consultas
+
+    def status_at(self, moment: Optional[datetime] = None, team_id: Optional[int] = None) -> str:
+        """Status do horário comercial em moment (agora, se omitido)"""
+        moment = moment or datetime.now()
+        return self._compiled_for(moment, self._team(team_id)).status_at(moment)
+
+    def next_transition(self, moment: Optional[datetime] = None, status: Optional[str] = None,
+                        team_id: Optional[int] = None) -> Optional[Tuple[datetime, str]]:
+        """
+        Próxima mudança de status após moment: (instante, novo status).
+        Com status, procura a próxima entrada nesse status. Inclui a virada de cada dia.
+        """
+        team_id = self._team(team_id)
+        moment = moment or datetime.now()
+        limit = moment + timedelta(days=self.SEARCH_LIMIT_DAYS)
+        cursor = moment
+        while cursor < limit:
+            compiled = self._compiled_for(cursor, team_id)
+            found = compiled.next_transition(moment, status)
+            if found:
+                return found
+            # Continua na janela seguinte
+            cursor = datetime.combine(compiled.last_day, time())
+        return None
+
+    def day_schedule(self, team_id: Optional[int] = None) -> DaySchedule:
+        """Horário de trabalho da equipe (o mesmo para todos os dias úteis)"""
+        self._ensure_loaded()
+        return self._team_rules(self._team(team_id))[0]
+
+    def is_workday(self, day: date, team_id: Optional[int] = None) -> bool:
+        self._ensure_loaded()
+        _, workdays, days_off = self._team_rules(self._team(team_id))
+        return day.weekday() in workdays and day not in days_off
+
+    def is_holiday(self, day: date, team_id: Optional[int] = None) -> bool:
+        """Feriado ou recesso cadastrado (independente do dia da semana)"""
+        self._ensure_loaded()
+        return day in self._team_rules(self._team(team_id))[2]
+
+    def business_calendar(self, team_id: Optional[int] = None) -> BusinessCalendar:
+        """Calendário para cálculo de duração em horário comercial da equipe"""
+        self._ensure_loaded()
+        team_id = self._team(team_id)
+        calendar = self._business.get(team_id)
+        if calendar is None:
+            schedule, workdays, days_off = self._team_rules(team_id)
+            calendar = BusinessCalendar.from_hours(
+                schedule.company_start, schedule.break_start, schedule.break_end, schedule.company_end,
+                workdays=workdays, holidays=days_off
+            )
+            self._business[team_id] = calendar
+        return calendar
@@ -1,47 +1,94 @@
 import mysql.connector
 from mysql.connector import Error
 import logging
-from ..config.settings import DB_CONFIG, APP_CONFIG
+from contextlib import contextmanager
+from ..config.settings import DB_CONFIG, DB_POOL_CONFIG, DB_BACKEND_CONFIG, QUERY_STATS_CONFIG, APP_CONFIG
+from .pool import ConnectionPool, PoolExhaustedError, DatabaseUnavailableError
+from .instrumentation import QueryInstrumentation
 import threading
+import time
 from queue import Queue
 import concurrent.futures
 
 logger = logging.getLogger(__name__)
 
+# Erros que indicam conexão perdida: a conexão é descartada e a query repetida
+CONNECTION_ERRORS = (
+    mysql.connector.errors.OperationalError,
+    mysql.connector.errors.InterfaceError
+)
+
+# Linhas buscadas por fetchmany nas consultas em streaming
+STREAM_CHUNK_SIZE = 500
+
+# Linhas enviadas por executemany nas gravações em lote
+BULK_BATCH_SIZE = 500
+
+class _Measure:
+    """Guarda o resultado de uma query medida por DatabaseConnection._measure"""
+    __slots__ = ('result',)
+
+    def __init__(self):
+        self.result = None
+
 class DatabaseConnection:
     _instance = None
-    
+
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+            self.pool = ConnectionPool(
+                self._create_connection,
+                size=DB_POOL_CONFIG['size'],
+                idle_timeout=DB_POOL_CONFIG['idle_timeout'],
+                acquire_timeout=DB_POOL_CONFIG['acquire_timeout'],
+                ping_after=DB_POOL_CONFIG['ping_after'],
+                keepalive_interval=DB_POOL_CONFIG['keepalive_interval'],
+                retry_backoff=DB_POOL_CONFIG['retry_backoff']
+            )
+            self._local = threading.local()
+            self._stats_lock = threading.Lock()
+            self.query_count = 0
+            self.instrumentation = QueryInstrumentation(**QUERY_STATS_CONFIG)
             self.initialized = True
-    
+
     def __new__(cls):
+        if DB_BACKEND_CONFIG['engine'] == 'sqlite':
+            # Backend local para testes e benchmarks, com a mesma API
+            from .sqlite_backend import SQLiteConnection
+            return SQLiteConnection()
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance.connection = None
         return cls._instance
-    
+
     def __enter__(self):
         """Implementa o protocolo de context manager"""
         self.connect()
         return self
-    
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Implementa o protocolo de context manager"""
-        if exc_type is not None:
-            # Se houver uma exceção, faz rollback
-            if self.connection and self.connection.is_connected():
-                self.connection.rollback()
-        else:
-            # Se não houver exceção, faz commit
-            if self.connection and self.connection.is_connected():
-                self.connection.commit()
-    
+        connection = getattr(self._local, 'connection', None)
+        try:
+            if connection:
+                if exc_type is not None:
+                    # Se houver uma exceção, faz rollback
+                    connection.rollback()
+                else:
+                    # Se não houver exceção, faz commit
+                    connection.commit()
+        finally:
+            self.release_connection()
+
+    @property
+    def connection(self):
+        """Conexão fixada na thread atual (mantida até release_connection)"""
+        return self.connect()
+
     def execute_query_async(self, query, params=None, callback=None):
         """Executa uma query de forma assíncrona"""
         future = self.thread_pool.submit(self.execute_query, query, params)
-        
+
         if callback:
             future.add_done_callback(
                 lambda f: callback(f.result())
@@ -51,72 +98,320 @@ class DatabaseConnection:
     def fetch_one_async(self, query, params=None, callback=None):
         """Versão assíncrona do fetch_one"""
         future = self.thread_pool.submit(self.fetch_one, query, params)
-        
+
         if callback:
             future.add_done_callback(
                 lambda f: callback(f.result())
             )
         return future
-    
+
     def fetch_one(self, query, params=None):
         try:
-            with self.connection.cursor(dictionary=True) as cursor:
-                cursor.execute(query, params)
-            return cursor.fetchone()
+            with self._borrow() as connection:
+                if not connection:
+                    return None
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    with self._measure(query) as measure:
+                        cursor.execute(query, params)
+                        measure.result = cursor.fetchone()
+                    return measure.result
+                finally:
+                    cursor.close()
         except Exception as e:
             logger.error(f"Database error: {e}")
         return None
-    
+
+    def _create_connection(self, timeout=10):
+        """Abre uma nova conexão física (usada pelo pool)"""
+        if APP_CONFIG['debug']:
+            print("Tentando conectar com configurações:",
+                  {k: v for k, v in DB_CONFIG.items() if k != 'password'})
+
+        connection = mysql.connector.connect(
+            **DB_CONFIG,
+            connection_timeout=timeout
+        )
+
+        if APP_CONFIG['debug']:
+            print("Conexão estabelecida com sucesso!")
+        logger.info("Conexão com o banco de dados estabelecida")
+        return connection
+
     def connect(self, timeout=10):
-        """Estabelece conexão com o banco de dados com timeout"""
+        """Fixa uma conexão do pool na thread atual e a retorna"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                if APP_CONFIG['debug']:
-                    print("Tentando conectar com configurações:", 
-                          {k: v for k, v in DB_CONFIG.items() if k != 'password'})
-                
-                self.connection = mysql.connector.connect(
-                    **DB_CONFIG,
-                    connection_timeout=timeout
-                )
-                
-                if APP_CONFIG['debug']:
-                    print("Conexão estabelecida com sucesso!")
-                logger.info("Conexão com o banco de dados estabelecida")
-                
-            return self.connection
-        except Error as e:
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self.pool.acquire()
+                self._local.connection = connection
+            return connection
+        except Exception as e:
             logger.error(f"Erro ao conectar ao banco de dados: {e}")
             if APP_CONFIG['debug']:
                 print(f"Erro ao conectar ao banco de dados: {e}")
             return None
-    
+
+    def release_connection(self, broken=False):
+        """Devolve ao pool a conexão fixada na thread atual"""
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        self.pool.release(connection, broken=broken)
+
+    @contextmanager
+    def _borrow(self, raise_errors=False, ignore_backoff=False):
+        """
+        Empresta uma conexão para uma única operação.
+        Se a thread já tiver uma conexão fixada ela é reutilizada, senão a
+        conexão volta ao pool ao final do bloco. Retorna None se não for
+        possível conectar (ou relança o erro com raise_errors=True).
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            try:
+                yield pinned
+            except CONNECTION_ERRORS:
+                self.release_connection(broken=True)
+                raise
+            return
+
+        try:
+            connection = self.pool.acquire(ignore_backoff=ignore_backoff)
+        except (Error, PoolExhaustedError, DatabaseUnavailableError) as e:
+            if raise_errors:
+                raise
+            logger.error(f"Erro ao conectar ao banco de dados: {e}")
+            yield None
+            return
+
+        broken = False
+        try:
+            yield connection
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.pool.release(connection, broken=broken)
+
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        logger.info(f"[DB_POOL] Estatísticas de liveness: {self.get_liveness_stats()}")
+        self.instrumentation.stop()
+        self.release_connection()
+        self.pool.close()
+
+    def is_available(self):
+        """Indica se o servidor não está marcado como indisponível"""
+        return self.pool.is_available()
+
+    @contextmanager
+    def transaction(self, ignore_backoff=False):
+        """
+        Abre uma transação e retorna um cursor (dictionary=True).
+        Faz commit ao final do bloco ou rollback se houver exceção.
+        Erros de conexão são relançados para o chamador.
+        """
+        with self._borrow(raise_errors=True, ignore_backoff=ignore_backoff) as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                yield cursor
+                connection.commit()
+            except Exception:
+                try:
+                    connection.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def stream(self, query, params=None, chunk_size=STREAM_CHUNK_SIZE, chunks=False):
+        """
+        Executa uma query em um cursor não bufferizado e retorna um iterador
+        que busca as linhas em blocos de chunk_size (fetchmany), mantendo a
+        memória constante para resultados grandes. Com chunks=True o iterador
+        retorna listas de até chunk_size linhas em vez de linhas individuais.
+
+            with db.stream(query, params) as rows:
+                for row in rows:
+                    ...
+
+        O cursor vive só dentro do bloco with e usa uma conexão própria do
+        pool (nunca a fixada na thread), pois a conexão fica ocupada até o fim
+        da leitura. Se o bloco terminar sem ler tudo, a conexão é descartada
+        em vez de drenar o restante do resultado.
+        """
+        connection = self.pool.acquire()
+        cursor = None
+        state = {'rows': 0, 'sample': None, 'done': False}
+        broken = False
+        start = time.perf_counter()
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            self._count_query()
+            cursor.execute(query, params or ())
+            yield self._fetch_chunks(cursor, chunk_size, state, chunks)
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            if not state['done']:
+                broken = True
+            if cursor is not None and not broken:
+                try:
+                    cursor.close()
+                except Error:
+                    broken = True
+            self.instrumentation.record(
+                query, time.perf_counter() - start, state['sample'], rows=state['rows']
+            )
+            self.pool.release(connection, broken=broken)
+
+    @staticmethod
+    def _fetch_chunks(cursor, chunk_size, state, chunks):
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                state['done'] = True
+                return
+            if state['sample'] is None:
+                state['sample'] = rows
+            state['rows'] += len(rows)
+            if chunks:
+                yield rows
+            else:
+                yield from rows
+
+    def execute_many(self, query, rows, batch_size=BULK_BATCH_SIZE):
+        """
+        Executa um comando para várias linhas em uma única transação, com
+        executemany em lotes de batch_size (o mysql-connector envia um INSERT
+        com várias tuplas em VALUES por lote, um round trip por lote).
+        Se um lote falhar, ele é desfeito até o savepoint e repetido linha a
+        linha para isolar as linhas com erro, sem perder as demais.
+        Retorna (linhas gravadas, [(índice da linha, mensagem de erro), ...]).
+        """
+        rows = list(rows)
+        written = 0
+        failures = []
+        with self.transaction() as cursor:
+            for offset in range(0, len(rows), batch_size):
+                batch = rows[offset:offset + batch_size]
+                cursor.execute("SAVEPOINT bulk_batch")
+                try:
+                    with self._measure(query):
+                        cursor.executemany(query, batch)
+                    written += len(batch)
+                    continue
+                except CONNECTION_ERRORS:
+                    raise
+                except Error:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bulk_batch")
+
+                for index, params in enumerate(batch, start=offset):
+                    cursor.execute("SAVEPOINT bulk_row")
+                    try:
+                        with self._measure(query):
+                            cursor.execute(query, params)
+                        written += 1
+                    except CONNECTION_ERRORS:
+                        raise
+                    except Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                        failures.append((index, str(e)))
+
+        if failures:
+            logger.warning(f"[DB_BULK] {len(failures)} de {len(rows)} linha(s) com erro")
+        return written, failures
+
+    def execute_transaction(self, statements, max_retries=3):
+        """
+        Executa uma lista de (query, params) em uma única transação.
+        Faz rollback e relança a exceção se qualquer comando falhar.
+        Retorna False se não for possível conectar.
+        """
+        for attempt in range(max_retries):
+            try:
+                with self.transaction() as cursor:
+                    for query, params in statements:
+                        with self._measure(query):
+                            cursor.execute(query, params or ())
+                return True
+            except (PoolExhaustedError, DatabaseUnavailableError) as e:
+                logger.error(f"Erro ao conectar ao banco de dados: {e}")
+                return False
+            except CONNECTION_ERRORS:
+                if attempt == max_retries - 1:
+                    raise
+                logger.warning(f"Tentativa {attempt + 1} de {max_retries} falhou. Reconectando...")
+        return False
+
+    def get_liveness_stats(self):
+        """
+        Retorna os contadores de liveness: queries executadas, pings e
+        reconexões, além da média de round trips por query
+        """
+        stats = self.pool.stats()
+        with self._stats_lock:
+            queries = self.query_count
+        stats['queries'] = queries
+        stats['round_trips_per_query'] = (
+            (queries + stats['pings']) / queries if queries else 0.0
+        )
+        return stats
+
+    def _count_query(self):
+        with self._stats_lock:
+            self.query_count += 1
+
+    @contextmanager
+    def _measure(self, query):
+        """Conta a query e registra latência/linhas na instrumentação"""
+        self._count_query()
+        measure = _Measure()
+        start = time.perf_counter()
+        try:
+            yield measure
+        except Exception as e:
+            self.instrumentation.record(query, time.perf_counter() - start, error=e)
+            raise
+        self.instrumentation.record(query, time.perf_counter() - start, measure.result)
+
+    def get_query_stats(self):
+        """Estatísticas por statement (fingerprint + chamador), ordenadas por tempo total"""
+        return self.instrumentation.snapshot()
+
     def execute_query(self, query, params=None, max_retries=3):
-        """Executa uma query no banco de dados"""
+        """
+        Executa uma query no banco de dados.
+        A conexão não é pingada antes da query: se ela tiver caído, o erro
+        de conexão descarta a conexão e a query é repetida em uma nova.
+        """
         for attempt in range(max_retries):
             try:
                 logger.debug(f"[DB_QUERY] Executando query: {query}")  # Temporário para debug
-                connection = self.connect()
-                if connection:
+                with self._borrow() as connection:
+                    if not connection:
+                        continue
                     cursor = connection.cursor(dictionary=True)
-                    
-                    if APP_CONFIG['debug']:
-                        print(f"Executando query: {query}")
-                        print(f"Parâmetros: {params}")
-                    
-                    cursor.execute(query, params or ())
-                    result = cursor.fetchall()
-                    connection.commit()
-                    
-                    if APP_CONFIG['debug']:
-                        print(f"Resultado da query: {result}")
-                    
-                    return result
-            except mysql.connector.errors.OperationalError:
+                    try:
+                        if APP_CONFIG['debug']:
+                            print(f"Executando query: {query}")
+                            print(f"Parâmetros: {params}")
+
+                        with self._measure(query) as measure:
+                            cursor.execute(query, params or ())
+                            result = measure.result = cursor.fetchall()
+                            connection.commit()
+
+                        if APP_CONFIG['debug']:
+                            print(f"Resultado da query: {result}")
+
+                        return result
+                    finally:
+                        cursor.close()
+            except CONNECTION_ERRORS:
                 if attempt == max_retries - 1:
                     raise
                 logger.warning(f"Tentativa {attempt + 1} de {max_retries} falhou. Reconectando...")
-                self.connect()
-            finally:
-                if 'cursor' in locals():
-                    cursor.close()
\ No newline at end of file
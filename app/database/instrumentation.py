@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import re
+import socket
+import sys
+import threading
+from bisect import bisect_left
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Logger dedicado para o log de queries lentas (arquivo próprio em logs/,
+# criado só na primeira query lenta)
+slow_logger = logging.getLogger("chronos.slow_query")
+_slow_log_lock = threading.Lock()
+
+_COMMENT_RE = re.compile(r"(--[^\n]*|/\*.*?\*/)", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+# Limites dos buckets de latência em ms (escala geométrica ~1.25x, de 0.1 ms a ~80 s)
+_BUCKETS = [0.1 * (1.25 ** i) for i in range(62)]
+
+def fingerprint(query):
+    """Normaliza uma query: remove comentários e literais e compacta espaços"""
+    text = _COMMENT_RE.sub(" ", query)
+    text = _STRING_RE.sub("?", text)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("(?+)", text)
+    return _SPACE_RE.sub(" ", text).strip().upper()
+
+class _StatementStats:
+    """Contadores de um fingerprint + chamador"""
+    __slots__ = ('count', 'errors', 'total_ms', 'max_ms', 'rows', 'bytes', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.histogram = [0] * (len(_BUCKETS) + 1)
+
+    def add(self, duration_ms, rows, size, error):
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        self.rows += rows
+        self.bytes += size
+        if error:
+            self.errors += 1
+        self.histogram[bisect_left(_BUCKETS, duration_ms)] += 1
+
+    def percentile(self, fraction):
+        """Percentil aproximado pelo limite superior do bucket"""
+        target = self.count * fraction
+        seen = 0
+        for index, amount in enumerate(self.histogram):
+            seen += amount
+            if seen >= target and amount:
+                return _BUCKETS[index] if index < len(_BUCKETS) else self.max_ms
+        return self.max_ms
+
+class QueryInstrumentation:
+    """
+    Instrumentação por statement da camada de banco.
+    Cada query é identificada pelo fingerprint e pelo módulo/função que a
+    chamou; registra contagem, latência (p50/p95/p99 via histograma),
+    linhas e bytes retornados, grava um log de queries lentas e despeja um
+    resumo periódico em logs/. O custo por query é um lookup em cache de
+    fingerprint, uma subida curta na pilha e uma atualização de contadores.
+    """
+
+    def __init__(self, enabled=True, slow_query_ms=500, summary_interval=900,
+                 log_dir='logs', top_n=30, byte_sample_rows=20):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.summary_interval = summary_interval
+        self.log_dir = log_dir
+        self.top_n = top_n
+        self.byte_sample_rows = byte_sample_rows
+        self._stats = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._started_at = datetime.now()
+        self._host = socket.gethostname()
+        self._stop = threading.Event()
+
+        if enabled and summary_interval:
+            threading.Thread(target=self._summary_loop, daemon=True, name="query-stats").start()
+
+    def _setup_slow_log(self):
+        with _slow_log_lock:
+            if slow_logger.handlers:
+                return
+            try:
+                os.makedirs(self.log_dir, exist_ok=True)
+                handler = logging.FileHandler(os.path.join(self.log_dir, 'slow_queries.log'), encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+                slow_logger.addHandler(handler)
+                slow_logger.setLevel(logging.INFO)
+            except Exception as e:
+                logger.error(f"[QUERY_STATS] Erro ao configurar log de queries lentas: {e}")
+
+    def record(self, query, duration_s, result=None, error=None, caller=None, rows=None):
+        """
+        Registra a execução de uma query. Em consultas em streaming, result é
+        só o primeiro bloco (usado para estimar bytes) e rows o total lido.
+        """
+        if not self.enabled:
+            return
+
+        duration_ms = duration_s * 1000.0
+        key_fp = self._fingerprint(query)
+        caller = caller or self._find_caller()
+        if rows is None:
+            rows = len(result) if isinstance(result, list) else (1 if result else 0)
+        size = self._estimate_bytes(result, rows)
+
+        with self._lock:
+            stats = self._stats.get((key_fp, caller))
+            if stats is None:
+                stats = self._stats[(key_fp, caller)] = _StatementStats()
+            stats.add(duration_ms, rows, size, error is not None)
+
+        if duration_ms >= self.slow_query_ms:
+            if not slow_logger.handlers:
+                self._setup_slow_log()
+            slow_logger.info(
+                f"{duration_ms:.1f} ms | rows={rows} | {caller} | {key_fp}"
+            )
+
+    def _fingerprint(self, query):
+        cached = self._fingerprints.get(query)
+        if cached is None:
+            cached = fingerprint(query)
+            # As queries do app são strings fixas; limita o cache para SQL dinâmico
+            if len(self._fingerprints) < 2000:
+                self._fingerprints[query] = cached
+        return cached
+
+    @staticmethod
+    def _find_caller():
+        """Primeiro frame fora de app/database: 'modulo.funcao'"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            if not module.startswith(('app.database', 'contextlib', 'concurrent.', 'threading')):
+                return f"{module}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return "desconhecido"
+
+    def _estimate_bytes(self, result, rows):
+        """Estima o tamanho do resultado amostrando as primeiras linhas"""
+        if not result:
+            return 0
+        sample = result[:self.byte_sample_rows] if isinstance(result, list) else [result]
+        sampled = 0
+        for row in sample:
+            values = row.values() if isinstance(row, dict) else row
+            for value in values:
+                if isinstance(value, (str, bytes)):
+                    sampled += len(value)
+                elif value is not None:
+                    sampled += 8
+        return int(sampled * rows / len(sample))
+
+    def snapshot(self):
+        """Retorna as estatísticas ordenadas por tempo total"""
+        with self._lock:
+            items = [(key, stats) for key, stats in self._stats.items()]
+            entries = [{
+                'fingerprint': fp,
+                'caller': caller,
+                'count': stats.count,
+                'errors': stats.errors,
+                'total_ms': round(stats.total_ms, 1),
+                'p50_ms': round(stats.percentile(0.50), 2),
+                'p95_ms': round(stats.percentile(0.95), 2),
+                'p99_ms': round(stats.percentile(0.99), 2),
+                'max_ms': round(stats.max_ms, 2),
+                'rows': stats.rows,
+                'bytes': stats.bytes
+            } for (fp, caller), stats in items]
+        entries.sort(key=lambda e: e['total_ms'], reverse=True)
+        return entries
+
+    def write_summary(self):
+        """Acrescenta um resumo (JSON por linha) em logs/query_stats.log"""
+        entries = self.snapshot()[:self.top_n]
+        if not entries:
+            return
+        summary = {
+            'host': self._host,
+            'since': self._started_at.isoformat(timespec='seconds'),
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'statements': entries
+        }
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(os.path.join(self.log_dir, 'query_stats.log'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.error(f"[QUERY_STATS] Erro ao gravar resumo: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self.enabled:
+            self.write_summary()
+
+    def _summary_loop(self):
+        while not self._stop.wait(self.summary_interval):
+            self.write_summary()
@@ -0,0 +1,468 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from ..config.settings import JOURNAL_CONFIG, DB_BACKEND_CONFIG
+from .connection import DatabaseConnection, CONNECTION_ERRORS
+from .pool import PoolExhaustedError, DatabaseUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Prefixo das referências a atividades criadas enquanto o MySQL estava fora
+LOCAL_REF_PREFIX = "local:"
+
+# Erros que indicam que o servidor está inacessível: o syncer para e tenta depois
+UNREACHABLE_ERRORS = CONNECTION_ERRORS + (PoolExhaustedError, DatabaseUnavailableError)
+
+def get_journal(db=None):
+    """
+    Retorna o journal local das mutações gravadas em db, ou None se ele estiver
+    desabilitado na configuração ou se db for outra conexão (testes,
+    ferramentas): o journal só repete entradas na conexão MySQL do app.
+    """
+    # Com o backend SQLite não há servidor remoto para sincronizar
+    if not JOURNAL_CONFIG['enabled'] or DB_BACKEND_CONFIG['engine'] == 'sqlite':
+        return None
+    if db is not None and type(db) is not DatabaseConnection:
+        return None
+    return LocalJournal(db)
+
+def resolve_ref(activity_ref, db=None):
+    """Id do MySQL de uma atividade criada offline e já sincronizada; senão a própria referência"""
+    if not LocalJournal.is_local_ref(activity_ref):
+        return activity_ref
+    journal = get_journal(db)
+    return (journal.resolve(activity_ref) if journal else None) or activity_ref
+
+def write_through(db, direct, queued, *activity_refs):
+    """
+    Grava uma mutação direto em db (direct()) ou no journal local (queued(journal)).
+    O journal só é usado com o MySQL inacessível, com entradas pendentes (para
+    manter a ordem) ou se alguma de activity_refs (já passadas por resolve_ref)
+    ainda for uma referência local. Se direct() falhar por conexão, a mutação
+    vai para o journal. Retorna o resultado de quem gravou.
+    """
+    journal = get_journal(db)
+    if journal is None:
+        return direct()
+    if journal.accepts_direct(*activity_refs):
+        try:
+            return direct()
+        except (ConnectionError,) + UNREACHABLE_ERRORS as e:
+            logger.warning(f"[JOURNAL] MySQL inacessível, mutação gravada no journal local: {e}")
+            journal.mark_offline()
+    return queued(journal)
+
+class LocalJournal:
+    """
+    Journal local (SQLite em modo WAL) para mutações de atividades.
+    Com o MySQL inacessível (ou enquanto houver entradas pendentes, ver
+    write_through) as mutações são gravadas no disco local e depois repetidas
+    no MySQL, em ordem, por uma thread de sincronização. Cada entrada tem uma
+    chave de idempotência registrada na tabela journal_applied do servidor
+    na mesma transação da mutação, então repetir uma entrada nunca a aplica
+    duas vezes. Uma entrada que falha MAX_ATTEMPTS vezes é marcada como
+    'failed' junto com as entradas seguintes da mesma atividade (ver
+    failed_entries), e a repetição segue com as demais atividades.
+
+    Tipos de entrada:
+        create    - cria uma atividade (payload com local_key e os campos)
+        update    - atualiza campos de uma atividade (activity_ref + fields);
+                    valores {"$sql": "..."} são escritos como expressão SQL
+        statement - comando SQL livre (query + params)
+        transaction - vários comandos na mesma transação (statements); com
+                    activity_ref, o id resolvido é passado no parâmetro
+                    nomeado atividade_id de cada comando
+    """
+    _instance = None
+    MAX_ATTEMPTS = 5
+    RETENTION_DAYS = 7  # Entradas já sincronizadas são removidas após esse prazo
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, db=None, path=None):
+        if self._initialized:
+            return
+        self.db = db or DatabaseConnection()
+        self.path = path or JOURNAL_CONFIG['path']
+        self.wait_timeout = JOURNAL_CONFIG['wait_timeout']
+        self.retry_interval = JOURNAL_CONFIG['retry_interval']
+        self.offline = False
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._wakeup = threading.Event()
+        self._running = True
+        self._server_ready = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+        self._syncer = threading.Thread(target=self._run, daemon=True, name="journal-sync")
+        self._syncer.start()
+        self._initialized = True
+
+    def _create_schema(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    result_id INTEGER
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_journal_status ON journal (status, seq)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS id_map (
+                    local_key TEXT PRIMARY KEY,
+                    remote_id INTEGER NOT NULL
+                )
+            """)
+
+    # ------------------------------------------------------------------
+    # API de escrita
+
+    def append(self, kind, payload):
+        """Grava uma mutação no journal local e acorda o syncer. Retorna a chave."""
+        key = str(uuid.uuid4())
+        data = json.dumps(payload, default=self._json_default)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO journal (idempotency_key, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (key, kind, data, datetime.now().isoformat(timespec='seconds'))
+            )
+        self._wakeup.set()
+        return key
+
+    def record_create(self, fields):
+        """
+        Registra a criação de uma atividade.
+        Retorna (referência, chave): o id do MySQL se a sincronização terminar
+        dentro de wait_timeout, senão uma referência local ("local:<uuid>").
+        """
+        local_key = LOCAL_REF_PREFIX + str(uuid.uuid4())
+        key = self.append('create', {'local_key': local_key, 'fields': fields})
+        remote_id = self.wait_synced(key)
+        return (remote_id if remote_id else local_key), key
+
+    def record_update(self, activity_ref, fields, wait=False):
+        """Registra a atualização de campos de uma atividade"""
+        key = self.append('update', {'activity_ref': activity_ref, 'fields': fields})
+        if wait:
+            self.wait_synced(key)
+        return key
+
+    def record_statement(self, query, params=None, wait=False):
+        """Registra um comando SQL livre (ex.: incremento de ociosidade)"""
+        key = self.append('statement', {'query': query, 'params': list(params or ())})
+        if wait:
+            self.wait_synced(key)
+        return key
+
+    def record_transaction(self, statements, activity_ref=None, wait=False):
+        """Registra comandos (query, params nomeados) aplicados juntos (ex.: evento + resumo)"""
+        key = self.append('transaction', {
+            'activity_ref': activity_ref,
+            'statements': [[query, dict(params or {})] for query, params in statements]
+        })
+        if wait:
+            self.wait_synced(key)
+        return key
+
+    def wait_synced(self, key, timeout=None):
+        """
+        Espera até a entrada ser aplicada no MySQL.
+        Retorna o result_id (ou True) se aplicada; None se offline ou timeout.
+        Offline não espera, para a interface continuar na latência do disco.
+        """
+        deadline = time.monotonic() + (self.wait_timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                row = self._fetch_entry(key)
+                if row is None:
+                    return None
+                if row['status'] == 'synced':
+                    return row['result_id'] or True
+                if row['status'] == 'failed' or self.offline:
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    # ------------------------------------------------------------------
+    # Consultas
+
+    def accepts_direct(self, *activity_refs):
+        """Se uma mutação pode ir direto ao MySQL sem passar à frente do journal"""
+        if any(self.is_local_ref(ref) for ref in activity_refs):
+            return False
+        return not self.offline and not self.has_pending()
+
+    def mark_offline(self):
+        """Escrita direta falhou: as mutações seguem pelo journal até o syncer voltar a aplicar"""
+        self._set_offline(True)
+
+    def has_pending(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM journal WHERE status = 'pending' LIMIT 1"
+            ).fetchone()
+        return row is not None
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM journal WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def failed_entries(self):
+        """Entradas que não serão mais repetidas (falharam ou dependiam de uma que falhou)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, idempotency_key, kind, payload, created_at, attempts, last_error "
+                "FROM journal WHERE status = 'failed' ORDER BY seq"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def resolve(self, activity_ref):
+        """Traduz uma referência local para o id do MySQL, se já sincronizada"""
+        if not self.is_local_ref(activity_ref):
+            return activity_ref
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT remote_id FROM id_map WHERE local_key = ?", (activity_ref,)
+            ).fetchone()
+        return row['remote_id'] if row else None
+
+    @staticmethod
+    def is_local_ref(activity_ref):
+        return isinstance(activity_ref, str) and activity_ref.startswith(LOCAL_REF_PREFIX)
+
+    def stop(self, timeout=5.0):
+        """Tenta sincronizar o que estiver pendente e encerra o syncer"""
+        deadline = time.monotonic() + timeout
+        self._wakeup.set()
+        while self.has_pending() and not self.offline and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self._running = False
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Sincronização
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.retry_interval)
+            self._wakeup.clear()
+            try:
+                self._sync_pending()
+            except Exception as e:
+                logger.error(f"[JOURNAL] Erro inesperado na sincronização: {e}")
+
+    def _sync_pending(self):
+        while self._running:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM journal WHERE status = 'pending' ORDER BY seq LIMIT 50"
+                ).fetchall()
+            if not rows:
+                self._purge_synced()
+                return
+
+            for row in rows:
+                try:
+                    self._ensure_server_table()
+                    result_id = self._apply(row)
+                except UNREACHABLE_ERRORS as e:
+                    if not self.offline:
+                        logger.warning(f"[JOURNAL] MySQL inacessível, operando offline: {e}")
+                    self._set_offline(True)
+                    return
+                except Exception as e:
+                    attempts = row['attempts'] + 1
+                    status = 'failed' if attempts >= self.MAX_ATTEMPTS else 'pending'
+                    logger.error(f"[JOURNAL] Erro ao aplicar entrada {row['seq']} ({row['kind']}), "
+                                 f"tentativa {attempts}: {e}")
+                    self._update_entry(row['seq'], status=status, attempts=attempts, last_error=str(e))
+                    if status == 'pending':
+                        # Preserva a ordem: tenta a mesma entrada no próximo ciclo
+                        return
+                    self._quarantine_dependents(row)
+                    # As entradas do lote podem ter sido isoladas: relê as pendentes
+                    break
+
+                self._update_entry(row['seq'], status='synced', result_id=result_id)
+                if self.offline:
+                    logger.info("[JOURNAL] Conexão com MySQL restabelecida, repetindo journal")
+                self._set_offline(False)
+
+    def _apply(self, row):
+        """Aplica uma entrada no MySQL em uma transação idempotente"""
+        payload = json.loads(row['payload'])
+        key = row['idempotency_key']
+
+        with self.db.transaction(ignore_backoff=True) as cursor:
+            cursor.execute(
+                "SELECT result_id FROM journal_applied WHERE idempotency_key = %s", (key,)
+            )
+            applied = cursor.fetchone()
+            if applied is not None:
+                # Já aplicada anteriormente (ex.: caiu antes de marcar localmente)
+                result_id = applied['result_id']
+                if row['kind'] == 'create' and result_id:
+                    self._map_local_key(payload['local_key'], result_id)
+                return result_id
+            # A chave primária também barra uma aplicação concorrente da mesma entrada
+            cursor.execute(
+                "INSERT INTO journal_applied (idempotency_key) VALUES (%s)", (key,)
+            )
+
+            result_id = None
+            if row['kind'] == 'create':
+                fields = payload['fields']
+                columns = ', '.join(fields)
+                placeholders = ', '.join(['%s'] * len(fields))
+                cursor.execute(
+                    f"INSERT INTO atividades ({columns}) VALUES ({placeholders})",
+                    tuple(fields.values())
+                )
+                result_id = cursor.lastrowid
+                cursor.execute(
+                    "UPDATE journal_applied SET result_id = %s WHERE idempotency_key = %s",
+                    (result_id, key)
+                )
+            elif row['kind'] == 'update':
+                activity_id = self.resolve(payload['activity_ref'])
+                if activity_id is None:
+                    raise ValueError(f"Atividade local não sincronizada: {payload['activity_ref']}")
+                assignments = []
+                params = []
+                for column, value in payload['fields'].items():
+                    if isinstance(value, dict) and '$sql' in value:
+                        assignments.append(f"{column} = {value['$sql']}")
+                    else:
+                        assignments.append(f"{column} = %s")
+                        params.append(value)
+                params.append(activity_id)
+                cursor.execute(
+                    f"UPDATE atividades SET {', '.join(assignments)} WHERE id = %s",
+                    tuple(params)
+                )
+            elif row['kind'] == 'statement':
+                cursor.execute(payload['query'], tuple(payload['params']))
+            elif row['kind'] == 'transaction':
+                activity_id = None
+                if payload['activity_ref'] is not None:
+                    activity_id = self.resolve(payload['activity_ref'])
+                    if activity_id is None:
+                        raise ValueError(f"Atividade local não sincronizada: {payload['activity_ref']}")
+                for query, params in payload['statements']:
+                    if activity_id is not None:
+                        params['atividade_id'] = activity_id
+                    cursor.execute(query, params)
+            else:
+                raise ValueError(f"Tipo de entrada desconhecido: {row['kind']}")
+
+        if row['kind'] == 'create':
+            self._map_local_key(payload['local_key'], result_id)
+        return result_id
+
+    def _ensure_server_table(self):
+        """Cria a tabela de chaves aplicadas no servidor na primeira sincronização"""
+        if self._server_ready:
+            return
+        with self.db.transaction(ignore_backoff=True) as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS journal_applied (
+                    idempotency_key CHAR(36) PRIMARY KEY,
+                    result_id INT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        self._server_ready = True
+
+    def _quarantine_dependents(self, failed):
+        """
+        Marca como falhas as entradas pendentes posteriores da mesma atividade.
+        Repeti-las sem a entrada que falhou aplicaria as mutações fora de ordem
+        (ou nem aplicaria, se a criação falhou e a referência local nunca resolve).
+        """
+        payload = json.loads(failed['payload'])
+        activity_ref = payload.get('local_key') if failed['kind'] == 'create' else payload.get('activity_ref')
+        if activity_ref is None:
+            return
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, payload FROM journal WHERE status = 'pending' AND seq > ? ORDER BY seq",
+                (failed['seq'],)
+            ).fetchall()
+        dependents = [row['seq'] for row in rows
+                      if json.loads(row['payload']).get('activity_ref') == activity_ref]
+        for seq in dependents:
+            self._update_entry(seq, status='failed',
+                               last_error=f"Entrada anterior {failed['seq']} da mesma atividade falhou")
+        if dependents:
+            logger.error(f"[JOURNAL] {len(dependents)} entrada(s) da atividade {activity_ref} "
+                         f"isoladas após a falha da entrada {failed['seq']}")
+
+    def _purge_synced(self):
+        limit = (datetime.now() - timedelta(days=self.RETENTION_DAYS)).isoformat(timespec='seconds')
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM journal WHERE status = 'synced' AND created_at < ?", (limit,)
+            )
+
+    def _map_local_key(self, local_key, remote_id):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO id_map (local_key, remote_id) VALUES (?, ?)",
+                (local_key, remote_id)
+            )
+
+    def _update_entry(self, seq, **fields):
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE journal SET {assignments} WHERE seq = ?", (*fields.values(), seq)
+            )
+        with self._cond:
+            self._cond.notify_all()
+
+    def _fetch_entry(self, key):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT status, result_id FROM journal WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+
+    def _set_offline(self, offline):
+        self.offline = offline
+        with self._cond:
+            self._cond.notify_all()
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        return str(value)
@@ -0,0 +1,253 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class PoolExhaustedError(Exception):
+    """Exceção lançada quando nenhuma conexão fica disponível dentro do timeout"""
+    pass
+
+class DatabaseUnavailableError(Exception):
+    """Exceção lançada enquanto o servidor está marcado como indisponível"""
+    pass
+
+class ConnectionPool:
+    """
+    Pool de conexões thread-safe.
+    As conexões livres ficam em uma pilha (a mais recente é reutilizada primeiro)
+    e são fechadas após ficarem ociosas por mais de idle_timeout segundos.
+
+    Liveness: uma conexão só é verificada com ping no empréstimo se estiver
+    sem verificação há mais de ping_after segundos. Falhas durante o uso são
+    tratadas de forma preguiçosa pelo chamador (release com broken=True), e o
+    keepalive opcional pinga em segundo plano apenas conexões paradas.
+
+    Se abrir uma conexão falhar, o pool fica marcado como indisponível por
+    retry_backoff segundos e novos empréstimos falham imediatamente, em vez de
+    bloquear a interface pelo timeout de conexão a cada tentativa.
+    """
+
+    def __init__(self, connection_factory, size=6, idle_timeout=300, acquire_timeout=10,
+                 ping_after=60, keepalive_interval=0, retry_backoff=15):
+        self._factory = connection_factory
+        self.size = max(1, int(size))
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after
+        self.keepalive_interval = keepalive_interval
+        self.retry_backoff = retry_backoff
+        self._down_until = 0.0
+        # Entradas [conexão, instante da devolução, instante da última verificação]
+        self._idle = deque()
+        self._open = 0  # Conexões abertas (livres + emprestadas)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Contadores de liveness
+        self.pings = 0
+        self.reconnects = 0
+        self.created = 0
+
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread = None
+        if keepalive_interval:
+            self._keepalive_thread = threading.Thread(
+                target=self._keepalive_loop, daemon=True, name="db-keepalive"
+            )
+            self._keepalive_thread.start()
+
+    def acquire(self, ignore_backoff=False):
+        """
+        Empresta uma conexão do pool, criando uma nova se houver vaga.
+        Com ignore_backoff=True tenta conectar mesmo com o servidor marcado
+        como indisponível (usado por quem sonda a volta do servidor).
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            entry = None
+            with self._cond:
+                expired = self._collect_expired()
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            f"Nenhuma conexão disponível após {self.acquire_timeout}s "
+                            f"(tamanho do pool: {self.size})"
+                        )
+                    self._cond.wait(remaining)
+                    expired.extend(self._collect_expired())
+
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    self._open += 1
+
+            self._close_all(expired)
+
+            if entry is None:
+                if not ignore_backoff and not self.is_available():
+                    self._release_slot()
+                    raise DatabaseUnavailableError("Servidor de banco de dados indisponível")
+                try:
+                    connection = self._factory()
+                except Exception:
+                    self._down_until = time.monotonic() + self.retry_backoff
+                    self._release_slot()
+                    raise
+                with self._cond:
+                    self.created += 1
+                    self._down_until = 0.0
+                return connection
+
+            connection, _, checked_at = entry
+            if self._is_healthy(connection, checked_at):
+                return connection
+
+            # Conexão morta: descarta e tenta novamente
+            logger.debug("[DB_POOL] Conexão inválida descartada no empréstimo")
+            self._discard(connection)
+
+    def release(self, connection, broken=False):
+        """Devolve uma conexão ao pool; conexões quebradas são fechadas"""
+        if connection is None:
+            return
+
+        if broken or self._closed:
+            if broken:
+                logger.debug("[DB_POOL] Conexão quebrada descartada, será reaberta sob demanda")
+                self._discard(connection)
+            else:
+                self._close_all([connection])
+                self._release_slot()
+            return
+
+        with self._cond:
+            # Conexão que acabou de ser usada conta como verificada
+            now = time.monotonic()
+            self._idle.append([connection, now, now])
+            self._cond.notify()
+
+    def is_available(self):
+        """Indica se o pool não está no período de espera após falha de conexão"""
+        return time.monotonic() >= self._down_until
+
+    def evict_idle(self):
+        """Fecha as conexões que excederam o tempo máximo de ociosidade"""
+        with self._cond:
+            expired = self._collect_expired()
+        self._close_all(expired)
+        return len(expired)
+
+    def keepalive(self):
+        """Pinga as conexões livres que estão sem verificação há keepalive_interval segundos"""
+        interval = self.keepalive_interval or self.ping_after
+        limit = time.monotonic() - interval
+
+        with self._cond:
+            expired = self._collect_expired()
+            stale = [entry for entry in self._idle if entry[2] <= limit]
+            for entry in stale:
+                self._idle.remove(entry)
+        self._close_all(expired)
+
+        alive = []
+        for entry in stale:
+            if self._ping(entry[0]):
+                entry[2] = time.monotonic()
+                alive.append(entry)
+            else:
+                self._discard(entry[0])
+
+        if alive:
+            with self._cond:
+                # Mantém a ordem por instante de devolução usada pela remoção de ociosas
+                self._idle = deque(sorted([*self._idle, *alive], key=lambda e: e[1]))
+                self._cond.notify(len(alive))
+        return len(stale)
+
+    def close(self):
+        """Fecha todas as conexões livres e impede novas devoluções"""
+        self._keepalive_stop.set()
+        with self._cond:
+            self._closed = True
+            connections = [entry[0] for entry in self._idle]
+            self._open -= len(connections)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(connections)
+
+    def stats(self):
+        """Retorna um resumo do estado atual do pool"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'created': self.created,
+                'pings': self.pings,
+                'reconnects': self.reconnects
+            }
+
+    def _is_healthy(self, connection, checked_at):
+        """Verificação de saúde feita somente no empréstimo e só para conexões paradas"""
+        if time.monotonic() - checked_at < self.ping_after:
+            return True
+        return self._ping(connection)
+
+    def _ping(self, connection):
+        with self._cond:
+            self.pings += 1
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _keepalive_loop(self):
+        while not self._keepalive_stop.wait(self.keepalive_interval):
+            try:
+                self.keepalive()
+            except Exception as e:
+                logger.error(f"[DB_POOL] Erro no keepalive: {e}")
+
+    def _collect_expired(self):
+        """Remove do pool as conexões ociosas há mais tempo (chamar com o lock)"""
+        expired = []
+        if not self.idle_timeout:
+            return expired
+
+        limit = time.monotonic() - self.idle_timeout
+        # As conexões mais antigas ficam à esquerda da pilha
+        while self._idle and self._idle[0][1] < limit:
+            expired.append(self._idle.popleft()[0])
+            self._open -= 1
+
+        if expired:
+            self._cond.notify_all()
+            logger.debug(f"[DB_POOL] {len(expired)} conexão(ões) ociosa(s) removida(s)")
+        return expired
+
+    def _discard(self, connection):
+        """Fecha uma conexão morta e libera sua vaga para ser reaberta"""
+        self._close_all([connection])
+        with self._cond:
+            self.reconnects += 1
+            self._open -= 1
+            self._cond.notify()
+
+    def _release_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_all(connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.debug(f"[DB_POOL] Erro ao fechar conexão: {e}")
@@ -0,0 +1,668 @@
+import concurrent.futures
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from ..config.settings import DB_BACKEND_CONFIG, QUERY_STATS_CONFIG
+from .instrumentation import QueryInstrumentation
+from ..utils.duration import Duration, format_hms
+
+logger = logging.getLogger(__name__)
+
+# Schema equivalente ao de sql/create_tables.sql para as tabelas usadas pelo app.
+# Os tipos declarados (DATETIME, TIME...) acionam os conversores registrados abaixo,
+# e os gatilhos reproduzem ON UPDATE CURRENT_TIMESTAMP e after_usuario_insert.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS equipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(100) NOT NULL UNIQUE,
+    descricao TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    equipe_id INTEGER REFERENCES equipes(id),
+    nome VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    name_id VARCHAR(50),
+    senha VARCHAR(255) NOT NULL,
+    tipo_usuario VARCHAR(10) DEFAULT 'comum',
+    data_entrada DATE,
+    base_value DECIMAL(10,2),
+    ociosidade TIME,
+    ociosidade_seconds INTEGER NOT NULL DEFAULT 0,
+    is_logged_in BOOLEAN DEFAULT FALSE,
+    status BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS atividades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES usuarios(id),
+    description TEXT,
+    atividade VARCHAR(255) NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME,
+    time_regress TIME,
+    time_exceeded TIME,
+    reason VARCHAR(255),
+    total_time TIME,
+    ativo BOOLEAN DEFAULT TRUE,
+    pausado BOOLEAN DEFAULT FALSE,
+    concluido BOOLEAN DEFAULT FALSE,
+    current_mode VARCHAR(20),
+    version INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS user_lock_unlock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+    lock_status BOOLEAN DEFAULT FALSE,
+    unlock_control BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS horarios_equipe (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    equipe_id INTEGER UNIQUE REFERENCES equipes(id) ON DELETE CASCADE,
+    inicio_expediente TIME NOT NULL,
+    inicio_intervalo TIME NOT NULL,
+    fim_intervalo TIME NOT NULL,
+    fim_expediente TIME NOT NULL,
+    dias_semana VARCHAR(13) NOT NULL DEFAULT '0,1,2,3,4,5,6',
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS feriados (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data DATE NOT NULL,
+    descricao VARCHAR(255),
+    equipe_id INTEGER REFERENCES equipes(id) ON DELETE CASCADE,
+    UNIQUE (data, equipe_id)
+);
+
+CREATE TABLE IF NOT EXISTS recessos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_inicio DATE NOT NULL,
+    data_fim DATE NOT NULL,
+    descricao VARCHAR(255),
+    equipe_id INTEGER REFERENCES equipes(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS activity_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    atividade_id INTEGER,
+    user_id INTEGER,
+    event_type VARCHAR(16) NOT NULL,
+    occurred_at DATETIME NOT NULL,
+    total_seconds INTEGER,
+    limit_seconds INTEGER,
+    idle_seconds INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS activity_summary (
+    atividade_id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    state VARCHAR(16),
+    total_seconds INTEGER NOT NULL DEFAULT 0,
+    running_since DATETIME,
+    limit_seconds INTEGER NOT NULL DEFAULT 0,
+    exceeded_at DATETIME,
+    idle_seconds INTEGER NOT NULL DEFAULT 0,
+    last_event VARCHAR(16),
+    event_count INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS idle_periods (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    atividade_id INTEGER,
+    started_at DATETIME NOT NULL,
+    ended_at DATETIME NOT NULL,
+    idle_seconds INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS idle_daily (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    idle_seconds INTEGER NOT NULL DEFAULT 0,
+    periods INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_atividades_user_status ON atividades (user_id, ativo, concluido, pausado);
+CREATE INDEX IF NOT EXISTS idx_atividades_user_start ON atividades (user_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_atividades_user_updated ON atividades (user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_atividades_user_created ON atividades (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_atividades_updated ON atividades (updated_at);
+CREATE INDEX IF NOT EXISTS idx_atividades_start ON atividades (start_time);
+CREATE INDEX IF NOT EXISTS idx_atividades_created ON atividades (created_at);
+CREATE INDEX IF NOT EXISTS idx_activity_events_atividade ON activity_events (atividade_id, id);
+CREATE INDEX IF NOT EXISTS idx_activity_events_user ON activity_events (user_id, occurred_at);
+CREATE INDEX IF NOT EXISTS idx_activity_summary_user ON activity_summary (user_id, state);
+CREATE INDEX IF NOT EXISTS idx_idle_periods_user ON idle_periods (user_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_idle_periods_atividade ON idle_periods (atividade_id);
+CREATE INDEX IF NOT EXISTS idx_lock_user ON user_lock_unlock (user_id, lock_status, unlock_control);
+
+CREATE TRIGGER IF NOT EXISTS usuarios_updated_at AFTER UPDATE ON usuarios
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE usuarios SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS atividades_updated_at AFTER UPDATE ON atividades
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE atividades SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS user_lock_unlock_updated_at AFTER UPDATE ON user_lock_unlock
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE user_lock_unlock SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS after_usuario_insert AFTER INSERT ON usuarios
+BEGIN
+    INSERT INTO user_lock_unlock (user_id, lock_status, unlock_control) VALUES (NEW.id, FALSE, TRUE);
+END;
+"""
+
+# Equivalente aos índices FULLTEXT do MySQL: tabelas FTS5 de conteúdo externo
+# mantidas pelos triggers (a pesquisa ordena por bm25)
+SEARCH_TABLES = ('atividades_fts', 'usuarios_fts')
+
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS atividades_fts USING fts5(
+    description, atividade, content='atividades', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS usuarios_fts USING fts5(
+    nome, content='usuarios', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS atividades_fts_insert AFTER INSERT ON atividades
+BEGIN
+    INSERT INTO atividades_fts (rowid, description, atividade) VALUES (NEW.id, NEW.description, NEW.atividade);
+END;
+
+CREATE TRIGGER IF NOT EXISTS atividades_fts_delete AFTER DELETE ON atividades
+BEGIN
+    INSERT INTO atividades_fts (atividades_fts, rowid, description, atividade)
+    VALUES ('delete', OLD.id, OLD.description, OLD.atividade);
+END;
+
+CREATE TRIGGER IF NOT EXISTS atividades_fts_update AFTER UPDATE OF description, atividade ON atividades
+BEGIN
+    INSERT INTO atividades_fts (atividades_fts, rowid, description, atividade)
+    VALUES ('delete', OLD.id, OLD.description, OLD.atividade);
+    INSERT INTO atividades_fts (rowid, description, atividade) VALUES (NEW.id, NEW.description, NEW.atividade);
+END;
+
+CREATE TRIGGER IF NOT EXISTS usuarios_fts_insert AFTER INSERT ON usuarios
+BEGIN
+    INSERT INTO usuarios_fts (rowid, nome) VALUES (NEW.id, NEW.nome);
+END;
+
+CREATE TRIGGER IF NOT EXISTS usuarios_fts_delete AFTER DELETE ON usuarios
+BEGIN
+    INSERT INTO usuarios_fts (usuarios_fts, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+END;
+
+CREATE TRIGGER IF NOT EXISTS usuarios_fts_update AFTER UPDATE OF nome ON usuarios
+BEGIN
+    INSERT INTO usuarios_fts (usuarios_fts, rowid, nome) VALUES ('delete', OLD.id, OLD.nome);
+    INSERT INTO usuarios_fts (rowid, nome) VALUES (NEW.id, NEW.nome);
+END;
+"""
+
+# Colunas adicionadas por migrações depois da criação do arquivo (tabela, coluna, definição)
+ADDED_COLUMNS = [
+    ('atividades', 'version', 'INTEGER NOT NULL DEFAULT 0'),
+    ('usuarios', 'ociosidade_seconds', 'INTEGER NOT NULL DEFAULT 0'),
+]
+
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Equivalência entre os especificadores de DATE_FORMAT do MySQL e do strftime
+_DATE_FORMAT_MAP = {
+    'd': '%d', 'm': '%m', 'Y': '%Y', 'y': '%y', 'H': '%H', 'h': '%I', 'i': '%M',
+    's': '%S', 'S': '%S', 'p': '%p', 'T': '%H:%M:%S', 'W': '%A', 'M': '%B', '%': '%%'
+}
+
+_LITERAL_RE = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\")")
+_REWRITES = [
+    (re.compile(r"%\((\w+)\)s"), r":\1"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bCURRENT_DATE\b(\s*\(\s*\))?", re.I), "CURDATE()"),
+    # Valor padrão de coluna precisa ser expressão entre parênteses no SQLite
+    (re.compile(r"\bDEFAULT\s+CURRENT_TIMESTAMP\b(\s*\(\s*\))?", re.I), "DEFAULT (datetime('now', 'localtime'))"),
+    (re.compile(r"\bCURRENT_TIMESTAMP\b(\s*\(\s*\))?", re.I), "NOW()"),
+    (re.compile(r"\bLAST_INSERT_ID\s*\(\s*\)", re.I), "last_insert_rowid()"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+]
+
+def translate(query):
+    """Converte uma query no dialeto do MySQL para o SQLite (fora dos literais)"""
+    parts = _LITERAL_RE.split(query)
+    for index in range(0, len(parts), 2):
+        for pattern, replacement in _REWRITES:
+            parts[index] = pattern.sub(replacement, parts[index])
+    return "".join(parts)
+
+def _adapt(value):
+    if isinstance(value, datetime):
+        return value.strftime(_DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (timedelta, Duration)):
+        return _format_seconds(value.total_seconds() if isinstance(value, timedelta) else value.seconds)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _adapt_params(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return {key: _adapt(value) for key, value in params.items()}
+    return tuple(_adapt(value) for value in params)
+
+def _format_seconds(seconds):
+    return format_hms(int(seconds))
+
+def _parse_datetime(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    text = str(value).replace("T", " ")
+    for fmt in (_DATETIME_FORMAT, "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _time_to_sec(value):
+    if value is None:
+        return None
+    text = str(value)
+    if " " in text or "T" in text:
+        parsed = _parse_datetime(text)
+        return parsed.hour * 3600 + parsed.minute * 60 + parsed.second if parsed else None
+    negative = text.startswith("-")
+    try:
+        parts = [float(part) for part in text.lstrip("-").split(":")]
+    except ValueError:
+        return None
+    while len(parts) < 3:
+        parts.insert(0, 0.0)
+    seconds = int(parts[0] * 3600 + parts[1] * 60 + parts[2])
+    return -seconds if negative else seconds
+
+def _sec_to_time(value):
+    return None if value is None else _format_seconds(value)
+
+def _timediff(first, second):
+    a, b = _parse_datetime(first), _parse_datetime(second)
+    if a and b and " " in str(first):
+        return _format_seconds((a - b).total_seconds())
+    x, y = _time_to_sec(first), _time_to_sec(second)
+    return None if x is None or y is None else _format_seconds(x - y)
+
+def _date_format(value, fmt):
+    parsed = _parse_datetime(value)
+    if parsed is None or fmt is None:
+        return None
+    out = []
+    chars = iter(fmt)
+    for char in chars:
+        if char == '%':
+            spec = next(chars, '')
+            if spec == 'e':
+                out.append(str(parsed.day))
+            elif spec == 'c':
+                out.append(str(parsed.month))
+            else:
+                out.append(parsed.strftime(_DATE_FORMAT_MAP.get(spec, spec)))
+        else:
+            out.append(char)
+    return "".join(out)
+
+def _yearweek(value, mode=0):
+    parsed = _parse_datetime(value)
+    if parsed is None:
+        return None
+    if mode in (1, 3):
+        iso_year, week, _ = parsed.isocalendar()
+        return iso_year * 100 + week
+    # Modo 0: semanas começando no domingo
+    return parsed.year * 100 + int(parsed.strftime("%U"))
+
+def _now():
+    return datetime.now().strftime(_DATETIME_FORMAT)
+
+def _curdate():
+    return date.today().isoformat()
+
+def _part(attribute):
+    def extract(value):
+        parsed = _parse_datetime(value)
+        return getattr(parsed, attribute) if parsed else None
+    return extract
+
+def _convert_timedelta(raw):
+    seconds = _time_to_sec(raw.decode())
+    return timedelta(seconds=seconds) if seconds is not None else None
+
+sqlite3.register_converter("TIME", _convert_timedelta)
+sqlite3.register_converter("DATETIME", lambda raw: _parse_datetime(raw.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda raw: _parse_datetime(raw.decode()))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()[:10]))
+sqlite3.register_converter("DECIMAL", lambda raw: Decimal(raw.decode()))
+
+class _Cursor:
+    """Cursor com a interface usada do mysql-connector (linhas como dict opcionalmente)"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=None):
+        self._cursor.execute(translate(query), _adapt_params(params))
+
+    def executemany(self, query, seq_params):
+        self._cursor.executemany(translate(query), [_adapt_params(p) for p in seq_params])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+class _ConnectionShim:
+    """Imita a conexão do mysql-connector para quem usa db.connection diretamente"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def cursor(self, dictionary=False, buffered=None):
+        return _Cursor(self._backend._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._backend._conn.commit()
+
+    def rollback(self):
+        self._backend._conn.rollback()
+
+class SQLiteConnection:
+    """
+    Backend SQLite com a mesma API pública de DatabaseConnection
+    (execute_query, fetch_one, versões assíncronas, stream, transaction...).
+    Carrega um schema equivalente ao do MySQL e registra funções que imitam
+    TIME_TO_SEC, SEC_TO_TIME, CURDATE, NOW, TIMEDIFF, DATE_FORMAT, YEARWEEK,
+    MONTH, YEAR e DAY, para que as queries do app rodem sem servidor.
+    Selecionado com DB_BACKEND=sqlite (SQLITE_PATH=:memory: por padrão).
+
+    Uma única conexão é compartilhada entre as threads e protegida por lock,
+    o que também mantém o banco em memória visível para todas elas.
+    """
+    _instance = None
+
+    def __new__(cls, path=None):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, path=None):
+        if self.initialized:
+            return
+        self.path = path or DB_BACKEND_CONFIG['sqlite_path']
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        self._register_functions()
+        self._conn.executescript(SCHEMA)
+        self._add_missing_columns()
+        self.full_text = self._create_search_index()
+        self._lock = threading.RLock()
+        self.thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        self.instrumentation = QueryInstrumentation(**QUERY_STATS_CONFIG)
+        self.query_count = 0
+        self.initialized = True
+        logger.info(f"[SQLITE] Backend SQLite iniciado em {self.path}")
+
+    def _add_missing_columns(self):
+        """Atualiza arquivos criados antes das colunas de ADDED_COLUMNS"""
+        for table, column, definition in ADDED_COLUMNS:
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                logger.info(f"[SQLITE] Coluna {column} adicionada em {table}")
+        self._conn.commit()
+
+    def _create_search_index(self):
+        """
+        Cria as tabelas FTS5 da pesquisa; em arquivos criados antes delas, o
+        índice é reconstruído a partir das linhas existentes. Retorna False se
+        o SQLite não tiver FTS5 (a pesquisa volta ao LIKE).
+        """
+        existing = {row[0] for row in self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+        try:
+            self._conn.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"[SQLITE] FTS5 indisponível, pesquisa sem índice de texto: {e}")
+            return False
+        for table in SEARCH_TABLES:
+            if table not in existing:
+                self._conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        self._conn.commit()
+        return True
+
+    def _register_functions(self):
+        functions = [
+            ("TIME_TO_SEC", 1, _time_to_sec),
+            ("SEC_TO_TIME", 1, _sec_to_time),
+            ("TIMEDIFF", 2, _timediff),
+            ("DATE_FORMAT", 2, _date_format),
+            ("YEARWEEK", 1, _yearweek),
+            ("YEARWEEK", 2, _yearweek),
+            ("NOW", 0, _now),
+            ("CURDATE", 0, _curdate),
+            ("MONTH", 1, _part('month')),
+            ("YEAR", 1, _part('year')),
+            ("DAY", 1, _part('day'))
+        ]
+        for name, args, function in functions:
+            self._conn.create_function(name, args, function)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._conn.rollback()
+        else:
+            self._conn.commit()
+
+    @property
+    def connection(self):
+        return _ConnectionShim(self)
+
+    def connect(self, timeout=10):
+        return self.connection
+
+    def release_connection(self, broken=False):
+        pass
+
+    def is_available(self):
+        return True
+
+    def close(self):
+        self.instrumentation.stop()
+        self._conn.close()
+
+    @contextmanager
+    def _measure(self, query):
+        self.query_count += 1
+        result = {'rows': None}
+        start = time.perf_counter()
+        try:
+            yield result
+        except Exception as e:
+            self.instrumentation.record(query, time.perf_counter() - start, error=e)
+            raise
+        self.instrumentation.record(query, time.perf_counter() - start, result['rows'])
+
+    def execute_query(self, query, params=None, max_retries=3):
+        """Executa uma query e retorna as linhas como lista de dicts"""
+        with self._lock:
+            cursor = _Cursor(self._conn.cursor(), dictionary=True)
+            try:
+                with self._measure(query) as measure:
+                    cursor.execute(query, params)
+                    result = measure['rows'] = cursor.fetchall() if cursor._cursor.description else []
+                    self._conn.commit()
+                return result
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def fetch_one(self, query, params=None):
+        try:
+            with self._lock:
+                cursor = _Cursor(self._conn.cursor(), dictionary=True)
+                try:
+                    with self._measure(query) as measure:
+                        cursor.execute(query, params)
+                        measure['rows'] = cursor.fetchone()
+                    return measure['rows']
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+        return None
+
+    def execute_query_async(self, query, params=None, callback=None):
+        future = self.thread_pool.submit(self.execute_query, query, params)
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        return future
+
+    def fetch_one_async(self, query, params=None, callback=None):
+        future = self.thread_pool.submit(self.fetch_one, query, params)
+        if callback:
+            future.add_done_callback(lambda f: callback(f.result()))
+        return future
+
+    @contextmanager
+    def stream(self, query, params=None, chunk_size=500, chunks=False):
+        """Mesma interface de DatabaseConnection.stream (lock mantido durante a leitura)"""
+        with self._lock:
+            cursor = _Cursor(self._conn.cursor(), dictionary=True)
+
+            def fetch():
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    if chunks:
+                        yield rows
+                    else:
+                        yield from rows
+            try:
+                with self._measure(query):
+                    cursor.execute(query, params)
+                    yield fetch()
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def transaction(self, ignore_backoff=False):
+        with self._lock:
+            cursor = _Cursor(self._conn.cursor(), dictionary=True)
+            try:
+                yield cursor
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def execute_many(self, query, rows, batch_size=500):
+        """Mesma interface de DatabaseConnection.execute_many"""
+        rows = list(rows)
+        written = 0
+        failures = []
+        with self.transaction() as cursor:
+            for offset in range(0, len(rows), batch_size):
+                batch = rows[offset:offset + batch_size]
+                cursor.execute("SAVEPOINT bulk_batch")
+                try:
+                    with self._measure(query):
+                        cursor.executemany(query, batch)
+                    written += len(batch)
+                    continue
+                except sqlite3.Error:
+                    cursor.execute("ROLLBACK TO SAVEPOINT bulk_batch")
+
+                for index, params in enumerate(batch, start=offset):
+                    cursor.execute("SAVEPOINT bulk_row")
+                    try:
+                        cursor.execute(query, params)
+                        written += 1
+                    except sqlite3.Error as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                        failures.append((index, str(e)))
+        return written, failures
+
+    def execute_transaction(self, statements, max_retries=3):
+        with self.transaction() as cursor:
+            for query, params in statements:
+                with self._measure(query):
+                    cursor.execute(query, params)
+        return True
+
+    def get_liveness_stats(self):
+        return {'backend': 'sqlite', 'queries': self.query_count}
+
+    def get_query_stats(self):
+        return self.instrumentation.snapshot()
@@ -0,0 +1,233 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import Full
+from .connection import DatabaseConnection
+from .local_journal import write_through, resolve_ref
+
+logger = logging.getLogger(__name__)
+
+class SqlExpression:
+    """Valor que deve ser escrito como expressão SQL em vez de parâmetro"""
+    __slots__ = ('sql',)
+
+    def __init__(self, sql):
+        self.sql = sql
+
+    def __repr__(self):
+        return f"SqlExpression({self.sql!r})"
+
+class WriteBehindQueue:
+    """
+    Fila write-behind para atualizações de campos por linha.
+    Atualizações para a mesma linha são mescladas (só os valores finais são
+    escritos) e gravadas em uma única transação por uma thread de trabalho,
+    tirando a latência do banco do loop de 1 segundo da interface.
+    Gravações que não podem ser mescladas (ex.: eventos do log de atividades)
+    são agendadas com defer() e executadas pela mesma thread, em ordem.
+
+    Com o journal local habilitado, lotes que não puderem ir direto ao MySQL
+    (servidor fora, journal com entradas pendentes ou atividade criada
+    offline) são gravados no journal para manter a ordem das mutações.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, db=None, flush_interval=5.0, max_pending=200, enqueue_timeout=5.0):
+        if self._initialized:
+            return
+        self.db = db or DatabaseConnection()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._pending = OrderedDict()  # (tabela, id) -> {coluna: valor}
+        self._calls = deque()  # gravações agendadas com defer(), em ordem
+        self._cond = threading.Condition()
+        self._flush_requested = False
+        self._in_flight = 0
+        self._running = True
+        self.flushed_rows = 0
+        self.merged_updates = 0
+        self._worker = threading.Thread(target=self._run, daemon=True, name="write-behind")
+        self._worker.start()
+        self._initialized = True
+
+    def enqueue(self, row_id, fields, table='atividades'):
+        """
+        Agenda a atualização de campos de uma linha, mesclando com as pendentes.
+        Com a fila cheia força a gravação e espera por espaço; lança queue.Full
+        se não houver espaço dentro de enqueue_timeout.
+        """
+        if row_id is None or not fields:
+            return
+
+        key = (table, row_id)
+        deadline = time.monotonic() + self.enqueue_timeout
+        with self._cond:
+            while key not in self._pending and len(self._pending) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Full(f"Fila write-behind cheia ({self.max_pending} linhas)")
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+
+            if key in self._pending:
+                self._pending[key].update(fields)
+                self.merged_updates += 1
+            else:
+                self._pending[key] = dict(fields)
+
+    def defer(self, write):
+        """
+        Agenda uma gravação (função sem argumentos) para a thread de trabalho.
+        As gravações rodam na ordem de chegada, depois das linhas pendentes;
+        se uma lançar exceção, ela e as seguintes são repetidas no próximo ciclo.
+        """
+        with self._cond:
+            self._calls.append(write)
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def flush(self, wait=True, timeout=10.0):
+        """
+        Solicita a gravação imediata das atualizações pendentes.
+        Com wait=True bloqueia até que tudo que estava na fila seja gravado.
+        Retorna True se a fila foi esvaziada.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if not self._pending and not self._calls and not self._in_flight:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            if not wait:
+                return False
+
+            while self._pending or self._calls or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"[WRITE_BEHIND] Timeout aguardando flush ({len(self._pending)} pendentes)")
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def discard(self, row_id, table='atividades'):
+        """Remove atualizações pendentes de uma linha"""
+        with self._cond:
+            self._pending.pop((table, row_id), None)
+
+    def stop(self, timeout=10.0):
+        """Grava o que estiver pendente e encerra a thread de trabalho"""
+        self.flush(wait=True, timeout=timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'deferred': len(self._calls),
+                'flushed_rows': self.flushed_rows,
+                'merged_updates': self.merged_updates
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._flush_requested and self._running:
+                    self._cond.wait(self.flush_interval)
+                if not self._running and not self._pending and not self._calls:
+                    return
+                requested, self._flush_requested = self._flush_requested, False
+                if not self._pending and not self._calls:
+                    continue
+                batch, calls = self._pending, self._calls
+                self._pending, self._calls = OrderedDict(), deque()
+                self._in_flight = len(batch) + len(calls)
+
+            try:
+                if batch:
+                    self._write(batch)
+                    logger.debug(f"[WRITE_BEHIND] {len(batch)} linha(s) gravada(s)")
+                    with self._cond:
+                        self.flushed_rows += len(batch)
+                    batch = OrderedDict()
+                while calls:
+                    calls[0]()
+                    calls.popleft()
+            except Exception as e:
+                logger.error(f"[WRITE_BEHIND] Erro ao gravar lote, nova tentativa no próximo ciclo: {e}")
+                with self._cond:
+                    # Valores mais novos que chegaram durante a gravação têm precedência
+                    for key, fields in reversed(batch.items()):
+                        merged = dict(fields)
+                        merged.update(self._pending.get(key, {}))
+                        self._pending[key] = merged
+                        self._pending.move_to_end(key, last=False)
+                    self._calls.extendleft(reversed(calls))
+                    # Quem pediu o flush (flush, stop, fila cheia) continua esperando: repete logo
+                    self._flush_requested = self._flush_requested or requested
+                # Evita laço apertado enquanto o banco estiver indisponível
+                time.sleep(1)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _write(self, batch):
+        """
+        Grava o lote direto no banco; com o MySQL fora, backlog no journal ou
+        atividade criada offline ainda não sincronizada, o lote vai para o
+        journal para manter a ordem das mutações
+        """
+        batch = OrderedDict(
+            ((table, resolve_ref(row_id, self.db) if table == 'atividades' else row_id), fields)
+            for (table, row_id), fields in batch.items()
+        )
+
+        def direct():
+            if not self.db.execute_transaction(self._build_statements(batch)):
+                raise ConnectionError("Sem conexão com o banco de dados")
+
+        write_through(self.db, direct, lambda journal: self._spill_to_journal(journal, batch),
+                      *(row_id for _, row_id in batch))
+
+    @staticmethod
+    def _spill_to_journal(journal, batch):
+        for (table, row_id), fields in batch.items():
+            values = {
+                column: {'$sql': value.sql} if isinstance(value, SqlExpression) else value
+                for column, value in fields.items()
+            }
+            if table == 'atividades':
+                journal.record_update(row_id, values)
+            else:
+                statement, params = WriteBehindQueue._build_statements({(table, row_id): fields})[0]
+                journal.record_statement(statement, params)
+
+    @staticmethod
+    def _build_statements(batch):
+        statements = []
+        for (table, row_id), fields in batch.items():
+            assignments = []
+            params = []
+            for column, value in fields.items():
+                if isinstance(value, SqlExpression):
+                    assignments.append(f"{column} = {value.sql}")
+                else:
+                    assignments.append(f"{column} = %s")
+                    params.append(value)
+            params.append(row_id)
+            statements.append((
+                f"UPDATE {table} SET {', '.join(assignments)} WHERE id = %s",
+                tuple(params)
+            ))
+        return statements
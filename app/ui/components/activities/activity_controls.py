@@ -7,13 +7,16 @@ from PIL import Image
 from ..logic.activity_controls_logic import ActivityControlsLogic
 from .activity_form import ActivityForm
 from app.core.time.time_manager import TimeManager, timedelta, Optional, Dict
+from app.core.activity.activity_state import ActivityStateStore
 from app.core.time.time_observer import TimeObserver
+from app.core.time.work_calendar import WorkCalendar, BLOCKED_STATUSES, BREAK_TIME
 from app.ui.notifications.notification_manager import NotificationManager
 from app.ui.dialogs.break_end_dialog import BreakEndDialog
 from app.ui.dialogs.break_start_dialog import BreakStartDialog
 from app.ui.dialogs.company_end_dialog import CompanyEndDialog
 from app.ui.dialogs.company_end_warning_dialog import CompanyEndWarningDialog
 from app.ui.dialogs.time_exceeded_dialog import TimeExceededDialog
+from app.utils.duration import to_hms, to_hours, to_seconds
 from app.utils.tooltip import ToolTip
 
 logger = logging.getLogger(__name__)
@@ -49,6 +52,9 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
         self.load_icons()
 
         self.setup_ui()
+        # Estado das atividades em memória: mudanças (inclusive de outras sessões) atualizam o status
+        self.state_store = ActivityStateStore()
+        self.state_store.subscribe(self._on_state_changed)
         self.check_current_status()
         self.notification_system = NotificationManager()
         self.notification_system.initialize(self.master, self.user_data['nome'])
@@ -191,9 +197,9 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
             current_date = current_time.date()
             current_timestamp = current_time.timestamp()
             time_now = current_time.time()
-            company_end = TimeManager.get_time_object(TimeManager.COMPANY_END_TIME)
-            break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-            break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
+            calendar = WorkCalendar()
+            schedule = calendar.day_schedule()
+            company_end, break_start, break_end = schedule.company_end, schedule.break_start, schedule.break_end
             
             # Garantir que _last_check_date está inicializado
             if not hasattr(self, '_last_check_date'):
@@ -254,10 +260,8 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
                     except Exception as e:
                         logger.error(f"Erro ao mostrar diálogo de fim de expediente: {e}")
             
-            # Bloqueia se for depois do expediente OU horário de almoço (e não estiver desbloqueado)
-            is_blocked = (
-                (time_now >= company_end or break_start <= time_now <= break_end)
-            )
+            # Bloqueia depois do expediente, no intervalo e em dias sem expediente
+            is_blocked = calendar.status_at(current_time) in BLOCKED_STATUSES
 
             # Se estiver bloqueado, desabilita todos os botões e pausa atividade ativa
             if is_blocked:
@@ -494,16 +498,11 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
     def update_daily_time(self, daily_time: timedelta) -> None:
         """Atualiza o display do tempo diário e decimal"""
         try:
-            total_seconds = int(daily_time.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            
             # Atualizar o label de tempo em HH:MM:SS
-            self.daily_hours_label.configure(text=f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            self.daily_hours_label.configure(text=to_hms(daily_time))
             
             # Converter para decimal e atualizar o label
-            decimal_hours = self._convert_to_decimal_hours(daily_time)
+            decimal_hours = to_hours(daily_time)
             self.decimal_hours_label.configure(text=f"{decimal_hours:.3f}")
             
         except Exception as e:
@@ -530,14 +529,10 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
                 """
                 result = self.db.execute_query(query, (activity_info['id'],))
                 
-                if result and result[0]['time_exceeded'] != '00:00:00':
+                if result and to_seconds(result[0]['time_exceeded']) > 0:
                     # Atualizar o status no banco apenas se o tempo foi realmente excedido
-                    update_query = """
-                        UPDATE atividades 
-                        SET time_exceeded = TRUE 
-                        WHERE id = %s
-                    """
-                    self.db.execute_query(update_query, (activity_info['id'],))
+                    # (gravação assíncrona pela fila write-behind)
+                    self.time_manager.writer.enqueue(activity_info['id'], {'time_exceeded': True})
                     
                     # Atualizar a interface
                     self.refresh_activities()
@@ -552,21 +547,10 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
             logger.error(f"Erro ao processar tempo excedido: {e}")
 
     def check_current_status(self):
-        """Verifica e atualiza status atual"""
+        """Verifica e atualiza status atual a partir do estado em memória"""
         try:
-            query = """
-                SELECT id, description, atividade, start_time, end_time, 
-                       ativo, pausado, concluido
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-                LIMIT 1
-            """
-            result = self.logic.db.execute_query(query, (self.user_data['id'],))
-            if result and result[0]:
-                activity = result[0]
+            activity = self.state_store.running_activity()
+            if activity:
                 self.active_activity = activity
                 if self.active_activity_label:
                     self.active_activity_label.configure(
@@ -598,11 +582,17 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
         """Limpa referências quando o widget for destruído"""
         try:
             if event.widget == self:
+                self.state_store.unsubscribe(self._on_state_changed)
                 self.active_activity = None
                 self.selected_activity = None
         except Exception as e:
             logger.error(f"Erro ao limpar referências: {e}")
 
+    def _on_state_changed(self):
+        """Estado das atividades alterado: atualiza o status exibido"""
+        if self.winfo_exists():
+            self.check_current_status()
+
     def on_activity_selected(self, activity):
         """Manipula seleção de atividade na tabela"""
         try:
@@ -630,14 +620,7 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
     def check_if_blocked(self) -> bool:
         """Verifica se as ações estão bloqueadas"""
         try:
-            current_time = datetime.now().time()
-            company_end = TimeManager.get_time_object(TimeManager.COMPANY_END_TIME)
-            break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-            break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
-            
-            is_blocked = (
-                (current_time >= company_end or break_start <= current_time <= break_end)
-            )
+            is_blocked = WorkCalendar().status_at() in BLOCKED_STATUSES
             
             if is_blocked:
                 messagebox.showwarning(
@@ -663,11 +646,10 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
                 logger.debug("[BOTÃO] Tentando criar atividade")
                 if not self.active_activity:
                     # Verificar horário comercial antes de criar
-                    current_time = datetime.now().time()
-                    break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-                    break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
+                    calendar = WorkCalendar()
+                    break_start, break_end = calendar.day_schedule().break_start, calendar.day_schedule().break_end
                     
-                    if break_start <= current_time <= break_end:
+                    if calendar.status_at() == BREAK_TIME:
                         if not messagebox.askyesno(
                             "Horário de Intervalo",
                             f"Você está no horário de intervalo ({break_start.strftime('%H:%M')} - {break_end.strftime('%H:%M')}).\n"
@@ -775,20 +757,7 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
 
     def _has_active_activities(self):
         """Verifica se existem atividades ativas além da atual"""
-        try:
-            query = """
-                SELECT COUNT(*) as count
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-            """
-            result = self.logic.db.execute_query(query, (self.user_data['id'],))
-            return result[0]['count'] > 0 if result else False
-        except Exception as e:
-            logger.error(f"Erro ao verificar atividades ativas: {e}")
-            return False
+        return self.state_store.has_running()
 
     def show_activity_form(self):
         """Exibe o formulário de criação de atividade"""
@@ -796,11 +765,10 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
             # Verificar se não há atividade ativa
             if not self.active_activity:
                 # Verificar horário comercial antes de criar
-                current_time = datetime.now().time()
-                break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-                break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
+                calendar = WorkCalendar()
+                break_start, break_end = calendar.day_schedule().break_start, calendar.day_schedule().break_end
                 
-                if break_start <= current_time <= break_end:
+                if calendar.status_at() == BREAK_TIME:
                     if not messagebox.askyesno(
                         "Horário de Intervalo",
                         f"Você está no horário de intervalo ({break_start.strftime('%H:%M')} - {break_end.strftime('%H:%M')}).\n"
@@ -907,11 +875,10 @@ class ActivityControls(ctk.CTkFrame, TimeObserver):
                 return
 
             # Verificar horário comercial
-            current_time = datetime.now().time()
-            break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-            break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
+            calendar = WorkCalendar()
+            break_start, break_end = calendar.day_schedule().break_start, calendar.day_schedule().break_end
             
-            if break_start <= current_time <= break_end:
+            if calendar.status_at() == BREAK_TIME:
                 if not messagebox.askyesno(
                     "Horário de Intervalo",
                     f"Você está no horário de intervalo ({break_start.strftime('%H:%M')} - {break_end.strftime('%H:%M')}).\n"
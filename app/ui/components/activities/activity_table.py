@@ -1,9 +1,10 @@
 import customtkinter as ctk
 from tkinter import ttk
-import threading
 import time
 import logging
-from ..logic.activity_table_logic import ActivityTableLogic
+from ..logic.activity_table_logic import ActivityTableLogic, diff_rows, row_version
+from ....core.time.scheduler import DeadlineScheduler
+from ....utils.ui_tasks import UITaskRunner
 
 logger = logging.getLogger(__name__)
 
@@ -12,10 +13,12 @@ class ActivityTable(ctk.CTkFrame):
         super().__init__(parent)
         self.logic = ActivityTableLogic(db)
         self.user_data = user_data
-        self.update_thread = None
+        self.scheduler = DeadlineScheduler()
+        self.tasks = UITaskRunner()
         self.should_update = True
         self.current_period = "Dia"
-        self.last_update = 0  # Força primeira atualização imediata
+        self._versions = {}  # id -> versão da linha exibida
+        self._fetching = False
         self.setup_ui()
         self.configure_ttk_style()
         self.start_update_thread()
@@ -73,6 +76,15 @@ class ActivityTable(ctk.CTkFrame):
             troughcolor="#2b2b2b" if is_dark else "#F5F5F5"
         )
         
+        # Cores de cada status, configuradas uma única vez como tags
+        status_colors = {
+            'ativo': '#FF0000',
+            'pausado': '#00AA46' if is_dark else '#377D22',  # Verde mais escuro no light
+            'concluído': '#848484'  # Cinza igual para ambos
+        }
+        for tag_name, color in status_colors.items():
+            self.tree.tag_configure(tag_name, foreground=color)
+        
     def setup_ui(self):
         """Configura a interface da tabela"""
         # Frame para conter a tabela e scrollbar
@@ -152,106 +164,119 @@ class ActivityTable(ctk.CTkFrame):
             logger.error(f"Erro ao processar duplo clique: {e}")
 
     def start_update_thread(self):
-        self.should_update = True
-        self.update_thread = threading.Thread(
-            target=self.update_loop,
-            daemon=True
-        )
-        self.update_thread.start()
-        
-    def update_loop(self):
-        """Loop de atualização otimizado para atualizar a cada minuto"""
-        while self.should_update:
-            try:
-                current_time = time.time()
-                # Verifica se passou 5 segundos desde a última atualização
-                if current_time - self.last_update >= 5:
-                    logger.debug("[TABLE] Executando atualização periódica")
-                    # Usa o after_idle para garantir execução na thread principal
-                    if self.winfo_exists():
-                        self.after_idle(self.update_activities)
-                    self.last_update = current_time
-                
-                # Dormir por 1 segundo antes da próxima verificação
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Erro no loop de atualização: {e}")
-                time.sleep(5)  # Espera mais tempo em caso de erro
-
-    def start_update_thread(self):
-        """Inicia a thread de atualização apenas se o widget existir"""
+        """Inscreve a atualização periódica (a cada 5 segundos) no tick do agendador"""
         if self.winfo_exists():
             self.should_update = True
-            self.update_thread = threading.Thread(
-                target=self.update_loop,
-                daemon=True
-            )
-            self.update_thread.start()
+            self.scheduler.attach(self)
+            self.after_idle(self.update_activities)  # Primeira atualização imediata
+            self.scheduler.subscribe_tick(self.update_loop, every=5)
+        
+    def update_loop(self, now=None):
+        """Atualização periódica disparada pelo tick do agendador (já na thread da interface)"""
+        if not self.should_update:
+            return
+        logger.debug("[TABLE] Executando atualização periódica")
+        self.update_activities()
 
     def update_activities(self, filter_period=None):
-        """Atualiza a lista de atividades com melhor logging"""
+        """Busca as atividades em uma thread de trabalho e aplica apenas as diferenças"""
         try:
             if not self.winfo_exists():
                 return
             
             # Atualiza o período apenas se um novo for explicitamente passado
-            if filter_period is not None:
+            period_changed = filter_period is not None and filter_period != self.current_period
+            if period_changed:
                 self.current_period = filter_period
                 logger.debug(f"[TABLE] Período atualizado para: {self.current_period}")
+            elif self._fetching:
+                # Atualização periódica com uma busca em andamento: aguarda o resultado dela
+                return
+            self._fetching = True
             
-            logger.debug(f"[TABLE] Iniciando atualização periódica - {time.strftime('%H:%M:%S')}")
-            activities = self.logic.get_activities(self.user_data['id'], self.current_period)
+            logger.debug(f"[TABLE] Iniciando atualização - {time.strftime('%H:%M:%S')}")
+            user_id, period = self.user_data['id'], self.current_period
+            # A mesma chave descarta o resultado de uma busca do período anterior
+            self.tasks.submit(
+                self,
+                lambda: self.logic.get_activities(user_id, period),
+                on_success=self._apply_activities,
+                on_error=self._on_fetch_error,
+                key=(id(self), 'activities')
+            )
+                    
+        except Exception as e:
+            self._on_fetch_error(e)
+
+    def _on_fetch_error(self, error):
+        self._fetching = False
+        logger.error(f"[TABLE] Erro ao atualizar atividades: {error}")
+
+    def _apply_activities(self, activities):
+        """Aplica na Treeview só as linhas inseridas, alteradas, removidas ou movidas"""
+        self._fetching = False
+        try:
+            ids = {str(row_id): row_id for row_id in self._versions}
+            order = [ids[item] for item in self.tree.get_children()]
+            diff = diff_rows(order, self._versions, activities)
+            if diff.empty:
+                return
             
-            # Salvar seleção atual
-            selected_items = self.tree.selection()
-            selected_ids = [self.tree.item(item)['values'][0] for item in selected_items]
+            tree = self.tree
+            selected = set(tree.selection())
+            if diff.deletes:
+                tree.delete(*map(str, diff.deletes))
+            if diff.moves:
+                # Retira as linhas fora de ordem; as que ficam já estão na ordem certa
+                tree.detach(*map(str, diff.moves))
             
-            # Determina as cores baseado no modo
-            is_dark = ctk.get_appearance_mode() == "Dark"
+            inserted = {activity['id']: activity for activity in diff.inserts}
+            for index, row_id in diff.placements:
+                if row_id in inserted:
+                    activity = inserted[row_id]
+                    tree.insert('', index, iid=str(row_id), values=self._row_values(activity),
+                                tags=self._row_tags(activity))
+                else:
+                    tree.move(str(row_id), '', index)
             
-            # Define cores para cada status baseado no tema
-            status_colors = {
-                'Ativo': '#FF0000' if is_dark else '#FF0000',    # Vermelho mais suave no dark
-                'Pausado': '#00AA46' if is_dark else '#377D22',  # Verde mais escuro no light
-                'Concluído': '#848484'  # Cinza igual para ambos
-            }
+            for activity in diff.updates:
+                tree.item(str(activity['id']), values=self._row_values(activity),
+                          tags=self._row_tags(activity))
             
-            # Limpar tabela
-            self.tree.delete(*self.tree.get_children())
+            # detach() remove as linhas movidas da seleção
+            reselect = [str(row_id) for row_id in diff.moves if str(row_id) in selected]
+            if reselect:
+                tree.selection_add(*reselect)
             
-            # Preencher dados
-            for activity in activities:
-                values = (
-                    activity['id'],
-                    activity['description'],
-                    activity['atividade'],
-                    activity['start_time'],
-                    activity['end_time'],
-                    activity['time_exceeded'],
-                    activity['total_time'],
-                    activity['status']
-                )
-                item = self.tree.insert('', 'end', values=values)
-                
-                # Aplicar cores baseado no status e tema
-                status = activity['status']
-                if status in status_colors:
-                    color = status_colors[status]
-                    tag_name = f'{status.lower()}'
-                    self.tree.tag_configure(tag_name, foreground=color)
-                    self.tree.item(item, tags=(tag_name,))
-                
-                # Restaurar seleção
-                if activity['id'] in selected_ids:
-                    self.tree.selection_add(item)
+            for row_id in diff.deletes:
+                self._versions.pop(row_id, None)
+            for activity in diff.inserts + diff.updates:
+                self._versions[activity['id']] = row_version(activity)
             
-            logger.debug(f"[TABLE] Atualização concluída - {time.strftime('%H:%M:%S')}")
-                    
+            logger.debug(
+                f"[TABLE] Atualização concluída: {len(diff.inserts)} nova(s), {len(diff.updates)} alterada(s), "
+                f"{len(diff.deletes)} removida(s), {len(diff.moves)} movida(s)"
+            )
         except Exception as e:
-            logger.error(f"[TABLE] Erro ao atualizar atividades: {e}")
+            logger.error(f"[TABLE] Erro ao aplicar atualização: {e}")
+
+    @staticmethod
+    def _row_values(activity):
+        return (
+            activity['id'],
+            activity['description'],
+            activity['atividade'],
+            activity['start_time'],
+            activity['end_time'],
+            activity['time_exceeded'],
+            activity['total_time'],
+            activity['status']
+        )
+
+    @staticmethod
+    def _row_tags(activity):
+        return (activity['status'].lower(),)
                 
     def on_destroy(self, event):
         self.should_update = False
-        if self.update_thread and self.update_thread.is_alive():
-            self.update_thread.join(timeout=1.0)
\ No newline at end of file
+        self.scheduler.unsubscribe_tick(self.update_loop)
\ No newline at end of file
@@ -1,4 +1,6 @@
 import logging
+from ....core.activity.activity_transitions import ActivityTransitions, STATUS_PAUSED
+from ....core.activity.activity_state import ActivityStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -7,8 +9,12 @@ class ActivityControlsLogic:
         self.db = db_connection
 
     def get_active_activity(self, user_id):
-        """Busca a atividade ativa do usuário"""
+        """Busca a atividade ativa do usuário (do ActivityStateStore para o usuário logado)"""
         try:
+            store = ActivityStateStore()
+            if store.covers(user_id):
+                return store.open_activity()
+            
             query = """
                 SELECT * FROM atividades
                 WHERE user_id = %s 
@@ -64,74 +70,27 @@ class ActivityControlsLogic:
                 
         return states
 
-    def update_activity_status(self, activity_id, new_status):
+    def update_activity_status(self, activity_id, new_status, expected_version=None):
         """
-        Atualiza o status de uma atividade no banco de dados.
+        Atualiza o status de uma atividade no banco de dados (um único UPDATE
+        condicional; com o MySQL fora, enfileirado no journal local).
         """
         try:
-            # Primeiro verificar o status atual da atividade
-            status_query = """
-                SELECT pausado
-                FROM atividades 
-                WHERE id = %s
-            """
-            result = self.db.execute_query(status_query, (activity_id,))
-            
-            if not result:
-                return False, "Atividade não encontrada"
-                
-            is_paused = result[0]['pausado']
-            
-            # Se estiver concluindo uma atividade pausada
-            if new_status == 'concluido' and is_paused:
-                query = """
-                    UPDATE atividades
-                    SET concluido = TRUE,
-                        ativo = FALSE,
-                        pausado = FALSE
-                    WHERE id = %s
-                """
-                self.db.execute_query(query, (activity_id,))
-                return True, "Atividade concluída com sucesso!"
-                
-            # Para outros casos, manter a lógica existente
-            status_values = {
-                'ativo': {'ativo': True, 'pausado': False, 'concluido': False},
-                'pausado': {'ativo': False, 'pausado': True, 'concluido': False},
-                'concluido': {'ativo': False, 'pausado': False, 'concluido': True}
-            }
-            
-            if new_status not in status_values:
-                return False, f"Status inválido: {new_status}"
-
-            values = status_values[new_status]
-            query = """
-                UPDATE atividades
-                SET ativo = %s,
-                    pausado = %s,
-                    concluido = %s
-                WHERE id = %s
-            """
-            params = (values['ativo'], values['pausado'], values['concluido'], activity_id)
-            self.db.execute_query(query, params)
-            
-            return True, f"Atividade {new_status} com sucesso!"
-                
+            result = ActivityTransitions(self.db).transition(activity_id, new_status, expected_version)
+            return result.ok, result.message
+        except ValueError:
+            return False, f"Status inválido: {new_status}"
         except Exception as e:
             logger.error(f"Erro ao atualizar status da atividade: {e}")
             return False, f"Erro ao atualizar status: {e}"
 
     def pause_all_active_activities(self, user_id):
         """
-        Pausa todas as atividades ativas do usuário (seta ativo=FALSE, pausado=TRUE onde ativo=TRUE e concluido=FALSE)
+        Pausa todas as atividades em andamento do usuário em uma única transação
         """
         try:
-            query = """
-                UPDATE atividades
-                SET ativo = FALSE, pausado = TRUE
-                WHERE user_id = %s AND ativo = TRUE AND concluido = FALSE
-            """
-            self.db.execute_query(query, (user_id,))
+            paused = ActivityTransitions(self.db).transition_all(user_id, STATUS_PAUSED)
+            logger.debug(f"[DB] {len(paused)} atividade(s) pausada(s) para o usuário {user_id}")
             return True
         except Exception as e:
             logger.error(f"Erro ao pausar todas as atividades ativas: {e}")
@@ -1,8 +1,74 @@
-from datetime import timedelta
 import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Tuple
+from ....utils.date_ranges import period_range, range_clause
+from ....utils.duration import to_hms
 
 logger = logging.getLogger(__name__)
 
+class TableDiff(NamedTuple):
+    """Diferença entre as linhas exibidas e as recém-buscadas"""
+    deletes: List[Any]                 # ids que saíram da tabela
+    updates: List[Dict]                # linhas existentes com nova versão
+    moves: List[Any]                   # ids existentes que mudaram de posição
+    inserts: List[Dict]                # linhas novas
+    placements: List[Tuple[int, Any]]  # (posição final, id) de moves e inserts, em ordem crescente
+
+    @property
+    def empty(self) -> bool:
+        return not (self.deletes or self.updates or self.moves or self.inserts)
+
+def row_version(activity: Dict) -> Tuple:
+    """Versão da linha: muda a cada UPDATE da atividade (version e updated_at)"""
+    return (activity.get('version'), activity.get('row_updated_at'))
+
+def _stable_ids(ids: List[Any], old_index: Dict[Any, int]) -> set:
+    """
+    Maior subsequência de ids que já está na ordem antiga (LIS): essas linhas
+    ficam onde estão e só as demais precisam ser movidas
+    """
+    tails, tail_pos, previous = [], [], [None] * len(ids)
+    for pos, row_id in enumerate(ids):
+        index = old_index[row_id]
+        slot = bisect_left(tails, index)
+        if slot == len(tails):
+            tails.append(index)
+            tail_pos.append(pos)
+        else:
+            tails[slot] = index
+            tail_pos[slot] = pos
+        previous[pos] = tail_pos[slot - 1] if slot else None
+    stable, pos = set(), tail_pos[-1] if tail_pos else None
+    while pos is not None:
+        stable.add(ids[pos])
+        pos = previous[pos]
+    return stable
+
+def diff_rows(old_order: List[Any], old_versions: Dict[Any, Tuple], rows: List[Dict]) -> TableDiff:
+    """
+    Compara as linhas exibidas (ordem e versão por id) com as novas linhas.
+    O custo de aplicar o resultado na Treeview é proporcional ao que mudou.
+    """
+    new_ids = {row['id'] for row in rows}
+    deletes = [row_id for row_id in old_order if row_id not in new_ids]
+    kept = [row['id'] for row in rows if row['id'] in old_versions]
+    old_index = {row_id: index for index, row_id in enumerate(old_order)}
+    stable = _stable_ids(kept, old_index)
+
+    updates, moves, inserts, placements = [], [], [], []
+    for index, row in enumerate(rows):
+        row_id = row['id']
+        if row_id not in old_versions:
+            inserts.append(row)
+            placements.append((index, row_id))
+            continue
+        if old_versions[row_id] != row_version(row):
+            updates.append(row)
+        if row_id not in stable:
+            moves.append(row_id)
+            placements.append((index, row_id))
+    return TableDiff(deletes, updates, moves, inserts, placements)
+
 class ActivityTableLogic:
     def __init__(self, db_connection):
         self.db = db_connection
@@ -23,6 +89,8 @@ class ActivityTableLogic:
                     DATE_FORMAT(start_time, '%d/%m/%Y %H:%i') as start_time,
                     DATE_FORMAT(end_time, '%d/%m/%Y %H:%i') as end_time,
                     DATE_FORMAT(updated_at, '%d/%m/%Y %H:%i') as updated_at,
+                    DATE_FORMAT(updated_at, '%Y-%m-%d %H:%i:%s') as row_updated_at,
+                    COALESCE(version, 0) as version,
                     COALESCE(time_exceeded, '00:00:00') as time_exceeded,
                     COALESCE(total_time, '00:00:00') as total_time,
                     CASE
@@ -40,21 +108,20 @@ class ActivityTableLogic:
 
             params = [user_id]
             
-            if period == "Dia":
-                query += """ AND (
-                    DATE(start_time) = CURRENT_DATE() OR 
-                    DATE(updated_at) = CURRENT_DATE()
+            # Intervalos semiabertos [início, fim) para usar os índices de data
+            if period in ("Dia", "Semana"):
+                start, end = period_range(period)
+                query += f""" AND (
+                    ({range_clause('start_time')}) OR 
+                    ({range_clause('updated_at')})
                 )"""
-            elif period == "Semana":
-                query += """ AND (
-                    YEARWEEK(start_time, 1) = YEARWEEK(CURRENT_DATE(), 1) OR
-                    YEARWEEK(updated_at, 1) = YEARWEEK(CURRENT_DATE(), 1)
-                )"""
-            elif period == "Mês":
-                query += " AND YEAR(start_time) = YEAR(CURRENT_DATE()) AND MONTH(start_time) = MONTH(CURRENT_DATE())"
-            elif period == "Ano":
-                query += " AND YEAR(start_time) = YEAR(CURRENT_DATE())"
+                params.extend([start, end, start, end])
+            elif period in ("Mês", "Ano"):
+                start, end = period_range(period)
+                query += f" AND {range_clause('start_time')}"
+                params.extend([start, end])
                 
+            today_start, _ = period_range("day")
             query += """
                 ORDER BY 
                     CASE 
@@ -64,10 +131,11 @@ class ActivityTableLogic:
                         ELSE 4
                     END,
                     CASE 
-                        WHEN DATE(updated_at) = CURRENT_DATE() THEN updated_at
+                        WHEN updated_at >= %s THEN updated_at
                         ELSE start_time
                     END DESC
             """
+            params.append(today_start)
 
             #logger.debug(f"[FILTER] Query final: {query}")
             results = self.db.execute_query(query, tuple(params))
@@ -83,6 +151,8 @@ class ActivityTableLogic:
                         'start_time': activity['start_time'],
                         'end_time': activity['end_time'],
                         'updated_at': activity['updated_at'],
+                        'row_updated_at': activity['row_updated_at'],
+                        'version': activity['version'],
                         'time_exceeded': activity['time_exceeded'],
                         'total_time': self._format_total_time(activity['total_time']),
                         'status': activity['status'],
@@ -104,40 +174,10 @@ class ActivityTableLogic:
     def _format_total_time(self, time_value) -> str:
         """
         Formata o tempo total para exibição.
-        Aceita timedelta, string HH:MM:SS ou segundos
+        Aceita timedelta, string HH:MM:SS, segundos ou Duration
         """
         try:
-            if not time_value:
-                return "00:00:00"
-
-            # Se já for timedelta
-            if isinstance(time_value, timedelta):
-                total_seconds = int(time_value.total_seconds())
-            
-            # Se for string no formato HH:MM:SS
-            elif isinstance(time_value, str) and ":" in time_value:
-                try:
-                    hours, minutes, seconds = map(int, time_value.split(":"))
-                    total_seconds = hours * 3600 + minutes * 60 + seconds
-                except ValueError:
-                    logger.warning(f"Formato de tempo inválido: {time_value}")
-                    return "00:00:00"
-            
-            # Se for número (segundos)
-            else:
-                try:
-                    total_seconds = int(float(str(time_value)))
-                except (ValueError, TypeError):
-                    logger.warning(f"Valor de tempo inválido: {time_value}")
-                    return "00:00:00"
-
-            # Calcula horas, minutos e segundos
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-
-            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
-        except Exception as e:
-            logger.error(f"Erro ao formatar tempo: {e}")
-            return "00:00:00"
\ No newline at end of file
+            return to_hms(time_value)
+        except (TypeError, ValueError):
+            logger.warning(f"Valor de tempo inválido: {time_value}")
+            return "00:00:00"
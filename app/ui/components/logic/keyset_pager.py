@@ -0,0 +1,145 @@
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Linhas por página e páginas mantidas na Treeview ao mesmo tempo
+PAGE_SIZE = 200
+MAX_PAGES = 5
+
+_ESTIMATE_QUERY = """
+    SELECT TABLE_ROWS as total
+    FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+"""
+
+class KeysetPager:
+    """
+    Páginas de uma consulta por keyset: cada página continua a partir da
+    chave da última linha (WHERE a.id < %s ORDER BY a.id DESC LIMIT n), usando
+    o índice da chave em vez de OFFSET. O custo de uma página não depende de
+    quantas linhas existem antes dela.
+
+    keys: colunas da ordenação como (expressão SQL, nome na linha), da mais
+    significativa para a última, que deve ser única (ex.: a chave primária).
+    """
+
+    def __init__(self, db, columns: str, source: str, keys: Sequence[Tuple[str, str]],
+                 where: Optional[str] = None, params: Sequence = (), descending: bool = True,
+                 page_size: int = PAGE_SIZE, estimate_table: Optional[str] = None):
+        self.db = db
+        self.columns = columns
+        self.source = source
+        self.keys = list(keys)
+        self.where = where
+        self.params = tuple(params)
+        self.descending = descending
+        self.page_size = page_size
+        self.estimate_table = estimate_table
+
+    def key_of(self, row: Dict) -> Tuple:
+        return tuple(row[name] for _, name in self.keys)
+
+    def fetch_after(self, key: Optional[Tuple] = None) -> List[Dict]:
+        """Página seguinte à chave (a primeira página se key for None)"""
+        return self._fetch(key, forward=True)
+
+    def fetch_before(self, key: Tuple) -> List[Dict]:
+        """Página anterior à chave, na ordem de exibição"""
+        rows = self._fetch(key, forward=False)
+        rows.reverse()
+        return rows
+
+    def count(self) -> Tuple[int, bool]:
+        """
+        Total de linhas: (total, estimado). Sem filtro, usa a estimativa de
+        information_schema (MySQL); com filtro ou sem estimativa, COUNT(*).
+        """
+        if self.estimate_table and not self.where:
+            try:
+                rows = self.db.execute_query(_ESTIMATE_QUERY, (self.estimate_table,))
+                if rows and rows[0]['total']:
+                    return int(rows[0]['total']), True
+            except Exception as e:
+                logger.debug(f"[PAGER] Estimativa indisponível, usando COUNT(*): {e}")
+        query = f"SELECT COUNT(*) as total {self.source}"
+        if self.where:
+            query += f" WHERE {self.where}"
+        rows = self.db.execute_query(query, self.params)
+        return (int(rows[0]['total']) if rows else 0), False
+
+    def _fetch(self, key, forward):
+        descending = self.descending == forward
+        conditions = [self.where] if self.where else []
+        params = list(self.params)
+        if key is not None:
+            clause, seek_params = self._seek_clause(key, '<' if descending else '>')
+            conditions.append(clause)
+            params.extend(seek_params)
+        direction = "DESC" if descending else "ASC"
+        query = f"SELECT {self.columns} {self.source}"
+        if conditions:
+            query += " WHERE " + " AND ".join(f"({condition})" for condition in conditions)
+        query += " ORDER BY " + ", ".join(f"{column} {direction}" for column, _ in self.keys)
+        query += f" LIMIT {int(self.page_size)}"
+        return list(self.db.execute_query(query, tuple(params)) or [])
+
+    def _seek_clause(self, key, op):
+        """(k1 op v1) OR (k1 = v1 AND k2 op v2) OR ... para chaves compostas"""
+        alternatives, params = [], []
+        for index, (column, _) in enumerate(self.keys):
+            parts = [f"{previous} = %s" for previous, _ in self.keys[:index]] + [f"{column} {op} %s"]
+            alternatives.append(" AND ".join(parts))
+            params.extend(key[:index + 1])
+        return " OR ".join(f"({alternative})" for alternative in alternatives), params
+
+class PageWindow:
+    """
+    Janela de páginas exibidas: ao passar de max_pages, a página da outra
+    ponta é descartada e volta a ser buscada se a rolagem retornar a ela.
+    """
+
+    def __init__(self, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES):
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.reset()
+
+    def reset(self):
+        self.pages = deque()
+        self.at_start = True   # a primeira página da consulta está na janela
+        self.at_end = False    # a última página da consulta está na janela
+
+    @property
+    def rows(self) -> List[Dict]:
+        return [row for page in self.pages for row in page]
+
+    def first_row(self) -> Optional[Dict]:
+        return self.pages[0][0] if self.pages else None
+
+    def last_row(self) -> Optional[Dict]:
+        return self.pages[-1][-1] if self.pages else None
+
+    def append(self, page: List[Dict]) -> List[Dict]:
+        """Acrescenta uma página no fim; retorna as linhas descartadas do início"""
+        if len(page) < self.page_size:
+            self.at_end = True
+        if not page:
+            return []
+        self.pages.append(page)
+        if len(self.pages) > self.max_pages:
+            self.at_start = False
+            return self.pages.popleft()
+        return []
+
+    def prepend(self, page: List[Dict]) -> List[Dict]:
+        """Acrescenta uma página no início; retorna as linhas descartadas do fim"""
+        if len(page) < self.page_size:
+            self.at_start = True
+        if not page:
+            return []
+        self.pages.appendleft(page)
+        if len(self.pages) > self.max_pages:
+            self.at_end = False
+            return self.pages.pop()
+        return []
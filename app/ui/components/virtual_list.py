@@ -0,0 +1,120 @@
+import logging
+from .logic.keyset_pager import PageWindow, MAX_PAGES
+from ...utils.ui_tasks import UITaskRunner, busy_cursor
+
+logger = logging.getLogger(__name__)
+
+# Fração da rolagem a partir da qual a próxima página é buscada
+PREFETCH_THRESHOLD = 0.15
+
+class VirtualList:
+    """
+    Lista virtual sobre uma ttk.Treeview existente.
+
+    Exibe apenas uma janela de páginas do KeysetPager: a próxima (ou a
+    anterior) é buscada em segundo plano quando a rolagem se aproxima do fim
+    (ou do início) da janela, e a página da outra ponta é descartada. O total
+    vem de pager.count() (estimativa ou COUNT(*)), entregue a on_total.
+    Abrir a lista custa uma página, independente do tamanho da tabela.
+    """
+
+    def __init__(self, tree, scrollbar, row_values, on_total=None, max_pages=MAX_PAGES):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.on_total = on_total
+        self.max_pages = max_pages
+        self.tasks = UITaskRunner()
+        self.pager = None
+        self.window = None
+        self._loading = False
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    def load(self, pager):
+        """Troca a consulta exibida; buscas da consulta anterior são descartadas"""
+        self.pager = pager
+        self.window = PageWindow(pager.page_size, self.max_pages)
+        self.tree.delete(*self.tree.get_children())
+        self._loading = False
+        self._request('after', None)
+        self.tasks.submit(
+            self.tree,
+            pager.count,
+            on_success=lambda result: self.on_total and self.on_total(*result),
+            on_error=lambda e: logger.error(f"[LIST] Erro ao contar linhas: {e}"),
+            key=(id(self), 'count')
+        )
+
+    def show(self, rows, key='id'):
+        """Exibe uma lista fixa já limitada (ex.: resultados de pesquisa), sem paginação"""
+        self.tasks.cancel((id(self), 'page'))
+        self.tasks.cancel((id(self), 'count'))
+        self.pager = None
+        self.window = None
+        self._loading = False
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[key]), values=self.row_values(row))
+
+    def refresh(self):
+        """Recarrega a consulta atual a partir do início"""
+        if self.pager is not None:
+            self.load(self.pager)
+
+    # ------------------------------------------------------------- rolagem
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.window is None or self._loading:
+            return
+        if float(last) >= 1 - PREFETCH_THRESHOLD and not self.window.at_end:
+            row = self.window.last_row()
+            if row is not None:
+                self._request('after', self.pager.key_of(row))
+        elif float(first) <= PREFETCH_THRESHOLD and not self.window.at_start:
+            row = self.window.first_row()
+            if row is not None:
+                self._request('before', self.pager.key_of(row))
+
+    def _request(self, direction, key):
+        pager = self.pager
+        fetch = (lambda: pager.fetch_after(key)) if direction == 'after' else (lambda: pager.fetch_before(key))
+        self._loading = True
+        self.tasks.submit(
+            self.tree,
+            fetch,
+            on_success=lambda rows: self._apply(pager, direction, rows),
+            on_error=self._on_error,
+            key=(id(self), 'page'),
+            busy=busy_cursor(self.tree)
+        )
+
+    def _on_error(self, error):
+        self._loading = False
+        logger.error(f"[LIST] Erro ao buscar página: {error}")
+
+    def _iid(self, row):
+        return "|".join(map(str, self.pager.key_of(row)))
+
+    def _apply(self, pager, direction, rows):
+        """Insere a página e descarta a da outra ponta mantendo a linha visível no lugar"""
+        self._loading = False
+        if pager is not self.pager:
+            return
+        tree = self.tree
+        children = tree.get_children()
+        anchor = children[min(len(children) - 1, int(tree.yview()[0] * len(children)))] if children else None
+
+        if direction == 'after':
+            dropped = self.window.append(rows)
+            for row in rows:
+                tree.insert("", "end", iid=self._iid(row), values=self.row_values(row))
+        else:
+            dropped = self.window.prepend(rows)
+            for index, row in enumerate(rows):
+                tree.insert("", index, iid=self._iid(row), values=self.row_values(row))
+        if dropped:
+            tree.delete(*[self._iid(row) for row in dropped if tree.exists(self._iid(row))])
+
+        if anchor is not None and tree.exists(anchor):
+            tree.yview_moveto(tree.index(anchor) / max(1, len(tree.get_children())))
@@ -7,6 +7,11 @@ from ..notifications.notification_manager import NotificationManager
 from ...core.time.time_observer import TimeObserver, Dict, Optional
 from ...core.time.time_manager import TimeManager
 from ...core.time.daily_time_manager import DailyTimeManager
+from ...core.time.scheduler import DeadlineScheduler
+from ...core.time.work_calendar import WorkCalendar
+from ...core.activity.activity_transitions import ActivityTransitions, STATUS_PAUSED
+from ...core.activity.activity_state import ActivityStateStore
+from ...utils.duration import format_decimal_hours, to_hms
 from datetime import datetime, timedelta
 import logging
 
@@ -27,7 +32,15 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
         self.active_activity = None
         self.selected_activity = None
         self.time_manager = TimeManager()
-        self.time_manager.state.set_user_id(user_data['id'])
+        self.time_manager.set_user(user_data)
+        # Estado das atividades carregado no login; verificação de versão periódica
+        self.state_store = ActivityStateStore()
+        if not self.state_store.covers(user_data['id']):
+            try:
+                self.state_store.load(user_data['id'])
+            except Exception as e:
+                logger.error(f"Erro ao carregar estado das atividades: {e}")
+        self.state_store.start(self)
         self.time_manager.add_observer(self)
         self.daily_time_manager = DailyTimeManager()
         self.daily_time_manager.add_observer(self)
@@ -103,12 +116,13 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
         )
         company_hours_title.pack(pady=(5,2))
 
-        # Horários da empresa
+        # Horários da equipe do usuário (calendário de trabalho)
+        schedule = WorkCalendar().day_schedule()
         company_hours = {
-            'start': TimeManager.get_time_tuple(TimeManager.COMPANY_START_TIME),
-            'break_start': TimeManager.get_time_tuple(TimeManager.BREAK_START_TIME),
-            'break_end': TimeManager.get_time_tuple(TimeManager.BREAK_END_TIME),
-            'end': TimeManager.get_time_tuple(TimeManager.COMPANY_END_TIME)
+            'start': (schedule.company_start.hour, schedule.company_start.minute),
+            'break_start': (schedule.break_start.hour, schedule.break_start.minute),
+            'break_end': (schedule.break_end.hour, schedule.break_end.minute),
+            'end': (schedule.company_end.hour, schedule.company_end.minute)
         }
 
         # Container para os horários
@@ -212,7 +226,7 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
         self.total_time_label.pack(pady=(0,5))
 
         # Iniciar atualização do relógio
-        self.update_clock()
+        self._start_clock()
 
     def handle_activity_action(self, action):
         """Redireciona ações de atividade para o ActivityControls"""
@@ -280,125 +294,82 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
         except Exception as e:
             logger.error(f"Erro ao atualizar display do timer: {e}")
 
-    def update_clock(self):
-        current_time = datetime.now()
+    def _start_clock(self):
+        """
+        Inscreve o relógio no tick do agendador e agenda as verificações de
+        horário comercial nas transições do calendário de trabalho (e na virada
+        do dia). A pausa no fim do expediente fica a cargo do TimeManager.
+        """
+        self.scheduler = DeadlineScheduler()
+        self.calendar = WorkCalendar()
+        self.scheduler.attach(self)
+        self.calendar.start(self)
+        self.update_clock(datetime.now())
+        self.scheduler.subscribe_tick(self.update_clock)
+        self._on_calendar_transition()
+
+        self.bind('<Destroy>', self._stop_clock)
+
+    def _on_calendar_transition(self):
+        self.check_company_hours_notice()
+        transition = self.calendar.next_transition()
+        if transition:
+            self.scheduler.schedule_at(transition[0], self._on_calendar_transition, name='calendar_notice')
+
+    def _stop_clock(self, event=None):
+        self.scheduler.unsubscribe_tick(self.update_clock)
+        self.scheduler.cancel('calendar_notice')
+        self.calendar.stop()
+        self.state_store.stop()
+
+    def update_clock(self, current_time: datetime):
+        """Atualiza relógio e horas diárias a cada tick do agendador"""
+        if not self.winfo_exists():
+            return
         self.clock_label.configure(text=current_time.strftime("%H:%M:%S"))
         self.date_label.configure(text=current_time.strftime("%d/%m/%Y"))
         
-        # Verificar mudança de dia
-        self.daily_time_manager.check_day_change()
-        
-        # Verificar horários comerciais
-        time_status = self.notification_manager.check_company_hours()
-        if time_status != "working_hours":
-            # Buscar atividade ativa se houver
-            query = """
-                SELECT id, atividade 
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-                LIMIT 1
-            """
-            result = self.db.execute_query(query, (self.user_data['id'],))
-            activity_info = result[0] if result else None
+        # Atualizar tempo diário se estiver rodando
+        if self.daily_time_manager.is_running:
+            self.daily_time_manager.update_daily_hours()
+
+    def check_company_hours_notice(self):
+        """Notifica o status do horário comercial (chamado apenas quando o status muda)"""
+        try:
+            # Verificar mudança de dia
+            self.daily_time_manager.check_day_change()
+
+            time_status = self.notification_manager.check_company_hours()
+            if time_status == "working_hours":
+                return
+
+            # Atividade em andamento, se houver (estado em memória)
+            activity_info = self.state_store.running_activity()
             
             # Notificar sobre horário comercial
             self.notification_manager.notify_company_hours(time_status, activity_info)
-        
-        current_time = current_time.time()
-        company_end = TimeManager.get_time_object(TimeManager.COMPANY_END_TIME)
-        
-        try:
-            # Verificar horário de fim do expediente
-            if current_time >= company_end:
-                query = """
-                    SELECT id, atividade 
-                    FROM atividades 
-                    WHERE user_id = %s
-                    AND ativo = TRUE 
-                    AND concluido = FALSE
-                    AND pausado = FALSE
-                    LIMIT 1
-                """
-                result = self.db.execute_query(query, (self.user_data['id'],))
-                
-                if result and result[0]:
-                    activity_id = result[0]['id']
-                    activity_name = result[0]['atividade']
-                    
-                    # Pausa a atividade diretamente
-                    update_query = """
-                        UPDATE atividades 
-                        SET pausado = TRUE,
-                            ativo = TRUE,
-                            concluido = FALSE,
-                            total_time = COALESCE(
-                                (SELECT SEC_TO_TIME(
-                                    TIME_TO_SEC(TIMEDIFF(NOW(), start_time))
-                                )
-                            ), '00:00:00')
-                        WHERE id = %s
-                    """
-                    self.db.execute_query(update_query, (activity_id,))
-                    
-                    # Pausa o timer sem mensagens extras
-                    self.time_manager.pause_activity()
-                    
-                    # Atualiza interface
-                    if hasattr(self, 'activity_controls'):
-                        self.activity_controls.check_current_status()
-                        self.activity_controls.refresh_activities()
-                        
-                    logger.debug(f"[END_TIME] Atividade '{activity_name}' pausada automaticamente por fim de expediente")
             
         except Exception as e:
-            logger.error(f"Erro ao processar pausa automática: {e}")
-        
-        # Atualizar tempo diário se estiver rodando
-        if self.daily_time_manager.is_running:
-            self.daily_time_manager.update_daily_hours()
-        
-        self.after(1000, self.update_clock)
+            logger.error(f"Erro ao verificar horário comercial: {e}")
 
     def _pause_active_activities(self):
         """Pausa todas as atividades ativas"""
         try:
             logger.debug("[LOCK] Iniciando pausa de atividades ativas")
             
-            # Buscar atividades ativas
-            query = """
-                SELECT id, atividade 
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-            """
-            active_activities = self.db.execute_query(query, (self.user_data['id'],))
+            # Fixar os tempos do timer antes de gravar a pausa
+            if hasattr(self, 'time_manager'):
+                self.time_manager.pause_activity()
             
-            for activity in active_activities:
-                logger.debug(f"[LOCK] Pausando atividade {activity['id']}: {activity['atividade']}")
-                
-                # Pausar no TimeManager
-                if hasattr(self, 'time_manager'):
-                    self.time_manager.pause_activity()
-                
-                # Atualizar status no banco
-                update_query = """
-                    UPDATE atividades 
-                    SET pausado = TRUE,
-                        ativo = TRUE,
-                        concluido = FALSE
-                    WHERE id = %s
-                """
-                self.db.execute_query(update_query, (activity['id'],))
-                
-                # Notificar interface
-                if hasattr(self, 'activity_controls'):
-                    self.activity_controls.check_current_status()
-                    self.activity_controls.refresh_activities()
+            # Pausar todas no banco em uma única transação
+            paused = ActivityTransitions(self.db).transition_all(self.user_data['id'], STATUS_PAUSED)
+            for activity in paused:
+                logger.debug(f"[LOCK] Atividade {activity['id']} pausada: {activity['atividade']}")
+            
+            # Notificar interface
+            if hasattr(self, 'activity_controls'):
+                self.activity_controls.check_current_status()
+                self.activity_controls.refresh_activities()
                     
             logger.info("[LOCK] Todas as atividades ativas foram pausadas")
             
@@ -407,62 +378,23 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
 
     def _has_active_activities(self):
         """Verifica se existem atividades ativas"""
-        try:
-            query = """
-                SELECT COUNT(*) as count
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-            """
-            result = self.db.execute_query(query, (self.user_data['id'],))
-            return result[0]['count'] > 0 if result else False
-        except Exception as e:
-            logger.error(f"Erro ao verificar atividades ativas: {e}")
-            return False
+        return self.state_store.has_running()
         
     def _convert_time_to_decimal(self, time_value) -> str:
         """
         Converte tempo para decimal, usando o mesmo padrão do ExcelProcessor
         """
         try:
-            if not time_value:
-                return "0,0000"
-
-            # Se for timedelta, extrair horas, minutos e segundos
-            if isinstance(time_value, timedelta):
-                total_seconds = int(time_value.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-            # Se for string, fazer split
-            elif isinstance(time_value, str):
-                if time_value == "00:00:00":
-                    return "0,0000"
-                hours, minutes, seconds = map(int, time_value.split(':'))
-            else:
-                logger.error(f"Tipo de tempo não suportado: {type(time_value)}")
-                return "0,0000"
-
-            decimal_hours = hours + (minutes / 60.0) + (seconds / 3600.0)
-            # Formata para ter 4 casas decimais e usa vírgula
-            return f"{decimal_hours:.4f}".replace('.', ',')
-                
-        except Exception as e:
+            return format_decimal_hours(time_value)
+        except (TypeError, ValueError) as e:
             logger.error(f"Erro ao converter tempo {time_value}: {e}")
             return "0,0000"
 
     def update_daily_time(self, daily_time: timedelta) -> None:
         """Atualiza o display do tempo diário e decimal"""
         try:
-            total_seconds = int(daily_time.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            
             # Atualizar o label de tempo em HH:MM:SS
-            self.daily_hours_label.configure(text=f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            self.daily_hours_label.configure(text=to_hms(daily_time))
             
             # Converter para decimal e atualizar o label
             decimal_value = self._convert_time_to_decimal(daily_time)
@@ -486,39 +418,19 @@ class ActivityTopFrame(ctk.CTkFrame, TimeObserver):
             logger.error(f"Erro ao atualizar atividade ativa: {e}")
 
     def check_current_status(self):
-        """Verifica e atualiza status atual"""
+        """Verifica e atualiza status atual a partir do estado em memória"""
         try:
-            query = """
-                SELECT id, description, atividade, start_time, end_time, 
-                    ativo, pausado, concluido
-                FROM atividades 
-                WHERE user_id = %s
-                AND ativo = TRUE 
-                AND concluido = FALSE
-                AND pausado = FALSE
-                LIMIT 1
-            """
-            
-            def on_status_received(result):
-                if result and result[0]:
-                    activity = result[0]
-                    self.active_activity = activity
-                    if self.active_activity_label:
-                        self.active_activity_label.configure(
-                            text=f"Atividade atual (ATIVA): {activity['atividade']}"
-                        )
+            activity = self.state_store.running_activity()
+            self.active_activity = activity
+            if self.active_activity_label:
+                if activity:
+                    self.active_activity_label.configure(
+                        text=f"Atividade atual (ATIVA): {activity['atividade']}"
+                    )
                 else:
-                    self.active_activity = None
-                    if self.active_activity_label:
-                        self.active_activity_label.configure(text="Atividade atual: Nenhuma")
-                self._update_button_states("atividades")
-            
-            # Usar versão assíncrona
-            self.logic.db.execute_query_async(
-                query, 
-                (self.user_data['id'],),
-                callback=on_status_received
-            )
+                    self.active_activity_label.configure(text="Atividade atual: Nenhuma")
+            if getattr(self, 'activity_controls', None):
+                self.activity_controls.update_button_states()
             
         except Exception as e:
             logger.error(f"Erro ao verificar status atual: {e}")
@@ -3,7 +3,7 @@ from PIL import Image
 import os
 import sys
 import logging
-from app.core.time.time_manager import TimeManager
+from app.core.time.work_calendar import WorkCalendar
 from ...utils.window_manager import WindowManager
 
 logger = logging.getLogger(__name__)
@@ -56,9 +56,9 @@ class BreakStartDialog(ctk.CTkToplevel):
         )
         self.title_label.pack(pady=10)
         
-        # Pegar horários do TimeManager
-        break_start = TimeManager.get_time_object(TimeManager.BREAK_START_TIME)
-        break_end = TimeManager.get_time_object(TimeManager.BREAK_END_TIME)
+        # Horários da equipe no calendário de trabalho
+        break_start = WorkCalendar().day_schedule().break_start
+        break_end = WorkCalendar().day_schedule().break_end
         
         # Mensagem
         self.message_label = ctk.CTkLabel(
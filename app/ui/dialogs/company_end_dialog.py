@@ -3,7 +3,7 @@ from PIL import Image
 import os
 import sys
 import logging
-from app.core.time.time_manager import TimeManager
+from app.core.time.work_calendar import WorkCalendar
 from ...utils.window_manager import WindowManager
 
 logger = logging.getLogger(__name__)
@@ -56,8 +56,8 @@ class CompanyEndDialog(ctk.CTkToplevel):
         )
         self.title_label.pack(pady=10)
         
-        # Pegar horário do TimeManager
-        company_end = TimeManager.get_time_object(TimeManager.COMPANY_END_TIME)
+        # Horário da equipe no calendário de trabalho
+        company_end = WorkCalendar().day_schedule().company_end
         
         # Mensagem
         self.message_label = ctk.CTkLabel(
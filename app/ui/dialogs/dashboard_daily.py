@@ -14,6 +14,7 @@ from app.core.printer.templates.dashboard_printer import DashboardPrinter
 from app.core.printer.query.dashboard_query import DashboardQuery
 from app.config.settings import APP_CONFIG
 from ...database.connection import DatabaseConnection
+from ...utils.ui_tasks import UITaskRunner, busy_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +32,13 @@ class DashboardDaily(ctk.CTkFrame):
         self.db = db_connection or DatabaseConnection()
         self.user_data = user_data
         self.dashboard_query = DashboardQuery(self.db)
+        self.tasks = UITaskRunner()
         self.container = ctk.CTkFrame(self, fg_color="#FFF")
         self.container.pack(fill="both", expand=True)
         self.cores = {}
         self.dados_atrasos = {}
         self.dados_atrasos_periodos = {}
+        self.equipes = ["Todos"]
         self.selected_equipe = None
         
         self._on_theme_change_callback_id = self.after(100, self._on_theme_change)
@@ -43,14 +46,12 @@ class DashboardDaily(ctk.CTkFrame):
         ctk.AppearanceModeTracker.add(self._on_theme_change_callback, self)
         logger.debug("[THEME] Callback de tema registrado")
         
-        # Primeiro carregar os dados, depois criar a interface
-        self.carregar_dados_atrasos()
-        
         # Forçar atualização inicial do tema
         self._on_theme_change()
         
-        # Criar interface após configuração inicial
+        # Criar interface após configuração inicial; os dados chegam em segundo plano
         self.setup_interface()
+        self.carregar_dados_atrasos()
         
         # Garantir novamente que a janela esteja em foco após a configuração completa
         self.after(100, self.lift)
@@ -122,43 +123,67 @@ class DashboardDaily(ctk.CTkFrame):
         self.after(300, self.focus_force)
 
     def carregar_dados_atrasos(self, equipe_nome=None):
-        """Carrega os dados de atrasos do banco de dados para a equipe selecionada ou todas"""
+        """Carrega em segundo plano os dados de atrasos da equipe selecionada (ou de todas) e recria a interface"""
+        if self.db is None:
+            logger.error("Conexão com banco de dados não inicializada")
+            return
+        
+        def on_error(e):
+            logger.error(f"Erro ao carregar dados de atrasos: {e}")
+            self._aplicar_dados_atrasos(None)
+        
+        self.tasks.submit(
+            self,
+            lambda: self._buscar_dados_atrasos(equipe_nome),
+            on_success=self._aplicar_dados_atrasos,
+            on_error=on_error,
+            key=(id(self), 'atrasos'),
+            busy=busy_cursor(self)
+        )
+
+    def _buscar_dados_atrasos(self, equipe_nome=None):
+        """Consultas do dashboard (executado fora da thread da interface)"""
+        # Nomes das equipes para o menu suspenso
+        equipes = ["Todos"]
         try:
-            if self.db is None:
-                logger.error("Conexão com banco de dados não inicializada")
-                return
-            
-            # Buscar equipe_id se equipe_nome não for 'Todos'
-            team_id = None
-            if equipe_nome and equipe_nome != "Todos":
-                equipe_query = "SELECT id FROM equipes WHERE nome = %s"
-                equipe_result = self.db.execute_query(equipe_query, (equipe_nome,))
-                if equipe_result:
-                    team_id = equipe_result[0]['id']
-            
-            # Usar o DashboardQuery para buscar os dados
-            dados = self.dashboard_query.get_dashboard_data(
-                user_id=None,
-                team_id=team_id,
-                period='week'
-            )
-            
-            if dados and 'atrasos' in dados:
-                # Armazenar todos os períodos
-                self.dados_atrasos_periodos = dados['atrasos']
-                # Processar apenas os motivos da semana_atual
-                self.dados_atrasos = self._processar_dados_atrasos(self.dados_atrasos_periodos.get('semana_atual', {}))
-                logger.info(f"Dados de atrasos carregados: {len(self.dados_atrasos)} registros da semana atual")
-                logger.info(f"Períodos carregados: {list(self.dados_atrasos_periodos.keys())}")
-            else:
-                logger.warning("Nenhum dado de atraso encontrado")
-                self.dados_atrasos = {}
-                self.dados_atrasos_periodos = {}
-                
+            equipes_result = self.db.execute_query("SELECT nome FROM equipes ORDER BY nome")
+            if equipes_result:
+                equipes += [row['nome'] for row in equipes_result]
         except Exception as e:
-            logger.error(f"Erro ao carregar dados de atrasos: {e}")
+            logger.error(f"Erro ao buscar equipes para OptionMenu: {e}")
+        
+        # Buscar equipe_id se equipe_nome não for 'Todos'
+        team_id = None
+        if equipe_nome and equipe_nome != "Todos":
+            equipe_query = "SELECT id FROM equipes WHERE nome = %s"
+            equipe_result = self.db.execute_query(equipe_query, (equipe_nome,))
+            if equipe_result:
+                team_id = equipe_result[0]['id']
+        
+        # Usar o DashboardQuery para buscar os dados
+        dados = self.dashboard_query.get_dashboard_data(
+            user_id=None,
+            team_id=team_id,
+            period='week'
+        )
+        return equipes, dados
+
+    def _aplicar_dados_atrasos(self, resultado):
+        """Armazena os dados carregados e recria a interface (thread da interface)"""
+        equipes, dados = resultado if resultado else (self.equipes, None)
+        self.equipes = equipes
+        if dados and 'atrasos' in dados:
+            # Armazenar todos os períodos
+            self.dados_atrasos_periodos = dados['atrasos']
+            # Processar apenas os motivos da semana_atual
+            self.dados_atrasos = self._processar_dados_atrasos(self.dados_atrasos_periodos.get('semana_atual', {}))
+            logger.info(f"Dados de atrasos carregados: {len(self.dados_atrasos)} registros da semana atual")
+            logger.info(f"Períodos carregados: {list(self.dados_atrasos_periodos.keys())}")
+        else:
+            logger.warning("Nenhum dado de atraso encontrado")
             self.dados_atrasos = {}
             self.dados_atrasos_periodos = {}
+        self._recriar_interface()
 
     def _processar_dados_atrasos(self, dados_brutos):
         """Processa os dados brutos do banco para garantir estrutura consistente"""
@@ -212,10 +237,13 @@ class DashboardDaily(ctk.CTkFrame):
 
     def recarregar_dashboard_por_equipe(self, equipe_nome):
         """Recarrega apenas os dados do dashboard para a equipe selecionada, sem recriar toda a interface."""
+        logger.info(f"Recarregando dashboard para equipe: {equipe_nome}")
+        # Carregar novos dados; a interface é recriada quando chegarem
+        self.carregar_dados_atrasos(equipe_nome)
+
+    def _recriar_interface(self):
+        """Recria a interface com os dados atuais"""
         try:
-            logger.info(f"Recarregando dashboard para equipe: {equipe_nome}")
-            # Carregar novos dados
-            self.carregar_dados_atrasos(equipe_nome)
             # Limpar container antes de recriar a interface
             for widget in self.container.winfo_children():
                 if widget != self.container:
@@ -340,18 +368,8 @@ class DashboardDaily(ctk.CTkFrame):
         info_frame = ctk.CTkFrame(header, fg_color="transparent")
         info_frame.pack(side="right", padx=20)
         
-        # Buscar informações do banco
-        
-        # Buscar nomes das equipes para o menu suspenso
-        try:
-            equipes = ["Todos"]
-            equipes_query = "SELECT nome FROM equipes ORDER BY nome"
-            equipes_result = self.db.execute_query(equipes_query)
-            if equipes_result:
-                equipes += [row['nome'] for row in equipes_result]
-        except Exception as e:
-            logger.error(f"Erro ao buscar equipes para OptionMenu: {e}")
-            equipes = ["Todos"]
+        # Nomes das equipes (carregados com os dados do dashboard)
+        equipes = self.equipes
 
         # Variável de controle para equipe selecionada
         self.selected_equipe = ctk.StringVar(value=valor_atual)
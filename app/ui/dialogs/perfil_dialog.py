@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from ...database.connection import DatabaseConnection
+from ...utils.ui_tasks import UITaskRunner
 from .change_password_dialog import ChangePasswordDialog
 
 class PerfilFrame(ctk.CTkFrame):
@@ -7,6 +8,7 @@ class PerfilFrame(ctk.CTkFrame):
         super().__init__(parent)
         
         self.db = DatabaseConnection()
+        self.tasks = UITaskRunner()
         self.user_data = user_data
         
         # Configurações de estilo
@@ -43,11 +45,6 @@ class PerfilFrame(ctk.CTkFrame):
         subtitle_label.pack(anchor="w")
         
         try:
-            # Buscar nome da equipe
-            team_query = "SELECT nome FROM equipes WHERE id = %s"
-            team_result = self.db.execute_query(team_query, (self.user_data['equipe_id'],))
-            team_name = team_result[0]['nome'] if team_result else "Sem Equipe"
-            
             # Container para as informações em cards
             info_container = ctk.CTkFrame(main_container, fg_color="transparent")
             info_container.pack(fill="both", expand=True)
@@ -68,7 +65,7 @@ class PerfilFrame(ctk.CTkFrame):
             work_card = self._create_card(info_container, "Informações Profissionais")
             work_card.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
             
-            self._add_info_field(work_card, "Equipe", team_name)
+            team_label = self._add_info_field(work_card, "Equipe", "Carregando...")
             self._add_info_field(work_card, "Data de Cadastro", 
                                self.user_data['data_entrada'].strftime('%d/%m/%Y') 
                                if self.user_data['data_entrada'] else 'Não definida')
@@ -87,6 +84,17 @@ class PerfilFrame(ctk.CTkFrame):
             )
             btn_change_password.pack(side="left", padx=5)
             
+            # Buscar nome da equipe em segundo plano
+            team_query = "SELECT nome FROM equipes WHERE id = %s"
+            self.tasks.submit(
+                team_label,
+                lambda: self.db.execute_query(team_query, (self.user_data['equipe_id'],)),
+                on_success=lambda team_result: team_label.configure(
+                    text=team_result[0]['nome'] if team_result else "Sem Equipe"
+                ),
+                on_error=lambda e: team_label.configure(text="Indisponível")
+            )
+            
         except Exception as e:
             error_frame = ctk.CTkFrame(main_container, fg_color="#CFCFCF", corner_radius=15)
             error_frame.pack(fill="x", pady=20)
@@ -136,6 +144,7 @@ class PerfilFrame(ctk.CTkFrame):
             font=("Roboto", 14)
         )
         value_widget.pack(side="left", padx=(10, 0))
+        return value_widget
     
     def show_change_password_dialog(self):
         """Exibe o diálogo de alteração de senha"""
@@ -1,15 +1,35 @@
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from ...database.connection import DatabaseConnection
+from ...utils.date_ranges import period_range, month_range, year_range, range_clause
+from ...core.activity.activity_search import ActivitySearch, ready_to_search
+from ...utils.ui_tasks import UITaskRunner, Debouncer, busy_cursor
 
 logger = logging.getLogger(__name__)
 
+# Colunas da tabela de resultados (aliases de ActivitySearch: a, u, e)
+SEARCH_COLUMNS = """
+    u.nome as colaborador,
+    e.nome as equipe,
+    a.description as descricao,
+    a.atividade,
+    a.start_time as inicio,
+    a.end_time as fim_previsto,
+    a.time_regress as regressivo,
+    a.time_exceeded as excedido,
+    a.reason as motivo,
+    a.total_time as total
+"""
+
 class SearchFrame(ctk.CTkFrame):
     def __init__(self, parent, user_data):
         super().__init__(parent)
         self.db = DatabaseConnection()
+        self.tasks = UITaskRunner()
+        self.activity_search = ActivitySearch(self.db)
+        self._typed_term = ""
         self.user_data = user_data
         
         # Configurações de estilo
@@ -87,6 +107,9 @@ class SearchFrame(ctk.CTkFrame):
         )
         self.search_entry.pack(side="left", padx=(0, 5))
         self.search_entry.bind("<Return>", lambda e: self.search())
+        # Pesquisa enquanto digita, após uma pausa na digitação
+        self._debounced_search = Debouncer(self.search_entry, self.search)
+        self.search_entry.bind("<KeyRelease>", self._on_search_typed)
 
         # Botão de pesquisa
         self.search_button = ctk.CTkButton(
@@ -224,113 +247,106 @@ class SearchFrame(ctk.CTkFrame):
         # Realizar pesquisa inicial
         self.search()
         
+    @staticmethod
+    def build_filters(status, period, month_num=None, year=None):
+        """Monta os filtros da pesquisa (aliases a, u, e) e seus parâmetros"""
+        conditions = []
+        params = []
+        
+        # Adicionar filtro de status
+        if status != "Todos":
+            status_map = {
+                "Ativo": "a.ativo = 1",
+                "Pausado": "a.pausado = 1",
+                "Concluído": "a.concluido = 1"
+            }
+            conditions.append(status_map[status])
+        
+        # Adicionar filtro de período (intervalos [início, fim) para usar os índices)
+        if period != "Todos":
+            if period in ("Dia Atual", "Semana Atual"):
+                start, end = period_range(period)
+                conditions.append(f"""(
+                    ({range_clause('a.created_at')}) OR 
+                    ({range_clause('a.updated_at')} AND a.ativo = 1)
+                )""")
+                params.extend([start, end, start, end])
+        
+        # Adicionar filtros de data (mês/ano)
+        if month_num and year:
+            conditions.append(range_clause('a.created_at'))
+            params.extend(month_range(year, month_num))
+        elif year:
+            conditions.append(range_clause('a.created_at'))
+            params.extend(year_range(year))
+        elif month_num:
+            # Mesmo mês em todos os anos: não há intervalo único de datas
+            conditions.append("MONTH(a.created_at) = %s")
+            params.append(month_num)
+        
+        return " AND ".join(conditions) or None, params
+
+    def _on_search_typed(self, event=None):
+        """Agenda a pesquisa quando o termo muda e já pode ser buscado no índice"""
+        term = self.search_entry.get().strip()
+        if term != self._typed_term and ready_to_search(term):
+            self._typed_term = term
+            self._debounced_search()
+
     def search(self, *args):
-        """Realiza a pesquisa no banco de dados com os filtros aplicados"""
+        """
+        Realiza a pesquisa em segundo plano; uma nova pesquisa descarta a anterior.
+        Com termo, os resultados vêm por relevância; sem termo, dos mais recentes.
+        """
         try:
-            # Limpar resultados anteriores
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
             # Obter valores dos filtros
             search_term = self.search_entry.get().strip()
+            self._typed_term = search_term
+            self._debounced_search.cancel()
             status = self.status_combo.get()
             period = self.period_combo.get()
             month = self.month_combo.get()
             year = self.year_combo.get()
             
-            # Construir a query base
-            query = """
-                SELECT 
-                    u.nome as colaborador,
-                    e.nome as equipe,
-                    a.description as descricao,
-                    a.atividade,
-                    a.start_time as inicio,
-                    a.end_time as fim_previsto,
-                    a.time_regress as regressivo,
-                    a.time_exceeded as excedido,
-                    a.reason as motivo,
-                    a.total_time as total
-                FROM atividades a
-                JOIN usuarios u ON a.user_id = u.id
-                JOIN equipes e ON u.equipe_id = e.id
-                WHERE 1=1
-            """
-            params = []
-            
-            # Adicionar filtro de pesquisa
-            if search_term:
-                query += """ AND (
-                    u.nome LIKE %s OR
-                    a.description LIKE %s OR
-                    a.atividade LIKE %s
-                )"""
-                search_pattern = f"%{search_term}%"
-                params.extend([search_pattern] * 3)
+            month_num = self.meses.index(month) + 1 if month != "Todos" else None
+            where, params = self.build_filters(
+                status, period, month_num, None if year == "Todos" else year
+            )
             
-            # Adicionar filtro de status
-            if status != "Todos":
-                status_map = {
-                    "Ativo": "ativo = 1",
-                    "Pausado": "pausado = 1",
-                    "Concluído": "concluido = 1"
-                }
-                query += f" AND {status_map[status]}"
-            
-            # Adicionar filtro de período
-            if period != "Todos":
-                today = datetime.now().date()
-                if period == "Dia Atual":
-                    query += """ AND (
-                        DATE(a.created_at) = %s OR 
-                        (DATE(a.updated_at) = %s AND a.ativo = 1)
-                    )"""
-                    params.extend([today, today])
-                elif period == "Semana Atual":
-                    # Encontrar o início da semana (segunda-feira)
-                    start_of_week = today - timedelta(days=today.weekday())
-                    # Fim da semana (domingo)
-                    end_of_week = start_of_week + timedelta(days=6)
-                    query += """ AND (
-                        DATE(a.created_at) BETWEEN %s AND %s OR
-                        (DATE(a.updated_at) BETWEEN %s AND %s AND a.ativo = 1)
-                    )"""
-                    params.extend([start_of_week, end_of_week, start_of_week, end_of_week])
-            
-            # Adicionar filtros de data (mês/ano)
-            if month != "Todos" or year != "Todos":
-                if month != "Todos":
-                    month_num = self.meses.index(month) + 1
-                    query += " AND MONTH(a.created_at) = %s"
-                    params.append(month_num)
-                
-                if year != "Todos":
-                    query += " AND YEAR(a.created_at) = %s"
-                    params.append(year)
-            
-            # Ordenar por data de criação
-            query += " ORDER BY a.created_at DESC"
-            
-            # Executar a query
-            results = self.db.execute_query(query, params)
-            
-            if results:
-                # Preencher a tabela com os resultados
-                for result in results:
-                    values = (
-                        result['colaborador'],
-                        result.get('equipe', ''),
-                        result['descricao'],
-                        result['atividade'],
-                        result['inicio'],
-                        result['fim_previsto'],
-                        result['regressivo'],
-                        result['excedido'],
-                        result['motivo'] or "",
-                        result['total']
-                    )
-                    self.tree.insert("", "end", values=values)
+            self.tasks.submit(
+                self,
+                lambda: self.activity_search.search(
+                    search_term, SEARCH_COLUMNS, where, params, order_by="a.created_at DESC"
+                ),
+                on_success=self._show_results,
+                on_error=self._on_search_error,
+                key=(id(self), 'search'),
+                busy=busy_cursor(self)
+            )
                 
         except Exception as e:
-            logger.error(f"Erro ao realizar pesquisa: {str(e)}")
-            messagebox.showerror("Erro", "Ocorreu um erro ao realizar a pesquisa.")
\ No newline at end of file
+            self._on_search_error(e)
+
+    def _show_results(self, results):
+        """Preenche a tabela com os resultados da pesquisa"""
+        # Limpar resultados anteriores
+        self.tree.delete(*self.tree.get_children())
+        
+        for result in results or []:
+            values = (
+                result['colaborador'],
+                result.get('equipe') or '',
+                result['descricao'],
+                result['atividade'],
+                result['inicio'],
+                result['fim_previsto'],
+                result['regressivo'],
+                result['excedido'],
+                result['motivo'] or "",
+                result['total']
+            )
+            self.tree.insert("", "end", values=values)
+
+    def _on_search_error(self, error):
+        logger.error(f"Erro ao realizar pesquisa: {str(error)}")
+        messagebox.showerror("Erro", "Ocorreu um erro ao realizar a pesquisa.")
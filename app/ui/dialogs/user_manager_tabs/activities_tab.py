@@ -8,15 +8,28 @@ from PIL import Image
 from datetime import datetime, timedelta
 from ....database.connection import DatabaseConnection
 from ....utils.excel_selector import ExcelSelector
+from ...components.virtual_list import VirtualList
+from ...components.logic.keyset_pager import KeysetPager
+from ....core.activity.activity_search import ActivitySearch, SEARCH_LIMIT, ready_to_search
+from ....utils.ui_tasks import UITaskRunner, Debouncer, busy_cursor
 
 logger = logging.getLogger(__name__)
 
+# Colunas das linhas da treeview de atividades (lista paginada e pesquisa)
+_ACTIVITY_COLUMNS = """
+    a.id, a.description, a.atividade, a.total_time,
+    a.ativo, a.pausado, a.concluido, u.nome as user_name
+"""
+
 class ActivitiesTab(CTkFrame):
     def __init__(self, parent, user_data, manager=None):
         super().__init__(parent)
         self.user_data = user_data
         self.manager = manager
         self.db = DatabaseConnection()
+        self.tasks = UITaskRunner()
+        self.activity_search = ActivitySearch(self.db)
+        self._typed_term = ""
         self.setup_activities()
         self.pack(expand=True, fill="both")
 
@@ -75,6 +88,9 @@ class ActivitiesTab(CTkFrame):
         )
         self.activities_search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 2))
         self.activities_search_entry.bind("<Return>", lambda event: self.search_activities())
+        # Pesquisa enquanto digita, após uma pausa na digitação
+        self._debounced_search = Debouncer(self.activities_search_entry, self.search_activities)
+        self.activities_search_entry.bind("<KeyRelease>", self._on_search_typed)
         
         search_btn = ctk.CTkButton(
             search_frame,
@@ -126,6 +142,9 @@ class ActivitiesTab(CTkFrame):
         # Adicionar binding para duplo clique
         self.activities_tree.bind("<Double-1>", self.on_activity_double_click)
         
+        # Lista virtual: só as páginas próximas da rolagem ficam na treeview
+        self.activities_list = VirtualList(self.activities_tree, scrollbar, self._activity_values)
+        
         # Carregar atividades
         self.load_activities()
         
@@ -539,106 +558,87 @@ class ActivitiesTab(CTkFrame):
         )
         reset_btn.grid(row=0, column=1, sticky="e", pady=(0, 2))
 
+    def _activities_pager(self, where=None, params=()):
+        """Consulta paginada das atividades com usuários (sem filtro de equipe), das mais recentes às mais antigas"""
+        return KeysetPager(
+            self.db,
+            columns=_ACTIVITY_COLUMNS,
+            source="FROM atividades a JOIN usuarios u ON a.user_id = u.id",
+            keys=[("a.id", "id")],
+            where=where,
+            params=params,
+            estimate_table="atividades"
+        )
+
     def load_activities(self):
-        """Carrega todas as atividades na treeview"""
-        # Limpar a árvore
-        for item in self.activities_tree.get_children():
-            self.activities_tree.delete(item)
-            
-        try:
-            # Query base que junta atividades com usuários (sem filtro de equipe)
-            query = """
-                SELECT a.*, u.nome as user_name
-                FROM atividades a
-                JOIN usuarios u ON a.user_id = u.id
-                ORDER BY a.id DESC
-            """
-            
-            activities = self.db.execute_query(query)
-            
-            if activities:
-                for activity in activities:
-                    # Determinar o status baseado nas colunas booleanas
-                    status = "Concluído" if activity['concluido'] else \
-                            "Pausado" if activity['pausado'] else \
-                            "Ativo" if activity['ativo'] else "Indefinido"
-                    
-                    self.activities_tree.insert("", "end", values=(
-                        activity['user_name'],
-                        activity['description'],
-                        activity['atividade'],
-                        activity['total_time'],
-                        status
-                    ))
-                
-                # Atualizar contador de atividades
-                self.activities_count_label.configure(
-                    text=f"Total: {len(activities)} atividades"
-                )
-            else:
-                self.activities_count_label.configure(text="Total: 0 atividades")
-                
-        except Exception as e:
-            logger.error(f"Erro ao carregar atividades: {e}")
-            messagebox.showerror("Erro", "Erro ao carregar lista de atividades")
+        """Carrega as atividades na treeview, página a página conforme a rolagem"""
+        def on_total(total, estimated):
+            # Atualizar contador de atividades
+            self.activities_count_label.configure(
+                text=f"Total: {'~' if estimated else ''}{total} atividades"
+            )
+        
+        self.tasks.cancel((id(self), 'search'))
+        self.activities_list.on_total = on_total
+        self.activities_list.load(self._activities_pager())
+
+    @staticmethod
+    def _activity_values(activity):
+        """Valores de uma linha da treeview de atividades"""
+        # Determinar o status baseado nas colunas booleanas
+        status = "Concluído" if activity['concluido'] else \
+                "Pausado" if activity['pausado'] else \
+                "Ativo" if activity['ativo'] else "Indefinido"
+        
+        return (
+            activity['user_name'],
+            activity['description'],
+            activity['atividade'],
+            activity['total_time'],
+            status
+        )
+
+    def _on_search_typed(self, event=None):
+        """Agenda a pesquisa quando o termo muda e já pode ser buscado no índice"""
+        term = self.activities_search_entry.get().strip()
+        if term != self._typed_term and ready_to_search(term):
+            self._typed_term = term
+            self._debounced_search()
 
     def search_activities(self):
-        """Pesquisa atividades com base no termo de busca"""
+        """Pesquisa atividades por relevância em segundo plano; uma nova pesquisa descarta a anterior"""
         search_term = self.activities_search_entry.get().strip()
-        
-        # Limpar a árvore
-        for item in self.activities_tree.get_children():
-            self.activities_tree.delete(item)
+        self._typed_term = search_term
+        self._debounced_search.cancel()
         
         if not search_term:
             self.load_activities()
             return
         
-        try:
-            # Query que busca por correspondência em vários campos (sem filtro de equipe)
-            query = """
-                SELECT a.*, u.nome as user_name
-                FROM atividades a
-                JOIN usuarios u ON a.user_id = u.id
-                WHERE (
-                    u.nome LIKE %s OR
-                    a.description LIKE %s OR
-                    a.atividade LIKE %s
-                )
-                ORDER BY a.id DESC
-            """
-            
-            search_pattern = f"%{search_term}%"
-            activities = self.db.execute_query(
-                query, 
-                (search_pattern, search_pattern, search_pattern)
+        # Texto da atividade e nome do colaborador (sem filtro de equipe)
+        self.tasks.submit(
+            self,
+            lambda: self.activity_search.search(search_term, _ACTIVITY_COLUMNS),
+            on_success=self._show_search_results,
+            on_error=lambda e: logger.error(f"Erro ao pesquisar atividades: {e}"),
+            key=(id(self), 'search'),
+            busy=busy_cursor(self)
+        )
+
+    def _show_search_results(self, activities):
+        """Exibe os resultados mais relevantes da pesquisa"""
+        self.activities_list.show(activities)
+        if not activities:
+            self.activities_count_label.configure(text="Nenhuma atividade encontrada")
+        elif len(activities) >= SEARCH_LIMIT:
+            self.activities_count_label.configure(
+                text=f"Mostrando as {len(activities)} atividades mais relevantes"
+            )
+        else:
+            # Atualizar contador com resultados da busca
+            self.activities_count_label.configure(
+                text=f"Encontrado(s): {len(activities)} atividade(s)"
             )
-            
-            if activities:
-                for activity in activities:
-                    # Determinar o status baseado nas colunas booleanas
-                    status = "Concluído" if activity['concluido'] else \
-                            "Pausado" if activity['pausado'] else \
-                            "Ativo" if activity['ativo'] else "Indefinido"
-                    
-                    self.activities_tree.insert("", "end", values=(
-                        activity['user_name'],
-                        activity['description'],
-                        activity['atividade'],
-                        activity['total_time'],
-                        status
-                    ))
-                
-                # Atualizar contador com resultados da busca
-                self.activities_count_label.configure(
-                    text=f"Encontrado(s): {len(activities)} atividade(s)"
-                )
-            else:
-                self.activities_count_label.configure(text="Nenhuma atividade encontrada")
-                
-        except Exception as e:
-            logger.error(f"Erro ao pesquisar atividades: {e}")
-            messagebox.showerror("Erro", "Erro ao pesquisar atividades")
 
     def on_activity_double_click(self, event):
         """Manipula o evento de duplo clique na TreeView de atividades"""
@@ -798,31 +798,6 @@ class ActivitiesTab(CTkFrame):
                 )
                 return
             
-            # Buscar ID da equipe
-            equipe_query = "SELECT id FROM equipes WHERE nome = %s"
-            equipe_result = self.db.execute_query(equipe_query, (data['equipe'],))
-            
-            if not equipe_result:
-                messagebox.showerror("Erro", "Equipe não encontrada!")
-                return
-            
-            equipe_id = equipe_result[0]['id']
-            
-            # Buscar todos os usuários ativos da equipe
-            users_query = """
-                SELECT id 
-                FROM usuarios 
-                WHERE equipe_id = %s AND status = TRUE
-            """
-            users = self.db.execute_query(users_query, (equipe_id,))
-            
-            if not users:
-                messagebox.showerror(
-                    "Erro",
-                    "Não foram encontrados usuários ativos nesta equipe."
-                )
-                return
-            
             # Converter datas para o formato do banco
             try:
                 start_time = datetime.strptime(data['inicio'], '%d/%m/%Y %H:%M')
@@ -844,65 +819,89 @@ class ActivitiesTab(CTkFrame):
             
             # Determinar status da atividade
             status = data['status'].lower()
-            ativo = status == "ativo"
-            pausado = status == "pausado"
-            concluido = status == "concluído"
-            
-            # Preparar query de inserção
-            insert_query = """
-                INSERT INTO atividades (
-                    user_id, description, atividade, start_time,
-                    end_time, total_time, ativo, pausado, concluido
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            # Inserir atividade para cada usuário
-            cursor = self.db.connection.cursor(dictionary=True)
-            inserted_count = 0
-            
-            for user in users:
-                try:
-                    params = (
-                        user['id'],
-                        data['descricao'],
-                        data['atividade'],
-                        start_time,
-                        end_time,
-                        data['tempo_total'],
-                        ativo,
-                        pausado,
-                        concluido
-                    )
-                    cursor.execute(insert_query, params)
-                    inserted_count += 1
-                except Exception as e:
-                    logger.error(f"Erro ao inserir atividade para usuário {user['id']}: {e}")
-                    continue
-            
-            self.db.connection.commit()
-            cursor.close()
+            values = (
+                data['descricao'],
+                data['atividade'],
+                start_time,
+                end_time,
+                data['tempo_total'],
+                status == "ativo",
+                status == "pausado",
+                status == "concluído"
+            )
             
-            if inserted_count > 0:
-                messagebox.showinfo(
-                    "Sucesso",
-                    f"Atividade salva com sucesso para {inserted_count} usuário(s)!"
-                )
-                
-                # Recarregar lista de atividades
-                self.load_activities()
-                
-                # Limpar formulário
-                self.clear_activity_form()
-            else:
-                messagebox.showerror(
-                    "Erro",
-                    "Não foi possível salvar a atividade para nenhum usuário."
-                )
+            # Gravação em lote fora da thread da interface; o resultado só é
+            # exibido se o diálogo ainda existir
+            self.tasks.submit(
+                self,
+                lambda: self._insert_activity_for_team(data['equipe'], values),
+                on_success=self._show_bulk_insert_result,
+                on_error=self._show_bulk_insert_error,
+                busy=busy_cursor(self)
+            )
             
         except Exception as e:
             logger.error(f"Erro ao salvar atividade para todos: {e}")
             messagebox.showerror("Erro", f"Erro ao salvar atividade: {e}")
 
+    def _insert_activity_for_team(self, team_name, values):
+        """
+        Insere a atividade para todos os usuários ativos da equipe em uma única
+        transação (executemany em lote). Executado em thread de trabalho.
+        Retorna (usuários encontrados, inseridos, falhas por linha).
+        """
+        users_query = """
+            SELECT u.id 
+            FROM usuarios u
+            JOIN equipes e ON u.equipe_id = e.id
+            WHERE e.nome = %s AND u.status = TRUE
+        """
+        users = self.db.execute_query(users_query, (team_name,))
+        if not users:
+            return 0, 0, []
+        
+        insert_query = """
+            INSERT INTO atividades (
+                user_id, description, atividade, start_time,
+                end_time, total_time, ativo, pausado, concluido
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        rows = [(user['id'],) + values for user in users]
+        inserted, failures = self.db.execute_many(insert_query, rows)
+        
+        for index, error in failures:
+            logger.error(f"Erro ao inserir atividade para usuário {rows[index][0]}: {error}")
+        return len(users), inserted, failures
+
+    def _show_bulk_insert_error(self, error):
+        logger.error(f"Erro ao salvar atividade para todos: {error}")
+        messagebox.showerror("Erro", f"Erro ao salvar atividade: {error}")
+
+    def _show_bulk_insert_result(self, result):
+        """Atualiza a interface ao terminar a gravação em lote"""
+        total, inserted, failures = result
+        if not total:
+            messagebox.showerror(
+                "Erro",
+                "Não foram encontrados usuários ativos nesta equipe."
+            )
+        elif inserted > 0:
+            message = f"Atividade salva com sucesso para {inserted} usuário(s)!"
+            if failures:
+                message += f"\n{len(failures)} usuário(s) com erro (ver log)."
+            messagebox.showinfo("Sucesso", message)
+            
+            # Recarregar lista de atividades
+            self.load_activities()
+            
+            # Limpar formulário
+            self.clear_activity_form()
+        else:
+            messagebox.showerror(
+                "Erro",
+                "Não foi possível salvar a atividade para nenhum usuário."
+            )
+
     def clear_activity_form(self):
         """Limpa e restaura o formulário de atividade para o estado inicial"""
         # Limpar todos os campos
@@ -4,6 +4,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 from ....database.connection import DatabaseConnection
+from ....utils.ui_tasks import UITaskRunner
+from ...components.virtual_list import VirtualList
+from ...components.logic.keyset_pager import KeysetPager
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,8 @@ class BlocksTab(CTkFrame):
         super().__init__(parent)
         self.user_data = user_data
         self.db = DatabaseConnection()
+        self.tasks = UITaskRunner()
+        self.blocks_filter = ("u.status = TRUE", ())
         self.setup_blocks()
         self.pack(expand=True, fill="both")
 
@@ -114,6 +119,9 @@ class BlocksTab(CTkFrame):
         self.blocks_tree.grid(row=0, column=0, sticky="nsew")
         scrollbar.grid(row=0, column=1, sticky="ns")
         
+        # Lista virtual: só as páginas próximas da rolagem ficam na treeview
+        self.blocks_list = VirtualList(self.blocks_tree, scrollbar, self._block_values)
+        
         # Frame direito (ações)
         right_frame = ctk.CTkFrame(blocks_frame, fg_color="transparent")
         right_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 0), pady=0)
@@ -232,46 +240,12 @@ class BlocksTab(CTkFrame):
         """Pesquisa usuários bloqueados com base no texto inserido"""
         search_text = self.blocks_search_entry.get().strip()
         
-        # Limpar a árvore
-        for item in self.blocks_tree.get_children():
-            self.blocks_tree.delete(item)
-        
         if not search_text:
             self.load_blocks()
             return
             
-        try:
-            # Query de busca agora não filtra pela equipe do usuário logado
-            query = """
-                SELECT ul.id, u.nome, e.nome as equipe, ul.lock_status, ul.unlock_control
-                FROM user_lock_unlock ul
-                JOIN usuarios u ON ul.user_id = u.id
-                JOIN equipes e ON u.equipe_id = e.id
-                WHERE u.status = TRUE
-                AND u.nome LIKE %s
-                ORDER BY u.nome
-            """
-            blocks = self.db.execute_query(query, (f"%{search_text}%",))
-            
-            if blocks:
-                for block in blocks:
-                    status = "Bloqueado" if block['lock_status'] else "Desbloqueado"
-                    controle = "Liberado" if block['unlock_control'] else "Bloqueado"
-                    
-                    self.blocks_tree.insert("", "end", values=(
-                        block['id'],
-                        block['nome'],
-                        block['equipe'],
-                        status,
-                        controle
-                    ))
-                    
-        except Exception as e:
-            logger.error(f"Erro ao buscar bloqueios: {str(e)}")
-            messagebox.showerror(
-                "Erro",
-                "Ocorreu um erro ao buscar os bloqueios. Por favor, tente novamente."
-            )
+        # Busca agora não filtra pela equipe do usuário logado
+        self._show_blocks("u.status = TRUE AND u.nome LIKE %s", (f"%{search_text}%",))
 
     def show_block_context_menu(self, event):
         """Exibe menu de contexto para bloqueios"""
@@ -297,87 +271,108 @@ class BlocksTab(CTkFrame):
 
     def load_blocks(self):
         """Carrega lista de bloqueios sem filtrar pela equipe do usuário logado"""
-        for item in self.blocks_tree.get_children():
-            self.blocks_tree.delete(item)
-            
-        try:
-            # Query agora não filtra pela equipe do usuário logado
-            query = """
-                SELECT ul.id, u.nome, e.nome as equipe, ul.lock_status, ul.unlock_control
+        self._show_blocks("u.status = TRUE", ())
+        # Atualizar indicadores para todos os usuários
+        self.update_status_indicators()
+
+    def _show_blocks(self, where, params):
+        """Exibe os bloqueios do filtro, página a página conforme a rolagem, em ordem de nome"""
+        self.blocks_filter = (where, params)
+        self.blocks_list.load(KeysetPager(
+            self.db,
+            columns="ul.id, u.nome, e.nome as equipe, ul.lock_status, ul.unlock_control",
+            source="""
                 FROM user_lock_unlock ul
                 JOIN usuarios u ON ul.user_id = u.id
                 JOIN equipes e ON u.equipe_id = e.id
-                WHERE u.status = TRUE
-                ORDER BY u.nome
-            """
-            blocks = self.db.execute_query(query)
-            
-            if blocks:
-                for block in blocks:
-                    status = "Bloqueado" if block['lock_status'] else "Desbloqueado"
-                    controle = "Liberado" if block['unlock_control'] else "Bloqueado"
-                    
-                    self.blocks_tree.insert("", "end", values=(
-                        block['id'],
-                        block['nome'],
-                        block['equipe'],
-                        status,
-                        controle
-                    ))
-                    
-                # Atualizar indicadores para todos os usuários
-                self.update_status_indicators()
-                
-        except Exception as e:
-            logger.error(f"Erro ao carregar bloqueios: {e}")
-            messagebox.showerror("Erro", "Erro ao carregar lista de bloqueios")
+            """,
+            keys=[("u.nome", "nome"), ("ul.id", "id")],
+            where=where,
+            params=params,
+            descending=False
+        ))
+        self.update_counter()
+
+    @staticmethod
+    def _block_values(block):
+        """Valores de uma linha da treeview de bloqueios"""
+        status = "Bloqueado" if block['lock_status'] else "Desbloqueado"
+        controle = "Liberado" if block['unlock_control'] else "Bloqueado"
+        return (
+            block['id'],
+            block['nome'],
+            block['equipe'],
+            status,
+            controle
+        )
 
     def update_status_indicators(self):
         """Atualiza os indicadores de status apenas para a equipe atual"""
-        try:
-            # Usuários ativos da equipe atual
-            query_active = """
-                SELECT COUNT(*) as count 
-                FROM usuarios 
-                WHERE is_logged_in = TRUE
-                AND equipe_id = %s
-            """
-            active_users = self.db.execute_query(query_active, (self.user_data['equipe_id'],))[0]['count']
-            self.status_indicators["Usuários Ativos"].configure(text=str(active_users))
-            
-            # Usuários bloqueados da equipe atual
-            query_blocked = """
-                SELECT COUNT(*) as count 
-                FROM user_lock_unlock ul
-                JOIN usuarios u ON ul.user_id = u.id
-                WHERE ul.unlock_control = FALSE
-                AND u.equipe_id = %s
-            """
-            blocked_users = self.db.execute_query(query_blocked, (self.user_data['equipe_id'],))[0]['count']
-            self.status_indicators["Usuários Bloqueados"].configure(text=str(blocked_users))
-            
-            # Tentativas de login da equipe atual
-            self.status_indicators["Tentativas de Login"].configure(text="0")
-            
-        except Exception as e:
+        def on_error(e):
             logger.error(f"Erro ao atualizar indicadores: {e}")
             messagebox.showerror("Erro", "Erro ao atualizar indicadores")
+        
+        self.tasks.submit(
+            self,
+            self._count_indicators,
+            on_success=self._show_indicators,
+            on_error=on_error,
+            key=(id(self), 'indicators')
+        )
+
+    def _count_indicators(self):
+        """Consulta os indicadores da equipe atual (executado fora da thread da interface)"""
+        # Usuários ativos da equipe atual
+        query_active = """
+            SELECT COUNT(*) as count 
+            FROM usuarios 
+            WHERE is_logged_in = TRUE
+            AND equipe_id = %s
+        """
+        active_users = self.db.execute_query(query_active, (self.user_data['equipe_id'],))[0]['count']
+        
+        # Usuários bloqueados da equipe atual
+        query_blocked = """
+            SELECT COUNT(*) as count 
+            FROM user_lock_unlock ul
+            JOIN usuarios u ON ul.user_id = u.id
+            WHERE ul.unlock_control = FALSE
+            AND u.equipe_id = %s
+        """
+        blocked_users = self.db.execute_query(query_blocked, (self.user_data['equipe_id'],))[0]['count']
+        
+        return {
+            "Usuários Ativos": active_users,
+            "Usuários Bloqueados": blocked_users,
+            "Tentativas de Login": 0  # Tentativas de login da equipe atual
+        }
+
+    def _show_indicators(self, indicators):
+        for name, value in indicators.items():
+            self.status_indicators[name].configure(text=str(value))
 
     def update_counter(self):
-        """Atualiza o contador de bloqueios na aba."""
-        try:
-            if hasattr(self, 'blocks_tree') and hasattr(self, 'block_stats_label'):
-                blocked = 0
-                unblocked = 0
-                for item in self.blocks_tree.get_children():
-                    values = self.blocks_tree.item(item, 'values')
-                    if len(values) >= 5:
-                        if values[4] == 'Bloqueado':
-                            blocked += 1
-                        elif values[4] == 'Liberado':
-                            unblocked += 1
+        """Atualiza o contador de bloqueios na aba (contagem no banco, com o filtro exibido)."""
+        where, params = self.blocks_filter
+        query = f"""
+            SELECT
+                COALESCE(SUM(CASE WHEN ul.unlock_control THEN 0 ELSE 1 END), 0) as blocked,
+                COALESCE(SUM(CASE WHEN ul.unlock_control THEN 1 ELSE 0 END), 0) as unblocked
+            FROM user_lock_unlock ul
+            JOIN usuarios u ON ul.user_id = u.id
+            WHERE {where}
+        """
+        
+        def on_success(result):
+            if hasattr(self, 'block_stats_label') and result:
                 self.block_stats_label.configure(
-                    text=f"Bloqueados: {blocked} | Liberados: {unblocked}"
+                    text=f"Bloqueados: {result[0]['blocked']} | Liberados: {result[0]['unblocked']}"
                 )
-        except Exception as e:
-            logger.error(f"Erro ao atualizar contador de bloqueios: {e}")
\ No newline at end of file
+        
+        self.tasks.submit(
+            self,
+            lambda: self.db.execute_query(query, params),
+            on_success=on_success,
+            on_error=lambda e: logger.error(f"Erro ao atualizar contador de bloqueios: {e}"),
+            key=(id(self), 'counter')
+        )
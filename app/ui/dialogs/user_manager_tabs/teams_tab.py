@@ -5,6 +5,7 @@ from tkinter import messagebox
 from tkinter import ttk
 import logging
 from ....database.connection import DatabaseConnection
+from ....utils.ui_tasks import UITaskRunner, busy_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,7 @@ class TeamsTab(CTkFrame):
         self.user_data = user_data
         self.manager = manager
         self.db = DatabaseConnection()
+        self.tasks = UITaskRunner()
         self.setup_teams()
         self.pack(expand=True, fill="both")
 
@@ -280,77 +282,71 @@ class TeamsTab(CTkFrame):
         """Pesquisa equipes com base no nome"""
         search_text = self.teams_search_entry.get().strip()
         
-        # Limpar a árvore
-        for item in self.teams_tree.get_children():
-            self.teams_tree.delete(item)
-        
         if not search_text:
             self.load_teams()
             return
         
-        try:
-            query = """
-                SELECT e.id, e.nome, COUNT(u.id) as membros, e.created_at
-                FROM equipes e
-                LEFT JOIN usuarios u ON e.id = u.equipe_id AND u.status = TRUE
-                WHERE LOWER(e.nome) LIKE LOWER(%s)
-                GROUP BY e.id, e.nome, e.created_at
-                ORDER BY e.nome
-            """
-            
-            search_pattern = f"%{search_text}%"
-            teams = self.db.execute_query(query, (search_pattern,))
-            
-            if teams:
-                for team in teams:
-                    self.teams_tree.insert(
-                        "",
-                        "end",
-                        values=(
-                            team['id'],
-                            team['nome'],
-                            team['membros'],
-                            team['created_at'].strftime('%d/%m/%Y %H:%M')
-                        )
-                    )
-                    
-        except Exception as e:
+        query = """
+            SELECT e.id, e.nome, COUNT(u.id) as membros, e.created_at
+            FROM equipes e
+            LEFT JOIN usuarios u ON e.id = u.equipe_id AND u.status = TRUE
+            WHERE LOWER(e.nome) LIKE LOWER(%s)
+            GROUP BY e.id, e.nome, e.created_at
+            ORDER BY e.nome
+        """
+        
+        def on_error(e):
             logger.error(f"Erro ao buscar equipes: {str(e)}")
             messagebox.showerror(
                 "Erro",
                 "Ocorreu um erro ao buscar as equipes. Por favor, tente novamente."
             )
+        
+        self._fetch_teams(query, (f"%{search_text}%",), on_error)
 
     def load_teams(self):
-        """Carrega lista de equipes"""
-        for item in self.teams_tree.get_children():
-            self.teams_tree.delete(item)
-            
-        try:
-            query = """
-                SELECT e.id, e.nome, COUNT(u.id) as membros, e.created_at
-                FROM equipes e
-                LEFT JOIN usuarios u ON e.id = u.equipe_id AND u.status = TRUE
-                GROUP BY e.id, e.nome, e.created_at
-                ORDER BY e.nome
-            """
-            teams = self.db.execute_query(query)
-            
-            # Verificar se teams não é None e tem resultados
-            if teams:
-                for team in teams:
-                    self.teams_tree.insert("", "end", values=(
-                        team['id'],
-                        team['nome'],
-                        team['membros'],
-                        team['created_at'].strftime('%d/%m/%Y %H:%M')
-                    ))
-            else:
-                logger.info("Nenhuma equipe encontrada no banco de dados")
-            
-        except Exception as e:
+        """Carrega lista de equipes em segundo plano"""
+        query = """
+            SELECT e.id, e.nome, COUNT(u.id) as membros, e.created_at
+            FROM equipes e
+            LEFT JOIN usuarios u ON e.id = u.equipe_id AND u.status = TRUE
+            GROUP BY e.id, e.nome, e.created_at
+            ORDER BY e.nome
+        """
+        
+        def on_error(e):
             logger.error(f"Erro ao carregar equipes: {e}")
             messagebox.showerror("Erro", "Erro ao carregar equipes")
+        
+        self._fetch_teams(query, None, on_error)
+
+    def _fetch_teams(self, query, params, on_error):
+        """Busca as equipes em segundo plano; uma nova busca descarta a anterior"""
+        self.tasks.submit(
+            self,
+            lambda: self.db.execute_query(query, params),
+            on_success=self._fill_teams,
+            on_error=on_error,
+            key=(id(self), 'teams'),
+            busy=busy_cursor(self)
+        )
+
+    def _fill_teams(self, teams):
+        """Preenche a treeview de equipes"""
+        self.teams_tree.delete(*self.teams_tree.get_children())
+        
+        # Verificar se teams não é None e tem resultados
+        if teams:
+            for team in teams:
+                self.teams_tree.insert("", "end", values=(
+                    team['id'],
+                    team['nome'],
+                    team['membros'],
+                    team['created_at'].strftime('%d/%m/%Y %H:%M')
+                ))
+        else:
+            logger.info("Nenhuma equipe encontrada no banco de dados")
+        self.update_counter()
 
     def show_team_context_menu(self, event):
         """Exibe menu de contexto para equipes"""
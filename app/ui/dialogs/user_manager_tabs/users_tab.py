@@ -5,6 +5,8 @@ import logging
 import bcrypt
 from datetime import datetime
 from ....database.connection import DatabaseConnection
+from ...components.virtual_list import VirtualList
+from ...components.logic.keyset_pager import KeysetPager
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,7 @@ class UsersTab(CTkFrame):
         self.user_data = user_data
         self.manager = manager if manager is not None else None
         self.db = DatabaseConnection()
+        self.user_total = 0
         self.entry_widgets = {}  # Inicializa o dicionário de widgets
         self.setup_users()
         self.pack(expand=True, fill="both")
@@ -118,6 +121,9 @@ class UsersTab(CTkFrame):
         # Binding para seleção
         self.tree.bind("<<TreeviewSelect>>", self.on_user_select)
         
+        # Lista virtual: só as páginas próximas da rolagem ficam na treeview
+        self.users_list = VirtualList(self.tree, scrollbar, self._user_values, on_total=self._on_user_total)
+        
         # Frame direito (formulário)
         right_frame = ctk.CTkFrame(users_frame, fg_color="transparent")
         right_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 0), pady=0)
@@ -264,73 +270,54 @@ class UsersTab(CTkFrame):
         )
         delete_btn.pack(fill="x", padx=15, pady=(5, 10))
 
+    def _users_pager(self, where=None, params=()):
+        """Consulta paginada dos usuários (com a equipe), em ordem de cadastro"""
+        return KeysetPager(
+            self.db,
+            columns="u.id, u.nome, u.email, e.nome as equipe, u.tipo_usuario",
+            source="FROM usuarios u LEFT JOIN equipes e ON u.equipe_id = e.id",
+            keys=[("u.id", "id")],
+            where=where,
+            params=params,
+            descending=False
+        )
+
     def load_users(self):
-        """Carrega todos os usuários na treeview"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Query base
-        base_query = """
-            SELECT u.id, u.nome, u.email, e.nome as equipe, u.tipo_usuario
-            FROM usuarios u
-            LEFT JOIN equipes e ON u.equipe_id = e.id
-        """
-        
+        """Carrega os usuários na treeview, página a página conforme a rolagem"""
         # Se o usuário for da equipe 1, mostra todos os usuários
         # Caso contrário, mostra apenas os usuários da mesma equipe
         if self.user_data['equipe_id'] == 1:
-            query = base_query
-            params = ()
+            self.users_list.load(self._users_pager())
         else:
-            query = base_query + " WHERE u.equipe_id = %s"
-            params = (self.user_data['equipe_id'],)
-            
-        try:
-            users = self.db.execute_query(query, params)
-            for user in users:
-                self.tree.insert("", "end", values=(
-                    user['id'],
-                    user['nome'],
-                    user['email'],
-                    user['equipe'],
-                    user['tipo_usuario']
-                ))
-        except Exception as e:
-            logger.error(f"Erro ao carregar usuários: {e}")
-            messagebox.showerror("Erro", "Erro ao carregar lista de usuários")
+            self.users_list.load(self._users_pager("u.equipe_id = %s", (self.user_data['equipe_id'],)))
     
     def search_users(self):
         """Pesquisa usuários com base no termo de busca"""
         search_term = self.search_entry.get()
-        
-        for item in self.tree.get_children():
-            self.tree.delete(item)
             
         if not search_term:
             self.load_users()
             return
             
-        query = """
-            SELECT u.id, u.nome, u.email, e.nome as equipe, u.tipo_usuario
-            FROM usuarios u
-            LEFT JOIN equipes e ON u.equipe_id = e.id
-            WHERE u.equipe_id = %s
-            AND u.nome LIKE %s
-        """
-        
-        try:
-            users = self.db.execute_query(query, (self.user_data['equipe_id'], f"%{search_term}%"))
-            for user in users:
-                self.tree.insert("", "end", values=(
-                    user['id'],
-                    user['nome'],
-                    user['email'],
-                    user['equipe'],
-                    user['tipo_usuario']
-                ))
-        except Exception as e:
-            logger.error(f"Erro ao pesquisar usuários: {e}")
-            messagebox.showerror("Erro", "Erro ao pesquisar usuários")
+        self.users_list.load(self._users_pager(
+            "u.equipe_id = %s AND u.nome LIKE %s",
+            (self.user_data['equipe_id'], f"%{search_term}%")
+        ))
+
+    @staticmethod
+    def _user_values(user):
+        """Valores de uma linha da treeview de usuários"""
+        return (
+            user['id'],
+            user['nome'],
+            user['email'],
+            user['equipe'],
+            user['tipo_usuario']
+        )
+
+    def _on_user_total(self, total, estimated):
+        self.user_total = total
+        self.update_counter()
             
     def on_user_select(self, event):
         """Carrega os dados do usuário selecionado no formulário"""
@@ -559,7 +546,7 @@ class UsersTab(CTkFrame):
         """Atualiza o contador de usuários na aba."""
         try:
             if hasattr(self, 'tree') and hasattr(self, 'user_count_label'):
-                user_count = len(self.tree.get_children())
+                user_count = self.user_total
                 self.user_count_label.configure(text=f"Total: {user_count} usuário{'s' if user_count != 1 else ''}")
         except Exception as e:
             logger.error(f"Erro ao atualizar contador de usuários: {e}")
@@ -1,11 +1,12 @@
 import tkinter as tk
 import logging, os, sys
 from tkinter import messagebox
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from winotify import Notification, audio
 from typing import Dict
 from ...database.connection import DatabaseConnection
 from ...config.settings import APP_CONFIG
+from ...core.time.work_calendar import WorkCalendar, BREAK_TIME, WORKING_HOURS
 
 logger = logging.getLogger(__name__)
 
@@ -123,15 +124,25 @@ class NotificationManager:
             }
             cls._instance.last_checked_date = None
             
-            # Definir horários fixos da empresa (substituindo TimeManager)
-            time_converter = TimeConverter()
-            cls._instance.COMPANY_START = time_converter.string_to_time('08:00:00')  # Início expediente
-            cls._instance.BREAK_START = time_converter.string_to_time('12:15:00')   # Início intervalo
-            cls._instance.BREAK_END = time_converter.string_to_time('13:15:00')     # Fim intervalo
-            cls._instance.COMPANY_END = time_converter.string_to_time('17:00:00')   # Fim expediente
-            
         return cls._instance
 
+    # Horários da equipe do usuário, vindos do calendário de trabalho
+    @property
+    def COMPANY_START(self) -> time:
+        return WorkCalendar().day_schedule().company_start
+
+    @property
+    def BREAK_START(self) -> time:
+        return WorkCalendar().day_schedule().break_start
+
+    @property
+    def BREAK_END(self) -> time:
+        return WorkCalendar().day_schedule().break_end
+
+    @property
+    def COMPANY_END(self) -> time:
+        return WorkCalendar().day_schedule().company_end
+
     def initialize(self, main_window, username):
         """Inicializa o gerenciador com a janela principal e nome do usuário"""
         try:
@@ -292,37 +303,24 @@ class NotificationManager:
         }
 
     def check_company_hours(self):
-        """Verifica e notifica sobre horários da empresa usando horários fixos definidos na classe"""
+        """Verifica o status do horário comercial no calendário de trabalho"""
         try:
-            current_time = datetime.now().time()
-            current_date = datetime.now().date()
+            now = datetime.now()
 
             # Resetar estados de notificação no início de um novo dia
-            if current_date != self.last_checked_date:
+            if now.date() != self.last_checked_date:
                 self.reset_notification_states()
-                self.last_checked_date = current_date
+                self.last_checked_date = now.date()
 
-            # Verificar início do expediente
-            if current_time < self.COMPANY_START:
-                return "before_hours"
-                
-            # Verificar intervalo
-            elif self.BREAK_START <= current_time <= self.BREAK_END:
-                # Se estiver no início do intervalo (dentro de 1 minuto)
-                if abs((datetime.combine(datetime.today(), current_time) - 
-                       datetime.combine(datetime.today(), self.BREAK_START)).total_seconds()) <= 60:
-                    return "break_time"
-                # Se estiver no fim do intervalo (dentro de 1 minuto)
-                elif abs((datetime.combine(datetime.today(), current_time) - 
-                        datetime.combine(datetime.today(), self.BREAK_END)).total_seconds()) <= 60:
-                    return "break_end"
-                return "break_time"
-                
-            # Verificar fim do expediente
-            elif current_time >= self.COMPANY_END:
-                return "after_hours"
-                
-            return "working_hours"
+            calendar = WorkCalendar()
+            status = calendar.status_at(now)
+
+            # No último minuto do intervalo ou no primeiro após ele: aviso de retorno
+            if status == BREAK_TIME and calendar.status_at(now + timedelta(minutes=1)) == WORKING_HOURS:
+                return "break_end"
+            if status == WORKING_HOURS and calendar.status_at(now - timedelta(minutes=1)) == BREAK_TIME:
+                return "break_end"
+            return status
             
         except Exception as e:
             logger.error(f"Erro ao verificar horário comercial: {e}")
@@ -6,6 +6,8 @@ import logging, threading, time, json, os, sys, bcrypt
 from ...database.connection import DatabaseConnection
 from app.ui.windows.main_window import MainWindow
 from ...utils.helpers import IconMixin
+from ...utils.ui_tasks import UITaskRunner, busy_cursor
+from ...core.activity.activity_state import ActivityStateStore
 from ...config.settings import APP_CONFIG
 from .loading_window import LoadingWindow
 from cryptography.fernet import Fernet
@@ -489,7 +491,7 @@ class LoginWindow(ctk.CTk, IconMixin):
             messagebox.showerror("Erro", f"Falha ao iniciar admin: {e}")
 
     def validate_login(self):
-        """Valida as credenciais do usuário"""
+        """Valida as credenciais do usuário (consultas em segundo plano)"""
         try:
             username = self.username_entry.get()
             password = self.password_entry.get()
@@ -503,80 +505,119 @@ class LoginWindow(ctk.CTk, IconMixin):
                 messagebox.showerror("Erro", "Por favor, preencha todos os campos!")
                 return
             
-            # Primeiro, resetar status de usuários que não fizeram logout no dia anterior
-            reset_query = """
-                UPDATE usuarios 
-                SET is_logged_in = FALSE,
-                    updated_at = CURRENT_TIMESTAMP 
-                WHERE is_logged_in = TRUE 
-                AND DATE(updated_at) < CURRENT_DATE
-            """
-            self.db.execute_query(reset_query)
-            
-            # Consulta o usuário no banco
-            query = """
-                SELECT u.id, u.name_id, u.senha, u.tipo_usuario, u.status, 
-                    u.nome, u.email, u.equipe_id, u.data_entrada,
-                    e.nome as equipe_nome
-                FROM usuarios u
-                LEFT JOIN equipes e ON u.equipe_id = e.id
-                WHERE u.name_id = %s
-            """
-            
-            result = self.db.execute_query(query, (username,))
-            
-            if not result:
-                messagebox.showerror("Erro", "Usuário não encontrado!")
-                return
+            def on_success(result):
+                user_data, error = result
+                if error:
+                    messagebox.showerror("Erro", error)
+                else:
+                    self._complete_login(user_data, username, password)
+            
+            UITaskRunner().submit(
+                self,
+                lambda: self._authenticate(username, password),
+                on_success=on_success,
+                on_error=self._on_login_error,
+                key=(id(self), 'login'),
+                busy=self._set_login_busy
+            )
             
-            user = result[0]
+        except Exception as e:
+            self._on_login_error(e)
 
-            # Verifica a senha usando o novo método que suporta bcrypt
-            if not self.verify_password(password, user['senha']):
-                messagebox.showerror("Erro", "Senha incorreta!")
-                return
-            
-            # Se a senha está no formato antigo, atualiza para bcrypt
-            if password == user['senha']:  # Senha ainda no formato antigo
-                salt = bcrypt.gensalt()
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-                update_password_query = "UPDATE usuarios SET senha = %s WHERE id = %s"
-                self.db.execute_query(update_password_query, (hashed_password.decode('utf-8'), user['id']))
-                logger.info(f"Senha do usuário {username} atualizada para formato bcrypt")
-            
-            # Atualiza apenas is_logged_in do usuário
-            update_query = """
-                UPDATE usuarios 
-                SET is_logged_in = TRUE,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            """
-            self.db.execute_query(update_query, (user['id'],))
-            
-            # Confirma que a atualização foi feita
-            verify_query = "SELECT is_logged_in FROM usuarios WHERE id = %s"
-            verify_result = self.db.execute_query(verify_query, (user['id'],))
-            
-            if not verify_result or not verify_result[0]['is_logged_in']:
-                logger.error("Falha ao atualizar status de login do usuário")
-                messagebox.showerror("Erro", "Falha ao atualizar status de login do usuário")
-                return
-            
-            # Log de login bem-sucedido
-            logger.info(f"Usuário {username} logado com sucesso")
-            
-            # Prepara os dados do usuário para passar para a próxima janela
-            user_data = {
-                'id': user['id'],
-                'name_id': user['name_id'],
-                'nome': user['nome'],
-                'email': user['email'],
-                'equipe_id': user['equipe_id'],
-                'equipe_nome': user['equipe_nome'],
-                'tipo_usuario': user['tipo_usuario'],
-                'data_entrada': user['data_entrada']
-            }
-            
+    def _set_login_busy(self, busy):
+        """Indicador de ocupado do login: botão desabilitado e cursor de espera"""
+        self.login_button.configure(state="disabled" if busy else "normal")
+        busy_cursor(self)(busy)
+
+    def _on_login_error(self, error):
+        logger.error(f"Erro durante login: {error}")
+        messagebox.showerror("Erro", "Erro ao realizar login. Por favor, tente novamente.")
+
+    def _authenticate(self, username, password):
+        """
+        Consultas e atualizações do login (executado fora da thread da interface).
+        Retorna (user_data, None) ou (None, mensagem de erro).
+        """
+        # Primeiro, resetar status de usuários que não fizeram logout no dia anterior
+        reset_query = """
+            UPDATE usuarios 
+            SET is_logged_in = FALSE,
+                updated_at = CURRENT_TIMESTAMP 
+            WHERE is_logged_in = TRUE 
+            AND updated_at < CURRENT_DATE
+        """
+        self.db.execute_query(reset_query)
+        
+        # Consulta o usuário no banco
+        query = """
+            SELECT u.id, u.name_id, u.senha, u.tipo_usuario, u.status, 
+                u.nome, u.email, u.equipe_id, u.data_entrada,
+                e.nome as equipe_nome
+            FROM usuarios u
+            LEFT JOIN equipes e ON u.equipe_id = e.id
+            WHERE u.name_id = %s
+        """
+        
+        result = self.db.execute_query(query, (username,))
+        
+        if not result:
+            return None, "Usuário não encontrado!"
+        
+        user = result[0]
+
+        # Verifica a senha usando o novo método que suporta bcrypt
+        if not self.verify_password(password, user['senha']):
+            return None, "Senha incorreta!"
+        
+        # Se a senha está no formato antigo, atualiza para bcrypt
+        if password == user['senha']:  # Senha ainda no formato antigo
+            salt = bcrypt.gensalt()
+            hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+            update_password_query = "UPDATE usuarios SET senha = %s WHERE id = %s"
+            self.db.execute_query(update_password_query, (hashed_password.decode('utf-8'), user['id']))
+            logger.info(f"Senha do usuário {username} atualizada para formato bcrypt")
+        
+        # Atualiza apenas is_logged_in do usuário
+        update_query = """
+            UPDATE usuarios 
+            SET is_logged_in = TRUE,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """
+        self.db.execute_query(update_query, (user['id'],))
+        
+        # Confirma que a atualização foi feita
+        verify_query = "SELECT is_logged_in FROM usuarios WHERE id = %s"
+        verify_result = self.db.execute_query(verify_query, (user['id'],))
+        
+        if not verify_result or not verify_result[0]['is_logged_in']:
+            logger.error("Falha ao atualizar status de login do usuário")
+            return None, "Falha ao atualizar status de login do usuário"
+        
+        # Log de login bem-sucedido
+        logger.info(f"Usuário {username} logado com sucesso")
+        
+        # Estado das atividades em aberto, lido uma vez (a interface lê da memória)
+        try:
+            ActivityStateStore().load(user['id'])
+        except Exception as e:
+            logger.warning(f"Estado das atividades não carregado no login: {e}")
+        
+        # Prepara os dados do usuário para passar para a próxima janela
+        return {
+            'id': user['id'],
+            'name_id': user['name_id'],
+            'nome': user['nome'],
+            'email': user['email'],
+            'equipe_id': user['equipe_id'],
+            'equipe_nome': user['equipe_nome'],
+            'tipo_usuario': user['tipo_usuario'],
+            'data_entrada': user['data_entrada']
+        }, None
+
+    def _complete_login(self, user_data, username, password):
+        """Abre a janela principal após o login (thread da interface)"""
+        try:
             # Esconde a janela de login
             self.withdraw()
             
@@ -585,16 +626,15 @@ class LoginWindow(ctk.CTk, IconMixin):
             if self.window_manager:
                 self.window_manager.position_window(main_window, parent=self)
             notification_manager = NotificationManager()
-            notification_manager.initialize(main_window, user['nome'])
-            notification_manager.show_welcome_message(user['nome'])
+            notification_manager.initialize(main_window, user_data['nome'])
+            notification_manager.show_welcome_message(user_data['nome'])
             
             # Salva as credenciais se a opção estiver marcada
             if self.remember_var.get():
                 self.save_credentials(username, password)
             
         except Exception as e:
-            logger.error(f"Erro durante login: {e}")
-            messagebox.showerror("Erro", "Erro ao realizar login. Por favor, tente novamente.")
+            self._on_login_error(e)
 
     def check_setup_completion(self):
         """Verifica se a configuração foi concluída"""
@@ -3,6 +3,7 @@ import logging, os, time
 from tkinter import messagebox, filedialog
 from ..notifications.notification_manager import NotificationManager
 from ...database.connection import DatabaseConnection
+from ...database.write_behind import WriteBehindQueue
 from ..dialogs.search_dialog import SearchFrame
 from ..dialogs.activities_printer_dialog import ActivitiesPrinterDialog
 from ..dialogs.dashboard_daily import DashboardDaily
@@ -16,6 +17,7 @@ from ...core.printer.query.query_activities import QueryActivities
 from ...core.printer.observer.base_value_observer import BaseValueObserver
 from ..components.activities.activity_controls import ActivityControls
 from ..components.logic.activity_controls_logic import ActivityControlsLogic
+from ...core.activity.activity_state import ActivityStateStore
 
 logger = logging.getLogger(__name__)
 
@@ -276,9 +278,13 @@ class MainWindow(BaseWindow):
         """Realiza o logout do administrador"""
         if messagebox.askyesno("Logout", "Deseja realmente sair?"):
             try:
+                # Gravar atualizações de tempo pendentes antes de pausar
+                WriteBehindQueue(self.db).flush()
+                
                 # Pausar todas as atividades ativas do usuário
                 logic = ActivityControlsLogic(self.db)
                 logic.pause_all_active_activities(self.user_data['id'])
+                ActivityStateStore().clear()
                 # Primeiro desregistrar observers e limpar outros recursos
                 self.unregister_observers()
                 
@@ -425,6 +431,9 @@ class MainWindow(BaseWindow):
     def destroy(self):
         """Sobrescreve o método destroy para limpar recursos"""
         try:
+            # Não perder atualizações de tempo ainda na fila
+            WriteBehindQueue(self.db).flush()
+            
             # Primeiro limpar o system tray
             if hasattr(self, 'system_tray'):
                 self.system_tray.cleanup()
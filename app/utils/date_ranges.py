@@ -0,0 +1,59 @@
+from datetime import datetime, time, timedelta
+
+# Nomes de período aceitos (inglês e os textos usados nos filtros da interface)
+PERIOD_ALIASES = {
+    'day': 'day', 'dia': 'day', 'dia atual': 'day',
+    'week': 'week', 'semana': 'week', 'semana atual': 'week',
+    'month': 'month', 'mês': 'month', 'mes': 'month', 'mês atual': 'month',
+    'year': 'year', 'ano': 'year', 'ano atual': 'year'
+}
+
+def start_of_day(value):
+    """Converte uma data ou datetime para a meia-noite do mesmo dia"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return datetime.combine(value, time.min)
+
+def period_range(period, reference=None):
+    """
+    Retorna o intervalo semiaberto [início, fim) do período que contém reference.
+    period: 'day', 'week' (segunda a domingo, como YEARWEEK(..., 1)), 'month' ou
+    'year', ou um dos nomes usados na interface ("Dia", "Semana", "Mês", "Ano").
+    Lança ValueError para períodos desconhecidos.
+    """
+    kind = PERIOD_ALIASES.get(str(period).strip().lower())
+    if kind is None:
+        raise ValueError(f"Período desconhecido: {period}")
+
+    day = start_of_day(reference or datetime.now())
+    if kind == 'day':
+        return day, day + timedelta(days=1)
+    if kind == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(weeks=1)
+    if kind == 'month':
+        return month_range(day.year, day.month)
+    return year_range(day.year)
+
+def month_range(year, month):
+    """Intervalo [início, fim) de um mês"""
+    year, month = int(year), int(month)
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def year_range(year):
+    """Intervalo [início, fim) de um ano"""
+    year = int(year)
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+def custom_range(start, end):
+    """
+    Intervalo [início, fim) cobrindo os dias de start a end, inclusive
+    (equivalente a DATE(coluna) BETWEEN start AND end)
+    """
+    return start_of_day(start), start_of_day(end) + timedelta(days=1)
+
+def range_clause(column):
+    """Predicado indexável para um intervalo semiaberto; recebe (início, fim) como parâmetros"""
+    return f"{column} >= %s AND {column} < %s"
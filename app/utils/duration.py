@@ -0,0 +1,163 @@
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache, total_ordering
+import re
+
+# "[-]H:MM[:SS[.ffffff]]", com ou sem dias no formato de str(timedelta) ("1 day, 2:03:04")
+_TEXT_RE = re.compile(
+    r"^\s*(?:(?P<days>-?\d+)\s+days?,\s*)?(?P<sign>-)?(?P<h>\d+):(?P<m>\d{1,2})(?::(?P<s>\d{1,2})(?:\.\d+)?)?\s*$"
+)
+
+@lru_cache(maxsize=4096)
+def _parse_text(text: str) -> int:
+    match = _TEXT_RE.match(text)
+    if not match:
+        stripped = text.strip()
+        if stripped.lstrip('-').isdigit():
+            return int(stripped)
+        raise ValueError(f"Duração inválida: {text!r}")
+    seconds = int(match['h']) * 3600 + int(match['m']) * 60 + int(match['s'] or 0)
+    if match['sign']:
+        seconds = -seconds
+    if match['days']:
+        seconds += int(match['days']) * 86400
+    return seconds
+
+def to_seconds(value) -> int:
+    """
+    Converte uma duração para segundos inteiros.
+    Aceita Duration, int/float/Decimal (segundos), timedelta (coluna TIME do
+    MySQL) e texto "HH:MM:SS" (horas acima de 24, sinal e dias do timedelta).
+    None e texto vazio valem zero; lança ValueError para texto inválido.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, Duration):
+        return value.seconds
+    if isinstance(value, int):
+        return value
+    if isinstance(value, timedelta):
+        return value.days * 86400 + value.seconds
+    if isinstance(value, (float, Decimal)):
+        return int(value)
+    if isinstance(value, bytes):
+        value = value.decode()
+    if isinstance(value, str):
+        return _parse_text(value) if value else 0
+    raise TypeError(f"Tipo de duração não suportado: {type(value).__name__}")
+
+@lru_cache(maxsize=8192)
+def format_hms(seconds: int) -> str:
+    """Segundos para "HH:MM:SS" (horas podem passar de 24; negativos com "-")"""
+    sign = "-" if seconds < 0 else ""
+    seconds = abs(seconds)
+    return f"{sign}{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def to_hms(value) -> str:
+    """Qualquer valor aceito por to_seconds formatado como "HH:MM:SS" """
+    return format_hms(to_seconds(value))
+
+def to_hours(value) -> float:
+    """Duração em horas decimais"""
+    return to_seconds(value) / 3600
+
+def format_decimal_hours(value, places: int = 4) -> str:
+    """Horas decimais com vírgula (padrão das planilhas): "1,5000" """
+    return f"{to_hours(value):.{places}f}".replace('.', ',')
+
+# ------------------------------------------------------------ em lote
+
+def seconds_many(values) -> list:
+    """Converte uma sequência de durações para segundos"""
+    return [to_seconds(value) for value in values]
+
+def sum_seconds(values) -> int:
+    """Soma de uma sequência de durações, em segundos"""
+    return sum(map(to_seconds, values))
+
+def format_many(values) -> list:
+    """Formata uma sequência de durações como "HH:MM:SS" """
+    return [format_hms(to_seconds(value)) for value in values]
+
+# --------------------------------------------------------- banco de dados
+
+def seconds_column(column: str, alias: str = None) -> str:
+    """
+    Expressão SELECT que lê uma coluna TIME já em segundos (sem timedelta nem texto).
+    seconds_column("a.total_time") -> "TIME_TO_SEC(a.total_time) AS total_time_seconds"
+    """
+    return f"TIME_TO_SEC({column}) AS {alias or column.split('.')[-1] + '_seconds'}"
+
+def to_db(value) -> str:
+    """Parâmetro para gravar em uma coluna TIME ("HH:MM:SS", até 838:59:59 no MySQL)"""
+    return format_hms(to_seconds(value))
+
+@total_ordering
+class Duration:
+    """
+    Duração em segundos inteiros.
+
+    Guarda apenas um int (__slots__); o texto "HH:MM:SS" é gerado sob
+    demanda e reaproveitado pelo cache de format_hms. Soma, subtração e
+    comparações aceitam outros valores convertíveis por to_seconds.
+    """
+    __slots__ = ('seconds',)
+
+    def __init__(self, seconds: int = 0):
+        self.seconds = int(seconds)
+
+    @classmethod
+    def parse(cls, value) -> "Duration":
+        if isinstance(value, Duration):
+            return value
+        return cls(to_seconds(value))
+
+    @property
+    def hours(self) -> float:
+        return self.seconds / 3600
+
+    def to_timedelta(self) -> timedelta:
+        return timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return format_hms(self.seconds)
+
+    def __repr__(self) -> str:
+        return f"Duration({self.seconds})"
+
+    def __int__(self) -> int:
+        return self.seconds
+
+    def __bool__(self) -> bool:
+        return self.seconds != 0
+
+    def __hash__(self) -> int:
+        return hash(self.seconds)
+
+    def __eq__(self, other) -> bool:
+        try:
+            return self.seconds == to_seconds(other)
+        except (TypeError, ValueError):
+            return NotImplemented
+
+    def __lt__(self, other) -> bool:
+        return self.seconds < to_seconds(other)
+
+    def __add__(self, other) -> "Duration":
+        return Duration(self.seconds + to_seconds(other))
+
+    __radd__ = __add__  # permite sum() de Durations
+
+    def __sub__(self, other) -> "Duration":
+        return Duration(self.seconds - to_seconds(other))
+
+    def __rsub__(self, other) -> "Duration":
+        return Duration(to_seconds(other) - self.seconds)
+
+    def __neg__(self) -> "Duration":
+        return Duration(-self.seconds)
+
+    def __abs__(self) -> "Duration":
+        return Duration(abs(self.seconds))
+
+ZERO = Duration(0)
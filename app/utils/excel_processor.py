@@ -1,10 +1,12 @@
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from openpyxl import load_workbook
 import logging
 import win32com.client
 from typing import List, Dict
 from ..database.connection import DatabaseConnection
+from .date_ranges import period_range, range_clause
+from .duration import to_seconds, format_decimal_hours, seconds_column
 
 logger = logging.getLogger(__name__)
 
@@ -45,82 +47,62 @@ class ExcelProcessor:
 
     def convert_time_to_decimal(self, time_value) -> float:
         """
-        Converte tempo para decimal, aceitando tanto string HH:MM:SS quanto timedelta
+        Converte tempo para decimal (string com vírgula), aceitando string HH:MM:SS,
+        timedelta, segundos ou Duration
         """
         try:
             if not time_value:
                 return 0.0
-
-            # Se for timedelta, extrair horas, minutos e segundos
-            if isinstance(time_value, timedelta):
-                total_seconds = int(time_value.total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-            # Se for string, fazer split
-            elif isinstance(time_value, str):
-                if time_value == "00:00:00":
-                    return 0.0
-                hours, minutes, seconds = map(int, time_value.split(':'))
-            else:
-                logger.error(f"Tipo de tempo não suportado: {type(time_value)}")
-                return 0.0
-
-            decimal_hours = hours + (minutes / 60.0) + (seconds / 3600.0)
             # Formata para ter 4 casas decimais e usa vírgula
-            return f"{decimal_hours:.4f}".replace('.', ',')
+            return format_decimal_hours(time_value)
             
-        except Exception as e:
+        except (TypeError, ValueError) as e:
             logger.error(f"Erro ao converter tempo {time_value}: {e}")
             return 0.0
 
     def get_daily_activities(self, user_id: int) -> List[Dict]:
         """Busca atividades do dia atual do usuário específico e agrupa duplicatas"""
         try:
-            query = """
+            query = f"""
                 SELECT 
                     id,
                     user_id,
                     description,
                     atividade,
-                    total_time,
+                    {seconds_column('total_time')},
                     updated_at
                 FROM atividades 
                 WHERE user_id = %s
-                AND DATE(updated_at) = CURDATE()
+                AND {range_clause('updated_at')}
                 AND (concluido = TRUE OR pausado = TRUE)
                 ORDER BY start_time ASC
             """
-            
-            results = self.db.execute_query(query, (user_id,))
+            today_start, tomorrow_start = period_range('day')
             
             # Dicionário para agrupar atividades idênticas
             grouped_activities = {}
             
-            # Processar e agrupar resultados
-            for activity in results:
-                # Criar uma chave única usando descrição e atividade
-                key = (activity['description'], activity['atividade'])
-                
-                # Converter tempo total para timedelta para facilitar a soma
-                if isinstance(activity['total_time'], str):
-                    h, m, s = map(int, activity['total_time'].split(':'))
-                    total_time = timedelta(hours=h, minutes=m, seconds=s)
-                else:
-                    total_time = activity['total_time']
-                
-                if key in grouped_activities:
-                    # Se já existe, soma o tempo
-                    grouped_activities[key]['total_time'] += total_time
-                else:
-                    # Se não existe, cria novo registro
-                    grouped_activities[key] = {
-                        'id': activity['id'],
-                        'description': activity['description'],
-                        'atividade': activity['atividade'],
-                        'total_time': total_time,
-                        'updated_at': activity['updated_at']
-                    }
+            # Processar e agrupar resultados conforme são lidos do banco
+            with self.db.stream(query, (user_id, today_start, tomorrow_start)) as results:
+                for activity in results:
+                    # Criar uma chave única usando descrição e atividade
+                    key = (activity['description'], activity['atividade'])
+                    
+                    # Tempo total lido do banco já em segundos, somado como inteiro
+                    total_time = to_seconds(activity['total_time_seconds'])
+                    
+                    if key in grouped_activities:
+                        # Se já existe, soma o tempo
+                        grouped_activities[key]['total_time'] += total_time
+                    else:
+                        # Se não existe, cria novo registro
+                        grouped_activities[key] = {
+                            'id': activity['id'],
+                            'description': activity['description'],
+                            'atividade': activity['atividade'],
+                            'total_time': total_time,
+                            'updated_at': activity['updated_at']
+                        }
             
             # Converter resultados agrupados para lista
             processed_activities = []
@@ -0,0 +1,226 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Threads de trabalho para consultas e IO disparados pela interface
+MAX_WORKERS = 4
+
+# Intervalo do after() que entrega os resultados enquanto há tarefas em andamento
+PUMP_INTERVAL_MS = 30
+
+# Pausa na digitação antes de disparar a pesquisa enquanto o usuário digita
+DEBOUNCE_MS = 300
+
+class UITask:
+    """Tarefa submetida ao UITaskRunner; cancel() impede a entrega do resultado"""
+    __slots__ = ('widget', 'on_success', 'on_error', 'key', 'busy', 'cancelled', 'done', 'future')
+
+    def __init__(self, widget, on_success, on_error, key, busy):
+        self.widget = widget
+        self.on_success = on_success
+        self.on_error = on_error
+        self.key = key
+        self.busy = busy
+        self.cancelled = False
+        self.done = False
+        self.future = None
+
+    def cancel(self):
+        UITaskRunner().cancel_task(self)
+
+class UITaskRunner:
+    """
+    Executa trabalho de banco de dados e IO fora do loop de eventos do Tkinter.
+
+    submit() envia a função para um pool de threads; o resultado volta por uma
+    fila esvaziada por um único after() na thread da interface, que só fica
+    armado enquanto há tarefas em andamento. Antes de cada callback o widget
+    dono da tarefa é verificado (winfo_exists), e uma tarefa submetida com a
+    mesma chave (key) de outra ainda em andamento cancela a anterior, cujo
+    resultado é descartado. O indicador busy(True/False) acompanha cada tarefa.
+
+    submit() e cancel() devem ser chamados na thread da interface.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.initialized = False
+        return cls._instance
+
+    def __init__(self, max_workers=None):
+        if not self.initialized:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers or MAX_WORKERS,
+                                                thread_name_prefix="ui-task")
+            self._results = queue.SimpleQueue()
+            self._lock = threading.Lock()
+            self._keys = {}
+            self._pending = 0
+            self._root = None
+            self._after_id = None
+            self.initialized = True
+
+    # ---------------------------------------------------------------- tarefas
+
+    def submit(self, widget, work, on_success=None, on_error=None, key=None, busy=None):
+        """
+        Executa work() em uma thread de trabalho e entrega o resultado a
+        on_success(resultado) (ou a exceção a on_error) na thread da interface,
+        se widget ainda existir.
+        """
+        task = UITask(widget, on_success, on_error, key, busy)
+        if key is not None:
+            previous = self._keys.get(key)
+            if previous is not None:
+                self.cancel_task(previous)
+            self._keys[key] = task
+        self._set_busy(task, True)
+        with self._lock:
+            self._pending += 1
+        task.future = self._executor.submit(self._execute, task, work)
+        self._attach(widget)
+        return task
+
+    def cancel(self, key):
+        """Cancela a tarefa em andamento com a chave informada"""
+        task = self._keys.get(key)
+        if task is not None:
+            self.cancel_task(task)
+
+    def cancel_task(self, task):
+        if task.cancelled or task.done:
+            return
+        task.cancelled = True
+        if task.future is not None:
+            task.future.cancel()
+        self._finish(task)
+
+    def _execute(self, task, work):
+        if task.cancelled:
+            return
+        try:
+            self._results.put((task, True, work()))
+        except Exception as e:
+            self._results.put((task, False, e))
+
+    # ------------------------------------------------------------- entrega
+
+    def drain(self):
+        """Executa os callbacks dos resultados já prontos; retorna quantos foram entregues"""
+        delivered = 0
+        while True:
+            try:
+                task, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                return delivered
+            if task.cancelled or task.done:
+                continue
+            self._finish(task)
+            if not self._alive(task.widget):
+                logger.debug("[TASKS] Widget destruído, resultado descartado")
+                continue
+            delivered += 1
+            callback = task.on_success if ok else task.on_error
+            try:
+                if callback:
+                    callback(value)
+                elif not ok:
+                    logger.error(f"[TASKS] Erro na tarefa em segundo plano: {value}")
+            except Exception as e:
+                logger.error(f"[TASKS] Erro ao entregar resultado: {e}")
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def _finish(self, task):
+        task.done = True
+        if task.key is not None and self._keys.get(task.key) is task:
+            del self._keys[task.key]
+        with self._lock:
+            self._pending -= 1
+        self._set_busy(task, False)
+
+    def _set_busy(self, task, busy):
+        if task.busy is None:
+            return
+        try:
+            task.busy(busy)
+        except Exception as e:
+            logger.debug(f"[TASKS] Erro no indicador de ocupado: {e}")
+
+    # ---------------------------------------------------------------- motor
+
+    def _attach(self, widget):
+        """Arma o after() no Tk raiz (sobrevive ao fechamento de diálogos)"""
+        try:
+            if self._root is None or not self._alive(self._root):
+                self._root = widget._root()
+                self._after_id = None
+            if self._after_id is None:
+                self._after_id = self._root.after(PUMP_INTERVAL_MS, self._pump)
+        except Exception as e:
+            # Sem loop de eventos (ex.: testes): drain() entrega os resultados
+            logger.debug(f"[TASKS] Interface indisponível para a entrega automática: {e}")
+            self._root = None
+
+    def _pump(self):
+        self._after_id = None
+        try:
+            self.drain()
+        finally:
+            if self.pending > 0 and self._root is not None:
+                try:
+                    self._after_id = self._root.after(PUMP_INTERVAL_MS, self._pump)
+                except Exception:
+                    self._root = None
+
+    @staticmethod
+    def _alive(widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+def busy_cursor(widget):
+    """Indicador de ocupado: cursor de espera na janela de widget enquanto houver tarefas"""
+    def indicator(busy):
+        window = widget.winfo_toplevel()
+        count = getattr(window, '_busy_tasks', 0) + (1 if busy else -1)
+        window._busy_tasks = max(0, count)
+        window.configure(cursor="watch" if window._busy_tasks else "")
+    return indicator
+
+class Debouncer:
+    """
+    Adia callback até delay_ms sem novas chamadas: cada chamada reagenda o
+    after() pendente, então uma sequência de teclas dispara uma única vez.
+    """
+
+    def __init__(self, widget, callback, delay_ms=DEBOUNCE_MS):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._after_id = None
+
+    def __call__(self, *args):
+        self.cancel()
+        self._after_id = self.widget.after(self.delay_ms, self._fire, *args)
+
+    def cancel(self):
+        """Descarta a chamada pendente"""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _fire(self, *args):
+        self._after_id = None
+        self.callback(*args)
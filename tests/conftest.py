@@ -0,0 +1,63 @@
+# tests/conftest.py
+
+import sys
+import os
+
+import pytest
+
+# Adiciona o diretório raiz do projeto ao PATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+
+# Singletons do app (módulo, classe, encerrar ao fim do teste): cada teste
+# recebe instâncias novas e as compartilhadas são restauradas depois
+SINGLETONS = [
+    ('app.database.sqlite_backend', 'SQLiteConnection', False),
+    ('app.database.local_journal', 'LocalJournal', True),
+    ('app.database.write_behind', 'WriteBehindQueue', True),
+    ('app.core.time.scheduler', 'DeadlineScheduler', False),
+    ('app.core.time.work_calendar', 'WorkCalendar', False),
+    ('app.utils.ui_tasks', 'UITaskRunner', False),
+    ('app.core.activity.activity_events', 'ActivityEventLog', False),
+    ('app.core.activity.activity_state', 'ActivityStateStore', False),
+    ('app.core.idleness.idle_sessions', 'IdleSessionLog', True),
+]
+
+def _loaded_singletons():
+    # Só os módulos já importados pelos testes: nada é importado aqui
+    for module_name, class_name, stop in SINGLETONS:
+        module = sys.modules.get(module_name)
+        cls = getattr(module, class_name, None)
+        if cls is not None:
+            yield cls, stop
+
+@pytest.fixture(autouse=True)
+def isolated_app(monkeypatch, tmp_path):
+    """
+    Isola o estado global do app em cada teste: singletons novos, journal
+    local desabilitado e arquivos do app (journal, logs) em tmp_path.
+    """
+    saved = {cls: cls._instance for cls, _ in _loaded_singletons()}
+    for cls in saved:
+        cls._instance = None
+
+    monkeypatch.setitem(settings.JOURNAL_CONFIG, 'enabled', False)
+    monkeypatch.setitem(settings.JOURNAL_CONFIG, 'path', str(tmp_path / 'journal.db'))
+    monkeypatch.setitem(settings.QUERY_STATS_CONFIG, 'log_dir', str(tmp_path / 'logs'))
+
+    yield
+
+    for cls, stop in _loaded_singletons():
+        instance = cls._instance
+        if stop and instance is not None and instance is not saved.get(cls):
+            instance.stop()
+        cls._instance = saved.get(cls)
+
+@pytest.fixture
+def db():
+    """Banco SQLite em memória exclusivo do teste"""
+    from app.database.sqlite_backend import SQLiteConnection
+    database = SQLiteConnection(":memory:")
+    yield database
+    database.close()
@@ -0,0 +1,73 @@
+# tests/test_activity_events.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config.settings import JOURNAL_CONFIG, DB_BACKEND_CONFIG
+from app.database.local_journal import LocalJournal
+from app.core.activity.activity_events import (
+    ActivityEventLog, fold, EVENT_START, EVENT_PAUSE, EVENT_RESUME, EVENT_STOP,
+    EVENT_EXCEEDED, EVENT_IDLE, STATE_RUNNING, STATE_PAUSED, STATE_STOPPED
+)
+
+START = datetime(2024, 3, 4, 9, 0)
+
+@pytest.fixture
+def log(db):
+    return ActivityEventLog(db)
+
+def test_summary_follows_each_event(log):
+    # Atividade de 1 hora: começa às 9h, pausa às 9h20, retoma às 10h
+    log.record(101, 1, EVENT_START, START, total_seconds=0, limit_seconds=3600)
+    summary = log.get_summary(101)
+    assert summary.state == STATE_RUNNING and summary.running_since == START
+    assert summary.total_at(START + timedelta(minutes=5)) == 300
+    assert summary.mode_at(START + timedelta(minutes=5)) == 'regressivo'
+
+    log.record(101, 1, EVENT_PAUSE, START + timedelta(minutes=20), total_seconds=1200)
+    summary = log.get_summary(101)
+    assert summary.state == STATE_PAUSED
+    # Pausada, o tempo não avança
+    assert summary.total_at(START + timedelta(hours=5)) == 1200
+    assert summary.regress_seconds_at() == 2400
+
+    log.record(101, 1, EVENT_RESUME, START + timedelta(hours=1), total_seconds=1200, limit_seconds=3600)
+    log.record(101, 1, EVENT_EXCEEDED, START + timedelta(hours=1, minutes=40))
+    log.record(101, 1, EVENT_IDLE, START + timedelta(hours=1, minutes=50), idle_seconds=90)
+    log.record(101, 1, EVENT_STOP, START + timedelta(hours=2), total_seconds=4800)
+
+    summary = log.get_summary(101)
+    assert summary.state == STATE_STOPPED
+    assert summary.exceeded_at == START + timedelta(hours=1, minutes=40)
+    assert (summary.mode_at(), summary.exceeded_seconds_at(), summary.idle_seconds) == ('progressivo', 1200, 90)
+    assert summary.event_count == 6
+
+def test_summary_matches_replay_of_the_log(log):
+    log.record(102, 2, EVENT_START, START, total_seconds=600, limit_seconds=900)
+    log.record(102, 2, EVENT_EXCEEDED, START + timedelta(minutes=5))
+    log.record(102, 2, EVENT_PAUSE, START + timedelta(minutes=8), total_seconds=1080)
+
+    events = log.get_events(102)
+    assert [event['event_type'] for event in events] == [EVENT_START, EVENT_EXCEEDED, EVENT_PAUSE]
+    assert log.rebuild_summary(102) == log.get_summary(102)
+    assert fold(events[:1]).running_since == START
+
+def test_idle_without_activity_only_logs_event(log):
+    log.record(101, 1, EVENT_START, START, total_seconds=0, limit_seconds=3600)
+    log.record(102, 2, EVENT_START, START, total_seconds=0, limit_seconds=3600)
+    log.record(None, 3, EVENT_IDLE, START, idle_seconds=60)
+    assert log.get_summary(None) is None
+    assert log.get_summaries([101, 102, 999]).keys() == {101, 102}
+
+def test_invalid_event_type_is_rejected(log):
+    with pytest.raises(ValueError):
+        log.record(103, 1, "restart")
+
+def test_default_config_writes_to_the_injected_connection(log, monkeypatch):
+    # Configuração padrão do app: journal habilitado com o MySQL
+    monkeypatch.setitem(JOURNAL_CONFIG, 'enabled', True)
+    monkeypatch.setitem(DB_BACKEND_CONFIG, 'engine', 'mysql')
+    assert log.record(104, 1, EVENT_START, START, total_seconds=0, limit_seconds=600)
+    assert log.get_summary(104).state == STATE_RUNNING
+    assert LocalJournal._instance is None
@@ -0,0 +1,62 @@
+# tests/test_activity_search.py
+
+import pytest
+
+from app.core.activity.activity_search import ActivitySearch, search_tokens, ready_to_search, match_expression
+
+COLUMNS = "a.id, a.atividade, u.nome as user_name"
+
+@pytest.fixture
+def db(db):
+    # Banco do conftest com 3 usuários e 5 atividades indexadas
+    if not db.full_text:
+        pytest.skip("SQLite sem FTS5")
+    for index, nome in enumerate(["João Silva", "Maria Projeto", "Ana Souza"]):
+        db.execute_query("INSERT INTO usuarios (nome, email, senha) VALUES (%s, %s, %s)",
+                         (nome, f"user{index}@exemplo.com", "x"))
+    activities = [
+        (1, "Revisão do projeto elétrico", "Projeto"),        # 1: termo na descrição e na atividade
+        (1, "Reunião semanal", "Reunião"),                    # 2
+        (2, "Levantamento de cargas", "Cálculo"),             # 3: colaboradora "Maria Projeto"
+        (3, "Ajustes no projeto", "Desenho"),                 # 4: termo só na descrição
+        (3, "Reuniao com cliente", "Reunião"),                # 5
+    ]
+    for user_id, description, atividade in activities:
+        db.execute_query(
+            "INSERT INTO atividades (user_id, description, atividade, start_time) VALUES (%s, %s, %s, NOW())",
+            (user_id, description, atividade)
+        )
+    return db
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+def test_tokens_and_expressions():
+    assert search_tokens("Projeto, el") == ["projeto"]
+    assert ready_to_search("") and ready_to_search("pro") and not ready_to_search("pr")
+    assert match_expression(["proj", "joao"], 'fulltext') == "proj* joao*"
+    assert match_expression(["proj", "joao"], 'fts5') == '"proj"* OR "joao"*'
+
+def test_ranked_prefix_search(db):
+    search = ActivitySearch(db)
+    assert search.dialect == 'fts5'
+    rows = search.search("proj", COLUMNS)
+    # Texto e nome do colaborador; no texto, mais ocorrências primeiro
+    assert sorted(ids(rows)) == [1, 3, 4] and ids(rows).index(1) < ids(rows).index(4)
+    # Acentos ignorados; filtros e limite aplicados junto com a relevância
+    assert sorted(ids(search.search("reuniao", COLUMNS))) == [2, 5]
+    assert ids(search.search("reunião", COLUMNS, where="a.user_id = %s", params=(3,))) == [5]
+    assert len(search.search("reuniao projeto", COLUMNS, limit=2)) == 2
+    # Termo curto demais para o índice: LIKE, também limitado
+    assert ids(search.search("AS", COLUMNS)) == [3]
+    # Sem termo: todas as atividades filtradas, das mais recentes
+    assert ids(search.search("", COLUMNS, limit=3)) == [5, 4, 3]
+
+def test_index_follows_changes(db):
+    search = ActivitySearch(db)
+    db.execute_query("UPDATE atividades SET description = %s WHERE id = %s", ("Memorial descritivo", 4))
+    db.execute_query("UPDATE usuarios SET nome = %s WHERE id = %s", ("Maria Santos", 2))
+    db.execute_query("DELETE FROM atividades WHERE id = %s", (1,))
+    assert ids(search.search("projeto", COLUMNS)) == []
+    assert ids(search.search("memorial", COLUMNS)) == [4]
+    assert ids(search.search("santos", COLUMNS)) == [3]
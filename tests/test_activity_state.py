@@ -0,0 +1,65 @@
+# tests/test_activity_state.py
+
+from datetime import datetime, timedelta
+
+from app.core.activity.activity_state import ActivityStateStore
+from app.core.activity.activity_transitions import ActivityTransitions, STATUS_PAUSED, STATUS_DONE
+
+def create_activity(db, user_id, minutes_ago, pausado=False, concluido=False):
+    with db.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO atividades (user_id, atividade, start_time, ativo, pausado, concluido)
+            VALUES (%s, 'Projeto', %s, %s, %s, %s)
+        """, (user_id, datetime.now() - timedelta(minutes=minutes_ago), not concluido, pausado, concluido))
+        return cursor.lastrowid
+
+def test_load_and_read_from_memory(db):
+    running = create_activity(db, 1, 10)
+    paused = create_activity(db, 1, 5, pausado=True)
+    create_activity(db, 1, 20, concluido=True)
+    create_activity(db, 2, 1)
+
+    store = ActivityStateStore(db)
+    store.load(1)
+    assert store.covers(1) and not store.covers(2)
+    assert [row['id'] for row in store.activities()] == [paused, running]
+    assert store.running_activity()['id'] == running
+    assert [row['id'] for row in store.paused_activities()] == [paused]
+    # Em aberto mais recente, como em ActivityManager.get_active_activity
+    assert store.open_activity()['id'] == paused
+
+def test_transitions_update_store_and_subscribers(db):
+    running = create_activity(db, 1, 10)
+    paused = create_activity(db, 1, 5, pausado=True)
+    store = ActivityStateStore(db)
+    store.load(1)
+    changes = []
+    store.subscribe(lambda: changes.append(store.has_running()))
+
+    transitions = ActivityTransitions(db)
+    assert transitions.transition(running, STATUS_PAUSED).ok
+    assert not store.has_running() and changes == [False]
+    assert transitions.transition(paused, STATUS_DONE).ok
+    assert [row['id'] for row in store.activities()] == [running]
+
+    # Linhas de outro usuário não entram no estado
+    store.apply({'id': 99, 'user_id': 2, 'ativo': True, 'pausado': False, 'concluido': False})
+    assert [row['id'] for row in store.activities()] == [running]
+
+def test_version_check_reloads_only_on_change(db):
+    running = create_activity(db, 1, 10)
+    store = ActivityStateStore(db)
+    store.load(1)
+    assert store.refresh() is False
+
+    # Outra sessão inicia uma atividade
+    other = create_activity(db, 1, 1)
+    assert store.refresh() is True
+    assert store.open_activity()['id'] == other and store.refresh() is False
+
+    # Pausa gravada sem transição (write-behind do fim do expediente)
+    db.execute_query("UPDATE atividades SET pausado = TRUE WHERE id IN (%s, %s)", (running, other))
+    assert store.refresh() is True and not store.has_running()
+
+    store.clear()
+    assert not store.covers(1) and store.activities() == []
@@ -0,0 +1,47 @@
+# tests/test_activity_table_diff.py
+
+import random
+
+from app.ui.components.logic.activity_table_logic import diff_rows, row_version
+
+def make_row(row_id, version=0, updated="2024-03-04 09:00:00"):
+    return {'id': row_id, 'version': version, 'row_updated_at': updated, 'status': 'Ativo'}
+
+def apply(order, diff):
+    """Aplica o diff como a Treeview: delete, detach, insert/move na posição final"""
+    order = [row_id for row_id in order if row_id not in diff.deletes and row_id not in diff.moves]
+    for index, row_id in diff.placements:
+        order.insert(index, row_id)
+    return order
+
+def test_unchanged_table_produces_no_operations():
+    rows = [make_row(i) for i in range(500)]
+    versions = {row['id']: row_version(row) for row in rows}
+    diff = diff_rows([row['id'] for row in rows], versions, rows)
+    assert diff.empty and diff.placements == []
+
+def test_only_changed_rows_are_touched():
+    rows = [make_row(i) for i in range(1, 8)]
+    versions = {row['id']: row_version(row) for row in rows}
+    old_order = [row['id'] for row in rows]
+
+    # Atividade 5 pausada (sobe de versão e vai para o fim), 2 saiu do período, 9 é nova
+    new_rows = [make_row(9)] + [row for row in rows if row['id'] not in (2, 5)] + [make_row(5, version=1)]
+    diff = diff_rows(old_order, versions, new_rows)
+    assert diff.deletes == [2]
+    assert [row['id'] for row in diff.inserts] == [9]
+    assert [row['id'] for row in diff.updates] == [5]
+    assert diff.moves == [5]
+    assert apply(old_order, diff) == [row['id'] for row in new_rows]
+
+def test_random_reorders_converge():
+    rng = random.Random(42)
+    for _ in range(200):
+        old_order = rng.sample(range(50), rng.randint(0, 30))
+        versions = {row_id: row_version(make_row(row_id)) for row_id in old_order}
+        new_order = rng.sample(range(50), rng.randint(0, 30))
+        diff = diff_rows(old_order, versions, [make_row(row_id) for row_id in new_order])
+        assert apply(old_order, diff) == new_order
+        # Só as linhas fora da maior sequência já ordenada são movidas
+        kept = [row_id for row_id in new_order if row_id in versions]
+        assert len(diff.moves) <= max(0, len(kept) - 1)
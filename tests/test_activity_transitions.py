@@ -0,0 +1,77 @@
+# tests/test_activity_transitions.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config.settings import JOURNAL_CONFIG, DB_BACKEND_CONFIG
+from app.database.local_journal import LocalJournal
+from app.core.activity.activity_events import ActivityEventLog, EVENT_START
+from app.core.activity.activity_transitions import (
+    ActivityTransitions, STATUS_ACTIVE, STATUS_PAUSED, STATUS_DONE
+)
+
+@pytest.fixture(params=['journal_desabilitado', 'configuracao_padrao'])
+def settings(request, monkeypatch):
+    if request.param == 'configuracao_padrao':
+        # Journal habilitado com o MySQL: a conexão injetada continua recebendo as transições
+        monkeypatch.setitem(JOURNAL_CONFIG, 'enabled', True)
+        monkeypatch.setitem(DB_BACKEND_CONFIG, 'engine', 'mysql')
+    yield request.param
+    assert LocalJournal._instance is None
+
+def create_activity(db, user_id, ativo=True, pausado=False, concluido=False):
+    with db.transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO atividades (user_id, atividade, start_time, time_regress, time_exceeded,
+                                    total_time, ativo, pausado, concluido)
+            VALUES (%s, 'Projeto', %s, '01:00:00', '00:00:00', '00:00:00', %s, %s, %s)
+        """, (user_id, datetime.now(), ativo, pausado, concluido))
+        return cursor.lastrowid
+
+def test_pause_freezes_times_from_summary(db):
+    activity_id = create_activity(db, 1)
+    # Rodando há 10 minutos com 5 minutos já acumulados e limite de 1 hora
+    ActivityEventLog(db).record(activity_id, 1, EVENT_START, datetime.now() - timedelta(minutes=10),
+                                total_seconds=300, limit_seconds=3600)
+
+    result = ActivityTransitions(db).transition(activity_id, STATUS_PAUSED)
+    assert result.ok and result.row['pausado'] and result.row['version'] == 1
+    total = result.row['total_time'].total_seconds()
+    assert 900 <= total <= 902
+    assert result.row['time_regress'].total_seconds() == 3600 - total
+    assert result.row['time_exceeded'] == timedelta(0)
+
+    # Repetir a mesma transição não altera a linha
+    again = ActivityTransitions(db).transition(activity_id, STATUS_PAUSED)
+    assert again.ok and again.row['version'] == 1
+
+def test_version_conflict_and_invalid_transition(db, settings):
+    activity_id = create_activity(db, 2, pausado=True)
+    transitions = ActivityTransitions(db)
+
+    # Sem eventos, os tempos gravados na linha são mantidos
+    done = transitions.transition(activity_id, STATUS_DONE, expected_version=0)
+    assert done.ok and done.row['concluido'] and done.row['total_time'] == timedelta(0)
+
+    stale = transitions.transition(activity_id, STATUS_ACTIVE, expected_version=0)
+    assert not stale.ok and "outra sessão" in stale.message
+
+    invalid = transitions.transition(activity_id, STATUS_PAUSED)
+    assert not invalid.ok and invalid.row['version'] == 1
+
+    with pytest.raises(ValueError):
+        transitions.transition(activity_id, "cancelado")
+
+def test_pause_all_returns_only_changed_rows(db, settings):
+    running = [create_activity(db, 3), create_activity(db, 3)]
+    already_paused = create_activity(db, 3, pausado=True)
+    create_activity(db, 3, ativo=False, concluido=True)
+
+    rows = ActivityTransitions(db).transition_all(3, STATUS_PAUSED)
+    assert sorted(row['id'] for row in rows) == running
+    assert all(row['pausado'] and row['version'] == 1 for row in rows)
+
+    resumed = ActivityTransitions(db).transition_all(3, STATUS_ACTIVE)
+    assert sorted(row['id'] for row in resumed) == sorted(running + [already_paused])
+    assert ActivityTransitions(db).transition_all(4, STATUS_PAUSED) == []
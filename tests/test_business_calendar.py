@@ -0,0 +1,54 @@
+# tests/test_business_calendar.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.time.business_calendar import BusinessCalendar
+
+# Mesmo expediente do TimeManager: 08:00-12:15 e 13:15-18:30 (9h30 por dia)
+CALENDAR = BusinessCalendar.from_hours("08:00:00", "12:15:00", "13:15:00", "18:30:00")
+DAY = timedelta(hours=9, minutes=30)
+
+def test_same_day_discounts_break():
+    assert CALENDAR.duration(datetime(2024, 3, 4, 7, 0), datetime(2024, 3, 4, 20, 0)) == DAY
+    assert CALENDAR.duration(datetime(2024, 3, 4, 12, 0), datetime(2024, 3, 4, 13, 30)) == timedelta(minutes=30)
+    assert CALENDAR.duration(datetime(2024, 3, 4, 12, 20), datetime(2024, 3, 4, 13, 0)) == timedelta()
+
+def test_multi_day_span_without_walking_days():
+    start = datetime(2024, 3, 4, 17, 0)
+    end = datetime(2024, 3, 7, 9, 0)
+    assert CALENDAR.duration(start, end) == timedelta(hours=1, minutes=30) + 2 * DAY + timedelta(hours=1)
+
+    # Um ano inteiro custa o mesmo que um dia
+    assert CALENDAR.duration(datetime(2024, 1, 1), datetime(2025, 1, 1)) == 366 * DAY
+
+def test_reversed_span_is_zero():
+    assert CALENDAR.duration(datetime(2024, 3, 5, 10, 0), datetime(2024, 3, 4, 10, 0)) == timedelta()
+
+def test_weekends_and_holidays_are_skipped():
+    calendar = BusinessCalendar.from_hours(
+        "08:00:00", "12:15:00", "13:15:00", "18:30:00",
+        workdays=(0, 1, 2, 3, 4), holidays=[date(2024, 3, 8)]
+    )
+    # Quinta 17:00 até segunda 09:00: sexta é feriado, sábado e domingo não contam
+    start = datetime(2024, 3, 7, 17, 0)
+    end = datetime(2024, 3, 11, 9, 0)
+    assert calendar.duration(start, end) == timedelta(hours=2, minutes=30)
+    assert not calendar.is_workday(date(2024, 3, 8))
+    assert not calendar.is_workday(date(2024, 3, 9))
+
+def test_batch_matches_single_span():
+    np = pytest.importorskip("numpy")
+    calendar = BusinessCalendar.from_hours(
+        "08:00:00", "12:15:00", "13:15:00", "18:30:00",
+        workdays=(0, 1, 2, 3, 4), holidays=[date(2024, 3, 8)]
+    )
+    starts = [datetime(2024, 3, 4, 7, 0) + timedelta(hours=7 * i, minutes=13 * i) for i in range(200)]
+    ends = [start + timedelta(hours=5 * i) for i, start in enumerate(starts)]
+
+    batch = calendar.durations(starts, ends)
+    expected = [calendar.duration(start, end).total_seconds() for start, end in zip(starts, ends)]
+    assert np.allclose(batch, expected)
+
+    assert np.isnan(calendar.durations([datetime(2024, 3, 4, 9, 0)], [None])[0])
@@ -0,0 +1,75 @@
+# tests/test_checkpoint.py
+
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.core.time.checkpoint import (
+    TimerCheckpoint, CheckpointRecord, CHECKPOINT_RUNNING, CHECKPOINT_PAUSED, FILE_SIZE
+)
+
+SAVED_AT = datetime(2024, 3, 4, 9, 30, 15)
+
+def record(total, state=CHECKPOINT_RUNNING, ref=42):
+    return CheckpointRecord(ref, 7, state, total, 3600 - total, 3600, SAVED_AT)
+
+def test_round_trip_and_reopen(tmp_path):
+    path = str(tmp_path / "timer_7.chk")
+    checkpoint = TimerCheckpoint(path, sync_interval=60)
+    assert checkpoint.read() is None
+
+    for total in range(1, 121):
+        checkpoint.write(record(total))
+    assert checkpoint.read() == record(120)
+    assert checkpoint.read().mode == 'regressivo'
+    checkpoint.close()
+
+    # Outro processo (reinício do aplicativo) lê o mesmo registro
+    reopened = TimerCheckpoint(path)
+    assert os.path.getsize(path) == FILE_SIZE
+    assert reopened.read() == record(120)
+    reopened.write(record(121, CHECKPOINT_PAUSED), sync=True)
+    assert reopened.read().state == CHECKPOINT_PAUSED
+    reopened.close()
+
+def test_torn_write_falls_back_to_previous_slot(tmp_path):
+    path = str(tmp_path / "timer_7.chk")
+    checkpoint = TimerCheckpoint(path)
+    checkpoint.write(record(10))
+    checkpoint.write(record(11))
+    checkpoint.close()
+
+    # Corrompe o slot mais recente (sequência 2, slot 0 logo após o cabeçalho),
+    # como uma gravação interrompida no meio
+    with open(path, "r+b") as f:
+        f.seek(8 + 20)
+        byte = f.read(1)
+        f.seek(8 + 20)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+    assert TimerCheckpoint(path).read() == record(10)
+
+def test_local_reference_and_foreign_file(tmp_path):
+    path = str(tmp_path / "timer_7.chk")
+    with open(path, "wb") as f:
+        f.write(b"lixo")
+    checkpoint = TimerCheckpoint(path)
+    assert checkpoint.read() is None
+
+    # Referência de atividade criada offline, como gerada pelo journal local
+    local_ref = "local:" + str(uuid.uuid4())
+    checkpoint.write(record(5, ref=local_ref))
+    assert checkpoint.read() == record(5, ref=local_ref)
+    with pytest.raises(ValueError):
+        checkpoint.write(record(6, ref=local_ref + "-" * 10))
+    assert checkpoint.read() == record(5, ref=local_ref)
+    checkpoint.close()
+
+def test_file_from_previous_layout_is_reset(tmp_path):
+    path = str(tmp_path / "timer_7.chk")
+    with open(path, "wb") as f:
+        f.write(b"CHKP" + (1).to_bytes(2, "little") + bytes(FILE_SIZE - 6))
+    assert TimerCheckpoint(path).read() is None
+    assert os.path.getsize(path) == FILE_SIZE
@@ -0,0 +1,112 @@
+# tests/test_connection_pool.py
+
+import threading
+import time
+
+from app.database.pool import ConnectionPool, PoolExhaustedError
+
+class FakeConnection:
+    """Conexão falsa para testar o pool sem servidor MySQL"""
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("conexão perdida")
+
+    def close(self):
+        self.closed = True
+
+def make_pool(**kwargs):
+    created = []
+    def factory():
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+    return ConnectionPool(factory, **kwargs), created
+
+def test_reuses_released_connection():
+    pool, created = make_pool(size=2)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert first is second
+    assert len(created) == 1
+
+def test_threads_get_distinct_connections():
+    pool, created = make_pool(size=3)
+    borrowed = []
+    barrier = threading.Barrier(3)
+
+    def worker():
+        connection = pool.acquire()
+        borrowed.append(connection)
+        barrier.wait()
+        pool.release(connection)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, borrowed))) == 3
+    assert pool.stats()['idle'] == 3
+
+def test_exhausted_pool_times_out():
+    pool, _ = make_pool(size=1, acquire_timeout=0.1)
+    pool.acquire()
+    try:
+        pool.acquire()
+    except PoolExhaustedError:
+        return
+    assert False, "acquire deveria ter falhado"
+
+def test_recently_used_connection_not_pinged():
+    pool, _ = make_pool(size=1, ping_after=60)
+    for _ in range(5):
+        pool.release(pool.acquire())
+    assert pool.stats()['pings'] == 0
+
+def test_broken_connection_counts_reconnect():
+    pool, created = make_pool(size=1)
+    connection = pool.acquire()
+    pool.release(connection, broken=True)
+
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert pool.stats()['reconnects'] == 1
+    assert len(created) == 2
+
+def test_keepalive_pings_only_stale_connections():
+    pool, _ = make_pool(size=2, ping_after=0.05)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    time.sleep(0.1)
+    pool.release(second)
+
+    assert pool.keepalive() == 1
+    assert pool.stats()['pings'] == 1
+
+def test_dead_connection_replaced_on_borrow():
+    pool, created = make_pool(size=1, ping_after=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.alive = False
+
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()['open'] == 1
+
+def test_idle_connections_evicted():
+    pool, _ = make_pool(size=2, idle_timeout=0.05)
+    connection = pool.acquire()
+    pool.release(connection)
+    time.sleep(0.1)
+
+    assert pool.evict_idle() == 1
+    assert connection.closed
+    assert pool.stats()['open'] == 0
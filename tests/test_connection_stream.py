@@ -0,0 +1,114 @@
+# tests/test_connection_stream.py
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.database.connection import DatabaseConnection
+from app.database.instrumentation import QueryInstrumentation
+from app.database.pool import ConnectionPool
+
+ROWS = 1200
+
+class TrackingCursor:
+    """Cursor sqlite3 com a interface usada do mysql-connector; conta os blocos lidos"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self.dictionary = dictionary
+        self.fetches = 0
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), params)
+
+    def fetchmany(self, size=1):
+        self.fetches += 1
+        rows = self._cursor.fetchmany(size)
+        if not self.dictionary:
+            return rows
+        names = [column[0] for column in self._cursor.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def close(self):
+        self.closed = True
+        self._cursor.close()
+
+class SQLiteServerConnection:
+    """Conexão do pool sobre um arquivo SQLite, com a interface usada do mysql-connector"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self, dictionary=False, buffered=None):
+        cursor = TrackingCursor(self._conn.cursor(), dictionary)
+        self.cursors.append(cursor)
+        return cursor
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.closed = True
+        self._conn.close()
+
+@pytest.fixture
+def server(tmp_path):
+    path = str(tmp_path / "server.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE atividades (id INTEGER PRIMARY KEY, atividade TEXT)")
+        conn.executemany("INSERT INTO atividades (atividade) VALUES (?)", [("Projeto",)] * ROWS)
+    connections = []
+
+    def factory():
+        connections.append(SQLiteServerConnection(path))
+        return connections[-1]
+
+    # Só a parte de DatabaseConnection usada por stream, sem abrir o pool MySQL
+    db = object.__new__(DatabaseConnection)
+    db.pool = ConnectionPool(factory, size=1, acquire_timeout=0.5)
+    db.instrumentation = QueryInstrumentation(summary_interval=0, log_dir=str(tmp_path))
+    db._stats_lock = threading.Lock()
+    db.query_count = 0
+    return db, connections
+
+QUERY = "SELECT id, atividade FROM atividades WHERE id > %s ORDER BY id"
+
+def test_rows_are_fetched_in_chunks_and_connection_returned(server):
+    db, connections = server
+    with db.stream(QUERY, (0,), chunk_size=100) as rows:
+        first = next(rows)
+        cursor = connections[0].cursors[0]
+        # Só o primeiro bloco foi lido até aqui
+        assert first == {'id': 1, 'atividade': "Projeto"} and cursor.fetches == 1
+        assert sum(1 for _ in rows) == ROWS - 1
+    assert cursor.fetches == ROWS // 100 + 1 and cursor.closed
+    # Leitura completa: a conexão volta ao pool e é reutilizada
+    assert db.pool.stats()['idle'] == 1 and not connections[0].closed
+
+    with db.stream(QUERY, (ROWS - 250,), chunk_size=100, chunks=True) as chunks:
+        assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    assert len(connections) == 1
+
+def test_early_exit_and_errors_release_the_connection(server):
+    db, connections = server
+    with db.stream(QUERY, (0,), chunk_size=100) as rows:
+        for row in rows:
+            if row['id'] == 5:
+                break
+    # Resultado não drenado: a conexão é descartada e a vaga do pool liberada
+    assert connections[0].closed and db.pool.stats()['open'] == 0
+
+    with pytest.raises(ValueError):
+        with db.stream(QUERY, (0,), chunk_size=100) as rows:
+            next(rows)
+            raise ValueError("falha no processamento")
+    assert connections[1].closed and db.pool.stats()['open'] == 0
+
+    # A vaga única do pool continua disponível
+    with db.stream(QUERY, (ROWS - 1,)) as rows:
+        assert [row['id'] for row in rows] == [ROWS]
+    assert db.pool.stats()['in_use'] == 0
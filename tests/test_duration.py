@@ -0,0 +1,60 @@
+# tests/test_duration.py
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.utils.duration import (
+    Duration, ZERO, to_seconds, to_hms, to_hours, format_hms, format_decimal_hours,
+    seconds_many, sum_seconds, format_many, seconds_column, to_db
+)
+
+def test_parse_variants():
+    assert to_seconds("01:30:15") == 5415
+    assert to_seconds("27:00:00") == 27 * 3600
+    assert to_seconds("1 day, 2:00:00") == 26 * 3600
+    assert to_seconds("2 days, 0:00:01") == 2 * 86400 + 1
+    assert to_seconds("-00:10:00") == -600
+    assert to_seconds("00:00:05.750000") == 5
+    assert to_seconds("08:15") == 8 * 3600 + 15 * 60
+    assert to_seconds("3600") == 3600
+    assert to_seconds(None) == 0
+    assert to_seconds("") == 0
+    assert to_seconds(timedelta(days=1, hours=3)) == 27 * 3600
+    assert to_seconds(Decimal("5415")) == 5415
+    assert to_seconds(b"00:01:00") == 60
+    with pytest.raises(ValueError):
+        to_seconds("abc")
+    with pytest.raises(TypeError):
+        to_seconds([1])
+
+def test_format():
+    assert format_hms(0) == "00:00:00"
+    assert format_hms(27 * 3600 + 61) == "27:01:01"
+    assert format_hms(-600) == "-00:10:00"
+    assert to_hms(timedelta(days=1, hours=2)) == "26:00:00"
+    assert to_hours("01:30:00") == 1.5
+    assert format_decimal_hours("01:30:00") == "1,5000"
+    assert format_decimal_hours(None) == "0,0000"
+    assert to_db(timedelta(hours=1)) == "01:00:00"
+
+def test_duration_arithmetic():
+    first = Duration.parse("01:00:00")
+    second = Duration.parse(timedelta(minutes=30))
+    assert first + second == Duration(5400)
+    assert first - "00:15:00" == "00:45:00"
+    assert sum([first, second, Duration(30)]) == Duration(5430)
+    assert str(first + second) == "01:30:00"
+    assert first > second and -second < ZERO
+    assert not ZERO and first
+    assert first.hours == 1.0 and first.to_timedelta() == timedelta(hours=1)
+    assert {Duration(60), Duration(60)} == {Duration(60)}
+
+def test_bulk_and_sql_helpers():
+    values = ["00:01:00", timedelta(seconds=30), None, 15]
+    assert seconds_many(values) == [60, 30, 0, 15]
+    assert sum_seconds(values) == 105
+    assert format_many(values) == ["00:01:00", "00:00:30", "00:00:00", "00:00:15"]
+    assert seconds_column("a.total_time") == "TIME_TO_SEC(a.total_time) AS total_time_seconds"
+    assert seconds_column("time_exceeded", "excedido") == "TIME_TO_SEC(time_exceeded) AS excedido"
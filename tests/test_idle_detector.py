@@ -0,0 +1,107 @@
+# tests/test_idle_detector.py
+
+import threading
+from datetime import timedelta
+
+from app.core.idleness.idle_detector import IdleDetector
+from app.core.idleness.input_sources import SyntheticInputSource, INPUT_KEYBOARD
+from app.core.time.work_calendar import WORKING_HOURS, BREAK_TIME
+
+class FakeCalendar:
+    """Calendário com status fixo e sem transições"""
+    def __init__(self, status=WORKING_HOURS):
+        self.status = status
+
+    def status_at(self, moment=None):
+        return self.status
+
+    def next_transition(self, moment=None, status=None):
+        return None
+
+class Observer:
+    def __init__(self):
+        self.statuses = []
+        self.changed = threading.Event()
+
+    def update_idle_status(self, status):
+        self.statuses.append(status)
+        self.changed.set()
+
+def make_detector(source, calendar=None, threshold=10):
+    detector = IdleDetector(threshold, threshold, sources=[source], calendar=calendar or FakeCalendar(),
+                            clock=lambda: 0.0)
+    source.start(detector.on_input)
+    detector.set_login_status(False)
+    observer = Observer()
+    detector.add_observer(observer)
+    return detector, observer
+
+def test_single_deadline_moves_with_input():
+    source = SyntheticInputSource()
+    detector, observer = make_detector(source)
+
+    # Sem entradas: dorme exatamente até o limite
+    assert detector.check(now=4.0) == 6.0
+    # Entradas antes do prazo só movem o prazo; a thread não é acordada
+    source.emit('mouse', 8.0)
+    source.emit(INPUT_KEYBOARD, 9.0)
+    assert detector.check(now=10.0) == 9.0
+    assert observer.statuses == []
+
+    # Vencido o prazo: ocioso, esperando apenas por entradas
+    assert detector.check(now=19.0) is None
+    assert detector.is_idle and observer.statuses == ['idle']
+
+    source.emit('mouse', 49.0)
+    assert detector.check(now=49.0) == 10.0
+    assert observer.statuses == ['idle', 'active']
+    assert detector.get_accumulated_idle_time() == timedelta(seconds=30)
+    [(started_at, ended_at)] = detector.take_periods()
+    assert ended_at - started_at == timedelta(seconds=30)
+    assert detector.take_periods() == []
+
+def test_break_and_login_suppress_idle():
+    source = SyntheticInputSource()
+    calendar = FakeCalendar()
+    detector, observer = make_detector(source, calendar)
+    detector.check(now=20.0)
+    assert detector.is_idle
+
+    calendar.status = BREAK_TIME
+    detector.check(now=25.0)
+    assert not detector.is_idle and observer.statuses == ['idle', 'active']
+    assert detector.get_accumulated_idle_time() == timedelta(seconds=5)
+
+    calendar.status = WORKING_HOURS
+    detector.set_login_status(True)
+    assert detector.check(now=100.0) is None and not detector.is_idle
+
+def test_system_idle_query_source():
+    source = SyntheticInputSource(event_driven=False)
+    detector, observer = make_detector(source)
+    detector.poll_interval = 1.0
+
+    source.idle = 3.0
+    assert detector.check(now=20.0) == 7.0
+    source.idle = 12.0
+    # Fonte de consulta: durante a ociosidade, reavalia a cada poll_interval
+    assert detector.check(now=29.0) == 1.0 and detector.is_idle
+    source.idle = 0.5
+    detector.check(now=40.0)
+    assert observer.statuses == ['idle', 'active']
+
+def test_thread_sleeps_until_deadline():
+    source = SyntheticInputSource()
+    detector = IdleDetector(0.05, 0.05, sources=[source], calendar=FakeCalendar())
+    observer = Observer()
+    detector.add_observer(observer)
+    detector.start()
+    detector.set_login_status(False)
+    try:
+        assert observer.changed.wait(2)
+        observer.changed.clear()
+        source.emit('mouse')
+        assert observer.changed.wait(2)
+        assert observer.statuses == ['idle', 'active']
+    finally:
+        detector.stop()
@@ -0,0 +1,57 @@
+# tests/test_idle_sessions.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.config.settings import JOURNAL_CONFIG, DB_BACKEND_CONFIG
+from app.database.local_journal import LocalJournal
+from app.core.idleness.idle_sessions import IdleSessionLog, build_statements, split_by_day, IdlePeriod
+
+@pytest.fixture(params=['journal_desabilitado', 'configuracao_padrao'])
+def log(request, db, monkeypatch):
+    if request.param == 'configuracao_padrao':
+        # Journal habilitado com o MySQL: os períodos continuam indo para a conexão injetada
+        monkeypatch.setitem(JOURNAL_CONFIG, 'enabled', True)
+        monkeypatch.setitem(DB_BACKEND_CONFIG, 'engine', 'mysql')
+    db.execute_query(
+        "INSERT INTO usuarios (nome, email, senha) VALUES (%s, %s, %s)", ("Usuário", "ocioso@exemplo.com", "x")
+    )
+    yield IdleSessionLog(db, batch_size=100, flush_interval=3600)
+    assert LocalJournal._instance is None
+
+def test_split_by_day():
+    start = datetime(2024, 3, 4, 23, 50, 0)
+    assert split_by_day(start, start + timedelta(minutes=5)) == [(date(2024, 3, 4), 300)]
+    assert split_by_day(start, start + timedelta(days=1, minutes=20)) == [
+        (date(2024, 3, 4), 600), (date(2024, 3, 5), 86400), (date(2024, 3, 6), 600)
+    ]
+
+def test_batch_is_one_insert_plus_increments():
+    start = datetime(2024, 3, 4, 9, 0)
+    periods = [IdlePeriod(1, 10, start, start + timedelta(minutes=2)),
+               IdlePeriod(1, 10, start + timedelta(hours=1), start + timedelta(hours=1, minutes=3))]
+    statements = build_statements(periods)
+    # Um INSERT das linhas, um dia (INSERT IGNORE + UPDATE) e o total do usuário
+    assert len(statements) == 4
+    assert statements[-1][1] == {'user_id': 1, 'idle_seconds': 300}
+
+def test_flush_records_rows_daily_rollup_and_total(log):
+    start = datetime(2024, 3, 4, 23, 55)
+    log.record(1, 7, start, start + timedelta(minutes=10))
+    log.record(1, None, datetime(2024, 3, 5, 10, 0), datetime(2024, 3, 5, 10, 1))
+    log.record(1, 7, start, start)  # período vazio é ignorado
+    assert log.flush()
+
+    daily = log.get_daily(1, datetime(2024, 3, 1), datetime(2024, 4, 1))
+    assert [(row['day'], row['idle_seconds'], row['periods']) for row in daily] == [
+        (date(2024, 3, 4), 300, 1), (date(2024, 3, 5), 360, 1)
+    ]
+    periods = log.get_periods(1, datetime(2024, 3, 4), datetime(2024, 3, 6))
+    assert [(row['atividade_id'], row['idle_seconds']) for row in periods] == [(7, 600), (None, 60)]
+
+    # Segundo lote: os contadores são incrementados, sem reler os valores
+    log.record(1, 7, datetime(2024, 3, 5, 11, 0), datetime(2024, 3, 5, 11, 0, 30))
+    assert log.flush()
+    assert log.get_total_seconds(1) == 690
+    assert log.get_daily(1, date(2024, 3, 5), date(2024, 3, 6))[0]['periods'] == 2
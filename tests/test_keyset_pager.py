@@ -0,0 +1,62 @@
+# tests/test_keyset_pager.py
+
+import pytest
+
+from app.ui.components.logic.keyset_pager import KeysetPager, PageWindow
+
+@pytest.fixture
+def db(db):
+    # Banco do conftest com 3 usuários e 25 atividades
+    for index, nome in enumerate(["Bruno", "Ana", "Ana"]):
+        db.execute_query("INSERT INTO usuarios (nome, email, senha) VALUES (%s, %s, %s)",
+                         (nome, f"user{index}@exemplo.com", "x"))
+    for index in range(25):
+        db.execute_query(
+            "INSERT INTO atividades (user_id, description, atividade, start_time) VALUES (%s, %s, %s, NOW())",
+            (index % 3 + 1, f"Descrição {index}", "Projeto" if index % 2 else "Reunião")
+        )
+    return db
+
+def activities_pager(db, **kwargs):
+    return KeysetPager(db, "a.id, a.atividade, u.nome as user_name",
+                       "FROM atividades a JOIN usuarios u ON a.user_id = u.id",
+                       keys=[("a.id", "id")], page_size=10, estimate_table="atividades", **kwargs)
+
+def test_pages_follow_the_key(db):
+    pager = activities_pager(db)
+    first = pager.fetch_after()
+    assert [row['id'] for row in first] == list(range(25, 15, -1))
+    second = pager.fetch_after(pager.key_of(first[-1]))
+    assert [row['id'] for row in second] == list(range(15, 5, -1))
+    last = pager.fetch_after(pager.key_of(second[-1]))
+    assert [row['id'] for row in last] == [5, 4, 3, 2, 1]
+    # Voltando: a página anterior à primeira linha da segunda é a primeira, na ordem de exibição
+    assert pager.fetch_before(pager.key_of(second[0])) == first
+    # Sem estimativa de information_schema (SQLite), o total vem do COUNT(*)
+    assert pager.count() == (25, False)
+
+def test_filter_and_composite_key(db):
+    pager = activities_pager(db, where="a.atividade = %s", params=("Projeto",))
+    assert [row['id'] for row in pager.fetch_after()] == [24, 22, 20, 18, 16, 14, 12, 10, 8, 6]
+    assert pager.count() == (12, False)
+
+    users = KeysetPager(db, "u.id, u.nome", "FROM usuarios u", keys=[("u.nome", "nome"), ("u.id", "id")],
+                        descending=False, page_size=2)
+    first = users.fetch_after()
+    assert [(row['nome'], row['id']) for row in first] == [("Ana", 2), ("Ana", 3)]
+    assert [(row['nome'], row['id']) for row in users.fetch_after(users.key_of(first[-1]))] == [("Bruno", 1)]
+    assert [row['id'] for row in users.fetch_before(users.key_of(first[-1]))] == [2]
+
+def test_window_keeps_a_bounded_number_of_pages():
+    window = PageWindow(page_size=2, max_pages=2)
+    assert window.append([{'id': 9}, {'id': 8}]) == []
+    assert window.append([{'id': 7}, {'id': 6}]) == []
+    assert window.at_start and not window.at_end
+    # Terceira página: a primeira sai da janela
+    assert window.append([{'id': 5}]) == [{'id': 9}, {'id': 8}]
+    assert not window.at_start and window.at_end
+    assert [row['id'] for row in window.rows] == [7, 6, 5]
+    # Rolando de volta: a primeira página retorna e a última sai
+    assert window.prepend([{'id': 9}, {'id': 8}]) == [{'id': 5}]
+    assert not window.at_end and window.first_row() == {'id': 9}
+    assert window.prepend([]) == [] and window.at_start
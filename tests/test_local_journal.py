@@ -0,0 +1,113 @@
+# tests/test_local_journal.py
+
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+from app.config.settings import JOURNAL_CONFIG, DB_BACKEND_CONFIG
+from app.database.pool import DatabaseUnavailableError
+from app.database.local_journal import LocalJournal, get_journal, write_through
+
+class FlakyServer:
+    """Banco SQLite no lugar do MySQL, inacessível enquanto down=True"""
+
+    def __init__(self, db):
+        self.db = db
+        self.down = False
+
+    @contextmanager
+    def transaction(self, ignore_backoff=False):
+        if self.down:
+            raise DatabaseUnavailableError("MySQL fora")
+        with self.db.transaction() as cursor:
+            yield cursor
+
+@pytest.fixture
+def server(db, monkeypatch):
+    monkeypatch.setitem(JOURNAL_CONFIG, 'retry_interval', 0.05)
+    return FlakyServer(db)
+
+@pytest.fixture
+def journal(server, tmp_path):
+    return LocalJournal(server, path=str(tmp_path / "journal.db"))
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "journal não sincronizou a tempo"
+        time.sleep(0.02)
+
+def create_fields(description):
+    return {'user_id': 1, 'description': description, 'atividade': 'Projeto',
+            'start_time': datetime(2024, 3, 4, 9, 0), 'ativo': True, 'pausado': False, 'concluido': False}
+
+def test_offline_entries_replay_in_order_on_the_mysql_id(server, journal):
+    server.down = True
+    ref, _ = journal.record_create(create_fields("Original"))
+    assert journal.is_local_ref(ref) and journal.offline
+    journal.record_update(ref, {'description': "Primeira"})
+    journal.record_transaction([(
+        "UPDATE atividades SET description = %(description)s WHERE id = %(atividade_id)s",
+        {'description': "Segunda"}
+    )], activity_ref=ref)
+    assert journal.pending_count() == 3 and not journal.accepts_direct()
+
+    server.down = False
+    wait_until(lambda: journal.pending_count() == 0)
+    activity_id = journal.resolve(ref)
+    rows = server.db.execute_query("SELECT id, description FROM atividades")
+    # Criação, atualização e transação aplicadas nessa ordem no id gerado pelo servidor
+    assert rows == [{'id': activity_id, 'description': "Segunda"}]
+    assert not journal.offline and journal.accepts_direct()
+    assert not journal.accepts_direct("local:pendente")
+
+def test_replayed_entries_are_applied_once(server, journal):
+    server.db.execute_query("INSERT INTO usuarios (nome, email, senha) VALUES ('Ana', 'ana@exemplo.com', 'x')")
+    ref, create_key = journal.record_create(create_fields("Projeto"))
+    increment_key = journal.record_statement(
+        "UPDATE usuarios SET ociosidade_seconds = ociosidade_seconds + 60 WHERE id = %s", (1,), wait=True
+    )
+    assert not journal.is_local_ref(ref)
+
+    # Caiu depois de aplicar no servidor e antes de marcar no journal local
+    with journal._lock:
+        journal._conn.execute("UPDATE journal SET status = 'pending' WHERE idempotency_key IN (?, ?)",
+                              (create_key, increment_key))
+    journal._wakeup.set()
+    wait_until(lambda: journal.pending_count() == 0)
+
+    assert server.db.execute_query("SELECT COUNT(*) as total FROM atividades")[0]['total'] == 1
+    assert server.db.execute_query("SELECT ociosidade_seconds FROM usuarios")[0]['ociosidade_seconds'] == 60
+    assert journal.wait_synced(create_key) == ref
+
+def test_failed_create_quarantines_later_entries_of_the_activity(server, journal, monkeypatch):
+    monkeypatch.setattr(LocalJournal, 'MAX_ATTEMPTS', 2)
+    server.down = True
+    fields = create_fields("Quebrada")
+    fields['coluna_inexistente'] = 1
+    ref, create_key = journal.record_create(fields)
+    journal.record_update(ref, {'description': "Depois"})
+    other_ref, _ = journal.record_create(create_fields("Outra"))
+
+    server.down = False
+    wait_until(lambda: journal.pending_count() == 0)
+
+    failed = journal.failed_entries()
+    assert [entry['idempotency_key'] for entry in failed][0] == create_key
+    assert [entry['kind'] for entry in failed] == ['create', 'update']
+    assert "Entrada anterior" in failed[1]['last_error']
+    # A criação que falhou não trava as entradas de outras atividades
+    assert journal.resolve(ref) is None and journal.resolve(other_ref) is not None
+    assert journal.wait_synced(create_key) is None
+    rows = server.db.execute_query("SELECT description FROM atividades")
+    assert rows == [{'description': "Outra"}]
+
+def test_injected_connection_bypasses_journal(db, monkeypatch):
+    # Configuração padrão do app: journal habilitado com o MySQL
+    monkeypatch.setitem(JOURNAL_CONFIG, 'enabled', True)
+    monkeypatch.setitem(DB_BACKEND_CONFIG, 'engine', 'mysql')
+    assert get_journal(db) is None
+    assert write_through(db, lambda: "direto", lambda journal: "journal", "local:x") == "direto"
+    assert LocalJournal._instance is None
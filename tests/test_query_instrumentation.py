@@ -0,0 +1,39 @@
+# tests/test_query_instrumentation.py
+
+import os
+import tempfile
+
+from app.database.instrumentation import QueryInstrumentation, fingerprint, slow_logger
+
+def test_fingerprint_normalizes_literals():
+    first = fingerprint("SELECT * FROM atividades WHERE user_id = 12 AND status = 'ativa'")
+    second = fingerprint("select *  from atividades\n WHERE user_id = %s AND status = %s")
+    assert first == second == "SELECT * FROM ATIVIDADES WHERE USER_ID = ? AND STATUS = ?"
+
+def test_fingerprint_collapses_in_lists():
+    assert fingerprint("DELETE FROM x WHERE id IN (1, 2, 3)") == fingerprint("DELETE FROM x WHERE id IN (%s,%s)")
+
+def test_records_caller_and_percentiles():
+    stats = QueryInstrumentation(summary_interval=0, log_dir=tempfile.mkdtemp())
+    for ms in range(1, 101):
+        stats.record("SELECT 1", ms / 1000.0, [{'a': 'xy'}])
+
+    entry = stats.snapshot()[0]
+    assert entry['caller'] == f"{__name__}.test_records_caller_and_percentiles"
+    assert entry['count'] == 100
+    assert entry['rows'] == 100
+    assert entry['bytes'] == 200
+    assert 40 <= entry['p50_ms'] <= 65
+    assert 90 <= entry['p99_ms'] <= 125
+
+def test_slow_log_created_only_on_first_slow_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(slow_logger, 'handlers', [])
+    stats = QueryInstrumentation(slow_query_ms=50, summary_interval=0, log_dir=str(tmp_path))
+    stats.record("SELECT 1", 0.001)
+    assert not os.path.exists(tmp_path / "slow_queries.log")
+
+    stats.record("SELECT * FROM atividades WHERE id = 7", 0.2)
+    handler = slow_logger.handlers[0]
+    handler.close()
+    with open(tmp_path / "slow_queries.log", encoding='utf-8') as f:
+        assert "SELECT * FROM ATIVIDADES WHERE ID = ?" in f.read()
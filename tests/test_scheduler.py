@@ -0,0 +1,103 @@
+# tests/test_scheduler.py
+
+from datetime import datetime, timedelta
+
+from app.core.time.scheduler import DeadlineScheduler
+
+class FakeClock:
+    def __init__(self, start):
+        self.now = start.timestamp()
+
+    def __call__(self):
+        return self.now
+
+def make_scheduler(start):
+    return DeadlineScheduler(clock=FakeClock(start))
+
+def test_deadlines_fire_in_order_and_only_when_due():
+    start = datetime(2024, 3, 1, 12, 0, 0)
+    scheduler = make_scheduler(start)
+    fired = []
+    scheduler.schedule_at(start + timedelta(minutes=15), lambda: fired.append('break'))
+    scheduler.schedule_in(30, lambda: fired.append('activity'))
+
+    assert scheduler.run_pending() == start.timestamp() + 30
+    assert fired == []
+
+    assert scheduler.run_pending(start.timestamp() + 30) == (start + timedelta(minutes=15)).timestamp()
+    assert fired == ['activity']
+
+    assert scheduler.run_pending((start + timedelta(minutes=15)).timestamp()) is None
+    assert fired == ['activity', 'break']
+
+def test_named_event_is_replaced_and_cancelled():
+    start = datetime(2024, 3, 1, 9, 0, 0)
+    scheduler = make_scheduler(start)
+    fired = []
+    scheduler.schedule_in(10, lambda: fired.append('old'), name='activity_deadline')
+    scheduler.schedule_in(20, lambda: fired.append('new'), name='activity_deadline')
+
+    scheduler.run_pending(start.timestamp() + 60)
+    assert fired == ['new']
+
+    scheduler.schedule_in(10, lambda: fired.append('cancelled'), name='activity_deadline')
+    scheduler.cancel('activity_deadline')
+    assert scheduler.next_deadline() is None
+
+def test_daily_event_rearms_for_next_day():
+    start = datetime(2024, 3, 1, 18, 0, 0)
+    scheduler = make_scheduler(start)
+    fired = []
+    scheduler.schedule_daily("18:30:00", lambda: fired.append('end'), name='company_end')
+
+    first = datetime(2024, 3, 1, 18, 30)
+    assert scheduler.next_deadline() == first.timestamp()
+    scheduler.run_pending(first.timestamp())
+    assert fired == ['end']
+    assert scheduler.next_deadline() == (first + timedelta(days=1)).timestamp()
+
+def test_daily_event_fires_once_after_days_suspended():
+    start = datetime(2024, 3, 1, 18, 0, 0)
+    scheduler = make_scheduler(start)
+    fired = []
+    scheduler.schedule_daily("18:30:00", lambda: fired.append('end'), name='company_end')
+
+    # Máquina suspensa por quatro dias: um disparo e o próximo horário a partir de agora
+    assert scheduler.run_pending(datetime(2024, 3, 5, 20, 0).timestamp()) == datetime(2024, 3, 6, 18, 30).timestamp()
+    assert fired == ['end']
+
+    # Vários eventos diários atrasados: cada um roda uma vez; o de 07:00 ainda é hoje
+    fired.clear()
+    scheduler.schedule_daily("07:00:00", lambda: fired.append('start'), name='company_start')
+    scheduler.run_pending(datetime(2024, 3, 9, 6, 0).timestamp())
+    assert sorted(fired) == ['end', 'start']
+    assert scheduler.next_deadline() == datetime(2024, 3, 9, 7, 0).timestamp()
+
+def test_daily_catch_up_when_time_already_passed():
+    start = datetime(2024, 3, 1, 19, 0, 0)
+    scheduler = make_scheduler(start)
+    fired = []
+    scheduler.schedule_daily("18:30:00", lambda: fired.append('end'), catch_up=True)
+
+    scheduler.run_pending()
+    assert fired == ['end']
+    assert scheduler.next_deadline() == datetime(2024, 3, 2, 18, 30).timestamp()
+
+def test_coalesced_tick_respects_interval():
+    start = datetime(2024, 3, 1, 10, 0, 0, 400000)
+    scheduler = make_scheduler(start)
+    every_second, every_five = [], []
+    scheduler.subscribe_tick(every_second.append)
+    scheduler.subscribe_tick(every_five.append, every=5)
+
+    # Primeiro tick alinhado à virada do segundo
+    assert scheduler.run_pending() == datetime(2024, 3, 1, 10, 0, 1).timestamp()
+    for second in range(1, 11):
+        scheduler.run_pending(datetime(2024, 3, 1, 10, 0, second).timestamp())
+
+    assert len(every_second) == 10
+    assert [now.second for now in every_five] == [5, 10]
+
+    scheduler.unsubscribe_tick(every_second.append)
+    scheduler.unsubscribe_tick(every_five.append)
+    assert scheduler.run_pending(datetime(2024, 3, 1, 10, 0, 11).timestamp()) is None
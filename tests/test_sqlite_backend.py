@@ -0,0 +1,59 @@
+# tests/test_sqlite_backend.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.sqlite_backend import translate
+
+@pytest.fixture
+def db(db):
+    # Banco do conftest com uma equipe, um usuário e uma atividade
+    db.execute_query("INSERT INTO equipes (nome) VALUES (%s)", ("Teste",))
+    db.execute_query(
+        "INSERT INTO usuarios (equipe_id, nome, email, senha) VALUES (%s, %s, %s, %s)",
+        (1, "Usuário", "teste@exemplo.com", "x")
+    )
+    with db.transaction() as cursor:
+        cursor.execute(
+            "INSERT INTO atividades (user_id, atividade, start_time, time_regress) "
+            "VALUES (%(user_id)s, %(atividade)s, %(start)s, %(regress)s)",
+            {'user_id': 1, 'atividade': 'A', 'start': datetime(2024, 2, 29, 9, 0),
+             'regress': timedelta(hours=1)}
+        )
+    return db
+
+def test_translate_keeps_literals():
+    query = "SELECT DATE_FORMAT(x, '%d/%m %s') FROM t WHERE a = %s AND b < CURRENT_DATE()"
+    assert translate(query) == "SELECT DATE_FORMAT(x, '%d/%m %s') FROM t WHERE a = ? AND b < CURDATE()"
+
+def test_mysql_function_shims(db):
+    row = db.fetch_one("""
+        SELECT DATE_FORMAT(start_time, '%d/%m/%Y %H:%i') as inicio,
+               TIME_TO_SEC(time_regress) as segundos,
+               SEC_TO_TIME(TIME_TO_SEC(time_regress) + 65) as tempo,
+               TIMEDIFF(start_time, '2024-02-29 08:30:00') as diferenca,
+               YEARWEEK(start_time, 1) as semana
+        FROM atividades WHERE id = 1
+    """)
+    assert row == {'inicio': '29/02/2024 09:00', 'segundos': 3600, 'tempo': '01:01:05',
+                   'diferenca': '00:30:00', 'semana': 202409}
+
+def test_mysql_column_types(db):
+    row = db.execute_query("SELECT start_time, time_regress FROM atividades WHERE user_id = %s", (1,))[0]
+    assert row['start_time'] == datetime(2024, 2, 29, 9, 0)
+    assert row['time_regress'] == timedelta(hours=1)
+
+def test_user_insert_creates_lock_row(db):
+    assert db.fetch_one("SELECT unlock_control FROM user_lock_unlock WHERE user_id = %s", (1,)) == {'unlock_control': 1}
+
+def test_execute_many_reports_failed_rows(db):
+    query = "INSERT INTO atividades (user_id, atividade, start_time) VALUES (%s, %s, %s)"
+    start = datetime(2024, 3, 1, 8, 0)
+    rows = [(1, 'Lote', start), (1, None, start), (1, 'Lote', start)]
+
+    written, failures = db.execute_many(query, rows, batch_size=2)
+
+    assert written == 2
+    assert [index for index, _ in failures] == [1]
+    assert db.fetch_one("SELECT COUNT(*) as total FROM atividades WHERE atividade = 'Lote'") == {'total': 2}
@@ -0,0 +1,72 @@
+# tests/test_timer_engine.py
+
+from datetime import timedelta
+
+from app.core.time.timer_engine import TimerEngine, NS_PER_SECOND
+
+class FakeClock:
+    """Relógio monotônico controlado pelo teste (nanossegundos)"""
+    def __init__(self):
+        self.now = 1_000 * NS_PER_SECOND
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += int(seconds * NS_PER_SECOND)
+
+def test_regressive_counts_down_and_switches_at_budget():
+    clock = FakeClock()
+    engine = TimerEngine(clock=clock)
+    engine.start(regress=timedelta(seconds=3), accumulated=timedelta(minutes=1))
+
+    assert engine.snapshot()[1:4] == ('regressivo', 3, 60)
+    clock.advance(0.4)
+    assert engine.snapshot().timer_seconds == 3  # arredonda para cima até zerar
+    assert engine.seconds_until_transition() == 2.6
+
+    clock.advance(2.6)
+    snapshot = engine.snapshot()
+    assert (snapshot.mode, snapshot.timer_seconds, snapshot.total_seconds) == ('progressivo', 0, 63)
+    assert engine.seconds_until_transition() is None
+
+    clock.advance(5)
+    assert engine.snapshot()[1:4] == ('progressivo', 5, 68)
+
+def test_pause_segments_are_not_counted():
+    clock = FakeClock()
+    engine = TimerEngine(clock=clock)
+    engine.start(regress=timedelta(seconds=10))
+
+    clock.advance(4)
+    engine.pause()
+    clock.advance(3600)
+    assert engine.snapshot().timer_seconds == 6
+    assert engine.seconds_until_transition() is None
+
+    engine.resume()
+    clock.advance(2)
+    assert engine.snapshot()[1:4] == ('regressivo', 4, 6)
+
+def test_resume_in_progressive_mode_keeps_exceeded_time():
+    clock = FakeClock()
+    engine = TimerEngine(clock=clock)
+    engine.start(accumulated=timedelta(hours=1), exceeded=timedelta(minutes=5))
+
+    clock.advance(30)
+    assert engine.snapshot()[1:4] == ('progressivo', 330, 3630)
+    # O regressivo zerou com 55 minutos de tempo total
+    assert engine.limit_ns == 55 * 60 * NS_PER_SECOND
+
+def test_ticks_align_to_second_boundaries():
+    clock = FakeClock()
+    engine = TimerEngine(clock=clock)
+    engine.start(regress=timedelta(minutes=1))
+
+    assert engine.next_tick_delay() == 1.0
+    clock.advance(1.25)
+    assert engine.next_tick_delay() == 0.75
+
+    # Um tick atrasado não desloca os seguintes
+    clock.advance(0.75 + 0.2)
+    assert round(engine.next_tick_delay(), 6) == 0.8
@@ -0,0 +1,120 @@
+# tests/test_ui_tasks.py
+
+import threading
+
+import pytest
+
+from app.utils.ui_tasks import UITaskRunner, Debouncer
+
+class FakeRoot:
+    """Loop de eventos simulado: after() apenas guarda o callback"""
+    def __init__(self):
+        self.scheduled = {}
+        self.last_id = 0
+
+    def after(self, ms, callback, *args):
+        self.last_id += 1
+        self.scheduled[self.last_id] = lambda: callback(*args)
+        return self.last_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def winfo_exists(self):
+        return True
+
+    def run_pending(self):
+        scheduled, self.scheduled = self.scheduled, {}
+        for callback in scheduled.values():
+            callback()
+
+class FakeWidget:
+    def __init__(self, root):
+        self.root = root
+        self.exists = True
+
+    def _root(self):
+        return self.root
+
+    def winfo_exists(self):
+        return self.exists
+
+@pytest.fixture
+def runner():
+    # Singleton novo a cada teste (tests/conftest.py)
+    return UITaskRunner(max_workers=2)
+
+def wait(task):
+    task.future.exception(timeout=2)
+
+def test_result_delivered_by_single_pump(runner):
+    root = FakeRoot()
+    widget = FakeWidget(root)
+    received, busy = [], []
+    first = runner.submit(widget, lambda: 1, on_success=received.append, busy=busy.append)
+    second = runner.submit(widget, lambda: 2, on_success=received.append)
+    # Um único after() armado para todas as tarefas
+    assert len(root.scheduled) == 1
+    assert received == [] and busy == [True]
+
+    wait(first)
+    wait(second)
+    root.run_pending()
+    assert sorted(received) == [1, 2] and busy == [True, False]
+    # Sem tarefas pendentes o pump não é rearmado
+    assert runner.pending == 0 and not root.scheduled
+
+def test_newer_request_with_same_key_cancels_stale(runner):
+    root = FakeRoot()
+    widget = FakeWidget(root)
+    release = threading.Event()
+    received, busy = [], []
+
+    def slow():
+        release.wait(2)
+        return "antiga"
+
+    stale = runner.submit(widget, slow, on_success=received.append, key='search', busy=busy.append)
+    fresh = runner.submit(widget, lambda: "nova", on_success=received.append, key='search')
+    assert stale.cancelled and busy == [True, False]
+
+    release.set()
+    wait(fresh)
+    if not stale.future.cancelled():
+        wait(stale)
+    runner.drain()
+    assert received == ["nova"]
+
+def test_destroyed_widget_and_errors(runner):
+    root = FakeRoot()
+    widget = FakeWidget(root)
+    received, errors = [], []
+    gone = runner.submit(widget, lambda: "x", on_success=received.append)
+    wait(gone)
+    widget.exists = False
+    runner.drain()
+    assert received == [] and runner.pending == 0
+
+    def fail():
+        raise ConnectionError("sem banco")
+
+    failed = runner.submit(FakeWidget(root), fail, on_success=received.append, on_error=errors.append)
+    wait(failed)
+    runner.drain()
+    assert received == [] and isinstance(errors[0], ConnectionError)
+
+def test_debouncer_fires_once_after_typing_stops():
+    root = FakeRoot()
+    fired = []
+    debounced = Debouncer(root, fired.append)
+    for term in ("p", "pr", "pro"):
+        debounced(term)
+    # Cada chamada reagenda: só a última fica pendente
+    assert len(root.scheduled) == 1
+    root.run_pending()
+    assert fired == ["pro"]
+
+    debounced("proj")
+    debounced.cancel()
+    root.run_pending()
+    assert fired == ["pro"]
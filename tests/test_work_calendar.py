@@ -0,0 +1,142 @@
+# tests/test_work_calendar.py
+
+import time as clock
+from datetime import date, datetime, time, timedelta
+
+from app.core.time.work_calendar import (
+    WorkCalendar, CompiledCalendar, DEFAULT_SCHEDULE, BEFORE_HOURS, WORKING_HOURS,
+    BREAK_TIME, AFTER_HOURS, DAY_OFF
+)
+from app.core.time.scheduler import DeadlineScheduler
+from app.utils.ui_tasks import UITaskRunner
+
+class FakeDB:
+    """Banco em memória com as tabelas do calendário"""
+    def __init__(self, schedules=(), holidays=(), recesses=()):
+        self.tables = {
+            'horarios_equipe': list(schedules),
+            'feriados': list(holidays),
+            'recessos': list(recesses),
+        }
+        self.queries = 0
+        self.down = False
+
+    def execute_query(self, query, params=None):
+        self.queries += 1
+        if self.down:
+            raise ConnectionError("MySQL fora")
+        for table, rows in self.tables.items():
+            if f"FROM {table}" in query:
+                return rows
+        return []
+
+def new_calendar(db):
+    # Cada teste recebe um singleton novo (tests/conftest.py)
+    return WorkCalendar(db=db)
+
+def test_compiled_status_and_transitions():
+    monday = date(2024, 3, 4)
+    compiled = CompiledCalendar(DEFAULT_SCHEDULE, (0, 1, 2, 3, 4), {monday + timedelta(days=2)},
+                                monday, monday + timedelta(days=7))
+
+    assert compiled.status_at(datetime(2024, 3, 4, 7, 59)) == BEFORE_HOURS
+    assert compiled.status_at(datetime(2024, 3, 4, 8, 0)) == WORKING_HOURS
+    assert compiled.status_at(datetime(2024, 3, 4, 12, 15)) == BREAK_TIME
+    assert compiled.status_at(datetime(2024, 3, 4, 13, 15)) == WORKING_HOURS
+    assert compiled.status_at(datetime(2024, 3, 4, 18, 30)) == AFTER_HOURS
+    assert compiled.status_at(datetime(2024, 3, 6, 10, 0)) == DAY_OFF
+    assert compiled.status_at(datetime(2024, 3, 9, 10, 0)) == DAY_OFF
+
+    assert compiled.next_transition(datetime(2024, 3, 4, 12, 15)) == (datetime(2024, 3, 4, 13, 15), WORKING_HOURS)
+    # Quarta é feriado: o próximo fim de expediente após terça é na quinta
+    assert compiled.next_transition(datetime(2024, 3, 5, 19, 0), AFTER_HOURS) == \
+        (datetime(2024, 3, 7, 18, 30), AFTER_HOURS)
+
+def test_default_schedule_without_database_rows():
+    calendar = new_calendar(FakeDB())
+    assert calendar.day_schedule() == DEFAULT_SCHEDULE
+    # Sem dias da semana configurados, todos os dias são trabalhados
+    assert calendar.status_at(datetime(2024, 3, 9, 10, 0)) == WORKING_HOURS
+
+def test_team_schedule_holidays_and_recesses():
+    db = FakeDB(
+        schedules=[
+            {'equipe_id': None, 'inicio_expediente': '08:00:00', 'inicio_intervalo': '12:00:00',
+             'fim_intervalo': '13:00:00', 'fim_expediente': '17:00:00', 'dias_semana': '0,1,2,3,4'},
+            {'equipe_id': 7, 'inicio_expediente': timedelta(hours=6), 'inicio_intervalo': timedelta(hours=10),
+             'fim_intervalo': timedelta(hours=10, minutes=30), 'fim_expediente': timedelta(hours=14),
+             'dias_semana': '0,1,2,3,4,5'},
+        ],
+        holidays=[{'data': date(2024, 3, 5), 'equipe_id': None}],
+        recesses=[{'data_inicio': date(2024, 3, 11), 'data_fim': date(2024, 3, 12), 'equipe_id': 7}],
+    )
+    calendar = new_calendar(db)
+
+    assert calendar.day_schedule().company_end == time(17, 0)
+    assert calendar.day_schedule(team_id=7).company_start == time(6, 0)
+
+    # Feriado da empresa vale para todas as equipes
+    assert calendar.status_at(datetime(2024, 3, 5, 9, 0)) == DAY_OFF
+    assert calendar.status_at(datetime(2024, 3, 5, 9, 0), team_id=7) == DAY_OFF
+    # Sábado só é trabalhado pela equipe 7; o recesso só vale para ela
+    assert calendar.status_at(datetime(2024, 3, 9, 9, 0)) == DAY_OFF
+    assert calendar.status_at(datetime(2024, 3, 9, 9, 0), team_id=7) == WORKING_HOURS
+    assert calendar.is_holiday(date(2024, 3, 11), team_id=7)
+    assert calendar.is_workday(date(2024, 3, 11))
+
+    calendar.set_team(7)
+    assert calendar.status_at(datetime(2024, 3, 4, 10, 15)) == BREAK_TIME
+    assert calendar.next_transition(datetime(2024, 3, 9, 15, 0), AFTER_HOURS) == \
+        (datetime(2024, 3, 13, 14, 0), AFTER_HOURS)
+
+    # A duração em horário comercial usa as mesmas regras da equipe (terça é feriado)
+    duration = calendar.business_calendar().duration(datetime(2024, 3, 4, 13, 0), datetime(2024, 3, 6, 7, 0))
+    assert duration == timedelta(hours=2)
+
+def test_lookups_do_not_query_database_again():
+    db = FakeDB()
+    calendar = new_calendar(db)
+    calendar.status_at(datetime(2024, 3, 4, 9, 0))
+    queries = db.queries
+    for minute in range(600):
+        calendar.status_at(datetime(2024, 3, 4, 8, 0) + timedelta(minutes=minute))
+    assert calendar.next_transition(datetime(2024, 3, 4, 9, 0), AFTER_HOURS)
+    assert db.queries == queries
+
+class FakeWidget:
+    """Widget sem loop de eventos: os resultados são entregues com drain()"""
+    def winfo_exists(self):
+        return True
+
+def drain_one(timeout=5.0):
+    deadline = clock.monotonic() + timeout
+    while not UITaskRunner().drain():
+        assert clock.monotonic() < deadline, "releitura não terminou a tempo"
+        clock.sleep(0.01)
+
+def test_stale_calendar_reloads_in_background():
+    db = FakeDB(schedules=[
+        {'equipe_id': None, 'inicio_expediente': '08:00:00', 'inicio_intervalo': '12:00:00',
+         'fim_intervalo': '13:00:00', 'fim_expediente': '17:00:00', 'dias_semana': '0,1,2,3,4'},
+    ])
+    calendar = new_calendar(db)
+    calendar.reload()
+    calendar.start(FakeWidget())
+    db.tables['horarios_equipe'][0]['fim_expediente'] = '19:00:00'
+    calendar._loaded_at -= 2 * WorkCalendar.RELOAD_INTERVAL
+
+    # Vencido: as consultas não vão ao banco e continuam com o calendário compilado
+    queries = db.queries
+    assert calendar.status_at(datetime(2024, 3, 4, 18, 0)) == AFTER_HOURS
+    assert db.queries == queries
+
+    DeadlineScheduler().run_pending(now=clock.time() + WorkCalendar.RELOAD_INTERVAL + 1)
+    drain_one()
+    assert calendar.status_at(datetime(2024, 3, 4, 18, 0)) == WORKING_HOURS
+
+    # Banco fora na releitura: mantém o último calendário
+    db.down = True
+    DeadlineScheduler().run_pending(now=clock.time() + 2 * WorkCalendar.RELOAD_INTERVAL + 2)
+    drain_one()
+    assert calendar.day_schedule().company_end == time(19, 0)
+    calendar.stop()
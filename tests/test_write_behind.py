@@ -0,0 +1,116 @@
+# tests/test_write_behind.py
+
+import sqlite3
+import threading
+from queue import Full
+
+import pytest
+
+from app.database.write_behind import WriteBehindQueue, SqlExpression
+
+class GatedDb:
+    """
+    Banco sqlite3 com o execute_transaction de DatabaseConnection; as
+    transações esperam o gate e podem falhar uma vez
+    """
+
+    def __init__(self, rows):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("CREATE TABLE atividades (id INTEGER PRIMARY KEY, total_time TEXT, "
+                           "time_exceeded TEXT, time_regress TEXT)")
+        self._conn.executemany("INSERT INTO atividades (id) VALUES (?)", [(i,) for i in range(1, rows + 1)])
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail_next = False
+        self.batches = []
+
+    def execute_transaction(self, statements):
+        self.gate.wait()
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("falha simulada")
+        self.batches.append(len(statements))
+        with self._lock, self._conn:
+            for query, params in statements:
+                self._conn.execute(query.replace("%s", "?"), params)
+        return True
+
+    def columns(self, *names):
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id, {', '.join(names)} FROM atividades ORDER BY id").fetchall()
+        return {row[0]: row[1:] if len(names) > 1 else row[1] for row in rows}
+
+def test_updates_to_the_same_row_are_merged():
+    server = GatedDb(2)
+    queue = WriteBehindQueue(server, flush_interval=60)
+    for seconds in range(1, 6):
+        queue.enqueue(1, {'total_time': f"00:00:0{seconds}"})
+    queue.enqueue(1, {'time_exceeded': SqlExpression("'00:01:00'")})
+    queue.enqueue(2, {'total_time': "00:00:09"})
+    assert queue.stats()['pending'] == 2 and queue.stats()['merged_updates'] == 5
+
+    assert queue.flush()
+    # Um lote, uma linha por atividade, só com os valores finais
+    assert server.batches == [2]
+    assert server.columns('total_time', 'time_exceeded') == {1: ("00:00:05", "00:01:00"), 2: ("00:00:09", None)}
+
+def test_full_queue_applies_backpressure():
+    server = GatedDb(5)
+    queue = WriteBehindQueue(server, flush_interval=60, max_pending=2, enqueue_timeout=0.2)
+    server.gate.clear()
+    queue.enqueue(1, {'total_time': "00:00:01"})
+    queue.enqueue(2, {'total_time': "00:00:02"})
+    # Fila cheia: força a gravação de 1 e 2, que fica presa no banco, e ocupa o espaço liberado
+    queue.enqueue(3, {'total_time': "00:00:03"})
+    queue.enqueue(4, {'total_time': "00:00:04"})
+    with pytest.raises(Full):
+        queue.enqueue(5, {'total_time': "00:00:05"})
+    # Linha já pendente é mesclada mesmo com a fila cheia
+    queue.enqueue(4, {'total_time': "00:00:40"})
+
+    server.gate.set()
+    assert queue.flush()
+    # A atualização recusada (5) não foi gravada
+    assert server.columns('total_time') == {1: "00:00:01", 2: "00:00:02", 3: "00:00:03", 4: "00:00:40", 5: None}
+
+def test_stop_writes_pending_and_newer_values_win_after_failure():
+    server = GatedDb(1)
+    queue = WriteBehindQueue(server, flush_interval=60)
+    server.gate.clear()
+    server.fail_next = True
+    queue.enqueue(1, {'total_time': "00:00:10", 'time_regress': "00:50:00"})
+    queue.flush(wait=False)
+    # Chega durante a gravação que vai falhar: vence o valor do lote devolvido à fila
+    queue.enqueue(1, {'total_time': "00:00:20"})
+    server.gate.set()
+
+    queue.stop()
+    queue._worker.join(2)
+    assert not queue._worker.is_alive()
+    assert server.columns('total_time', 'time_regress') == {1: ("00:00:20", "00:50:00")}
+    assert queue.stats()['pending'] == 0
+
+def test_deferred_writes_run_in_order_and_are_retried():
+    server = GatedDb(1)
+    queue = WriteBehindQueue(server, flush_interval=60)
+    calls = []
+    attempts = {'pause': 0}
+
+    def pause():
+        attempts['pause'] += 1
+        if attempts['pause'] == 1:
+            raise ConnectionError("falha simulada")
+        calls.append(('pause', server.columns('total_time')[1]))
+
+    server.gate.clear()
+    queue.enqueue(1, {'total_time': "00:00:30"})
+    queue.defer(lambda: calls.append(('start', server.columns('total_time')[1])))
+    queue.defer(pause)
+    queue.defer(lambda: calls.append(('stop', None)))
+    server.gate.set()
+
+    assert queue.flush()
+    # As linhas pendentes vão antes; só a gravação que falhou e as seguintes são repetidas
+    assert calls == [('start', "00:00:30"), ('pause', "00:00:30"), ('stop', None)]
+    assert queue.stats()['deferred'] == 0